@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Free space and allocated range queries on a large cluster bitmap.
+
+A random bitmap of a volume with 4 KiB clusters is generated in memory
+(16 TiB volume takes a 512 MiB bitmap), free clusters are counted and
+allocated ranges of the first 512 GiB are extracted (random bits are the
+worst case, about one range per two clusters).
+
+Usage (from repository root):
+    PYTHONPATH=. python benchmarks/bench_bitmap.py [volume TiB]
+"""
+import sys
+import time
+import numpy
+from rawdisk.plugins.filesystems.ntfs.bitmap import ClusterBitmap
+
+CLUSTER_SIZE = 4096
+
+
+def main():
+    tib = float(sys.argv[1]) if len(sys.argv) > 1 else 16
+    total_clusters = int(tib * 2 ** 40) // CLUSTER_SIZE
+    rng = numpy.random.default_rng(1)
+    data = rng.integers(
+        0, 256, (total_clusters + 7) // 8, dtype=numpy.uint8)
+
+    start = time.perf_counter()
+    bitmap = ClusterBitmap(data, total_clusters)
+    free = bitmap.free_clusters
+    elapsed = time.perf_counter() - start
+    print('{:.1f} TiB volume: {} free clusters in {:.3f} s'.format(
+        tib, free, elapsed))
+
+    part = ClusterBitmap(data[:2 ** 27 // 8], 2 ** 27)
+    start = time.perf_counter()
+    count = sum(1 for _ in part.allocated_ranges())
+    elapsed = time.perf_counter() - start
+    print('{} allocated ranges of the first 512 GiB in {:.3f} s'.format(
+        count, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Attribution of search hits to files with the cluster reverse map.
+
+A map of a volume with 4 KiB clusters and one fragmented file per
+interval (1 million intervals by default) is generated in memory, then
+random disk offsets (eg. byte pattern search hits) are attributed with a
+single vectorized lookup and one by one.
+
+Usage (from repository root):
+    PYTHONPATH=. python benchmarks/bench_cluster_map.py [intervals] [hits]
+"""
+import sys
+import time
+import numpy
+from rawdisk.plugins.filesystems.ntfs.cluster_map import ClusterMap, \
+    INTERVAL_DTYPE
+
+CLUSTER_SIZE = 4096
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    hits = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    rng = numpy.random.default_rng(1)
+
+    intervals = numpy.zeros(count, dtype=INTERVAL_DTYPE)
+    lengths = rng.integers(1, 64, count)
+    # gaps of free clusters between intervals
+    starts = numpy.cumsum(lengths + rng.integers(0, 16, count)) - lengths
+    intervals['lcn'] = starts
+    intervals['length'] = lengths
+    intervals['record'] = numpy.arange(count) + 64
+    intervals['attr_type'] = 0x80
+    intervals['size'] = lengths * CLUSTER_SIZE
+    cluster_map = ClusterMap(intervals, [''], CLUSTER_SIZE)
+
+    total = int(starts[-1] + lengths[-1])
+    offsets = rng.integers(0, total * CLUSTER_SIZE, hits)
+
+    start = time.perf_counter()
+    positions = cluster_map.owners_of(offsets)
+    elapsed = time.perf_counter() - start
+    print('{} hits ({} owned) attributed in {:.2f} ms'.format(
+        hits, int((positions >= 0).sum()), elapsed * 1000))
+
+    start = time.perf_counter()
+
+    for offset in offsets.tolist():
+        cluster_map.owner_of(offset)
+
+    elapsed = time.perf_counter() - start
+    print('{} hits one by one in {:.2f} ms'.format(hits, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    main()
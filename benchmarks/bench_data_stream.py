@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Sequential read throughput of a non-resident $DATA stream.
+
+An image with one contiguous file is written to a temporary file, the file
+is read through :meth:`NtfsVolume.open` in fixed size chunks and compared
+to plain reads of the same range. Peak traced memory shows that streams
+do not grow with the file size.
+
+Usage (from repository root):
+    PYTHONPATH=. python benchmarks/bench_data_stream.py [MiB] [chunk KiB]
+"""
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+from rawdisk.plugins.filesystems.ntfs.ntfs_volume import NtfsVolume
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+
+
+def measure(read_chunks):
+    tracemalloc.start()
+    start = time.perf_counter()
+    total = read_chunks()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return total, elapsed, peak
+
+
+def main():
+    size = (int(sys.argv[1]) if len(sys.argv) > 1 else 128) * 1024 * 1024
+    chunk = (int(sys.argv[2]) if len(sys.argv) > 2 else 1024) * 1024
+
+    fd, filename = tempfile.mkstemp(suffix='.img')
+    os.close(fd)
+
+    try:
+        ntfs_image.build_file_image(filename, bytes(size))
+        volume = NtfsVolume()
+        volume.load(filename, ntfs_image.VOLUME_OFFSET)
+
+        def read_stream():
+            total = 0
+            with volume.open(ntfs_image.FILE_RECORD) as f:
+                for data in iter(lambda: f.read(chunk), b''):
+                    total += len(data)
+            return total
+
+        def read_plain():
+            total = 0
+            with open(filename, 'rb') as f:
+                f.seek(ntfs_image.VOLUME_OFFSET +
+                       ntfs_image.DATA_LCN * ntfs_image.CLUSTER_SIZE)
+                while total < size:
+                    total += len(f.read(min(chunk, size - total)))
+            return total
+
+        print('{:>8} {:>10} {:>10} {:>12}'.format(
+            'reader', 'seconds', 'MiB/s', 'peak KiB'))
+
+        for name, function in (('plain', read_plain),
+                               ('stream', read_stream)):
+            total, elapsed, peak = measure(function)
+            assert total == size
+            print('{:>8} {:>10.2f} {:>10.0f} {:>12.0f}'.format(
+                name, elapsed, total / elapsed / 2 ** 20, peak / 1024))
+    finally:
+        os.remove(filename)
+
+
+if __name__ == '__main__':
+    main()
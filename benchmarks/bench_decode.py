@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Per-record decode cost of MFT entry headers and NTFS boot sectors,
+field-by-field getters (previous implementation) versus precompiled
+struct schemas.
+
+Usage (from repository root):
+    PYTHONPATH=. python benchmarks/bench_decode.py [iterations]
+"""
+import sys
+import timeit
+from rawdisk.util.rawstruct import RawStruct
+from rawdisk.plugins.filesystems.ntfs.headers import MFT_RECORD_HEADER, \
+    MFT_RECORD_HEADER_SCHEMA, BIOS_PARAMETER_BLOCK, \
+    BIOS_PARAMETER_BLOCK_SCHEMA, EXTENDED_BIOS_PARAMETER_BLOCK, \
+    EXTENDED_BIOS_PARAMETER_BLOCK_SCHEMA
+
+
+def getters_mft_header(r):
+    return MFT_RECORD_HEADER(
+        r.get_string(0, 4),
+        r.get_ushort_le(0x04),
+        r.get_ushort_le(0x06),
+        r.get_ulonglong_le(0x08),
+        r.get_ushort_le(0x10),
+        r.get_ushort_le(0x12),
+        r.get_ushort_le(0x14),
+        r.get_ushort_le(0x16),
+        r.get_uint_le(0x18),
+        r.get_uint_le(0x1C),
+        r.get_ulonglong_le(0x20),
+        r.get_ushort_le(0x28),
+        r.get_uint_le(0x2C),
+    ),
+
+
+def schema_mft_header(r):
+    return MFT_RECORD_HEADER(*MFT_RECORD_HEADER_SCHEMA.unpack_from(r.data)),
+
+
+def getters_bootsector(r):
+    bpb = BIOS_PARAMETER_BLOCK(
+        r.get_ushort_le(0x0B),
+        r.get_ubyte(0x0D),
+        r.get_ushort_le(0x0E),
+        r.get_ubyte(0x15),
+        r.get_ushort_le(0x18),
+        r.get_ushort_le(0x1A),
+        r.get_uint_le(0x1C),
+        r.get_ulonglong_le(0x28),
+    )
+    extended_bpb = EXTENDED_BIOS_PARAMETER_BLOCK(
+        r.get_ulonglong_le(0x30),
+        r.get_ulonglong_le(0x38),
+        r.get_byte(0x40),
+        r.get_ubyte(0x44),
+        r.get_ulonglong_le(0x48),
+    )
+    return bpb, extended_bpb
+
+
+def schema_bootsector(r):
+    bpb = BIOS_PARAMETER_BLOCK(
+        *BIOS_PARAMETER_BLOCK_SCHEMA.unpack_from(r.data))
+    extended_bpb = EXTENDED_BIOS_PARAMETER_BLOCK(
+        *EXTENDED_BIOS_PARAMETER_BLOCK_SCHEMA.unpack_from(r.data))
+    return bpb, extended_bpb
+
+
+def per_record_us(func, arg, iterations):
+    best = min(timeit.repeat(
+        lambda: func(arg), number=iterations, repeat=5))
+    return best / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    with open('sample_images/ntfs_mft_table.bin', 'rb') as f:
+        record = RawStruct(f.read(1024))
+
+    with open('sample_images/ntfs_bootsector.bin', 'rb') as f:
+        bootsector = RawStruct(f.read())
+
+    cases = [
+        ('MFT_RECORD_HEADER', getters_mft_header, schema_mft_header,
+         record),
+        ('BOOT SECTOR (BPB + EBPB)', getters_bootsector, schema_bootsector,
+         bootsector),
+    ]
+
+    print('{:<26} {:>12} {:>12} {:>8}'.format(
+        'structure', 'getters us', 'schema us', 'speedup'))
+
+    for name, before, after, arg in cases:
+        # both implementations must decode identical structures
+        assert [bytes(s) for s in before(arg)] == \
+            [bytes(s) for s in after(arg)]
+
+        t_before = per_record_us(before, arg, iterations)
+        t_after = per_record_us(after, arg, iterations)
+
+        print('{:<26} {:>12.3f} {:>12.3f} {:>7.1f}x'.format(
+            name, t_before, t_after, t_before / t_after))
+
+
+if __name__ == '__main__':
+    main()
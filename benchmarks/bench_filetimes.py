@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""FILETIME conversion: one datetime per value (filetime_to_dt) versus
+whole array at once (filetimes_to_datetime64).
+
+Usage (from repository root):
+    PYTHONPATH=. python benchmarks/bench_filetimes.py [values]
+"""
+import sys
+import time
+import numpy
+from rawdisk.util.filetimes import filetime_to_dt, filetimes_to_datetime64
+
+# 2000-01-01 .. 2030-01-01 as FILETIME
+FIRST = 125911584000000000
+LAST = 135379296000000000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    filetimes = numpy.random.default_rng(0).integers(
+        FIRST, LAST, count, dtype=numpy.uint64)
+    # unset times, as in records without $STANDARD_INFORMATION
+    filetimes[::10] = 0
+    values = filetimes.tolist()
+
+    start = time.perf_counter()
+    [filetime_to_dt(value) for value in values if value]
+    t_loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    filetimes_to_datetime64(filetimes)
+    t_bulk = time.perf_counter() - start
+
+    print('{:<12} {:>10} {:>14}'.format('method', 'seconds', 'values/s'))
+
+    for name, elapsed in (('datetime', t_loop), ('datetime64', t_bulk)):
+        print('{:<12} {:>10.3f} {:>14.0f}'.format(
+            name, elapsed, count / elapsed))
+
+    print('speedup: {:.1f}x'.format(t_loop / t_bulk))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Update sequence fixups: one record at a time (Python loop) versus
+whole chunk at once (NumPy).
+
+Usage (from repository root):
+    PYTHONPATH=. python benchmarks/bench_fixups.py [records]
+"""
+import sys
+import time
+from rawdisk.plugins.filesystems.ntfs.fixups import apply_fixups_bulk, \
+    fixup_record
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+
+RECORD_SIZE = 1024
+# records per chunk (4 MiB chunks, same as bulk MFT reads)
+CHUNK_RECORDS = 4096
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    samples = ntfs_image.sample_records()
+    chunk = b''.join(
+        bytes(samples[n % len(samples)]) for n in range(CHUNK_RECORDS))
+    chunks = max(count // CHUNK_RECORDS, 1)
+    count = chunks * CHUNK_RECORDS
+
+    start = time.perf_counter()
+
+    for _ in range(chunks):
+        for n in range(CHUNK_RECORDS):
+            record = chunk[n * RECORD_SIZE:(n + 1) * RECORD_SIZE]
+            fixup_record(
+                record, int.from_bytes(record[4:6], 'little'),
+                int.from_bytes(record[6:8], 'little'))
+
+    t_loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+
+    for _ in range(chunks):
+        apply_fixups_bulk(chunk, RECORD_SIZE, b'FILE')
+
+    t_bulk = time.perf_counter() - start
+
+    print('{:<12} {:>10} {:>14}'.format('method', 'seconds', 'records/s'))
+
+    for name, elapsed in (('records', t_loop), ('chunks', t_bulk)):
+        print('{:<12} {:>10.2f} {:>14.0f}'.format(
+            name, elapsed, count / elapsed))
+
+    print('speedup: {:.1f}x'.format(t_loop / t_bulk))
+
+
+if __name__ == '__main__':
+    main()
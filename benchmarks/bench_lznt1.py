@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""LZNT1 decompression throughput.
+
+Text-like and zero filled 64 KiB compression units are compressed with
+the test compressor and decompressed with :func:`lznt1.decompress`, then
+a compressed file is read sequentially and at random offsets through
+:meth:`NtfsVolume.open`.
+
+Usage (from repository root):
+    PYTHONPATH=. python benchmarks/bench_lznt1.py [MiB]
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+from rawdisk.plugins.filesystems.ntfs.lznt1 import decompress
+from rawdisk.plugins.filesystems.ntfs.ntfs_volume import NtfsVolume
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+
+UNIT = ntfs_image.COMPRESSION_UNIT
+
+
+def text_unit(rng):
+    words = [b'volume ', b'cluster ', b'record ', b'index\n', b'0x%04x ']
+    data = b''.join(rng.choice(words) for _ in range(UNIT // 4))
+    return data[:UNIT]
+
+
+def report(name, size, elapsed):
+    print('{:>24} {:>10.2f} {:>10.1f}'.format(
+        name, elapsed, size / elapsed / 2 ** 20))
+
+
+def main():
+    size = (int(sys.argv[1]) if len(sys.argv) > 1 else 8) * 1024 * 1024
+    rng = random.Random(1)
+    units = size // UNIT
+
+    print('{:>24} {:>10} {:>10}'.format('', 'seconds', 'MiB/s'))
+
+    for name, unit in (('text units', text_unit(rng)),
+                       ('zero units', bytes(UNIT))):
+        packed = ntfs_image.lznt1_compress(unit)
+        start = time.perf_counter()
+
+        for _ in range(units):
+            assert len(decompress(packed, UNIT)) == UNIT
+
+        report(name, size, time.perf_counter() - start)
+
+    content = b''.join(text_unit(rng) for _ in range(units))
+    fd, filename = tempfile.mkstemp(suffix='.img')
+    os.close(fd)
+
+    try:
+        ntfs_image.build_file_image(filename, content, compressed=True)
+        volume = NtfsVolume()
+        volume.load(filename, ntfs_image.VOLUME_OFFSET)
+
+        with volume.open(ntfs_image.FILE_RECORD) as f:
+            start = time.perf_counter()
+            assert f.read() == content
+            report('sequential stream', size, time.perf_counter() - start)
+
+            # 4 KiB reads, units are decompressed once and then cached
+            offsets = [rng.randrange(len(content) - 4096) for _ in range(4096)]
+            offsets.sort()
+            start = time.perf_counter()
+
+            for offset in offsets:
+                f.seek(offset)
+                f.read(4096)
+
+            report('sorted 4 KiB reads', 4096 * 4096,
+                   time.perf_counter() - start)
+    finally:
+        os.remove(filename)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Full MFT scan throughput with a growing number of worker processes.
+
+A contiguous table of sample records is written to a temporary file and
+scanned with :func:`scan_records`, output of every run is compared to the
+single-process scan.
+
+Usage (from repository root):
+    PYTHONPATH=. python benchmarks/bench_mft_scan.py [records] [max workers]
+"""
+import os
+import sys
+import time
+import tempfile
+from rawdisk.plugins.filesystems.ntfs.mft import MftTable
+from rawdisk.plugins.filesystems.ntfs.mft_scan import scan_records
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+
+
+def write_table(filename, count):
+    samples = ntfs_image.sample_records()
+
+    with open(filename, 'wb') as f:
+        for number in range(count):
+            record = samples[number % len(samples)][:]
+            f.write(ntfs_image.set_record_number(record, number))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else \
+        os.cpu_count() or 1
+
+    fd, filename = tempfile.mkstemp(suffix='.mft')
+    os.close(fd)
+
+    try:
+        write_table(filename, count)
+        table = MftTable(filename=filename)
+        expected = None
+        baseline = None
+        workers = 1
+
+        print('{:>8} {:>10} {:>14} {:>8}'.format(
+            'workers', 'seconds', 'records/s', 'speedup'))
+
+        while workers <= max_workers:
+            start = time.perf_counter()
+            records = list(scan_records(table, 0, count, workers=workers))
+            elapsed = time.perf_counter() - start
+
+            if expected is None:
+                expected, baseline = records, elapsed
+
+            assert records == expected
+
+            print('{:>8} {:>10.2f} {:>14.0f} {:>7.1f}x'.format(
+                workers, elapsed, count / elapsed, baseline / elapsed))
+
+            workers *= 2
+    finally:
+        os.remove(filename)
+
+
+if __name__ == '__main__':
+    main()
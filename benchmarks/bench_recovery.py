@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Deleted entry scan: in use check on every MftEntry (Python loop)
+versus vectorized header filter that decodes deleted records only.
+
+Every tenth record of the generated table is marked deleted.
+
+Usage (from repository root):
+    PYTHONPATH=. python benchmarks/bench_recovery.py [records]
+"""
+import os
+import sys
+import time
+import tempfile
+from rawdisk.plugins.filesystems.ntfs.mft import MftTable
+from rawdisk.plugins.filesystems.ntfs.recovery import scan_deleted, \
+    deleted_entry
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+
+# every n-th record is deleted
+DELETED_EVERY = 10
+
+
+def write_table(filename, count):
+    samples = ntfs_image.sample_records()
+
+    with open(filename, 'wb') as f:
+        for number in range(count):
+            record = bytearray(ntfs_image.set_record_number(
+                samples[number % len(samples)][:], number))
+
+            if number % DELETED_EVERY == 0:
+                record[0x16] &= ~0x01
+
+            f.write(record)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    fd, filename = tempfile.mkstemp(suffix='.mft')
+    os.close(fd)
+
+    try:
+        write_table(filename, count)
+        table = MftTable(filename=filename)
+
+        start = time.perf_counter()
+        expected = [
+            deleted_entry(entry) for entry in table.iter_entries(0, count)
+            if entry.header.signature == b'FILE' and not entry.is_in_use
+        ]
+        t_loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = list(scan_deleted(table, stop=count))
+        t_scan = time.perf_counter() - start
+
+        assert found == expected
+
+        print('{} deleted of {} records'.format(len(found), count))
+        print('{:<12} {:>10} {:>14}'.format('method', 'seconds', 'records/s'))
+
+        for name, elapsed in (('entries', t_loop), ('scan', t_scan)):
+            print('{:<12} {:>10.2f} {:>14.0f}'.format(
+                name, elapsed, count / elapsed))
+
+        print('speedup: {:.1f}x'.format(t_loop / t_scan))
+    finally:
+        os.remove(filename)
+
+
+if __name__ == '__main__':
+    main()
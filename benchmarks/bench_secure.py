@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Security descriptor lookups of many files sharing few descriptors:
+read and decode per file versus the deduplicated $Secure cache.
+
+Usage (from repository root):
+    PYTHONPATH=. python benchmarks/bench_secure.py [files]
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+from rawdisk.plugins.filesystems.ntfs.ntfs_volume import NtfsVolume
+from rawdisk.plugins.filesystems.ntfs.security_descriptor import \
+    parse_security_descriptor
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+from rawdisk.plugins.filesystems.ntfs.tests.test_secure import build_image
+
+# security ids of the test image with a valid descriptor
+SECURITY_IDS = (0x100, 0x101, 0x102)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    tmpdir = tempfile.mkdtemp()
+
+    try:
+        filename = os.path.join(tmpdir, 'secure.img')
+        build_image(filename)
+        volume = NtfsVolume()
+        volume.load(filename, ntfs_image.VOLUME_OFFSET)
+        store = volume.secure
+        files = [SECURITY_IDS[n % len(SECURITY_IDS)] for n in range(count)]
+
+        expected, t_each = timed(lambda: [
+            parse_security_descriptor(store.read(sec_id))
+            for sec_id in files])
+        found, t_cached = timed(lambda: [
+            store.descriptor(sec_id) for sec_id in files])
+
+        assert found == expected
+
+        print('files: {}, descriptors: {}'.format(count, len(store)))
+        print('{:<12} {:>10} {:>14}'.format('method', 'seconds', 'files/s'))
+
+        for name, elapsed in (('per file', t_each), ('cached', t_cached)):
+            print('{:<12} {:>10.3f} {:>14.0f}'.format(
+                name, elapsed, count / elapsed))
+
+        print('speedup: {:.0f}x'.format(t_each / t_cached))
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Volume-wide alternate data stream sweep: one MftEntry per record
+(Python loop) versus header-only lock step walk, compared with the
+columnar MFT decode.
+
+Usage (from repository root):
+    PYTHONPATH=. python benchmarks/bench_streams.py [records]
+"""
+import os
+import sys
+import time
+import tempfile
+from rawdisk.plugins.filesystems.ntfs.mft import MftTable
+from rawdisk.plugins.filesystems.ntfs.mft_columns import read_columns
+from rawdisk.plugins.filesystems.ntfs.streams import iter_streams, \
+    entry_streams
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+
+# every n-th record is a file with an alternate data stream
+ADS_EVERY = 16
+
+
+def write_table(filename, count):
+    samples = ntfs_image.sample_records()
+
+    with open(filename, 'wb') as f:
+        for number in range(count):
+            if number % ADS_EVERY == ADS_EVERY - 1:
+                record = ntfs_image.file_record(number, 5, 'file.txt', [
+                    ntfs_image.attribute(0x80, b'content'),
+                    ntfs_image.attribute(
+                        0x80, b'[ZoneTransfer]', 'Zone.Identifier')])
+            else:
+                record = ntfs_image.set_record_number(
+                    samples[number % len(samples)][:], number)
+
+            f.write(record)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    fd, filename = tempfile.mkstemp(suffix='.mft')
+    os.close(fd)
+
+    try:
+        write_table(filename, count)
+        table = MftTable(filename=filename)
+
+        expected, t_loop = timed(lambda: [
+            stream for entry in table.iter_entries(0, count)
+            if entry.is_in_use for stream in entry_streams(entry)])
+        streams, t_sweep = timed(
+            lambda: list(iter_streams(table, 0, count)))
+        _, t_columns = timed(lambda: read_columns(table, 0, count))
+
+        assert streams == expected
+
+        print('records: {}, streams: {}'.format(count, len(streams)))
+        print('{:<12} {:>10} {:>14}'.format('method', 'seconds', 'records/s'))
+
+        for name, elapsed in (('entries', t_loop), ('sweep', t_sweep),
+                              ('columns', t_columns)):
+            print('{:<12} {:>10.2f} {:>14.0f}'.format(
+                name, elapsed, count / elapsed))
+
+        print('speedup over entries: {:.1f}x'.format(t_loop / t_sweep))
+    finally:
+        os.remove(filename)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""MACB timeline throughput: events generated from MFT columns and
+written as CSV, extrapolated to a 5 million entry MFT.
+
+Usage (from repository root):
+    PYTHONPATH=. python benchmarks/bench_timeline.py [records]
+"""
+import os
+import sys
+import time
+import numpy
+from rawdisk.plugins.filesystems.ntfs.mft_columns import MftColumns, \
+    RECORD_DTYPE
+from rawdisk.plugins.filesystems.ntfs.path_index import PathIndex
+from rawdisk.plugins.filesystems.ntfs.timeline import iter_events
+from rawdisk.util.timeline import write_csv
+
+# files per directory
+FILES_PER_DIRECTORY = 100
+TARGET_RECORDS = 5000000
+# 2014-11-15 as FILETIME
+FIRST_TIME = 130605790869733620
+
+
+def make_columns(count):
+    """Directories under the root, files in directories, every record \
+    has $STANDARD_INFORMATION and $FILE_NAME times."""
+    names = 'directory'.encode('utf-16-le') + 'file.txt'.encode('utf-16-le')
+    records = numpy.zeros(count, dtype=RECORD_DTYPE)
+    numbers = numpy.arange(count)
+    directories = numbers % FILES_PER_DIRECTORY == 0
+
+    records['record'] = numbers
+    records['valid'] = True
+    records['flags'] = numpy.where(directories, 0x03, 0x01)
+    records['parent_ref'] = numpy.where(
+        directories, 5, numbers - numbers % FILES_PER_DIRECTORY)
+    records['name_offset'] = numpy.where(directories, 0, 18)
+    records['name_length'] = numpy.where(directories, 9, 8)
+    records['size'] = numbers * 7
+
+    for n, column in enumerate(('ctime', 'atime', 'mtime', 'rtime')):
+        records[column] = FIRST_TIME + numbers * 10000 + n
+        records['fn_' + column] = FIRST_TIME + numbers * 10000
+
+    return MftColumns(records, names)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    columns = make_columns(count)
+
+    with open(os.devnull, 'w', newline='') as output:
+        start = time.perf_counter()
+        events = write_csv(iter_events(columns, PathIndex(columns)), output)
+        elapsed = time.perf_counter() - start
+
+    print('records: {}, events: {}'.format(count, events))
+    print('seconds: {:.2f}, events/s: {:.0f}'.format(
+        elapsed, events / elapsed))
+    print('estimated for {} records: {:.0f} s'.format(
+        TARGET_RECORDS, elapsed * TARGET_RECORDS / count))
+
+
+if __name__ == '__main__':
+    main()
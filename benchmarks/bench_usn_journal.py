@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Change journal queries: full $J scan versus a time range query that
+binary searches the start page and reads only the tail.
+
+Usage (from repository root):
+    PYTHONPATH=. python benchmarks/bench_usn_journal.py [records]
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+from rawdisk.plugins.filesystems.ntfs.mft import ENTRY_EXTEND
+from rawdisk.plugins.filesystems.ntfs.ntfs_volume import NtfsVolume
+from rawdisk.plugins.filesystems.ntfs.usn_journal import USN_PAGE_SIZE
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+from rawdisk.plugins.filesystems.ntfs.tests.ntfs_image import attribute, \
+    non_resident_attribute, file_name, mft_record, index_entry, \
+    directory_record
+from rawdisk.plugins.filesystems.ntfs.tests.test_usn_journal import \
+    usn_record, BASE_TIME, SECOND, JOURNAL_RECORD
+
+SPARSE_CLUSTERS = 0x10000
+JOURNAL_LCN = 0x300
+
+
+def build_image(filename, count):
+    pages = []
+    page = b''
+    usn = SPARSE_CLUSTERS * ntfs_image.CLUSTER_SIZE
+
+    for number in range(count):
+        record = usn_record(usn, BASE_TIME + number * SECOND,
+                            100 + number % 1000, ntfs_image.ROOT,
+                            'file{}.txt'.format(number))
+
+        if len(page) + len(record) > USN_PAGE_SIZE:
+            pages.append(page.ljust(USN_PAGE_SIZE, b'\x00'))
+            usn += USN_PAGE_SIZE - len(page)
+            record = usn_record(usn, BASE_TIME + number * SECOND,
+                                100 + number % 1000, ntfs_image.ROOT,
+                                'file{}.txt'.format(number))
+            page = b''
+
+        page += record
+        usn += len(record)
+
+    pages.append(page)
+    data = b''.join(pages)
+    clusters = -(-len(data) // ntfs_image.CLUSTER_SIZE)
+
+    image = ntfs_image.NtfsImage(JOURNAL_LCN + clusters)
+
+    for number, record in enumerate(ntfs_image.sample_records()):
+        image.write_record(number, record)
+
+    image.write_record(ENTRY_EXTEND, directory_record(
+        ENTRY_EXTEND, ntfs_image.ROOT, '$Extend', [
+            index_entry(JOURNAL_RECORD, file_name(
+                ENTRY_EXTEND, '$UsnJrnl')),
+            index_entry(0)]))
+    image.write_record(JOURNAL_RECORD, mft_record(JOURNAL_RECORD, [
+        attribute(0x30, file_name(ENTRY_EXTEND, '$UsnJrnl')),
+        non_resident_attribute(
+            0x80, [(None, SPARSE_CLUSTERS), (JOURNAL_LCN, clusters)],
+            usn, '$J'),
+    ]))
+    image.write_cluster(JOURNAL_LCN, data)
+    image.save(filename)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    tmpdir = tempfile.mkdtemp()
+
+    try:
+        filename = os.path.join(tmpdir, 'usn_journal.img')
+        build_image(filename, count)
+        volume = NtfsVolume()
+        volume.load(filename, ntfs_image.VOLUME_OFFSET)
+        journal = volume.usn_journal
+        # newest 1% of records
+        since = BASE_TIME + (count - count // 100) * SECOND
+
+        everything, t_full = timed(lambda: list(journal.iter_records()))
+        tail, t_tail = timed(lambda: list(journal.iter_records(since=since)))
+
+        assert tail == [record for record in everything
+                        if record.timestamp >= since]
+
+        print('records: {}, journal: {} MiB allocated, {} MiB sparse'.format(
+            count, (journal.size - journal.start) >> 20,
+            journal.start >> 20))
+        print('{:<12} {:>10} {:>10}'.format('query', 'seconds', 'records'))
+        print('{:<12} {:>10.3f} {:>10}'.format(
+            'full scan', t_full, len(everything)))
+        print('{:<12} {:>10.3f} {:>10}'.format('last 1%', t_tail, len(tail)))
+        print('speedup: {:.0f}x'.format(t_full / t_tail))
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -100,8 +100,10 @@ class FilesystemDetector(object):
         filesystem plugins.
 
         Args:
-            filename: device or file that it will read in order to detect
-            the filesystem fs_id: filesystem id to match (ex. 0x07)
+            filename: device or file (or an open \
+            :class:`~rawdisk.util.reader.ImageReader`) that it will read in \
+            order to detect the filesystem
+            fs_id: filesystem id to match (ex. 0x07)
             offset: offset for the filesystem that is being matched
 
         Returns:
@@ -124,8 +126,9 @@ class FilesystemDetector(object):
         filesystem plugins.
 
         Args:
-            filename: device or file that it will read in order to detect the
-            filesystem
+            filename: device or file (or an open \
+            :class:`~rawdisk.util.reader.ImageReader`) that it will read in \
+            order to detect the filesystem
             fs_id: filesystem guid to match
             (ex. {EBD0A0A2-B9E5-4433-87C0-68B6B72699C7})
             offset: offset for the filesystem that is being matched
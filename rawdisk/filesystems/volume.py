@@ -13,8 +13,9 @@ class Volume(object, metaclass=abc.ABCMeta):
         """Load volume information.
 
         Args:
-            filename: Filename or device that it will read volume.
-            information from.
+            filename: Filename or device (or an open \
+            :class:`~rawdisk.util.reader.ImageReader`) that it will read \
+            volume information from.
             offset: Volume offset.
         """
         return
@@ -3,10 +3,12 @@ import argparse
 import logging
 import sys
 from collections import namedtuple
+from itertools import chain
 
 from rawdisk.util.logging import setup_logging
 from rawdisk.session import Session
 from rawdisk.scheme.common import PartitionScheme
+from rawdisk.util.timeline import TIMELINE_WRITERS
 
 
 def parse_args(args):
@@ -30,14 +32,27 @@ def parse_args(args):
         choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
     )
 
+    parser.add_argument(
+        '--timeline', dest='timeline', choices=sorted(TIMELINE_WRITERS),
+        help='write MACB timeline of all volumes in this format'
+    )
+
+    parser.add_argument(
+        '-o', '--output', dest='output',
+        help='timeline output file (default: standard output)'
+    )
+
     parsed_args = parser.parse_args(args)
 
-    Options = namedtuple('Options', ['log_level', 'log_config', 'filename'])
+    Options = namedtuple('Options', [
+        'log_level', 'log_config', 'filename', 'timeline', 'output'])
 
     options = Options(
         log_level='DEBUG' if parsed_args.verbose else parsed_args.log_level,
         log_config=parsed_args.log_config,
-        filename=parsed_args.filename
+        filename=parsed_args.filename,
+        timeline=parsed_args.timeline,
+        output=parsed_args.output
     )
 
     return options
@@ -55,6 +70,31 @@ def configure_logging(args):
     setup_logging(**logging_options)
 
 
+def write_timeline(volumes, timeline_format, output=None):
+    """Writes timeline events of all volumes that provide them \
+    (``iter_timeline()``), volume after volume.
+
+    Args:
+        volumes (list): Loaded volumes.
+        timeline_format (str): One of \
+        :data:`~rawdisk.util.timeline.TIMELINE_WRITERS` keys.
+        output (str): Output file (default: standard output).
+
+    Returns:
+        int: Number of events written.
+    """
+    write = TIMELINE_WRITERS[timeline_format]
+    events = chain.from_iterable(
+        volume.iter_timeline() for volume in volumes
+        if hasattr(volume, 'iter_timeline'))
+
+    if output is None:
+        return write(events, sys.stdout)
+
+    with open(output, 'w', newline='') as stream:
+        return write(events, stream)
+
+
 def main():
     args = parse_args(sys.argv[1:])
     configure_logging(args)
@@ -71,6 +111,11 @@ def main():
             'Failed to open disk image file: {}'.format(args.filename))
         exit(1)
 
+    if args.timeline:
+        count = write_timeline(session.volumes, args.timeline, args.output)
+        logger.info('Timeline events written: {}'.format(count))
+        return
+
     if session.partition_scheme == PartitionScheme.SCHEME_MBR:
         print('Scheme: MBR')
     elif session.partition_scheme == PartitionScheme.SCHEME_GPT:
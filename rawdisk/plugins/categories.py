@@ -36,7 +36,14 @@ class IFilesystemPlugin(IPlugin):
     def detect(self, filename, offset, standalone=False):
         """Method is called by detector for each plugin, that is registered
         with :class:`FilesystemDetector \
-        <rawdisk.filesystems.detector.FilesystemDetector>`."""
+        <rawdisk.filesystems.detector.FilesystemDetector>`.
+
+        Args:
+            filename: Path to file/device or an open \
+            :class:`~rawdisk.util.reader.ImageReader`.
+            offset: Offset of the volume that is being matched.
+            standalone: True if volume is not a part of partition table.
+        """
         return
 
     def get_volume_object(self):
@@ -1,5 +1,35 @@
 import math
 from rawdisk.util.rawstruct import RawStruct
+from rawdisk.util.schema import StructSchema
+
+
+SUPERBLOCK_SCHEMA = StructSchema([
+    ('inodes_count',            0, 'I'),
+    ('blocks_count',            4, 'I'),
+    ('reserved_blocks_count',   8, 'I'),
+    ('free_blocks_count',       12, 'I'),
+    ('free_inodes_count',       16, 'I'),
+    ('first_data_block',        20, 'I'),
+    ('log_block_size',          24, 'I'),
+    ('log_fragment_size',       28, 'I'),
+    ('blocks_per_group',        32, 'I'),
+    ('fragments_per_group',     36, 'I'),
+    ('inodes_per_group',        40, 'I'),
+    ('mtime',                   44, 'I'),
+    ('wtime',                   48, 'I'),
+    ('mount_count',             52, 'H'),
+    ('max_mount_count',         54, 'H'),
+    ('magic',                   56, 'H'),
+    ('state',                   58, 'H'),
+    ('errors',                  60, 'H'),
+    ('minor_revision_level',    62, 'H'),
+    ('lastcheck',               64, 'I'),
+    ('checkinterval',           68, 'I'),
+    ('creator_os',              72, 'I'),
+    ('revision_level',          76, 'I'),
+    ('default_resuid',          80, 'H'),
+    ('default_resgid',          82, 'H'),
+])
 
 
 class SuperBlock(RawStruct):
@@ -11,36 +41,7 @@ class SuperBlock(RawStruct):
     def __init__(self, **kwargs):
         RawStruct.__init__(self, **kwargs)
 
-        self.inodes_count = self.get_uint_le(0)
-        self.blocks_count = self.get_uint_le(4)
-        self.reserved_blocks_count = self.get_uint_le(8)
-        self.free_blocks_count = self.get_uint_le(12)
-        self.free_inodes_count = self.get_uint_le(16)
-        self.first_data_block = self.get_uint_le(20)
-        self.log_block_size = self.get_uint_le(24)
-
-        self.log_fragment_size = self.get_int_le(28)
-
-        self.blocks_per_group = self.get_uint_le(32)
-        self.fragments_per_group = self.get_uint_le(36)
-        self.inodes_per_group = self.get_uint_le(40)
-        self.mtime = self.get_uint_le(44)
-        self.wtime = self.get_uint_le(48)
-
-        self.mount_count = self.get_ushort_le(52)
-        self.max_mount_count = self.get_ushort_le(54)
-        self.magic = self.get_ushort_le(56)
-        self.state = self.get_ushort_le(58)
-        self.errors = self.get_ushort_le(60)
-        self.minor_revision_level = self.get_ushort_le(62)
-
-        self.lastcheck = self.get_uint_le(64)
-        self.checkinterval = self.get_uint_le(68)
-        self.creator_os = self.get_uint_le(72)
-        self.revision_level = self.get_uint_le(76)
-
-        self.default_resuid = self.get_ushort_le(80)
-        self.default_resgid = self.get_ushort_le(82)
+        SUPERBLOCK_SCHEMA.unpack_into(self, self.data)
 
     def __str__(self):
         block_size = 1024 << self.log_block_size
@@ -3,6 +3,7 @@
 
 from rawdisk.filesystems.volume import Volume
 from rawdisk.util.rawstruct import RawStruct
+from rawdisk.util.reader import open_image
 
 VOLUME_HEADER_OFFSET = 1024
 
@@ -43,13 +44,11 @@ class HfsPlusVolume(Volume):
         """Loads HFS+ volume information"""
         try:
             self.offset = offset
-            self.fd = open(filename, 'rb')
-            # 1024 - temporary, need to find out actual volume header size
-            self.fd.seek(self.offset + VOLUME_HEADER_OFFSET)
-            data = self.fd.read(1024)
-            self.vol_header = VolumeHeader(data)
 
-            self.fd.close()
+            with open_image(filename) as reader:
+                # 1024 - temporary, need to find out actual volume header size
+                data = reader.read(self.offset + VOLUME_HEADER_OFFSET, 1024)
+                self.vol_header = VolumeHeader(data)
         except IOError as e:
             print(e)
 
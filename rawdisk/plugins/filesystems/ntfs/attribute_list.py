@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+
+
+"""$ATTRIBUTE_LIST resolution.
+
+Attributes of a file that do not fit into its base MFT record are moved
+to extension records, the base record then holds an $ATTRIBUTE_LIST
+naming the record of every attribute. Large fragmented or sparse files
+have their $DATA attribute split into pieces, each piece maps the VCN
+range starting at its lowest VCN.
+
+:func:`resolve_attribute_list` collects all extension records referenced
+by the list, sorts them and fetches them in coalesced sequential reads
+(nearby records are read together, records in between are skipped), so
+a file with hundreds of extension records resolves in a handful of I/Os.
+Attributes of the extension records are merged into the base entry's
+view, in list order, and data runs of split attributes are merged into
+their first piece.
+
+>>> entry = volume.mft_table.get_entry(record)   # resolved on load
+>>> entry.lookup_attribute(MFT_ATTR_DATA).data_runs   # all pieces
+"""
+from collections import namedtuple
+from rawdisk.util.reader import open_image
+from .data_runs import ExtentMap
+from .headers import ATTRIBUTE_LIST_ENTRY_SCHEMA, FILE_REFERENCE_MASK
+from .mft_attribute import MFT_ATTR_ATTRIBUTE_LIST
+from .mft_entry import MFT_ENTRY_SIGNATURE
+
+ATTRIBUTE_LIST_ENTRY_SIZE = 0x1A
+
+# extension records at most this many records apart are fetched in one
+# read
+DEFAULT_MAX_GAP = 16
+
+
+class AttributeListEntry(namedtuple('AttributeListEntry', [
+    'attr_type', 'name', 'starting_vcn', 'file_ref', 'attr_id'
+])):
+    """$ATTRIBUTE_LIST entry.
+
+    Attributes:
+        attr_type (int): Attribute type (eg. 0x80 - $DATA).
+        name (str): Attribute name ('' for unnamed attributes).
+        starting_vcn (int): Lowest VCN of the attribute piece (0 for \
+        resident attributes).
+        file_ref (int): File reference of the MFT record holding the \
+        attribute.
+        attr_id (int): Attribute identifier in that record.
+    """
+    __slots__ = ()
+
+    @property
+    def record(self):
+        """
+        Returns:
+            int: MFT entry index of the record holding the attribute.
+        """
+        return self.file_ref & FILE_REFERENCE_MASK
+
+
+def parse_attribute_list(data):
+    """Decodes $ATTRIBUTE_LIST attribute value.
+
+    Args:
+        data (bytes): Attribute value (bytes or memoryview).
+
+    Returns:
+        list: :class:`AttributeListEntry` tuples in list order.
+
+    Raises:
+        ValueError: If an entry is corrupted.
+    """
+    entries = []
+    offset = 0
+    end = len(data)
+
+    while offset + ATTRIBUTE_LIST_ENTRY_SIZE <= end:
+        attr_type, length, name_length, name_offset, starting_vcn, \
+            file_ref, attr_id = \
+            ATTRIBUTE_LIST_ENTRY_SCHEMA.unpack_from(data, offset)
+
+        if length < ATTRIBUTE_LIST_ENTRY_SIZE or offset + length > end or \
+                name_offset + 2 * name_length > length:
+            raise ValueError(
+                'Corrupted attribute list entry at {:#x}'.format(offset))
+
+        name_start = offset + name_offset
+        name = str(data[name_start:name_start + 2 * name_length],
+                   'utf-16-le')
+        entries.append(AttributeListEntry(
+            attr_type, name, starting_vcn, file_ref, attr_id))
+        offset += length
+
+    return entries
+
+
+def read_attribute_list(attr, mft_table):
+    """Reads and decodes $ATTRIBUTE_LIST, resident or not.
+
+    Args:
+        attr (MftAttrAttributeList): $ATTRIBUTE_LIST attribute.
+        mft_table (MftTable): :class:`~.mft.MftTable` of the volume.
+
+    Returns:
+        list: :class:`AttributeListEntry` tuples in list order.
+
+    Raises:
+        ValueError: If the list is corrupted or is non-resident and \
+        volume cluster size is unknown.
+    """
+    if not attr.header.non_resident_flag:
+        return parse_attribute_list(attr.value)
+
+    if not mft_table.cluster_size:
+        raise ValueError(
+            'Non-resident $ATTRIBUTE_LIST needs volume cluster size')
+
+    extent_map = ExtentMap(
+        attr.data_runs, mft_table.cluster_size, mft_table.volume_offset)
+
+    with open_image(mft_table.filename) as reader:
+        data = extent_map.read(reader, 0, attr.header.real_size)
+
+    return parse_attribute_list(data)
+
+
+def coalesce_records(records, max_gap=DEFAULT_MAX_GAP):
+    """Groups record numbers into ranges read with one sequential read.
+
+    Args:
+        records (iterable): MFT entry indexes, in any order.
+        max_gap (int): Maximum number of unneeded records between two \
+        records of the same range.
+
+    Returns:
+        list: (first record, record to stop at) tuples in ascending order.
+    """
+    ranges = []
+
+    for record in sorted(set(records)):
+        if ranges and record - ranges[-1][1] <= max_gap:
+            ranges[-1][1] = record + 1
+        else:
+            ranges.append([record, record + 1])
+
+    return [(start, stop) for start, stop in ranges]
+
+
+def fetch_extension_records(mft_table, base, records,
+                            max_gap=DEFAULT_MAX_GAP):
+    """Reads extension records of a base record.
+
+    Args:
+        mft_table (MftTable): :class:`~.mft.MftTable` of the volume.
+        base (int): Base record MFT entry index.
+        records (iterable): Extension record indexes.
+        max_gap (int): See :func:`coalesce_records`.
+
+    Returns:
+        dict: :class:`~.mft_entry.MftEntry` objects by index, records \
+        that are not in use, do not belong to the base record or are \
+        outside of the table are left out.
+    """
+    wanted = set(records)
+    found = {}
+
+    for start, stop in coalesce_records(wanted, max_gap):
+        try:
+            for entry in mft_table.iter_entries(start, stop):
+                if entry.index in wanted and \
+                        entry.header.signature == MFT_ENTRY_SIGNATURE and \
+                        entry.is_in_use and \
+                        entry.header.base_file_record & \
+                        FILE_REFERENCE_MASK == base:
+                    found[entry.index] = entry
+        except ValueError:
+            # range is not mapped by $MFT data runs
+            continue
+
+    return found
+
+
+def resolve_attribute_list(entry, mft_table, max_gap=DEFAULT_MAX_GAP):
+    """Merges attributes of extension records into a base entry.
+
+    Attributes are ordered as in the list, base record attributes the
+    list does not name (the list itself) follow. Pieces of a split
+    non-resident attribute are merged into the first piece
+    (:meth:`MftAttr.extend_data_runs
+    <.mft_attribute.MftAttr.extend_data_runs>`), so the entry holds one
+    attribute per stream. Attributes of missing extension records and
+    pieces with corrupted data runs are left out.
+
+    Args:
+        entry (MftEntry): Base :class:`~.mft_entry.MftEntry`.
+        mft_table (MftTable): :class:`~.mft.MftTable` of the volume.
+        max_gap (int): See :func:`coalesce_records`.
+
+    Returns:
+        int: Number of extension records merged (0 if entry has no \
+        $ATTRIBUTE_LIST).
+
+    Raises:
+        ValueError: If the list can not be read (see \
+        :func:`read_attribute_list`), entry is left as is.
+    """
+    list_attr = entry.lookup_attribute(MFT_ATTR_ATTRIBUTE_LIST)
+
+    if list_attr is None:
+        return 0
+
+    items = read_attribute_list(list_attr, mft_table)
+    base = entry.index
+    records = {base: entry}
+    records.update(fetch_extension_records(
+        mft_table, base,
+        [item.record for item in items if item.record != base], max_gap))
+
+    # (type, identifier) -> (attribute index tuple, attribute) per record
+    by_id = {}
+
+    for index, record in records.items():
+        by_id[index] = {
+            (attr.header.type, attr.header.identifier): (
+                position if index == base else
+                (position[0], None, position[2]), attr)
+            for position, attr in zip(
+                record.attribute_index, record.attributes)
+        }
+
+    attribute_index = []
+    attributes = []
+    merged = set()
+    # first piece of every split attribute by (type, name)
+    first_pieces = {}
+
+    for item in items:
+        found = by_id.get(item.record, {}).get(
+            (item.attr_type, item.attr_id))
+
+        if found is None or (item.record, item.attr_id) in merged:
+            continue
+
+        merged.add((item.record, item.attr_id))
+        position, attr = found
+        header = attr.header
+        key = (header.type, getattr(header, 'attr_name', ''))
+
+        if header.non_resident_flag and header.lowest_vcn:
+            first = first_pieces.get(key)
+
+            if first is not None:
+                try:
+                    first.extend_data_runs(attr.data_runs)
+                except ValueError:
+                    pass
+
+                continue
+        elif header.non_resident_flag:
+            first_pieces[key] = attr
+
+        attribute_index.append(position)
+        attributes.append(attr)
+
+    for position, attr in zip(entry.attribute_index, entry.attributes):
+        if (base, attr.header.identifier) not in merged:
+            attribute_index.append(position)
+            attributes.append(attr)
+
+    entry.replace_attributes(attribute_index, attributes)
+
+    return len(records) - 1
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+
+"""Volume cluster allocation bitmap ($Bitmap).
+
+Bit n of the bitmap is set if cluster n is allocated (bit 0 of the first
+byte is cluster 0). The bitmap is loaded once into a NumPy byte array,
+population counts and allocated range extraction are done block by block
+with vectorized operations, so a 16 TiB volume (512 MiB bitmap with 4 KiB
+clusters) is counted in a fraction of a second.
+
+>>> volume.bitmap.free_clusters
+>>> list(volume.bitmap.allocated_ranges())
+[(0, 4), (16, 1024), ...]
+"""
+import numpy
+
+# number of bitmap bytes processed at a time
+BLOCK_SIZE = 16 * 1024 * 1024
+# smaller blocks for range extraction, each bit takes one byte there
+RANGE_BLOCK_SIZE = 1024 * 1024
+
+# set bits in every byte value, used if numpy.bitwise_count is missing
+_POPCOUNT = numpy.array(
+    [bin(value).count('1') for value in range(256)], dtype=numpy.uint8)
+
+
+def popcount(data):
+    """Returns number of set bits in a uint8 array."""
+    if hasattr(numpy, 'bitwise_count'):
+        words = len(data) // 8
+        total = int(numpy.bitwise_count(
+            data[:words * 8].view(numpy.uint64)).sum(dtype=numpy.uint64))
+        return total + int(
+            numpy.bitwise_count(data[words * 8:]).sum(dtype=numpy.uint64))
+
+    return int(_POPCOUNT[data].sum(dtype=numpy.uint64))
+
+
+class ClusterBitmap(object):
+    """Cluster allocation bitmap of a volume.
+
+    Args:
+        bitmap (bytes): Raw $Bitmap content (bytes or uint8 array), \
+        bits past total_clusters are ignored.
+        total_clusters (int): Number of clusters in the volume.
+
+    Attributes:
+        bits (numpy.ndarray): Bitmap bytes (uint8), padding bits in the \
+        last byte are cleared.
+        total_clusters (int): Number of clusters in the volume.
+
+    Raises:
+        ValueError: If bitmap is smaller than the volume.
+    """
+    def __init__(self, bitmap, total_clusters):
+        size = (total_clusters + 7) // 8
+
+        if len(bitmap) < size:
+            raise ValueError('$Bitmap has {} bytes, {} needed'.format(
+                len(bitmap), size))
+
+        bits = numpy.frombuffer(bitmap, dtype=numpy.uint8, count=size)
+
+        if not bits.flags.writeable:
+            bits = bits.copy()
+
+        if total_clusters % 8:
+            bits[-1] &= (1 << (total_clusters % 8)) - 1
+
+        self.bits = bits
+        self.total_clusters = total_clusters
+        self._allocated = None
+
+    @classmethod
+    def load(cls, stream, total_clusters):
+        """Reads bitmap from a file-like object straight into the array.
+
+        Args:
+            stream (io.BufferedReader): $Bitmap $DATA stream (eg. from \
+            :meth:`NtfsVolume.open <.ntfs_volume.NtfsVolume.open>`).
+            total_clusters (int): Number of clusters in the volume.
+        """
+        bits = numpy.zeros((total_clusters + 7) // 8, dtype=numpy.uint8)
+        view = memoryview(bits)
+        done = 0
+
+        while done < len(bits):
+            count = stream.readinto(view[done:])
+
+            if not count:
+                break
+
+            done += count
+
+        return cls(bits[:done], total_clusters)
+
+    @property
+    def allocated_clusters(self):
+        """
+        Returns:
+            int: Number of allocated clusters.
+        """
+        if self._allocated is None:
+            self._allocated = sum(
+                popcount(self.bits[start:start + BLOCK_SIZE])
+                for start in range(0, len(self.bits), BLOCK_SIZE)
+            )
+
+        return self._allocated
+
+    @property
+    def free_clusters(self):
+        """
+        Returns:
+            int: Number of free clusters.
+        """
+        return self.total_clusters - self.allocated_clusters
+
+    def is_allocated(self, lcn):
+        """
+        Args:
+            lcn (int): Logical cluster number.
+
+        Returns:
+            bool: True if cluster is allocated.
+
+        Raises:
+            ValueError: If cluster is outside of the volume.
+        """
+        if not 0 <= lcn < self.total_clusters:
+            raise ValueError('Cluster {} is outside of the volume'.format(lcn))
+
+        return bool(self.bits[lcn >> 3] >> (lcn & 0x07) & 0x01)
+
+    def count_allocated(self, lcn, count):
+        """Counts allocated clusters of a cluster range.
+
+        Args:
+            lcn (int): First logical cluster number.
+            count (int): Number of clusters.
+
+        Returns:
+            int: Number of allocated clusters in the range, clusters \
+            outside of the volume are not counted.
+        """
+        end = min(lcn + count, self.total_clusters)
+        lcn = max(lcn, 0)
+
+        if lcn >= end:
+            return 0
+
+        data = self.bits[lcn >> 3:((end - 1) >> 3) + 1].copy()
+        # mask bits of the first and last byte outside of the range
+        data[0] &= (0xFF << (lcn & 0x07)) & 0xFF
+        data[-1] &= (1 << ((end - 1) & 0x07) + 1) - 1
+
+        return popcount(data)
+
+    def allocated_ranges(self):
+        """Yields runs of allocated clusters in ascending order.
+
+        Yields:
+            tuple: (first cluster, number of clusters).
+        """
+        previous = numpy.zeros(1, dtype=numpy.int8)
+        run_start = None
+
+        for start in range(0, len(self.bits), RANGE_BLOCK_SIZE):
+            bits = numpy.unpackbits(
+                self.bits[start:start + RANGE_BLOCK_SIZE],
+                bitorder='little').view(numpy.int8)
+            # bit changes, including the change from the previous block
+            edges = numpy.flatnonzero(numpy.diff(bits, prepend=previous))
+            values = bits[edges]
+            first = 8 * start
+            rising = first + edges[values == 1]
+            falling = first + edges[values == 0]
+
+            if run_start is not None:
+                rising = numpy.concatenate(([run_start], rising))
+
+            count = len(falling)
+
+            for lcn, length in zip(rising[:count].tolist(),
+                                   (falling - rising[:count]).tolist()):
+                yield lcn, length
+
+            run_start = rising[count] if len(rising) > count else None
+            previous = bits[-1:]
+
+        if run_start is not None:
+            yield int(run_start), self.total_clusters - int(run_start)
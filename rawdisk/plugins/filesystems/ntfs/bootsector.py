@@ -2,7 +2,8 @@
 
 
 from rawdisk.util.rawstruct import RawStruct
-from .headers import BIOS_PARAMETER_BLOCK, EXTENDED_BIOS_PARAMETER_BLOCK
+from .headers import BIOS_PARAMETER_BLOCK, EXTENDED_BIOS_PARAMETER_BLOCK, \
+    BIOS_PARAMETER_BLOCK_SCHEMA, EXTENDED_BIOS_PARAMETER_BLOCK_SCHEMA
 
 
 class BootSector(RawStruct):
@@ -29,23 +30,10 @@ class BootSector(RawStruct):
         self.oem_id = self.get_string(3, 8)
 
         self.bpb = BIOS_PARAMETER_BLOCK(
-            self.get_ushort_le(0x0B),       # bytes_per_sector
-            self.get_ubyte(0x0D),           # sectors_per_cluster
-            self.get_ushort_le(0x0E),       # reserved_sectors
-            self.get_ubyte(0x15),           # media_type
-            self.get_ushort_le(0x18),       # sectors_per_track
-            self.get_ushort_le(0x1A),       # heads
-            self.get_uint_le(0x1C),         # hidden_sectors
-            self.get_ulonglong_le(0x28),    # total sectors
-        )
+            *BIOS_PARAMETER_BLOCK_SCHEMA.unpack_from(self.data))
 
         self.extended_bpb = EXTENDED_BIOS_PARAMETER_BLOCK(
-            self.get_ulonglong_le(0x30),    # mft_cluster
-            self.get_ulonglong_le(0x38),    # mft_mirror_cluster
-            self.get_byte(0x40),            # clusters_per_mft
-            self.get_ubyte(0x44),           # clusters_per_index
-            self.get_ulonglong_le(0x48),    # volume_serial
-        )
+            *EXTENDED_BIOS_PARAMETER_BLOCK_SCHEMA.unpack_from(self.data))
 
     @property
     def mft_record_size(self):
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+
+
+"""Cluster to file reverse map.
+
+Data runs of every non-resident attribute of every in use MFT record are
+collected in a single MFT pass and stored as arrays of cluster intervals
+sorted by first LCN. Owner of a disk offset is then found with a binary
+search, :meth:`ClusterMap.owners_of` attributes a whole array of offsets
+(eg. byte pattern search hits) with one ``numpy.searchsorted`` call.
+
+>>> volume.owner_of(0x1234000)
+ClusterOwner(record=42, attr_type=128, name='', file_offset=8192, \
+is_slack=False)
+"""
+from collections import namedtuple
+import numpy
+from .headers import FILE_REFERENCE_MASK
+from .mft import DEFAULT_CHUNK_SIZE
+
+# offsets of unallocated clusters
+NO_OWNER = -1
+
+INTERVAL_DTYPE = numpy.dtype([
+    ('lcn', '<u8'),             # first cluster of the run
+    ('length', '<u8'),          # number of clusters
+    ('vcn', '<u8'),             # first cluster within the attribute
+    ('record', '<u8'),          # owner (base) MFT record
+    ('attr_type', '<u4'),
+    ('name', '<u4'),            # index of attribute name in names
+    ('size', '<u8'),            # attribute real size in bytes
+])
+
+
+class ClusterOwner(namedtuple('ClusterOwner', [
+    'record', 'attr_type', 'name', 'file_offset', 'is_slack'
+])):
+    """Attribute that owns a disk offset.
+
+    Attributes:
+        record (int): MFT record number (base record for attributes \
+        stored in extension records).
+        attr_type (int): Attribute type (eg. 0x80 - $DATA).
+        name (str): Attribute name ('' for unnamed attributes).
+        file_offset (int): Offset within the attribute value.
+        is_slack (bool): Offset is past the end of the value, in the \
+        slack space of the last cluster(s).
+    """
+    __slots__ = ()
+
+
+class ClusterMap(object):
+    """Sorted cluster interval map.
+
+    Args:
+        intervals (numpy.ndarray): :data:`INTERVAL_DTYPE` items sorted \
+        by lcn.
+        names (list): Attribute names referenced by interval name column.
+        cluster_size (int): Volume cluster size in bytes.
+        volume_offset (int): Volume offset from disk start in bytes.
+        identity (tuple): Identity of the volume the map was built for \
+        (stored with the map by :meth:`save`).
+
+    Note:
+        Intervals of different files should not overlap, on corrupted \
+        volumes with cross-linked clusters the owner with the last run \
+        start before the offset wins.
+    """
+    def __init__(self, intervals, names, cluster_size, volume_offset=0,
+                 identity=()):
+        self.intervals = intervals
+        self.names = list(names)
+        self.cluster_size = cluster_size
+        self.volume_offset = volume_offset
+        self.identity = tuple(identity)
+        self._starts = intervals['lcn']
+        self._ends = intervals['lcn'] + intervals['length']
+
+    @classmethod
+    def build(cls, mft_table, cluster_size, volume_offset=0, identity=(),
+              chunk_size=DEFAULT_CHUNK_SIZE):
+        """Builds map in a single sequential MFT pass.
+
+        Attributes split between extension records are mapped piece by \
+        piece, only the first piece (lowest VCN 0) holds the real size \
+        of the value, it is applied to runs of all pieces of the stream.
+
+        Args:
+            mft_table (MftTable): Initialized :class:`~.mft.MftTable`.
+            cluster_size (int): Volume cluster size in bytes.
+            volume_offset (int): Volume offset from disk start in bytes.
+            identity (tuple): Volume identity to store with the map.
+            chunk_size (int): Maximum number of bytes per MFT read.
+        """
+        rows = []
+        names = ['']
+        name_ids = {'': 0}
+        # (record, type, name) -> real size from the first piece
+        sizes = {}
+
+        for entry in mft_table.iter_entries(chunk_size=chunk_size):
+            if not entry.is_in_use:
+                continue
+
+            base = entry.header.base_file_record & FILE_REFERENCE_MASK
+            record = base if base else entry.index
+
+            for attr in entry.attributes:
+                if not attr.header.non_resident_flag:
+                    continue
+
+                name = getattr(attr.header, 'attr_name', '')
+                name_id = name_ids.setdefault(name, len(names))
+
+                if name_id == len(names):
+                    names.append(name)
+
+                try:
+                    runs = attr.data_runs
+                except ValueError:
+                    # corrupted runs, map what can not be decoded as free
+                    continue
+
+                stream = (record, attr.header.type, name_id)
+
+                if attr.header.lowest_vcn == 0:
+                    sizes[stream] = attr.header.real_size
+
+                for run in runs:
+                    if run.lcn is not None:
+                        rows.append((run.lcn, run.length, run.vcn) + stream)
+
+        intervals = numpy.array(
+            [row + (sizes.get(row[3:], 0),) for row in rows],
+            dtype=INTERVAL_DTYPE)
+        intervals = intervals[numpy.argsort(intervals['lcn'], kind='stable')]
+
+        return cls(intervals, names, cluster_size, volume_offset, identity)
+
+    def _lookup(self, lcns):
+        """Returns interval positions of clusters (:data:`NO_OWNER` for \
+        clusters no attribute owns)."""
+        positions = numpy.searchsorted(self._starts, lcns, side='right') - 1
+        valid = positions >= 0
+        owned = numpy.zeros(len(lcns), dtype=bool)
+        owned[valid] = lcns[valid] < self._ends[positions[valid]]
+
+        return numpy.where(owned, positions, NO_OWNER)
+
+    def owners_of(self, offsets):
+        """Attributes many disk offsets at once.
+
+        Args:
+            offsets (numpy.ndarray): Disk offsets in bytes (from the \
+            start of the disk, same as :meth:`owner_of`).
+
+        Returns:
+            numpy.ndarray: Position of the owning interval in \
+            :attr:`intervals` for every offset (:data:`NO_OWNER` if \
+            cluster is not owned by any attribute).
+        """
+        offsets = numpy.asarray(offsets, dtype=numpy.int64) - \
+            self.volume_offset
+        lcns = numpy.where(offsets >= 0, offsets, 0) // self.cluster_size
+        positions = self._lookup(lcns.astype(numpy.uint64))
+
+        return numpy.where(offsets >= 0, positions, NO_OWNER)
+
+    def owner_of(self, offset):
+        """
+        Args:
+            offset (int): Disk offset in bytes.
+
+        Returns:
+            ClusterOwner: Owner of the offset \
+            (:class:`ClusterOwner`, None if cluster is unallocated or \
+            not owned by any attribute).
+        """
+        position = int(self.owners_of([offset])[0])
+
+        if position == NO_OWNER:
+            return None
+
+        interval = self.intervals[position]
+        relative = offset - self.volume_offset
+        file_offset = (int(interval['vcn']) - int(interval['lcn'])) * \
+            self.cluster_size + relative
+
+        return ClusterOwner(
+            int(interval['record']),
+            int(interval['attr_type']),
+            self.names[int(interval['name'])],
+            file_offset,
+            file_offset >= int(interval['size'])
+        )
+
+    def save(self, filename):
+        """Saves map to a NumPy .npz file (file name is used as is)."""
+        with open(filename, 'wb') as f:
+            numpy.savez(
+                f,
+                intervals=self.intervals,
+                names=numpy.array(self.names, dtype=str),
+                geometry=numpy.array(
+                    [self.cluster_size, self.volume_offset],
+                    dtype=numpy.uint64),
+                identity=numpy.array(self.identity, dtype=numpy.uint64)
+            )
+
+    @classmethod
+    def load(cls, filename):
+        """Loads map saved by :meth:`save`.
+
+        Raises:
+            IOError: If file does not exist.
+            ValueError: If file is not a saved map.
+        """
+        with numpy.load(filename) as data:
+            cluster_size, volume_offset = data['geometry'].tolist()
+
+            return cls(
+                data['intervals'],
+                data['names'].tolist(),
+                cluster_size,
+                volume_offset,
+                data['identity'].tolist()
+            )
+
+    def __len__(self):
+        return len(self.intervals)
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+
+"""Non-resident attribute data runs (mapping pairs).
+
+Data runs describe where the clusters of a non-resident attribute are
+located on the volume. Every run starts with a header byte, low nibble is
+the size of the run length field, high nibble is the size of the run offset
+field. Run offset is a signed delta from the previous run's LCN, runs
+without an offset are sparse.
+
+See More:
+    http://ftp.kolibrios.org/users/Asper/docs/NTFS/ntfsdoc.html#concept_data_runs
+"""
+from bisect import bisect_right
+from collections import namedtuple
+
+
+DataRun = namedtuple('DataRun', ['vcn', 'lcn', 'length'])
+DataRun.__doc__ = """Contiguous run of clusters.
+
+Args:
+    vcn (int): First virtual cluster number of the run.
+    lcn (int): First logical cluster number on the volume (None if run \
+    is sparse).
+    length (int): Run length in clusters.
+"""
+
+
+def decode_data_runs(data, offset=0, start_vcn=0):
+    """Decodes data runs of a non-resident attribute.
+
+    Args:
+        data (bytes): Attribute data (bytes or memoryview).
+        offset (int): Offset to the first run in data \
+        (attribute header's data_run_offset).
+        start_vcn (int): VCN of the first run (attribute header's \
+        lowest_vcn).
+
+    Returns:
+        list: :class:`DataRun` tuples in VCN order.
+
+    Raises:
+        ValueError: If data runs are truncated or corrupted.
+    """
+    runs = []
+    vcn = start_vcn
+    lcn = 0
+    end = len(data)
+
+    while offset < end:
+        header = data[offset]
+
+        # 0x00 terminates the list
+        if header == 0:
+            break
+
+        length_size = header & 0x0F
+        offset_size = header >> 4
+        offset += 1
+
+        if length_size == 0 or offset + length_size + offset_size > end:
+            raise ValueError(
+                'Corrupted data run at offset {:#x}'.format(offset - 1))
+
+        length = int.from_bytes(
+            data[offset:offset + length_size], 'little')
+        offset += length_size
+
+        if offset_size == 0:
+            runs.append(DataRun(vcn, None, length))
+        else:
+            lcn += int.from_bytes(
+                data[offset:offset + offset_size], 'little', signed=True)
+            offset += offset_size
+            runs.append(DataRun(vcn, lcn, length))
+
+        vcn += length
+
+    return runs
+
+
+class ExtentMap(object):
+    """Translates offsets within a non-resident attribute to offsets on \
+    the disk.
+
+    Args:
+        runs (list): :class:`DataRun` tuples (eg. from \
+        :func:`decode_data_runs`).
+        cluster_size (int): Volume cluster size in bytes.
+        volume_offset (int): Volume offset from the beginning of the disk \
+        in bytes.
+    """
+    def __init__(self, runs, cluster_size, volume_offset=0):
+        self.runs = sorted(runs, key=lambda run: run.vcn)
+        self.cluster_size = cluster_size
+        self.volume_offset = volume_offset
+        self._vcns = [run.vcn for run in self.runs]
+
+    @property
+    def size(self):
+        """
+        Returns:
+            int: Number of bytes covered by data runs, starting at VCN 0.
+        """
+        if not self.runs:
+            return 0
+
+        last = self.runs[-1]
+        return (last.vcn + last.length) * self.cluster_size
+
+    def lookup(self, vcn):
+        """Finds data run containing the virtual cluster.
+
+        Args:
+            vcn (int): Virtual cluster number.
+
+        Returns:
+            DataRun: Data run containing vcn.
+
+        Raises:
+            ValueError: If vcn is not mapped by any of the data runs.
+        """
+        index = bisect_right(self._vcns, vcn) - 1
+
+        if index >= 0:
+            run = self.runs[index]
+
+            if vcn < run.vcn + run.length:
+                return run
+
+        raise ValueError('VCN {:#x} is not mapped'.format(vcn))
+
+    def translate(self, offset):
+        """
+        Args:
+            offset (int): Offset within the attribute in bytes.
+
+        Returns:
+            int: Offset from the beginning of the disk in bytes \
+            (None if offset is in a sparse run).
+        """
+        for disk_offset, _ in self.iter_segments(offset, 1):
+            return disk_offset
+
+    def iter_segments(self, offset, length):
+        """Splits attribute range into physically contiguous segments.
+
+        Args:
+            offset (int): Offset within the attribute in bytes.
+            length (int): Number of bytes.
+
+        Yields:
+            tuple: (offset from the beginning of the disk or None for \
+            sparse ranges, segment length in bytes).
+
+        Raises:
+            ValueError: If part of the range is not mapped.
+        """
+        cluster_size = self.cluster_size
+        end = offset + length
+        pending = None
+
+        while offset < end:
+            run = self.lookup(offset // cluster_size)
+            run_start = run.vcn * cluster_size
+            run_end = run_start + run.length * cluster_size
+            segment_length = min(run_end, end) - offset
+
+            if run.lcn is None:
+                disk_offset = None
+            else:
+                disk_offset = self.volume_offset + \
+                    run.lcn * cluster_size + offset - run_start
+
+            offset += segment_length
+
+            if pending is not None:
+                pending_offset, pending_length = pending
+
+                if pending_offset is None:
+                    adjacent = disk_offset is None
+                else:
+                    adjacent = disk_offset == pending_offset + pending_length
+
+                # merge runs that happen to be physically adjacent
+                if adjacent:
+                    pending = (pending_offset, pending_length + segment_length)
+                    continue
+
+                yield pending
+
+            pending = (disk_offset, segment_length)
+
+        if pending is not None:
+            yield pending
+
+    def read(self, reader, offset, length, cached=True):
+        """Reads attribute range, sparse ranges are filled with zeros.
+
+        Args:
+            reader (ImageReader): Open \
+            :class:`~rawdisk.util.reader.ImageReader`.
+            offset (int): Offset within the attribute in bytes.
+            length (int): Number of bytes to read.
+            cached (bool): Passed to :meth:`ImageReader.read`.
+
+        Returns:
+            bytes: Requested data (memoryview if reader returns views and \
+            range is contiguous).
+        """
+        chunks = []
+
+        for disk_offset, segment_length in self.iter_segments(
+                offset, length):
+            if disk_offset is None:
+                chunks.append(bytes(segment_length))
+            else:
+                chunks.append(
+                    reader.read(disk_offset, segment_length, cached=cached))
+
+        if len(chunks) == 1:
+            return chunks[0]
+
+        return b''.join(chunks)
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+
+
+"""Read-only file-like access to attribute values ($DATA streams).
+
+Non-resident values are read through their data runs: physically
+contiguous runs are read with a single call straight into the caller's
+buffer, sparse runs and the range past the initialized size are zero
+filled without any disk I/O. Streams are wrapped in
+:class:`io.BufferedReader`, its buffer size is the readahead, so small
+sequential reads are served from memory and large reads go straight to
+the disk.
+
+Compressed values are read one compression unit at a time: a unit
+without sparse clusters is stored uncompressed, a unit with sparse
+clusters holds LZNT1 compressed data in its allocated clusters, a fully
+sparse unit reads as zeros. Decompressed units are kept in a small LRU
+cache, so random reads only decompress units they touch.
+
+>>> with volume.open('/Windows/System32/config/SYSTEM') as f:
+>>>     header = f.read(4096)
+"""
+import io
+from rawdisk.util.cache import LruCache
+from rawdisk.util.reader import ImageReader
+from .data_runs import ExtentMap
+from .lznt1 import decompress
+from .mft_attribute import MFT_ATTR_DATA, ATTR_IS_COMPRESSED, \
+    ATTR_COMPRESSION_MASK, ATTR_IS_ENCRYPTED
+
+# default readahead (stream buffer size) in bytes
+DEFAULT_READAHEAD = 1024 * 1024
+
+# maximum number of decompressed compression units cached per stream
+DEFAULT_UNIT_CACHE_SIZE = 16
+
+
+class DataStream(io.RawIOBase):
+    """Seekable, read-only raw stream of an attribute value.
+
+    Args:
+        source (str or ImageReader): Source to read non-resident value \
+        from, readers passed in are left open on :meth:`close`.
+        extent_map (ExtentMap): :class:`~.data_runs.ExtentMap` of a \
+        non-resident value.
+        size (int): Value size in bytes.
+        initialized_size (int): Value bytes past this offset read as \
+        zeros (default: size).
+        value (bytes): Resident value (source and extent_map are not \
+        used).
+        unit_size (int): Compression unit size in bytes if value is \
+        compressed.
+        unit_cache_size (int): Maximum number of cached decompressed \
+        compression units.
+    """
+    def __init__(self, source=None, extent_map=None, size=0,
+                 initialized_size=None, value=None, unit_size=None,
+                 unit_cache_size=DEFAULT_UNIT_CACHE_SIZE):
+        io.RawIOBase.__init__(self)
+
+        if value is not None:
+            size = len(value)
+
+        self.size = size
+        self.initialized_size = size if initialized_size is None \
+            else min(initialized_size, size)
+        self._value = value
+        self._extent_map = extent_map
+        self._unit_size = unit_size
+        self.unit_cache = LruCache(unit_cache_size) if unit_size else None
+        self._position = 0
+        self._reader = None
+        self._owns_reader = False
+
+        if value is None and extent_map is not None:
+            self._owns_reader = not isinstance(source, ImageReader)
+            self._reader = ImageReader(source) if self._owns_reader \
+                else source
+
+    @classmethod
+    def from_attribute(cls, attr, source, cluster_size, volume_offset=0):
+        """Returns stream of an attribute value.
+
+        Args:
+            attr (MftAttr): Attribute (eg. \
+            :class:`~.mft_attribute.MftAttrData`).
+            source (str or ImageReader): Source to read from.
+            cluster_size (int): Volume cluster size in bytes.
+            volume_offset (int): Volume offset from disk start in bytes.
+
+        Raises:
+            ValueError: If attribute is encrypted or uses unknown \
+            compression.
+        """
+        header = attr.header
+
+        if not header.non_resident_flag:
+            return cls(value=bytes(attr.value))
+
+        if header.flags & ATTR_IS_ENCRYPTED:
+            raise ValueError('Encrypted attributes are not supported')
+
+        unit_size = None
+
+        if header.flags & ATTR_COMPRESSION_MASK:
+            if header.flags & ATTR_COMPRESSION_MASK != ATTR_IS_COMPRESSED \
+                    or not header.comp_unit_size:
+                raise ValueError('Unsupported compression')
+
+            # unit size is stored as log2 of clusters
+            unit_size = cluster_size << header.comp_unit_size
+
+        return cls(
+            source,
+            ExtentMap(attr.data_runs, cluster_size, volume_offset),
+            header.real_size,
+            header.data_size,
+            unit_size=unit_size
+        )
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError('Invalid whence ({})'.format(whence))
+
+        if position < 0:
+            raise ValueError('Negative seek position {}'.format(position))
+
+        self._position = position
+        return position
+
+    def readinto(self, buffer):
+        length = min(len(buffer), max(self.size - self._position, 0))
+
+        if length == 0:
+            return 0
+
+        view = memoryview(buffer).cast('B')
+        position = self._position
+
+        if self._value is not None:
+            view[:length] = self._value[position:position + length]
+        else:
+            initialized = max(min(length, self.initialized_size - position), 0)
+
+            if self._unit_size:
+                self._read_units(position, view[:initialized])
+            else:
+                self._read_runs(position, view[:initialized])
+
+            if initialized < length:
+                view[initialized:length] = bytes(length - initialized)
+
+        self._position += length
+        return length
+
+    def _read_runs(self, position, view):
+        done = 0
+
+        for disk_offset, length in \
+                self._extent_map.iter_segments(position, len(view)):
+            end = done + length
+
+            if disk_offset is None:
+                # sparse run
+                view[done:end] = bytes(length)
+            else:
+                self._reader.readinto(disk_offset, view[done:end])
+
+            done = end
+
+    def _read_units(self, position, view):
+        unit_size = self._unit_size
+        done = 0
+
+        while done < len(view):
+            unit, start = divmod(position + done, unit_size)
+            count = min(unit_size - start, len(view) - done)
+            view[done:done + count] = self._unit(unit)[start:start + count]
+            done += count
+
+    def _unit(self, unit):
+        """Returns decompressed compression unit, units are cached."""
+        data = self.unit_cache.get(unit)
+
+        if data is None:
+            data = self._read_unit(unit)
+            self.unit_cache.put(unit, data)
+
+        return data
+
+    def _read_unit(self, unit):
+        unit_size = self._unit_size
+        offset = unit * unit_size
+        segments = list(self._extent_map.iter_segments(
+            offset, min(unit_size, self._extent_map.size - offset)))
+        allocated = [
+            self._reader.read(disk_offset, length, cached=False)
+            for disk_offset, length in segments if disk_offset is not None
+        ]
+
+        if not allocated:
+            return bytes(unit_size)
+
+        data = b''.join(allocated)
+
+        # units without sparse clusters are not compressed
+        if len(allocated) < len(segments):
+            data = decompress(data, unit_size)
+
+        if len(data) < unit_size:
+            data = bytes(data) + bytes(unit_size - len(data))
+
+        return data
+
+    def close(self):
+        if self._owns_reader and self._reader is not None:
+            self._reader.close()
+
+        self._reader = None
+        io.RawIOBase.close(self)
+
+
+def open_stream(entry, source, cluster_size, volume_offset=0, name='',
+                readahead=DEFAULT_READAHEAD):
+    """Opens $DATA stream of an MFT entry.
+
+    Args:
+        entry (MftEntry): :class:`~.mft_entry.MftEntry` of the file.
+        source (str or ImageReader): Source to read from.
+        cluster_size (int): Volume cluster size in bytes.
+        volume_offset (int): Volume offset from disk start in bytes.
+        name (str): Stream name ('' for the unnamed stream).
+        readahead (int): Stream buffer size in bytes.
+
+    Returns:
+        io.BufferedReader: Buffered :class:`DataStream`.
+
+    Raises:
+        ValueError: If entry has no such stream or it is not supported.
+    """
+    attr = entry.lookup_attribute(MFT_ATTR_DATA, name)
+
+    if attr is None:
+        raise ValueError('MFT entry {} has no $DATA stream {!r}'.format(
+            entry.index, name))
+
+    return io.BufferedReader(
+        DataStream.from_attribute(attr, source, cluster_size, volume_offset),
+        readahead
+    )
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+
+"""Update sequence array (USA) fixups of multi-sector NTFS records.
+
+Before a multi-sector record (MFT FILE record, INDX block) is written, the
+last two bytes of every 512 byte stride are saved in the update sequence
+array and replaced with the update sequence number (USN). Readers have
+to put the saved bytes back, a stride that does not end with the USN was
+not completely written (torn write).
+
+:func:`apply_fixups_bulk` fixes a whole chunk of same size records at
+once: stride ends of all records are checked and restored one stride
+position at a time with NumPy fancy indexing instead of a Python loop per
+record.
+
+See More:
+    http://ftp.kolibrios.org/users/Asper/docs/NTFS/ntfsdoc.html#concept_fixup
+"""
+import struct
+import numpy
+
+# fixups are applied to 512 byte strides, regardless of the sector size
+FIXUP_STRIDE = 512
+
+
+def apply_fixups(data, usa_offset, usa_count):
+    """Returns copy of a multi-sector record with fixups applied.
+
+    Args:
+        data (bytes): Raw record (bytes or memoryview).
+        usa_offset (int): Update sequence array offset in record.
+        usa_count (int): Number of USA items (USN + one per stride).
+
+    Returns:
+        bytearray: Record with original stride end bytes restored \
+        (unchanged copy if update sequence array is not valid).
+    """
+    return fixup_record(data, usa_offset, usa_count)[0]
+
+
+def fixup_record(data, usa_offset, usa_count):
+    """Applies fixups to a copy of a multi-sector record and checks it \
+    for torn writes.
+
+    Args:
+        data (bytes): Raw record (bytes or memoryview).
+        usa_offset (int): Update sequence array offset in record.
+        usa_count (int): Number of USA items (USN + one per stride).
+
+    Returns:
+        tuple: (bytearray with fixups applied, True if a stride does not \
+        end with the USN or update sequence array is not valid).
+    """
+    fixed = bytearray(data)
+
+    if not is_valid_usa(len(fixed), usa_offset, usa_count):
+        return fixed, True
+
+    check = fixed[usa_offset:usa_offset + 2]
+    torn = False
+
+    for n in range(1, usa_count):
+        end = n * FIXUP_STRIDE
+        item = usa_offset + 2 * n
+        torn = torn or fixed[end - 2:end] != check
+        fixed[end - 2:end] = fixed[item:item + 2]
+
+    return fixed, torn
+
+
+def apply_fixups_bulk(data, record_size, signature=None):
+    """Applies fixups to a buffer of consecutive records.
+
+    Args:
+        data (bytes): Raw records (bytes or memoryview), trailing partial \
+        record is ignored.
+        record_size (int): Record size in bytes.
+        signature (bytes): Fix only records starting with this signature \
+        (eg. b'FILE'), other records are copied unchanged.
+
+    Returns:
+        tuple: (uint8 numpy.ndarray of shape (records, record_size) with \
+        fixups applied, bool numpy.ndarray marking torn records). Torn \
+        records are records with a stride that does not end with the USN \
+        or with invalid update sequence array, the latter are not fixed.
+    """
+    count = len(data) // record_size
+    records = numpy.frombuffer(
+        data, dtype=numpy.uint8, count=count * record_size
+    ).reshape(count, record_size).copy()
+
+    usa_offset = records[:, 4].astype(numpy.int64) | \
+        records[:, 5].astype(numpy.int64) << 8
+    usa_count = records[:, 6].astype(numpy.int64) | \
+        records[:, 7].astype(numpy.int64) << 8
+
+    selected = numpy.ones(count, dtype=bool)
+
+    if signature is not None:
+        selected = numpy.all(
+            records[:, :len(signature)] ==
+            numpy.frombuffer(signature, dtype=numpy.uint8), axis=1)
+
+    # same conditions as is_valid_usa
+    valid = selected & (usa_count > 1) & \
+        (usa_offset + 2 * usa_count <= record_size) & \
+        ((usa_count - 1) * FIXUP_STRIDE <= record_size) & \
+        (usa_offset >= 0x06)
+    torn = selected & ~valid
+
+    for n in range(1, record_size // FIXUP_STRIDE + 1):
+        rows = numpy.flatnonzero(valid & (usa_count > n))
+
+        if not rows.size:
+            break
+
+        end = n * FIXUP_STRIDE
+        item = usa_offset[rows] + 2 * n
+        check = usa_offset[rows]
+
+        torn[rows] |= (records[rows, end - 2] != records[rows, check]) | \
+            (records[rows, end - 1] != records[rows, check + 1])
+        records[rows, end - 2] = records[rows, item]
+        records[rows, end - 1] = records[rows, item + 1]
+
+    return records, torn
+
+
+def is_valid_usa(size, usa_offset, usa_count):
+    """Checks that update sequence array fits in the record and covers \
+    only strides inside the record."""
+    return usa_count > 1 and \
+        usa_offset + 2 * usa_count <= size and \
+        (usa_count - 1) * FIXUP_STRIDE <= size and \
+        usa_offset >= 0x06
+
+
+def usn(data, usa_offset):
+    """Returns update sequence number of the record."""
+    return struct.unpack_from('<H', data, usa_offset)[0]
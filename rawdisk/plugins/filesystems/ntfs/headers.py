@@ -1,6 +1,185 @@
 # -*- coding: utf-8 -*-
 from ctypes import Structure, c_ushort, c_ubyte, c_uint, c_ulonglong, \
     c_byte, c_char
+from rawdisk.util.schema import StructSchema
+
+
+# Offsets are relative to the start of the boot sector
+BIOS_PARAMETER_BLOCK_SCHEMA = StructSchema([
+    ("bytes_per_sector",    0x0B, c_ushort),
+    ("sectors_per_cluster", 0x0D, c_ubyte),
+    ("reserved_sectors",    0x0E, c_ushort),
+    ("media_type",          0x15, c_ubyte),
+    ("sectors_per_track",   0x18, c_ushort),
+    ("heads",               0x1A, c_ushort),
+    ("hidden_sectors",      0x1C, c_uint),
+    ("total_sectors",       0x28, c_ulonglong),
+])
+
+EXTENDED_BIOS_PARAMETER_BLOCK_SCHEMA = StructSchema([
+    ("mft_cluster",         0x30, c_ulonglong),
+    ("mft_mirror_cluster",  0x38, c_ulonglong),
+    ("clusters_per_mft",    0x40, c_byte),
+    ("clusters_per_index",  0x44, c_ubyte),
+    ("volume_serial",       0x48, c_ulonglong),
+])
+
+MFT_RECORD_HEADER_SCHEMA = StructSchema([
+    ("signature",               0x00, c_char * 4),
+    ("upd_seq_array_offset",    0x04, c_ushort),
+    ("upd_seq_array_size",      0x06, c_ushort),
+    ("logfile_seq_number",      0x08, c_ulonglong),
+    ("seq_number",              0x10, c_ushort),
+    ("hard_link_count",         0x12, c_ushort),
+    ("first_attr_offset",       0x14, c_ushort),
+    ("flags",                   0x16, c_ushort),
+    ("used_size",               0x18, c_uint),
+    ("allocated_size",          0x1C, c_uint),
+    ("base_file_record",        0x20, c_ulonglong),
+    ("next_attr_id",            0x28, c_ushort),
+    ("mft_record_number",       0x2C, c_uint),
+])
+
+# Offsets are relative to the start of $INDEX_ROOT attribute value
+INDEX_ROOT_SCHEMA = StructSchema([
+    ("indexed_attr_type",       0x00, c_uint),
+    ("collation_rule",          0x04, c_uint),
+    ("index_block_size",        0x08, c_uint),
+    ("clusters_per_index_block", 0x0C, c_byte),
+])
+
+# Index node header follows $INDEX_ROOT header and INDX record header,
+# entry offsets are relative to the start of the node header
+INDEX_NODE_HEADER_SCHEMA = StructSchema([
+    ("entries_offset",          0x00, c_uint),
+    ("entries_size",            0x04, c_uint),
+    ("allocated_size",          0x08, c_uint),
+    ("node_flags",              0x0C, c_ubyte),
+])
+
+INDEX_RECORD_HEADER_SCHEMA = StructSchema([
+    ("signature",               0x00, c_char * 4),
+    ("upd_seq_array_offset",    0x04, c_ushort),
+    ("upd_seq_array_size",      0x06, c_ushort),
+    ("logfile_seq_number",      0x08, c_ulonglong),
+    ("vcn",                     0x10, c_ulonglong),
+])
+
+INDEX_ENTRY_HEADER_SCHEMA = StructSchema([
+    ("file_ref",                0x00, c_ulonglong),
+    ("length",                  0x08, c_ushort),
+    ("key_length",              0x0A, c_ushort),
+    ("flags",                   0x0C, c_uint),
+])
+
+# $FILE_NAME attribute value, also the key of $I30 index entries
+FILE_NAME_SCHEMA = StructSchema([
+    ("parent_ref",              0x00, c_ulonglong),
+    ("ctime",                   0x08, c_ulonglong),
+    ("atime",                   0x10, c_ulonglong),
+    ("mtime",                   0x18, c_ulonglong),
+    ("rtime",                   0x20, c_ulonglong),
+    ("alloc_size",              0x28, c_ulonglong),
+    ("real_size",               0x30, c_ulonglong),
+    ("flags",                   0x38, c_uint),
+    ("reparse",                 0x3C, c_uint),
+    ("name_length",             0x40, c_ubyte),
+    ("namespace",               0x41, c_ubyte),
+])
+
+# $ATTRIBUTE_LIST attribute value entry, name follows at name_offset
+ATTRIBUTE_LIST_ENTRY_SCHEMA = StructSchema([
+    ("attr_type",               0x00, c_uint),
+    ("length",                  0x04, c_ushort),
+    ("name_length",             0x06, c_ubyte),
+    ("name_offset",             0x07, c_ubyte),
+    ("starting_vcn",            0x08, c_ulonglong),
+    ("file_ref",                0x10, c_ulonglong),
+    ("attr_id",                 0x18, c_ushort),
+])
+
+# View index ($SII, $SDH, ...) entry header, key follows the header, data
+# is at data_offset from the start of the entry
+VIEW_INDEX_ENTRY_HEADER_SCHEMA = StructSchema([
+    ("data_offset",             0x00, c_ushort),
+    ("data_length",             0x02, c_ushort),
+    ("length",                  0x08, c_ushort),
+    ("key_length",              0x0A, c_ushort),
+    ("flags",                   0x0C, c_uint),
+])
+
+# $SDS stream entry header (also $SII index entry data), self-relative
+# security descriptor follows
+SDS_ENTRY_HEADER_SCHEMA = StructSchema([
+    ("hash",                    0x00, c_uint),
+    ("sec_id",                  0x04, c_uint),
+    ("offset",                  0x08, c_ulonglong),
+    ("length",                  0x10, c_uint),
+])
+
+# Self-relative security descriptor, offsets are relative to its start
+SECURITY_DESCRIPTOR_SCHEMA = StructSchema([
+    ("revision",                0x00, c_ubyte),
+    ("control",                 0x02, c_ushort),
+    ("owner_offset",            0x04, c_uint),
+    ("group_offset",            0x08, c_uint),
+    ("sacl_offset",             0x0C, c_uint),
+    ("dacl_offset",             0x10, c_uint),
+])
+
+ACL_HEADER_SCHEMA = StructSchema([
+    ("revision",                0x00, c_ubyte),
+    ("size",                    0x02, c_ushort),
+    ("ace_count",               0x04, c_ushort),
+])
+
+ACE_HEADER_SCHEMA = StructSchema([
+    ("ace_type",                0x00, c_ubyte),
+    ("flags",                   0x01, c_ubyte),
+    ("size",                    0x02, c_ushort),
+    ("mask",                    0x04, c_uint),
+])
+
+# $UsnJrnl:$J change journal records, file name follows at name_offset
+USN_RECORD_V2_SCHEMA = StructSchema([
+    ("length",                  0x00, c_uint),
+    ("major_version",           0x04, c_ushort),
+    ("minor_version",           0x06, c_ushort),
+    ("file_ref",                0x08, c_ulonglong),
+    ("parent_ref",              0x10, c_ulonglong),
+    ("usn",                     0x18, c_ulonglong),
+    ("timestamp",               0x20, c_ulonglong),
+    ("reason",                  0x28, c_uint),
+    ("source_info",             0x2C, c_uint),
+    ("sec_id",                  0x30, c_uint),
+    ("file_attributes",         0x34, c_uint),
+    ("name_length",             0x38, c_ushort),
+    ("name_offset",             0x3A, c_ushort),
+])
+
+# 128-bit file ids, NTFS file reference is in the lower 8 bytes
+USN_RECORD_V3_SCHEMA = StructSchema([
+    ("length",                  0x00, c_uint),
+    ("major_version",           0x04, c_ushort),
+    ("minor_version",           0x06, c_ushort),
+    ("file_ref",                0x08, c_ulonglong),
+    ("parent_ref",              0x18, c_ulonglong),
+    ("usn",                     0x28, c_ulonglong),
+    ("timestamp",               0x30, c_ulonglong),
+    ("reason",                  0x38, c_uint),
+    ("source_info",             0x3C, c_uint),
+    ("sec_id",                  0x40, c_uint),
+    ("file_attributes",         0x44, c_uint),
+    ("name_length",             0x48, c_ushort),
+    ("name_offset",             0x4A, c_ushort),
+])
+
+# file reference number is in lower 48 bits of the reference
+FILE_REFERENCE_MASK = 0x0000FFFFFFFFFFFF
+
+# MFT record header flags
+MFT_ENTRY_IN_USE = 0x0001
+MFT_ENTRY_DIRECTORY = 0x0002
 
 
 class BIOS_PARAMETER_BLOCK(Structure):
@@ -32,26 +211,11 @@ class BIOS_PARAMETER_BLOCK(Structure):
         | http://en.wikipedia.org/wiki/BIOS_parameter_block
         | http://ntfs.com/ntfs-partition-boot-sector.htm
     """
-    _fields_ = [
-        ("bytes_per_sector",    c_ushort),
-        ("sectors_per_cluster", c_ubyte),
-        ("reserved_sectors",    c_ushort),
-        ("media_type",          c_ubyte),
-        ("sectors_per_track",   c_ushort),
-        ("heads",               c_ushort),
-        ("hidden_sectors",      c_uint),
-        ("total_sectors",       c_ulonglong),
-    ]
+    _fields_ = BIOS_PARAMETER_BLOCK_SCHEMA.ctypes_fields
 
 
 class EXTENDED_BIOS_PARAMETER_BLOCK(Structure):
-    _fields_ = [
-        ("mft_cluster",         c_ulonglong),
-        ("mft_mirror_cluster",  c_ulonglong),
-        ("clusters_per_mft",    c_byte),
-        ("clusters_per_index",  c_ubyte),
-        ("volume_serial",       c_ulonglong),
-    ]
+    _fields_ = EXTENDED_BIOS_PARAMETER_BLOCK_SCHEMA.ctypes_fields
 
 
 class MFT_RECORD_HEADER(Structure):
@@ -81,18 +245,4 @@ class MFT_RECORD_HEADER(Structure):
     See Also:
         http://msdn.microsoft.com/en-us/library/bb470124(v=vs.85).aspx
     """
-    _fields_ = [
-        ("signature",               c_char * 4),
-        ("upd_seq_array_offset",    c_ushort),
-        ("upd_seq_array_size",      c_ushort),
-        ("logfile_seq_number",      c_ulonglong),
-        ("seq_number",              c_ushort),
-        ("hard_link_count",         c_ushort),
-        ("first_attr_offset",       c_ushort),
-        ("flags",                   c_ushort),
-        ("used_size",               c_uint),
-        ("allocated_size",          c_ushort),
-        ("base_file_record",        c_ulonglong),
-        ("next_attr_id",            c_ushort),
-        ("mft_record_number",       c_uint),
-    ]
+    _fields_ = MFT_RECORD_HEADER_SCHEMA.ctypes_fields
@@ -0,0 +1,472 @@
+# -*- coding: utf-8 -*-
+
+
+"""$I30 directory index (B+ tree) reader.
+
+Directory entries are kept in a B+ tree sorted by upper cased file name:
+the root node is stored in $INDEX_ROOT attribute, other nodes in fixed
+size INDX blocks of $INDEX_ALLOCATION attribute, $BITMAP attribute marks
+blocks that are in use. Name lookup descends from the root node and reads
+one block per tree level, decoded blocks are kept in an LRU cache that is
+usually shared by all directories of a volume. Listing a directory reads
+all its blocks in large chunks and applies update sequence fixups to a
+whole chunk of blocks at once.
+
+Names are collated with the upper case table of the volume ($UpCase),
+:meth:`~.ntfs_volume.NtfsVolume.directory_index` passes it to the index.
+Without the table names are upper cased with Python's str.upper(), which
+differs from $UpCase for some non-ASCII characters, so a lookup of such
+a name may descend to the wrong node and miss it.
+
+>>> volume.list_directory('/Windows')
+>>> volume.lookup_path('/Windows/System32/config/SYSTEM')
+
+See More:
+    http://ftp.kolibrios.org/users/Asper/docs/NTFS/ntfsdoc.html#concept_indexes
+"""
+import struct
+from collections import namedtuple
+import numpy
+from rawdisk.util.cache import LruCache
+from rawdisk.util.reader import open_image
+from .data_runs import ExtentMap
+from .mft import DEFAULT_CHUNK_SIZE
+from .fixups import fixup_record, apply_fixups_bulk
+from .headers import INDEX_NODE_HEADER_SCHEMA, INDEX_RECORD_HEADER_SCHEMA, \
+    INDEX_ENTRY_HEADER_SCHEMA, FILE_NAME_SCHEMA, FILE_REFERENCE_MASK
+from .mft_attribute import MFT_ATTR_INDEX_ROOT, MFT_ATTR_INDEX_ALLOCATION, \
+    MFT_ATTR_BITMAP
+
+# directory index name
+INDEX_I30 = '$I30'
+
+INDEX_RECORD_SIGNATURE = b'INDX'
+# node header follows INDX record header
+INDEX_RECORD_HEADER_SIZE = 0x18
+INDEX_ENTRY_HEADER_SIZE = 0x10
+FILE_NAME_HEADER_SIZE = 0x42
+
+# node flags
+INDEX_NODE_LARGE = 0x01
+
+# index entry flags
+INDEX_ENTRY_NODE = 0x01
+INDEX_ENTRY_END = 0x02
+
+# file name namespaces
+FILE_NAME_POSIX = 0
+FILE_NAME_WIN32 = 1
+FILE_NAME_DOS = 2
+FILE_NAME_WIN32_AND_DOS = 3
+
+# $FILE_NAME flag of directories
+FILE_NAME_INDEX_PRESENT = 0x10000000
+
+# VCNs of blocks smaller than a cluster are in 512 byte units
+INDEX_BLOCK_VCN_SIZE = 512
+
+# $UpCase holds upper case of every UTF-16 code unit
+UPCASE_SIZE = 0x10000
+
+# maximum number of cached index nodes
+DEFAULT_NODE_CACHE_SIZE = 1024
+
+
+class IndexEntry(namedtuple('IndexEntry', [
+    'file_ref', 'flags', 'subnode_vcn', 'parent_ref', 'ctime', 'atime',
+    'mtime', 'rtime', 'alloc_size', 'real_size', 'file_flags', 'namespace',
+    'name'
+])):
+    """$I30 index entry, key is a copy of file's $FILE_NAME attribute.
+
+    Attributes:
+        file_ref (ulonglong): File reference (record number and sequence \
+        number) of the file.
+        flags (uint): Entry flags (0x01 - has subnode, 0x02 - last entry \
+        of the node, last entries have no key).
+        subnode_vcn (ulonglong): VCN of the child node with smaller keys \
+        (None if entry has no subnode).
+        namespace (ubyte): File name namespace (0 - POSIX, 1 - Win32, \
+        2 - DOS, 3 - Win32 and DOS).
+        name (str): File name.
+    """
+    __slots__ = ()
+
+    @property
+    def record(self):
+        return self.file_ref & FILE_REFERENCE_MASK
+
+    @property
+    def seq_number(self):
+        return self.file_ref >> 48
+
+    @property
+    def has_subnode(self):
+        return bool(self.flags & INDEX_ENTRY_NODE)
+
+    @property
+    def is_last(self):
+        return bool(self.flags & INDEX_ENTRY_END)
+
+    @property
+    def is_directory(self):
+        return bool(self.file_flags & FILE_NAME_INDEX_PRESENT)
+
+
+IndexNode = namedtuple('IndexNode', ['vcn', 'flags', 'entries'])
+
+
+def load_upcase(data):
+    """Decodes $UpCase table.
+
+    Args:
+        data (bytes): $UpCase content.
+
+    Returns:
+        numpy.ndarray: Upper case of every UTF-16 code unit (uint16).
+
+    Raises:
+        ValueError: If table is truncated.
+    """
+    if len(data) < 2 * UPCASE_SIZE:
+        raise ValueError('$UpCase table is truncated')
+
+    return numpy.frombuffer(data, dtype='<u2', count=UPCASE_SIZE)
+
+
+def collation_key(name, upcase=None):
+    """Returns sort key of a file name in $I30 index.
+
+    Names are compared as upper cased UTF-16 code units. Without the \
+    volume table characters are upper cased one at a time, which \
+    approximates $UpCase (characters without single character upper \
+    case are kept).
+
+    Args:
+        name (str): File name.
+        upcase (numpy.ndarray): $UpCase table of the volume \
+        (:func:`load_upcase`).
+    """
+    if upcase is not None:
+        units = numpy.frombuffer(
+            name.encode('utf-16-le', 'surrogatepass'), dtype='<u2')
+        return upcase[units].astype('>u2').tobytes()
+
+    return ''.join(
+        upper if len(upper) == 1 else char
+        for char, upper in ((char, char.upper()) for char in name)
+    ).encode('utf-16-be')
+
+
+def parse_entries(data, start, end):
+    """Decodes index entries of a node.
+
+    Args:
+        data (bytes): Node data.
+        start (int): Offset of the first entry.
+        end (int): Offset of the end of entries.
+
+    Returns:
+        list: :class:`IndexEntry` tuples, the last one is the end entry.
+
+    Raises:
+        ValueError: If entries are corrupted.
+    """
+    entries = []
+    offset = start
+
+    while True:
+        if offset + INDEX_ENTRY_HEADER_SIZE > end:
+            raise ValueError(
+                'Index entry at {:#x} crosses node end'.format(offset))
+
+        file_ref, length, key_length, flags = \
+            INDEX_ENTRY_HEADER_SCHEMA.unpack_from(data, offset)
+
+        if length < INDEX_ENTRY_HEADER_SIZE or offset + length > end or \
+                INDEX_ENTRY_HEADER_SIZE + key_length > length:
+            raise ValueError(
+                'Corrupted index entry at {:#x}'.format(offset))
+
+        subnode_vcn = None
+
+        if flags & INDEX_ENTRY_NODE:
+            # subnode VCN is in the last 8 bytes of the entry
+            subnode_vcn = struct.unpack_from(
+                '<Q', data, offset + length - 0x08)[0]
+
+        if flags & INDEX_ENTRY_END:
+            entries.append(IndexEntry(
+                file_ref, flags, subnode_vcn, 0, 0, 0, 0, 0, 0, 0, 0, 0, ''))
+            return entries
+
+        key = offset + INDEX_ENTRY_HEADER_SIZE
+
+        if key_length < FILE_NAME_HEADER_SIZE:
+            raise ValueError(
+                'Corrupted index entry key at {:#x}'.format(offset))
+
+        parent_ref, ctime, atime, mtime, rtime, alloc_size, real_size, \
+            file_flags, _, name_length, namespace = \
+            FILE_NAME_SCHEMA.unpack_from(data, key)
+        name_offset = key + FILE_NAME_HEADER_SIZE
+        name = str(data[name_offset:name_offset + 2 * name_length],
+                   'utf-16-le')
+
+        entries.append(IndexEntry(
+            file_ref, flags, subnode_vcn, parent_ref & FILE_REFERENCE_MASK,
+            ctime, atime, mtime, rtime, alloc_size, real_size, file_flags,
+            namespace, name))
+
+        offset += length
+
+
+class DirectoryIndex(object):
+    """$I30 index of a directory MFT entry.
+
+    Args:
+        entry (MftEntry): Directory :class:`~.mft_entry.MftEntry`.
+        filename (str or ImageReader): Source to read index blocks from.
+        cluster_size (int): Volume cluster size in bytes.
+        volume_offset (int): Volume offset from disk start in bytes.
+        cache (LruCache): Index node cache, usually shared by all \
+        directories of a volume (private cache if not specified).
+        name (str): Index name (default: '$I30').
+        entry_parser (callable): Decodes entries of a node, called with \
+        (data, start, end) (default: :func:`parse_entries` of $I30 \
+        entries). Entries of other indexes need has_subnode, \
+        subnode_vcn and is_last like :class:`IndexEntry`, :meth:`find` \
+        works with $I30 indexes only.
+        upcase (numpy.ndarray): $UpCase table names are collated with \
+        by :meth:`find` (:func:`load_upcase`, str.upper() is used if \
+        None).
+
+    Attributes:
+        block_size (int): Index block size in bytes.
+        root (IndexNode): Root node from $INDEX_ROOT attribute.
+        cache (LruCache): Index node cache.
+
+    Raises:
+        ValueError: If entry has no such index.
+    """
+    def __init__(self, entry, filename, cluster_size, volume_offset=0,
+                 cache=None, name=INDEX_I30, entry_parser=parse_entries,
+                 upcase=None):
+        root_attr = entry.lookup_attribute(MFT_ATTR_INDEX_ROOT, name)
+
+        if root_attr is None:
+            raise ValueError(
+                'MFT entry {} has no {} index'.format(entry.index, name))
+
+        self.filename = filename
+        self.block_size = root_attr.index_block_size
+        self.cache = LruCache(DEFAULT_NODE_CACHE_SIZE) \
+            if cache is None else cache
+        self._key = (entry.index, entry.header.seq_number, name)
+        self._parse_entries = entry_parser
+        self._upcase = upcase
+
+        node_offset = root_attr.node_offset
+        self.root = IndexNode(None, root_attr.node_flags, entry_parser(
+            root_attr.data,
+            node_offset + root_attr.entries_offset,
+            min(node_offset + root_attr.entries_size, root_attr.size)
+        ))
+
+        if self.block_size >= cluster_size:
+            self._vcn_size = cluster_size
+        else:
+            self._vcn_size = INDEX_BLOCK_VCN_SIZE
+
+        self._allocation = None
+        self._bitmap = None
+
+        alloc_attr = entry.lookup_attribute(MFT_ATTR_INDEX_ALLOCATION, name)
+
+        if alloc_attr is not None and alloc_attr.header.non_resident_flag:
+            self._allocation = ExtentMap(
+                alloc_attr.data_runs, cluster_size, volume_offset)
+
+        bitmap_attr = entry.lookup_attribute(MFT_ATTR_BITMAP, name)
+
+        if bitmap_attr is not None:
+            if bitmap_attr.header.non_resident_flag:
+                with open_image(filename) as reader:
+                    self._bitmap = bytes(ExtentMap(
+                        bitmap_attr.data_runs, cluster_size, volume_offset
+                    ).read(reader, 0, bitmap_attr.header.real_size))
+            else:
+                self._bitmap = bytes(bitmap_attr.value)
+
+    def is_allocated(self, vcn):
+        """Checks $BITMAP bit of the index block (blocks are assumed to be \
+        in use if index has no bitmap)."""
+        if self._bitmap is None:
+            return True
+
+        block = vcn * self._vcn_size // self.block_size
+        byte = block >> 3
+
+        return byte < len(self._bitmap) and \
+            bool(self._bitmap[byte] & (1 << (block & 0x07)))
+
+    def node(self, vcn):
+        """Returns decoded index block, blocks are cached.
+
+        Args:
+            vcn (int): Index block VCN (from :attr:`IndexEntry.subnode_vcn`).
+
+        Returns:
+            IndexNode: Decoded :class:`IndexNode`.
+
+        Raises:
+            ValueError: If block is not in use or is corrupted.
+        """
+        key = self._key + (vcn,)
+        node = self.cache.get(key)
+
+        if node is None:
+            node = self._read_node(vcn)
+            self.cache.put(key, node)
+
+        return node
+
+    def preload(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Reads all index blocks in large chunks and caches decoded \
+        nodes of blocks that are in use, fixups are applied to all blocks \
+        of a chunk at once. Corrupted and torn blocks are not cached \
+        (:meth:`node` raises ValueError for them).
+
+        Args:
+            chunk_size (int): Maximum number of bytes per read.
+
+        Returns:
+            int: Number of cached nodes.
+        """
+        if self._allocation is None:
+            return 0
+
+        block_size = self.block_size
+        chunk_size = max(chunk_size // block_size, 1) * block_size
+        size = self._allocation.size - self._allocation.size % block_size
+        count = 0
+
+        with open_image(self.filename) as reader:
+            for offset in range(0, size, chunk_size):
+                data = self._allocation.read(
+                    reader, offset, min(chunk_size, size - offset),
+                    cached=False)
+                blocks, torn = apply_fixups_bulk(
+                    data, block_size, INDEX_RECORD_SIGNATURE)
+
+                for position in range(len(blocks)):
+                    vcn = (offset + position * block_size) // self._vcn_size
+
+                    if not self.is_allocated(vcn):
+                        continue
+
+                    try:
+                        node = self._decode_node(
+                            vcn, blocks[position].tobytes(), torn[position])
+                    except ValueError:
+                        continue
+
+                    self.cache.put(self._key + (vcn,), node)
+                    count += 1
+
+        return count
+
+    def _read_node(self, vcn):
+        if self._allocation is None or not self.is_allocated(vcn):
+            raise ValueError('Index block {} is not in use'.format(vcn))
+
+        with open_image(self.filename) as reader:
+            data = self._allocation.read(
+                reader, vcn * self._vcn_size, self.block_size)
+
+        _, usa_offset, usa_count, _, _ = \
+            INDEX_RECORD_HEADER_SCHEMA.unpack_from(data)
+        data, torn = fixup_record(data, usa_offset, usa_count)
+
+        return self._decode_node(vcn, data, torn)
+
+    def _decode_node(self, vcn, data, torn):
+        """Decodes index block with fixups applied."""
+        signature, _, _, _, block_vcn = \
+            INDEX_RECORD_HEADER_SCHEMA.unpack_from(data)
+
+        if signature != INDEX_RECORD_SIGNATURE or block_vcn != vcn:
+            raise ValueError('Index block {} is corrupted'.format(vcn))
+
+        if torn:
+            raise ValueError('Index block {} is torn'.format(vcn))
+
+        entries_offset, entries_size, _, flags = \
+            INDEX_NODE_HEADER_SCHEMA.unpack_from(
+                data, INDEX_RECORD_HEADER_SIZE)
+
+        return IndexNode(vcn, flags, self._parse_entries(
+            data,
+            INDEX_RECORD_HEADER_SIZE + entries_offset,
+            min(INDEX_RECORD_HEADER_SIZE + entries_size, len(data))
+        ))
+
+    def find(self, name):
+        """Looks up a file name (case insensitive), reads only index \
+        blocks on the path from the root node.
+
+        Args:
+            name (str): File name.
+
+        Returns:
+            IndexEntry: Matching :class:`IndexEntry` or None.
+
+        Raises:
+            ValueError: If index is corrupted.
+        """
+        key = collation_key(name, self._upcase)
+        node = self.root
+        visited = set()
+
+        while node.entries:
+            for entry in node.entries:
+                if entry.is_last:
+                    break
+
+                entry_key = collation_key(entry.name, self._upcase)
+
+                if key == entry_key:
+                    return entry
+
+                if key < entry_key:
+                    break
+
+            if not entry.has_subnode:
+                return None
+
+            if entry.subnode_vcn in visited:
+                raise ValueError(
+                    'Index block {} loop'.format(entry.subnode_vcn))
+
+            visited.add(entry.subnode_vcn)
+            node = self.node(entry.subnode_vcn)
+
+        return None
+
+    def _iter_node(self, node, visited):
+        for entry in node.entries:
+            if entry.has_subnode:
+                if entry.subnode_vcn in visited:
+                    raise ValueError(
+                        'Index block {} loop'.format(entry.subnode_vcn))
+
+                visited.add(entry.subnode_vcn)
+                yield from self._iter_node(
+                    self.node(entry.subnode_vcn), visited)
+
+            if not entry.is_last:
+                yield entry
+
+    def __iter__(self):
+        """Yields all index entries in index order."""
+        return self._iter_node(self.root, set())
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+
+"""LZNT1 decompression of compressed NTFS attributes.
+
+Compressed data is a sequence of chunks, each decompressing to at most
+4 KiB. Chunk header bits 0 - 11 hold chunk size - 3, bit 15 is set if
+the chunk is compressed (uncompressed chunks are stored as is). A
+compressed chunk is a sequence of flag bytes, each followed by 8 tokens:
+a literal byte (flag bit 0) or a 16 bit back reference (flag bit 1).
+Back reference split between offset and length bits depends on the
+position in the decompressed chunk.
+
+See More:
+    https://docs.microsoft.com/en-us/openspecs/windows_protocols/ms-xca/
+"""
+import struct
+
+CHUNK_SIZE = 4096
+CHUNK_COMPRESSED = 0x8000
+CHUNK_SIZE_MASK = 0x0FFF
+
+
+def _offset_shift(position):
+    return 12 - max((position - 1).bit_length() - 4, 0)
+
+
+# back reference offset shift by position in decompressed chunk
+_SHIFTS = [_offset_shift(position) for position in range(CHUNK_SIZE + 1)]
+
+
+def decompress_chunk(data, start, end, out):
+    """Decompresses compressed chunk data[start:end] and appends it to \
+    out.
+
+    Raises:
+        ValueError: If back reference points before the chunk start.
+    """
+    base = len(out)
+    position = start
+    shifts = _SHIFTS
+
+    while position < end:
+        flags = data[position]
+        position += 1
+
+        if not flags:
+            # 8 literals
+            out += data[position:min(position + 8, end)]
+            position += 8
+            continue
+
+        for bit in range(8):
+            if position >= end:
+                break
+
+            if not flags & 1:
+                out.append(data[position])
+                position += 1
+                flags >>= 1
+                continue
+
+            flags >>= 1
+
+            if position + 2 > end:
+                raise ValueError('Truncated LZNT1 back reference')
+
+            token = data[position] | data[position + 1] << 8
+            position += 2
+
+            # offset bits grow with the position in decompressed chunk
+            produced = len(out) - base
+            shift = shifts[produced] if produced <= CHUNK_SIZE else 4
+            length = (token & ((1 << shift) - 1)) + 3
+            offset = (token >> shift) + 1
+
+            if offset > produced:
+                raise ValueError('Invalid LZNT1 back reference')
+
+            source = len(out) - offset
+
+            if offset >= length:
+                out += out[source:source + length]
+            else:
+                # overlapping copy repeats the last offset bytes
+                pattern = out[source:]
+                out += (pattern * (length // offset + 1))[:length]
+
+    return out
+
+
+def decompress(data, size=None):
+    """Decompresses LZNT1 buffer (eg. one compression unit).
+
+    Args:
+        data (bytes): Compressed data.
+        size (int): Maximum decompressed size, decompression stops once \
+        reached (default: decompress all chunks).
+
+    Returns:
+        bytearray: Decompressed data (may be shorter than size).
+
+    Raises:
+        ValueError: If data is corrupted.
+    """
+    out = bytearray()
+    position = 0
+
+    while position + 2 <= len(data) and (size is None or len(out) < size):
+        header = struct.unpack_from('<H', data, position)[0]
+
+        if header == 0:
+            break
+
+        # every chunk but the last decompresses to 4 KiB, short chunks
+        # are zero padded
+        if len(out) % CHUNK_SIZE:
+            out += bytes(CHUNK_SIZE - len(out) % CHUNK_SIZE)
+
+        start = position + 2
+        end = start + (header & CHUNK_SIZE_MASK) + 1
+
+        if end > len(data):
+            raise ValueError('Truncated LZNT1 chunk at {}'.format(position))
+
+        if header & CHUNK_COMPRESSED:
+            decompress_chunk(data, start, end, out)
+        else:
+            out += data[start:end]
+
+        position = end
+
+    if size is not None and len(out) > size:
+        del out[size:]
+
+    return out
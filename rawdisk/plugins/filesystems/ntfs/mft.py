@@ -1,7 +1,12 @@
 # -*- coding: utf-8 -*-
 
 
-from .mft_entry import MftEntry
+from .mft_entry import MftEntry, MFT_ENTRY_SIGNATURE
+from .fixups import apply_fixups_bulk
+from .mft_attribute import MFT_ATTR_DATA
+from .data_runs import ExtentMap
+from .attribute_list import resolve_attribute_list
+from rawdisk.util.reader import open_image
 
 ENTRY_MFT = 0
 ENTRY_MFT_MIRROR = 1
@@ -16,14 +21,27 @@ ENTRY_SECURE = 9
 ENTRY_UPCASE = 10
 ENTRY_EXTEND = 11
 
+# bulk MFT reads are done in chunks of this size (bytes)
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
 
 class MftTable(object):
     """Represents NTFS Master File Table (MFT)
 
+    If cluster size is known, entries are located through data runs of \
+    the $MFT $DATA attribute, so fragmented tables are read correctly. \
+    Otherwise the table is assumed to be contiguous.
+
+    Entries loaded through :meth:`get_entry` have attributes of their \
+    extension records merged in (see :mod:`~.attribute_list`).
+
     Args:
         offset (uint): Offset to the MFT table from disk start in bytes.
         mft_record_size (uint): Mft entry size in bytes (default: 1024).
-        filename (str): A file to read the data from.
+        filename (str or ImageReader): A file to read the data from.
+        cluster_size (uint): Volume cluster size in bytes.
+        volume_offset (uint): Volume offset from disk start in bytes, \
+        data runs are relative to it.
 
     See More:
         http://en.wikipedia.org/wiki/NTFS#Master_File_Table
@@ -32,7 +50,9 @@ class MftTable(object):
         self,
         mft_entry_size=1024,
         offset=None,
-        filename=None
+        filename=None,
+        cluster_size=None,
+        volume_offset=0
     ):
 
         if offset is None:
@@ -42,7 +62,11 @@ class MftTable(object):
 
         self.entry_size = mft_entry_size
         self.filename = filename
+        self.cluster_size = cluster_size
+        self.volume_offset = volume_offset
         self._entries = {}
+        self._entry_count = None
+        self._extent_map = None
 
     def get_entry(self, entry_id):
         """Get mft entry by index. If entry is not already loaded it will load \
@@ -55,21 +79,219 @@ class MftTable(object):
         if entry_id in self._entries:
             return self._entries[entry_id]
         else:
-            entry_offset = entry_id * self.entry_size
+            if entry_id == ENTRY_MFT:
+                # $MFT entry is always at the start of the table, extent map
+                # is built from it
+                segments = [(self.offset, self.entry_size)]
+            else:
+                segments = list(self._iter_segments(entry_id, entry_id + 1))
+
+            disk_offset, length = segments[0]
 
             # load entry
-            entry = MftEntry(
-                filename=self.filename,
-                offset=self.offset + entry_offset,
-                length=self.entry_size,
-                index=entry_id
-            )
+            if len(segments) == 1 and disk_offset is not None:
+                entry = MftEntry(
+                    filename=self.filename,
+                    offset=disk_offset,
+                    length=length,
+                    index=entry_id
+                )
+            else:
+                with open_image(self.filename) as reader:
+                    data = b''.join(
+                        self._read_segment(reader, offset, length)
+                        for offset, length in segments)
+
+                entry = MftEntry(data=data, index=entry_id)
+
+            if entry_id != ENTRY_MFT:
+                # $MFT attribute list is resolved with the extent map
+                self._resolve(entry)
 
             # cache entry
             self._entries[entry_id] = entry
 
             return entry
 
+    def _resolve(self, entry):
+        """Merges attributes of extension records into the entry, a \
+        corrupted attribute list leaves the base record attributes."""
+        try:
+            return resolve_attribute_list(entry, self)
+        except ValueError:
+            return 0
+
+    @property
+    def extent_map(self):
+        """
+        Returns:
+            ExtentMap: :class:`~.data_runs.ExtentMap` built from data runs \
+            of $MFT $DATA attribute (None if cluster size is unknown).
+        """
+        if self._extent_map is None and self.cluster_size:
+            entry = self.get_entry(ENTRY_MFT)
+            data_attr = entry.lookup_attribute(MFT_ATTR_DATA)
+
+            if data_attr is not None and data_attr.header.non_resident_flag:
+                self._extent_map = ExtentMap(
+                    data_attr.data_runs,
+                    self.cluster_size,
+                    self.volume_offset
+                )
+
+                # runs of a heavily fragmented table continue in extension
+                # records, they are read through the runs found so far
+                if self._resolve(entry):
+                    self._extent_map = ExtentMap(
+                        data_attr.data_runs,
+                        self.cluster_size,
+                        self.volume_offset
+                    )
+
+        return self._extent_map
+
+    @property
+    def entry_count(self):
+        """
+        Returns:
+            int: Number of MFT entries, taken from the size of $MFT \
+            $DATA attribute and limited by the size of the source \
+            (or data runs).
+        """
+        if self._entry_count is None:
+            if self.extent_map is not None:
+                available = self.extent_map.size // self.entry_size
+            else:
+                with open_image(self.filename) as reader:
+                    available = max(reader.size - self.offset, 0) // \
+                        self.entry_size
+
+            data_attr = self.get_entry(ENTRY_MFT).lookup_attribute(
+                MFT_ATTR_DATA)
+
+            if data_attr is not None and data_attr.header.non_resident_flag:
+                count = data_attr.header.real_size // self.entry_size
+                self._entry_count = min(count, available)
+            else:
+                self._entry_count = available
+
+        return self._entry_count
+
+    def _iter_segments(self, start, stop):
+        """Yields (disk offset, length) of physically contiguous parts \
+        of the entry range."""
+        offset = start * self.entry_size
+        length = (stop - start) * self.entry_size
+
+        if self.extent_map is None:
+            yield self.offset + offset, length
+        else:
+            for segment in self.extent_map.iter_segments(offset, length):
+                yield segment
+
+    def _read_segment(self, reader, offset, length, cached=True):
+        if offset is None:
+            # sparse
+            return bytes(length)
+
+        return reader.read(offset, length, cached=cached)
+
+    def iter_chunks(self, start=0, stop=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Reads raw MFT data in large sequential chunks, one or more reads \
+        per contiguous extent of the table.
+
+        Args:
+            start (int): First entry index.
+            stop (int): Entry index to stop at (default: \
+            :attr:`entry_count`).
+            chunk_size (int): Maximum number of bytes per read.
+
+        Yields:
+            tuple: (index of the first entry in chunk, chunk data).
+        """
+        if stop is None:
+            stop = self.entry_count
+
+        entry_size = self.entry_size
+        chunk_size = max(chunk_size // entry_size, 1) * entry_size
+        first = start
+        # part of an entry split between extents
+        pending = b''
+
+        with open_image(self.filename) as reader:
+            for offset, length in self._iter_segments(start, stop):
+                for position in range(0, length, chunk_size):
+                    data = self._read_segment(
+                        reader,
+                        None if offset is None else offset + position,
+                        min(chunk_size, length - position),
+                        cached=False
+                    )
+
+                    if pending:
+                        data = pending + bytes(data)
+
+                    usable = len(data) - len(data) % entry_size
+                    pending = bytes(data[usable:])
+
+                    if usable:
+                        if usable < len(data):
+                            data = data[:usable]
+
+                        yield first, data
+                        first += usable // entry_size
+
+    def iter_entries(self, start=0, stop=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Iterates over MFT entries reading the table in large sequential \
+        chunks, only one chunk is held in memory at a time. Entries are \
+        not cached in the table.
+
+        Args:
+            start (int): First entry index.
+            stop (int): Entry index to stop at (default: \
+            :attr:`entry_count`).
+            chunk_size (int): Maximum number of bytes per read \
+            (default: 4 MiB).
+
+        Yields:
+            MftEntry: initialized :class:`~.mft_entry.MftEntry`, fixups \
+            are applied to the whole chunk at once.
+        """
+        entry_size = self.entry_size
+
+        for first, records, torn in self.iter_fixed_chunks(
+                start, stop, chunk_size):
+            # entries own copies of their records, not views of the chunk
+            data = records.tobytes()
+            torn = torn.tolist()
+
+            for n in range(len(torn)):
+                yield MftEntry(
+                    data=data,
+                    offset=n * entry_size,
+                    length=entry_size,
+                    index=first + n,
+                    fixed_up=True,
+                    torn=torn[n]
+                )
+
+    def iter_fixed_chunks(self, start=0, stop=None,
+                          chunk_size=DEFAULT_CHUNK_SIZE):
+        """Same as :meth:`iter_chunks`, with update sequence array fixups \
+        applied to all records of a chunk at once.
+
+        Yields:
+            tuple: (index of the first entry in chunk, uint8 \
+            numpy.ndarray of records with fixups applied, bool \
+            numpy.ndarray marking torn records), see \
+            :func:`~.fixups.apply_fixups_bulk`.
+        """
+        for first, data in self.iter_chunks(start, stop, chunk_size):
+            records, torn = apply_fixups_bulk(
+                data, self.entry_size, MFT_ENTRY_SIGNATURE)
+
+            yield first, records, torn
+
     def preload_entries(self, count):
         """Loads specified number of MFT entries
 
@@ -77,8 +299,10 @@ class MftTable(object):
             count (int): Number of entries to preload.
 
         """
-        for n in range(0, count):
-            self.get_entry(n)
+        for entry in self.iter_entries(0, count):
+            if entry.index not in self._entries:
+                self._resolve(entry)
+                self._entries[entry.index] = entry
 
     def __str__(self):
         result = ""
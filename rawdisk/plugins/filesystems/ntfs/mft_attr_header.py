@@ -2,6 +2,34 @@
 
 
 from rawdisk.util.rawstruct import RawStruct
+from rawdisk.util.schema import StructSchema
+
+
+ATTR_HEADER_SCHEMA = StructSchema([
+    ('type',                0x00, 'I'),
+    ('length',              0x04, 'I'),
+    ('non_resident_flag',   0x08, 'B'),   # 0 - resident, 1 - not
+    ('length_of_name',      0x09, 'B'),
+    ('offset_to_name',      0x0A, 'H'),
+    ('flags',               0x0C, 'H'),
+    ('identifier',          0x0E, 'H'),
+])
+
+RESIDENT_HEADER_SCHEMA = StructSchema([
+    ('attr_length',         0x10, 'I'),
+    ('attr_offset',         0x14, 'H'),
+    ('indexed',             0x16, 'B'),
+])
+
+NON_RESIDENT_HEADER_SCHEMA = StructSchema([
+    ('lowest_vcn',          0x10, 'Q'),
+    ('highest_vcn',         0x18, 'Q'),
+    ('data_run_offset',     0x20, 'H'),
+    ('comp_unit_size',      0x22, 'H'),
+    ('alloc_size',          0x28, 'Q'),
+    ('real_size',           0x30, 'Q'),
+    ('data_size',           0x38, 'Q'),
+])
 
 
 class MftAttrHeader(RawStruct):
@@ -47,46 +75,48 @@ class MftAttrHeader(RawStruct):
         cluster boundary. This member is not valid if LowestVcn is nonzero.
 
 
+    Note:
+        Header keeps no copy of the raw bytes, :attr:`data` is None \
+        once fields are decoded.
+
     See More:
         | http://ftp.kolibrios.org\
 /users/Asper/docs/NTFS/ntfsdoc.html#concept_attribute_header
         | http://msdn.microsoft.com/en-us/library/bb470039(v=vs.85).aspx
     """
+    __slots__ = ATTR_HEADER_SCHEMA.names + RESIDENT_HEADER_SCHEMA.names + \
+        NON_RESIDENT_HEADER_SCHEMA.names + ('attr_name', '_size')
+
     def __init__(self, data):
         RawStruct.__init__(self, data)
-        self.type = self.get_uint_le(0)
-        self.length = self.get_uint_le(0x4)
-        self.non_resident_flag = self.get_ubyte(0x08)   # 0 - resident, 1 - not
-        self.length_of_name = self.get_ubyte(0x09)      # Used only for ADS
-        self.offset_to_name = self.get_ushort_le(0x0A)     # Used only for ADS
-
-        # (Compressed, Encrypted, Sparse)
-        self.flags = self.get_ushort_le(0x0C)
-        self.identifier = self.get_ushort_le(0x0E)
+        # (Compressed, Encrypted, Sparse) flags, length_of_name and
+        # offset_to_name are used only for ADS
+        ATTR_HEADER_SCHEMA.unpack_into(self, self.data)
 
         if (self.non_resident_flag):
             # Attribute is Non-Resident
-            self.lowest_vcn = self.get_ulonglong_le(0x10)
-            self.highest_vcn = self.get_ulonglong_le(0x18)
-            self.data_run_offset = self.get_ushort_le(0x20)
-            self.comp_unit_size = self.get_ushort_le(0x22)
             # 4 byte 0x00 padding @ 0x24
-            self.alloc_size = self.get_ulonglong_le(0x28)
-            self.real_size = self.get_ulonglong_le(0x30)
-            self.data_size = self.get_ulonglong_le(0x38)
+            NON_RESIDENT_HEADER_SCHEMA.unpack_into(self, self.data)
 
             if (self.length_of_name > 0):
-                self.attr_name = self.get_chunk(
-                    0x40, 2 * self.length_of_name).decode('utf-16')
-                # print self.attr_name.decode('utf-16')
+                self.attr_name = self.get_unicode(
+                    0x40, 2 * self.length_of_name)
         else:
             # Attribute is Resident
-            self.attr_length = self.get_uint_le(0x10)
-            self.attr_offset = self.get_ushort_le(0x14)
-            self.indexed = self.get_ubyte(0x16)
+            RESIDENT_HEADER_SCHEMA.unpack_into(self, self.data)
+
             if (self.length_of_name > 0):
-                self.attr_name = self.get_chunk(
-                    0x18, 2 * self.length_of_name).decode('utf-16')
-                # print self.attr_name.decode('utf-16')
+                self.attr_name = self.get_unicode(
+                    0x18, 2 * self.length_of_name)
             # The rest byte is 0x00 padding
-            # print "Attr Offset: 0x%x" % (self.attr_offset)
+
+        self._size = len(self._data)
+        self._data = None
+
+    @property
+    def size(self):
+        """
+        Returns:
+            int: Size of the attribute header (including name) in bytes.
+        """
+        return self._size
@@ -4,6 +4,9 @@
 from rawdisk.util.rawstruct import RawStruct
 from rawdisk.util.filetimes import filetime_to_dt
 from .mft_attr_header import MftAttrHeader
+from .data_runs import decode_data_runs
+from .headers import INDEX_ROOT_SCHEMA, INDEX_NODE_HEADER_SCHEMA
+from .security_descriptor import parse_security_descriptor
 
 
 MFT_ATTR_STANDARD_INFORMATION = 0x10
@@ -35,10 +38,19 @@ class MftAttr(RawStruct):
         $SYSTEM_INFORMATION.
         header (MftAttrHeader): Initialized \
         :class:`~.mft_attr_header.MftAttrHeader` object.
+
+    Note:
+        Attributes keep no copy of raw bytes that are not needed anymore: \
+        :attr:`data` is None once all fields of an attribute are decoded \
+        (eg. $STANDARD_INFORMATION, $FILE_NAME) and once data runs of a \
+        non-resident attribute are decoded.
     """
+    __slots__ = ('type_str', 'header', '_data_runs')
+
     def __init__(self, data):
         RawStruct.__init__(self, data)
         self.type_str = "$UNKNOWN"
+        self._data_runs = None
         non_resident_flag = self.get_ubyte(8)
         name_length = self.get_ubyte(9)
         header_size = 0
@@ -62,6 +74,67 @@ class MftAttr(RawStruct):
             self.get_chunk(0, header_size)
         )
 
+    @property
+    def data_runs(self):
+        """
+        Returns:
+            list: :class:`~.data_runs.DataRun` tuples of a non-resident \
+            attribute (None for resident attributes).
+        """
+        if not self.header.non_resident_flag:
+            return None
+
+        if self._data_runs is None:
+            self._data_runs = decode_data_runs(
+                self.data, self.header.data_run_offset,
+                self.header.lowest_vcn)
+            # runs are the only content of a non-resident attribute
+            self._release()
+
+        return self._data_runs
+
+    def extend_data_runs(self, runs):
+        """Adds data runs of another piece of the attribute. Large \
+        non-resident attributes are split between MFT records, each piece \
+        maps the VCN range starting at its lowest_vcn \
+        (see :mod:`~.attribute_list`).
+
+        Args:
+            runs (list): :class:`~.data_runs.DataRun` tuples of the piece.
+
+        Raises:
+            ValueError: If data runs of this attribute are corrupted.
+        """
+        self._data_runs = sorted(
+            self.data_runs + list(runs), key=lambda run: run.vcn)
+
+    def _release(self):
+        """Drops raw bytes of the attribute, called once they are decoded."""
+        self._data = None
+
+    @property
+    def size(self):
+        """
+        Returns:
+            int: Size of the attribute record in bytes.
+        """
+        if self._data is None:
+            return self.header.length
+
+        return len(self._data)
+
+    @property
+    def value(self):
+        """
+        Returns:
+            bytes: Value of a resident attribute (None for non-resident \
+            attributes and attributes whose fields are all decoded).
+        """
+        if self.header.non_resident_flag or self._data is None:
+            return None
+
+        return self.get_chunk(self.header.attr_offset, self.header.attr_length)
+
     @staticmethod
     def factory(attr_type, data):
         """Returns Initialized attribute object based on attr_type \
@@ -73,26 +146,12 @@ class MftAttr(RawStruct):
             data (byte array): Data to initialize attribute object with.
         """
 
-        constructors = {
-            MFT_ATTR_STANDARD_INFORMATION: MftAttrStandardInformation,
-            MFT_ATTR_ATTRIBUTE_LIST: MftAttrAttributeList,
-            MFT_ATTR_FILENAME: MftAttrFilename,
-            MFT_ATTR_OBJECT_ID: MftAttrObjectId,
-            MFT_ATTR_SECURITY_DESCRIPTOR: MftAttrSecurityDescriptor,
-            MFT_ATTR_VOLUME_NAME: MftAttrVolumeName,
-            MFT_ATTR_VOLUME_INFO: MftAttrVolumeInfo,
-            MFT_ATTR_DATA: MftAttrData,
-            MFT_ATTR_INDEX_ROOT: MftAttrIndexRoot,
-            MFT_ATTR_INDEX_ALLOCATION: MftAttrIndexAllocation,
-            MFT_ATTR_BITMAP: MftAttrBitmap,
-            MFT_ATTR_REPARSE_POINT: MftAttrReparsePoint,
-            MFT_ATTR_LOGGED_TOOLSTREAM: MftAttrLoggedToolstream,
-        }
-
-        if attr_type not in constructors:
+        constructor = ATTRIBUTE_CLASSES.get(attr_type)
+
+        if constructor is None:
             return None
 
-        return constructors[attr_type](data)
+        return constructor(data)
 
     def __str__(self):
         name = "N/A"
@@ -131,6 +190,11 @@ class MftAttrStandardInformation(MftAttr):
     See Also:
         http://ftp.kolibrios.org/users/Asper/docs/NTFS/ntfsdoc.html#attribute_standard_information
     """
+    __slots__ = (
+        'ctime', 'atime', 'mtime', 'rtime', 'perm', 'versions', 'version',
+        'class_id', 'owner_id', 'sec_id', 'quata', 'usn'
+    )
+
     def __init__(self, data):
         MftAttr.__init__(self, data)
         self.type_str = "$STANDARD_INFORMATION"
@@ -158,6 +222,8 @@ class MftAttrStandardInformation(MftAttr):
             self.quata = self.get_ulonglong_le(offset + 0x38)
             self.usn = self.get_ulonglong_le(offset + 0x40)
 
+        self._release()
+
     @property
     def ctime_dt(self):
         """
@@ -192,12 +258,22 @@ class MftAttrStandardInformation(MftAttr):
 
 
 class MftAttrAttributeList(MftAttr):
+    """$ATTRIBUTE_LIST attribute, lists attributes of a file that are \
+    held by extension records. Entries are decoded and resolved by \
+    :mod:`~.attribute_list`."""
+    __slots__ = ()
+
     def __init__(self, data):
         MftAttr.__init__(self, data)
         self.type_str = "$ATTRIBUTE_LIST"
 
 
 class MftAttrFilename(MftAttr):
+    __slots__ = (
+        'parent_ref', 'ctime', 'atime', 'mtime', 'rtime', 'alloc_size',
+        'real_size', 'flags', 'reparse', 'fname_length', 'fnspace', 'fname'
+    )
+
     def __init__(self, data):
         MftAttr.__init__(self, data)
         self.type_str = "$FILE_NAME"
@@ -215,8 +291,8 @@ class MftAttrFilename(MftAttr):
         self.reparse = self.get_uint_le(offset + 0x3C)
         self.fname_length = self.get_ubyte(offset + 0x40)
         self.fnspace = self.get_ubyte(offset + 0x41)
-        self.fname = self.get_chunk(offset + 0x42, 2 *
-                                    self.fname_length).decode('utf-16')
+        self.fname = self.get_unicode(offset + 0x42, 2 * self.fname_length)
+        self._release()
 
     @property
     def ctime_dt(self):
@@ -236,25 +312,53 @@ class MftAttrFilename(MftAttr):
 
 
 class MftAttrObjectId(MftAttr):
+    __slots__ = ()
+
     def __init__(self, data):
         MftAttr.__init__(self, data)
         self.type_str = "$OBJECT_ID"
 
 
 class MftAttrSecurityDescriptor(MftAttr):
+    """$SECURITY_DESCRIPTOR attribute, security descriptor of a file on \
+    volumes older than NTFS 3.0 (newer volumes keep descriptors in \
+    $Secure, see :mod:`~.secure`)."""
+    __slots__ = ()
+
     def __init__(self, data):
         MftAttr.__init__(self, data)
         self.type_str = "$SECURITY_DESCRIPTOR"
 
+    @property
+    def descriptor(self):
+        """
+        Returns:
+            SecurityDescriptor: Decoded \
+            :class:`~.security_descriptor.SecurityDescriptor` (None for \
+            non-resident attributes).
+
+        Raises:
+            ValueError: If descriptor is corrupted.
+        """
+        value = self.value
+
+        if value is None:
+            return None
+
+        return parse_security_descriptor(value)
+
 
 class MftAttrVolumeName(MftAttr):
+    __slots__ = ('vol_name',)
+
     def __init__(self, data):
         MftAttr.__init__(self, data)
         self.type_str = "$VOLUME_NAME"
         offset = self.header.size
         length = self.header.length - self.header.size
-        self.vol_name = self.get_chunk(
-            offset, 2 * length).decode('utf-16').partition('\0')[0]
+        self.vol_name = self.get_unicode(
+            offset, 2 * length).partition('\0')[0]
+        self._release()
 
 
 # Volume Flags
@@ -268,6 +372,8 @@ VOLUME_MODIFIED_BY_CHDSK = 0x8000
 
 
 class MftAttrVolumeInfo(MftAttr):
+    __slots__ = ('major_ver', 'minor_ver', 'flags')
+
     def __init__(self, data):
         MftAttr.__init__(self, data)
         offset = self.header.size
@@ -275,39 +381,109 @@ class MftAttrVolumeInfo(MftAttr):
         self.major_ver = self.get_ubyte(offset + 0x08)
         self.minor_ver = self.get_ubyte(offset + 0x09)
         self.flags = self.get_ushort_le(offset + 0x0A)
+        self._release()
 
 
 class MftAttrData(MftAttr):
+    __slots__ = ()
+
     def __init__(self, data):
         MftAttr.__init__(self, data)
         self.type_str = "$DATA"
 
 
+# Size of $INDEX_ROOT header preceding the root node header
+INDEX_ROOT_HEADER_SIZE = 0x10
+
+
 class MftAttrIndexRoot(MftAttr):
+    """$INDEX_ROOT attribute, root node of an index B+ tree.
+
+    Attributes:
+        indexed_attr_type (uint): Type of the indexed attribute (0x30 for \
+        $I30 directory indexes).
+        collation_rule (uint): Collation rule used to sort index entries.
+        index_block_size (uint): Size of index allocation blocks (INDX \
+        records) in bytes.
+        clusters_per_index_block (byte): Index block size in clusters.
+        entries_offset (uint): Offset of the first index entry from the \
+        start of the node header.
+        entries_size (uint): Size of the node header and index entries.
+        allocated_size (uint): Allocated size of the node.
+        node_flags (ubyte): 0x01 - index is too large for the root \
+        node alone, entries point to nodes in $INDEX_ALLOCATION.
+
+    Note:
+        This attribute is always resident.
+
+    See Also:
+        http://ftp.kolibrios.org/users/Asper/docs/NTFS/ntfsdoc.html#attribute_index_root
+    """
+    __slots__ = INDEX_ROOT_SCHEMA.names + INDEX_NODE_HEADER_SCHEMA.names
+
     def __init__(self, data):
         MftAttr.__init__(self, data)
         self.type_str = "$INDEX_ROOT"
+        offset = self.header.attr_offset
+        INDEX_ROOT_SCHEMA.unpack_into(self, self.data, offset)
+        INDEX_NODE_HEADER_SCHEMA.unpack_into(
+            self, self.data, offset + INDEX_ROOT_HEADER_SIZE)
+
+    @property
+    def node_offset(self):
+        """
+        Returns:
+            int: Offset of the root node header in attribute data.
+        """
+        return self.header.attr_offset + INDEX_ROOT_HEADER_SIZE
 
 
 class MftAttrIndexAllocation(MftAttr):
+    __slots__ = ()
+
     def __init__(self, data):
         MftAttr.__init__(self, data)
         self.type_str = "$INDEX_ALLOCATION"
 
 
 class MftAttrBitmap(MftAttr):
+    __slots__ = ()
+
     def __init__(self, data):
         MftAttr.__init__(self, data)
         self.type_str = "$BITMAP"
 
 
 class MftAttrReparsePoint(MftAttr):
+    __slots__ = ()
+
     def __init__(self, data):
         MftAttr.__init__(self, data)
         self.type_str = "$REPARSE_POINT"
 
 
 class MftAttrLoggedToolstream(MftAttr):
+    __slots__ = ()
+
     def __init__(self, data):
         MftAttr.__init__(self, data)
         self.type_str = "$LOGGED_UTILITY_STREAM"
+
+
+# Attribute classes by attribute type, types that are not listed here
+# end attribute walk of an MFT entry
+ATTRIBUTE_CLASSES = {
+    MFT_ATTR_STANDARD_INFORMATION: MftAttrStandardInformation,
+    MFT_ATTR_ATTRIBUTE_LIST: MftAttrAttributeList,
+    MFT_ATTR_FILENAME: MftAttrFilename,
+    MFT_ATTR_OBJECT_ID: MftAttrObjectId,
+    MFT_ATTR_SECURITY_DESCRIPTOR: MftAttrSecurityDescriptor,
+    MFT_ATTR_VOLUME_NAME: MftAttrVolumeName,
+    MFT_ATTR_VOLUME_INFO: MftAttrVolumeInfo,
+    MFT_ATTR_DATA: MftAttrData,
+    MFT_ATTR_INDEX_ROOT: MftAttrIndexRoot,
+    MFT_ATTR_INDEX_ALLOCATION: MftAttrIndexAllocation,
+    MFT_ATTR_BITMAP: MftAttrBitmap,
+    MFT_ATTR_REPARSE_POINT: MftAttrReparsePoint,
+    MFT_ATTR_LOGGED_TOOLSTREAM: MftAttrLoggedToolstream,
+}
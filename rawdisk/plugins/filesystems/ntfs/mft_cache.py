@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+
+"""Persistent MFT index cache.
+
+Decoded MFT columns (:class:`~.mft_columns.MftColumns`) are stored in an
+SQLite database as raw array blobs, one row per volume keyed by volume
+serial number, volume size and size of the image it is stored in (a
+volume cloned to another image or device is indexed again). Each row
+also holds a fingerprint of the first :data:`FINGERPRINT_RECORDS` MFT
+records (the system files), an index is rebuilt when one of them
+changes. Loading a cached index is a single blob read, no MFT records
+are read or decoded.
+
+Note:
+    The fingerprint does not cover the rest of the MFT. Creating,
+    deleting or modifying a file usually rewrites its own record only,
+    records of the system files change only if the MFT grows, the
+    volume is resized or renamed etc. A cached index of a volume that
+    was modified since is returned as is, use a separate database (or
+    delete the cached one) for a volume that is still in use.
+
+>>> session = Session(mft_cache='evidence.db')
+>>> session.load('evidence.img')
+>>> session.volumes[0].mft_columns    # decoded once, then loaded
+"""
+import hashlib
+import sqlite3
+from contextlib import closing
+import numpy
+from .mft_columns import MftColumns, RECORD_DTYPE, read_columns
+
+# number of MFT records the fingerprint is computed from
+FINGERPRINT_RECORDS = 16
+
+# stored arrays are not used if record layout changes
+RECORD_LAYOUT = str(RECORD_DTYPE.descr)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mft_columns (
+    volume_serial TEXT NOT NULL,
+    volume_size INTEGER NOT NULL,
+    image_size INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    layout TEXT NOT NULL,
+    records BLOB NOT NULL,
+    names BLOB NOT NULL,
+    PRIMARY KEY (volume_serial, volume_size, image_size)
+)
+"""
+
+
+def fingerprint(mft_table, count=FINGERPRINT_RECORDS):
+    """Hashes raw content of the first MFT records.
+
+    Args:
+        mft_table (MftTable): Initialized :class:`~.mft.MftTable`.
+        count (int): Number of records to hash.
+
+    Returns:
+        int: 64 bit fingerprint.
+    """
+    digest = hashlib.sha1()
+
+    for _, data in mft_table.iter_chunks(
+            0, min(count, mft_table.entry_count)):
+        digest.update(data)
+
+    return int.from_bytes(digest.digest()[:8], 'little')
+
+
+class MftCache(object):
+    """SQLite database of decoded MFT columns.
+
+    Args:
+        filename (str): Database file (created if it does not exist).
+
+    Note:
+        Each operation opens its own connection, so the cache can be \
+        shared by volumes loaded in different processes.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+
+        with closing(self._connect()) as connection:
+            with connection:
+                connection.execute(_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.filename)
+
+    @staticmethod
+    def _key(identity):
+        volume_serial, volume_size, image_size = identity[:3]
+        return '{:016x}'.format(volume_serial), volume_size, image_size
+
+    def load(self, identity):
+        """Loads columns of a volume.
+
+        Args:
+            identity (tuple): (volume serial number, volume size, image \
+            size, fingerprint), eg. :attr:`NtfsVolume.identity \
+            <.ntfs_volume.NtfsVolume.identity>`.
+
+        Returns:
+            MftColumns: Cached :class:`~.mft_columns.MftColumns` with \
+            read-only arrays (None if volume is not cached or its \
+            fingerprint changed).
+        """
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                'SELECT fingerprint, layout, records, names FROM mft_columns '
+                'WHERE volume_serial = ? AND volume_size = ? AND '
+                'image_size = ?',
+                self._key(identity)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        stored_fingerprint, layout, records, names = row
+
+        if stored_fingerprint != '{:016x}'.format(identity[3]) or \
+                layout != RECORD_LAYOUT:
+            return None
+
+        return MftColumns(
+            numpy.frombuffer(records, dtype=RECORD_DTYPE), bytes(names))
+
+    def save(self, identity, columns):
+        """Stores columns of a volume, replacing any older index of it.
+
+        Args:
+            identity (tuple): (volume serial number, volume size, image \
+            size, fingerprint).
+            columns (MftColumns): Decoded \
+            :class:`~.mft_columns.MftColumns`.
+        """
+        with closing(self._connect()) as connection:
+            with connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO mft_columns VALUES '
+                    '(?, ?, ?, ?, ?, ?, ?)',
+                    self._key(identity) + (
+                        '{:016x}'.format(identity[3]),
+                        RECORD_LAYOUT,
+                        sqlite3.Binary(columns.records.tobytes()),
+                        sqlite3.Binary(columns.names)
+                    )
+                )
+
+    def load_or_build(self, identity, mft_table):
+        """Loads cached columns, decodes and stores the MFT if they are \
+        missing or stale.
+
+        Args:
+            identity (tuple): (volume serial number, volume size, image \
+            size, fingerprint).
+            mft_table (MftTable): Initialized :class:`~.mft.MftTable` of \
+            the volume.
+
+        Returns:
+            MftColumns: :class:`~.mft_columns.MftColumns` of the whole MFT.
+        """
+        columns = self.load(identity)
+
+        if columns is None:
+            columns = read_columns(mft_table)
+            self.save(identity, columns)
+
+        return columns
@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+
+
+"""Columnar view of the MFT backed by NumPy structured arrays.
+
+Raw MFT chunks are decoded with vectorized operations: update sequence
+fixups are applied to the whole chunk (:func:`~.fixups.apply_fixups_bulk`),
+record headers through a structured dtype built from
+:data:`~.headers.MFT_RECORD_HEADER_SCHEMA`, attributes by walking all
+records of a chunk in lock step, one attribute per step. No
+:class:`~.mft_entry.MftEntry` objects are created.
+
+>>> columns = read_columns(volume.mft_table)
+>>> in_use = columns.records['flags'] & 0x01 != 0
+>>> columns.records['size'][in_use].sum()
+"""
+import numpy
+from rawdisk.util.filetimes import filetimes_to_datetime64
+from .headers import MFT_RECORD_HEADER_SCHEMA, FILE_REFERENCE_MASK, \
+    MFT_ENTRY_IN_USE, MFT_ENTRY_DIRECTORY
+from .mft import DEFAULT_CHUNK_SIZE
+from .mft_attribute import ATTRIBUTE_CLASSES, \
+    MFT_ATTR_STANDARD_INFORMATION, MFT_ATTR_FILENAME, MFT_ATTR_DATA
+from .mft_entry import MFT_ENTRY_HEADER_SIZE, MFT_ENTRY_SIGNATURE
+from .fixups import apply_fixups_bulk
+
+RECORD_DTYPE = numpy.dtype([
+    ('record', '<u8'),          # MFT entry index
+    ('valid', '?'),             # record has 'FILE' signature
+    ('torn', '?'),              # record failed update sequence check
+    ('flags', '<u2'),           # 0x01 - in use, 0x02 - directory
+    ('seq_number', '<u2'),
+    ('base_record', '<u8'),
+    ('parent_ref', '<u8'),      # parent entry index from $FILE_NAME
+    ('parent_seq', '<u2'),      # parent sequence number from $FILE_NAME
+    ('ctime', '<u8'),           # $STANDARD_INFORMATION times (FILETIME)
+    ('atime', '<u8'),
+    ('mtime', '<u8'),
+    ('rtime', '<u8'),
+    ('sec_id', '<u4'),          # $STANDARD_INFORMATION security id
+    ('fn_ctime', '<u8'),        # $FILE_NAME times (FILETIME)
+    ('fn_atime', '<u8'),
+    ('fn_mtime', '<u8'),
+    ('fn_rtime', '<u8'),
+    ('size', '<u8'),            # $DATA size in bytes
+    ('name_offset', '<u8'),     # offset of the name in names buffer
+    ('name_length', '<u2'),     # name length in characters
+])
+
+# Attribute types walk continues through, same as MftEntry attribute walk
+_KNOWN_TYPES = numpy.array(sorted(ATTRIBUTE_CLASSES), dtype='<u4')
+
+_REFERENCE_MASK = numpy.uint64(FILE_REFERENCE_MASK)
+
+
+class MftColumns(object):
+    """Decoded MFT columns.
+
+    Args:
+        records (numpy.ndarray): Array of :data:`RECORD_DTYPE` items.
+        names (bytes): UTF-16 encoded file names, referenced by \
+        name_offset and name_length columns.
+
+    Attributes:
+        records (numpy.ndarray): One :data:`RECORD_DTYPE` item per MFT \
+        record. Attribute columns are zero if record has no such \
+        attribute. File name, parent and fn_* times come from the last \
+        $FILE_NAME attribute (same as :attr:`MftEntry.fname_str \
+        <.mft_entry.MftEntry.fname_str>`), times and size from the first \
+        $STANDARD_INFORMATION and $DATA attributes.
+        names (bytes): File names buffer.
+    """
+    def __init__(self, records, names):
+        self.records = records
+        self.names = names
+
+    def name(self, position):
+        """
+        Args:
+            position (int): Position of the record in :attr:`records`.
+
+        Returns:
+            str: File name ('' if record has no $FILE_NAME attribute).
+        """
+        record = self.records[position]
+        offset = int(record['name_offset'])
+        length = 2 * int(record['name_length'])
+
+        return str(self.names[offset:offset + length], 'utf-16')
+
+    @property
+    def in_use(self):
+        """
+        Returns:
+            numpy.ndarray: Boolean mask of valid records that are in use.
+        """
+        return self.records['valid'] & \
+            (self.records['flags'] & MFT_ENTRY_IN_USE != 0)
+
+    @property
+    def is_directory(self):
+        """
+        Returns:
+            numpy.ndarray: Boolean mask of directory records.
+        """
+        return self.records['valid'] & \
+            (self.records['flags'] & MFT_ENTRY_DIRECTORY != 0)
+
+    def datetimes(self, column, unit='ns'):
+        """Converts a time column of all records at once.
+
+        Args:
+            column (str): Time column ('ctime', 'atime', 'mtime', \
+            'rtime' or one of the fn_* columns).
+            unit (str): datetime64 unit (see \
+            :func:`~rawdisk.util.filetimes.filetimes_to_datetime64`).
+
+        Returns:
+            numpy.ndarray: datetime64 array, NaT for records without \
+            $STANDARD_INFORMATION or with out of range times.
+        """
+        return filetimes_to_datetime64(self.records[column], unit)
+
+    def __len__(self):
+        return len(self.records)
+
+
+def _read_uint(matrix, rows, offsets, size):
+    """Reads little-endian unsigned integers of size bytes at \
+    (row, offset) pairs."""
+    columns = offsets[:, None] + numpy.arange(size)
+    raw = numpy.ascontiguousarray(matrix[rows[:, None], columns])
+    return raw.view('<u{}'.format(size)).reshape(-1)
+
+
+def walk_attributes(matrix, first_offset, rows=None):
+    """Walks attribute headers of many records in lock step, one \
+    attribute of every record per step. Stops at the same conditions as \
+    :class:`~.mft_entry.MftEntry` attribute walk.
+
+    Args:
+        matrix (numpy.ndarray): (records, record size) uint8 array of \
+        records with fixups applied.
+        first_offset (numpy.ndarray): Offset of the first attribute of \
+        every record (int64).
+        rows (numpy.ndarray): Rows to walk (default: all records).
+
+    Yields:
+        tuple: (rows, attribute offsets, attribute types, attribute \
+        lengths) arrays of records that still have an attribute.
+    """
+    entry_size = matrix.shape[1]
+    rows = numpy.arange(len(matrix)) if rows is None else rows
+    offsets = first_offset[rows]
+
+    while rows.size:
+        active = (offsets - first_offset[rows] <
+                  entry_size - MFT_ENTRY_HEADER_SIZE) & \
+            (offsets + 0x08 <= entry_size)
+        rows, offsets = rows[active], offsets[active]
+
+        attr_type = _read_uint(matrix, rows, offsets, 4)
+        length = _read_uint(
+            matrix, rows, offsets + 4, 4).astype(numpy.int64)
+        active = numpy.isin(attr_type, _KNOWN_TYPES) & (length >= 0x18) & \
+            (offsets + length <= entry_size)
+        rows, offsets = rows[active], offsets[active]
+        attr_type, length = attr_type[active], length[active]
+
+        if not rows.size:
+            break
+
+        yield rows, offsets, attr_type, length
+
+        offsets = offsets + length
+
+
+def decode_columns(data, first_index=0, entry_size=1024):
+    """Decodes a buffer of consecutive MFT records.
+
+    Args:
+        data (bytes): Raw MFT records (bytes or memoryview).
+        first_index (int): Index of the first record in data.
+        entry_size (int): MFT record size in bytes.
+
+    Returns:
+        MftColumns: Decoded :class:`MftColumns`.
+    """
+    matrix, torn = apply_fixups_bulk(data, entry_size, MFT_ENTRY_SIGNATURE)
+    count = len(matrix)
+    headers = matrix.reshape(-1).view(
+        MFT_RECORD_HEADER_SCHEMA.numpy_dtype(entry_size))
+
+    records = numpy.zeros(count, dtype=RECORD_DTYPE)
+    records['record'] = numpy.arange(first_index, first_index + count)
+    records['valid'] = headers['signature'] == MFT_ENTRY_SIGNATURE
+    records['torn'] = torn
+    records['flags'] = headers['flags']
+    records['seq_number'] = headers['seq_number']
+    records['base_record'] = headers['base_file_record']
+
+    # position of the last $FILE_NAME name in record (-1 if none)
+    name_position = numpy.full(count, -1, dtype=numpy.int64)
+    seen_si = numpy.zeros(count, dtype=bool)
+    seen_data = numpy.zeros(count, dtype=bool)
+
+    first_offset = headers['first_attr_offset'].astype(numpy.int64)
+
+    for rows, offsets, attr_type, length in walk_attributes(
+            matrix, first_offset):
+        non_resident = matrix[rows, offsets + 8]
+        name_length = matrix[rows, offsets + 9].astype(numpy.int64)
+        # attribute content follows the header and attribute name
+        content = offsets + 0x18 + 2 * name_length
+
+        # $STANDARD_INFORMATION, first one wins
+        mask = (attr_type == MFT_ATTR_STANDARD_INFORMATION) & \
+            (non_resident == 0) & ~seen_si[rows] & \
+            (content + 0x20 <= entry_size)
+        si_rows, si_content = rows[mask], content[mask]
+        seen_si[si_rows] = True
+
+        for shift, column in enumerate(('ctime', 'atime', 'mtime', 'rtime')):
+            records[column][si_rows] = _read_uint(
+                matrix, si_rows, si_content + 8 * shift, 8)
+
+        # security id is set by NTFS 3.0+ only (0x48 byte value)
+        si_value_length = _read_uint(matrix, si_rows, offsets[mask] + 0x10, 4)
+        fits = (si_value_length >= 0x38) & (si_content + 0x38 <= entry_size)
+        records['sec_id'][si_rows[fits]] = _read_uint(
+            matrix, si_rows[fits], si_content[fits] + 0x34, 4)
+
+        # $FILE_NAME, last one wins
+        mask = (attr_type == MFT_ATTR_FILENAME) & (non_resident == 0) & \
+            (content + 0x42 <= entry_size)
+        fn_rows, fn_content = rows[mask], content[mask]
+        fn_length = matrix[fn_rows, fn_content + 0x40].astype(numpy.int64)
+        fits = fn_content + 0x42 + 2 * fn_length <= entry_size
+        fn_rows, fn_content = fn_rows[fits], fn_content[fits]
+
+        parent_refs = _read_uint(matrix, fn_rows, fn_content, 8)
+        records['parent_ref'][fn_rows] = parent_refs & _REFERENCE_MASK
+        records['parent_seq'][fn_rows] = parent_refs >> numpy.uint64(48)
+        records['name_length'][fn_rows] = fn_length[fits]
+        name_position[fn_rows] = fn_content + 0x42
+
+        for shift, column in enumerate(
+                ('fn_ctime', 'fn_atime', 'fn_mtime', 'fn_rtime')):
+            records[column][fn_rows] = _read_uint(
+                matrix, fn_rows, fn_content + 0x08 + 8 * shift, 8)
+
+        # $DATA, first one wins
+        mask = (attr_type == MFT_ATTR_DATA) & ~seen_data[rows]
+        seen_data[rows[mask]] = True
+
+        nr = mask & (non_resident != 0) & (offsets + 0x38 <= entry_size)
+        records['size'][rows[nr]] = _read_uint(
+            matrix, rows[nr], offsets[nr] + 0x30, 8)
+
+        resident = mask & (non_resident == 0)
+        records['size'][rows[resident]] = _read_uint(
+            matrix, rows[resident], offsets[resident] + 0x10, 4)
+
+    names = _gather_names(matrix, records, name_position)
+
+    return MftColumns(records, names)
+
+
+def _gather_names(matrix, records, name_position):
+    """Copies all file names into one buffer and sets name_offset \
+    column."""
+    rows = numpy.nonzero(name_position >= 0)[0]
+    sizes = 2 * records['name_length'][rows].astype(numpy.int64)
+    ends = numpy.cumsum(sizes)
+    starts = ends - sizes
+
+    records['name_offset'][rows] = starts
+
+    # (row, column) of every name byte
+    byte_rows = numpy.repeat(rows, sizes)
+    byte_columns = numpy.arange(int(ends[-1]) if ends.size else 0) - \
+        numpy.repeat(starts, sizes) + numpy.repeat(name_position[rows], sizes)
+
+    return matrix[byte_rows, byte_columns].tobytes()
+
+
+def concatenate_columns(parts):
+    """Merges decoded :class:`MftColumns` parts into one.
+
+    Args:
+        parts (list): :class:`MftColumns` in record order.
+
+    Returns:
+        MftColumns: Merged columns.
+    """
+    if not parts:
+        return MftColumns(numpy.zeros(0, dtype=RECORD_DTYPE), b'')
+
+    names = []
+    names_size = 0
+
+    for part in parts:
+        part.records['name_offset'] += names_size
+        names.append(part.names)
+        names_size += len(part.names)
+
+    return MftColumns(
+        numpy.concatenate([part.records for part in parts]),
+        b''.join(names)
+    )
+
+
+def read_columns(mft_table, start=0, stop=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE):
+    """Reads MFT in large chunks and decodes them into columns.
+
+    Args:
+        mft_table (MftTable): Initialized :class:`~.mft.MftTable`.
+        start (int): First entry index.
+        stop (int): Entry index to stop at (default: all entries).
+        chunk_size (int): Maximum number of bytes per read.
+
+    Returns:
+        MftColumns: Decoded :class:`MftColumns`.
+    """
+    return concatenate_columns([
+        decode_columns(data, first, mft_table.entry_size)
+        for first, data in mft_table.iter_chunks(start, stop, chunk_size)
+    ])
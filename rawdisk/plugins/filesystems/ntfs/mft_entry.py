@@ -1,27 +1,60 @@
 # -*- coding: utf-8 -*-
 
 
-from .mft_attribute import MFT_ATTR_FILENAME, MftAttr
+from .mft_attribute import MFT_ATTR_FILENAME, MftAttr, ATTRIBUTE_CLASSES
 from rawdisk.util.rawstruct import RawStruct
-from .headers import MFT_RECORD_HEADER
+from .headers import MFT_RECORD_HEADER, MFT_RECORD_HEADER_SCHEMA, \
+    MFT_ENTRY_IN_USE, MFT_ENTRY_DIRECTORY
+from .fixups import fixup_record
 
 MFT_ENTRY_HEADER_SIZE = 48
+MFT_ENTRY_SIGNATURE = b'FILE'
+
+# Memory taken by a loaded entry and by an entry with all attributes
+# decoded, in bytes over the size of a bare copy of the record (upper
+# bound, 64-bit CPython)
+ENTRY_OVERHEAD = 320
+DECODED_ENTRY_OVERHEAD = 3100
 
 
 class MftEntry(RawStruct):
     """Represents MFT table entry.
 
+    Only the record header is decoded on initialization. Attribute \
+    headers are walked on first access to attributes, attribute objects \
+    are created only for attributes that are requested \
+    (:meth:`lookup_attribute`) or when :attr:`attributes` is accessed.
+
+    Update sequence array fixups are applied on initialization, entry \
+    data is a fixed up copy of the record (a view of the copy if entry \
+    was initialized with a :class:`memoryview`). Bulk readers fix whole \
+    chunks of records (:func:`~.fixups.apply_fixups_bulk`) and pass \
+    fixed_up=True with the torn flag instead.
+
+    Entries use ``__slots__`` and decoded attributes keep no raw byte \
+    copies of their headers, attributes drop their bodies once all \
+    their fields or data runs are decoded. Only bodies decoded lazily \
+    are kept (resident values, index root nodes, security descriptors). \
+    Loaded entry takes up to :data:`ENTRY_OVERHEAD` bytes more than a \
+    bare copy of its record, up to :data:`DECODED_ENTRY_OVERHEAD` bytes \
+    more with all attributes and data runs of a typical system file \
+    record decoded.
+
     Attributes:
         offset (uint): MFT entry offset starting from the beginning of \
         disk in bytes.
-        attributes (list): List of initialized mft attribute objects \
-        (eg. :class:`~.mft_attribute.MftAttrStandardInformation`).
         header (MftEntryHeader): Initialized \
         :class:`~.mft_entry_header.MftEntryHeader`.
+        is_torn (bool): Record was not completely written (a sector \
+        does not end with the update sequence number) or its update \
+        sequence array is corrupted.
     """
+    __slots__ = (
+        'index', 'header', 'is_torn', '_attribute_index', '_attributes')
+
     def __init__(
         self, data=None, offset=None, length=None,
-        filename=None, index=None
+        filename=None, index=None, fixed_up=False, torn=False
     ):
         RawStruct.__init__(
             self,
@@ -32,31 +65,72 @@ class MftEntry(RawStruct):
         )
 
         self.index = index
-        self.attributes = []
-        self.fname_str = ""
+        # (type, offset, length) of every attribute, filled on first access,
+        # offset is None for attributes merged from extension records
+        self._attribute_index = None
+        # decoded attributes, same order as attribute index
+        self._attributes = None
 
         self.header = MFT_RECORD_HEADER(
-            self.get_string(0, 4),      # signature
-            self.get_ushort_le(4),      # upd_seq_array_offset
-            self.get_ushort_le(6),      # upd_seq_array_size
-            self.get_ulonglong_le(8),   # logfile_seq_number
-            self.get_ushort_le(16),     # seq_number
-            self.get_ushort_le(18),     # hard_link_count
-            self.get_ushort_le(20),     # first_attr_offset
-            self.get_ushort_le(22),     # flags
-            self.get_uint_le(24),       # used_size
-            self.get_ushort_le(28),     # allocated_size
-            self.get_ulonglong_le(30),  # base_file_record
-            self.get_ushort_le(38),     # next_attr_id
-            self.get_uint_le(42)        # mft_record_number
-        )
+            *MFT_RECORD_HEADER_SCHEMA.unpack_from(self.data))
+
+        self.is_torn = bool(torn)
+
+        if not fixed_up and self.header.signature == MFT_ENTRY_SIGNATURE:
+            fixed, self.is_torn = fixup_record(
+                self._data,
+                self.header.upd_seq_array_offset,
+                self.header.upd_seq_array_size
+            )
+            self._data = memoryview(fixed) \
+                if isinstance(self._data, memoryview) else fixed
+
+    @property
+    def name_str(self):
+        return self._get_entry_name(self.index)
+
+    @property
+    def attribute_index(self):
+        """
+        Returns:
+            list: (attribute type, offset, length) tuples of all \
+            attributes in the entry, attribute bodies are not decoded \
+            (offset is None for attributes of extension records, see \
+            :meth:`replace_attributes`).
+        """
+        if self._attribute_index is None:
+            self._attribute_index = self._walk_attributes()
+
+        return self._attribute_index
+
+    @property
+    def attributes(self):
+        """
+        Returns:
+            list: List of initialized mft attribute objects \
+            (eg. :class:`~.mft_attribute.MftAttrStandardInformation`).
+        """
+        return [
+            self._decode_attribute(position)
+            for position in range(len(self.attribute_index))
+        ]
 
-        self.name_str = self._get_entry_name(self.index)
-        self._load_attributes()
+    @property
+    def fname_str(self):
+        """
+        Returns:
+            str: File name from the last $FILE_NAME attribute \
+            (empty string if entry has none).
+        """
+        for position in reversed(range(len(self.attribute_index))):
+            if self.attribute_index[position][0] == MFT_ATTR_FILENAME:
+                return self._decode_attribute(position).fname
+
+        return ""
 
     @property
     def is_directory(self):
-        return self.header.flags & 0x0002
+        return self.header.flags & MFT_ENTRY_DIRECTORY
 
     @property
     def is_file(self):
@@ -64,51 +138,101 @@ class MftEntry(RawStruct):
 
     @property
     def is_in_use(self):
-        return self.header.flags & 0x0001
+        return self.header.flags & MFT_ENTRY_IN_USE
 
     @property
     def used_size(self):
         return self.header.used_size
 
-    def _load_attributes(self):
+    def _walk_attributes(self):
+        """Walks attribute headers, stops at the end marker, unsupported \
+        attribute type or corrupted attribute length."""
+        index = []
         free_space = self.size - MFT_ENTRY_HEADER_SIZE
         offset = self.header.first_attr_offset
 
-        while free_space > 0:
-            attr = self._get_attribute(offset)
-
-            if (attr is not None):
-                if attr.header.type == MFT_ATTR_FILENAME:
-                    self.fname_str = attr.fname
+        while free_space > 0 and offset + 0x08 <= self.size:
+            attr_type = self.get_uint_le(offset)
+            # Attribute length is in header @ offset 0x4
+            length = self.get_uint_le(offset + 0x04)
 
-                self.attributes.append(attr)
-                free_space = free_space - attr.header.length
-                offset = offset + attr.header.length
-            else:
+            if attr_type not in ATTRIBUTE_CLASSES or length < 0x18 or \
+                    offset + length > self.size:
                 break
 
-    def lookup_attribute(self, attr_type_id):
-        for attr in self.attributes:
-            if attr.header.type == attr_type_id:
-                return attr
+            index.append((attr_type, offset, length))
+            free_space = free_space - length
+            offset = offset + length
+
+        return index
+
+    def lookup_attribute(self, attr_type_id, name=None):
+        """Returns first attribute of the type, only attributes of this \
+        type are decoded.
+
+        Args:
+            attr_type_id (uint): Attribute type (eg. 0x30 - $FILE_NAME).
+            name (str): Attribute name (eg. '$I30', '' for unnamed \
+            attributes), any name matches if not specified.
+
+        Returns:
+            MftAttr: Initialized attribute object or None if entry has no \
+            attribute of this type.
+        """
+        for position, (attr_type, _, _) in enumerate(self.attribute_index):
+            if attr_type == attr_type_id:
+                attr = self._decode_attribute(position)
+
+                if name is None or \
+                        getattr(attr.header, 'attr_name', '') == name:
+                    return attr
         return None
 
-    def _get_attribute(self, offset):
-        """Determines attribute type at the offset and returns \
-        initialized attribute object.
+    def lookup_attributes(self, attr_type_id):
+        """Returns all attributes of the type, only attributes of this \
+        type are decoded.
+
+        Args:
+            attr_type_id (uint): Attribute type (eg. 0x80 - $DATA).
 
         Returns:
-            MftAttr: One of the attribute objects \
-            (eg. :class:`~.mft_attribute.MftAttrFilename`).
-            None: If atttribute type does not mach any one of the supported \
-            attribute types.
+            list: Initialized attribute objects in entry order.
+        """
+        return [
+            self._decode_attribute(position)
+            for position, (attr_type, _, _) in enumerate(self.attribute_index)
+            if attr_type == attr_type_id
+        ]
+
+    def replace_attributes(self, attribute_index, attributes):
+        """Replaces attributes of the entry, eg. with attributes of the \
+        base record and its extension records merged by \
+        :func:`~.attribute_list.resolve_attribute_list`.
+
+        Args:
+            attribute_index (list): (attribute type, offset, length) \
+            tuples, offset is None for attributes held by other records.
+            attributes (list): Decoded attribute objects, same order as \
+            attribute_index.
         """
-        attr_type = self.get_uint_le(offset)
-        # Attribute length is in header @ offset 0x4
-        length = self.get_uint_le(offset + 0x04)
-        data = self.get_chunk(offset, length)
+        self._attribute_index = list(attribute_index)
+        self._attributes = list(attributes)
+
+    def _decode_attribute(self, position):
+        """Returns initialized attribute object (eg. \
+        :class:`~.mft_attribute.MftAttrFilename`) at the position in \
+        attribute index, attributes are decoded once."""
+        if self._attributes is None:
+            self._attributes = [None] * len(self.attribute_index)
+
+        attr = self._attributes[position]
+
+        if attr is None:
+            attr_type, offset, length = self.attribute_index[position]
+            attr = MftAttr.factory(attr_type, self.get_chunk(offset, length))
+            self._attributes[position] = attr
 
-        return MftAttr.factory(attr_type, data)
+        return attr
 
     def _get_entry_name(self, index):
         names = {
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+
+"""Parallel MFT scanning.
+
+MFT record parsing is CPU bound, :func:`scan_records` splits the record
+range into slices and parses them in a pool of processes. Every worker
+opens its own reader and returns compact :class:`MftRecord` tuples, which
+are cheap to pickle, instead of full :class:`~.mft_entry.MftEntry`
+objects.
+
+>>> for record in scan_records(volume.mft_table, workers=8):
+>>>     print(record.index, record.name)
+"""
+import os
+from collections import deque, namedtuple
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from rawdisk.util.reader import ImageReader
+from .mft import MftTable, DEFAULT_CHUNK_SIZE
+from .data_runs import ExtentMap
+from .mft_attribute import MFT_ATTR_FILENAME, MFT_ATTR_DATA
+from .headers import FILE_REFERENCE_MASK, MFT_ENTRY_IN_USE, \
+    MFT_ENTRY_DIRECTORY
+
+# minimum number of records per worker task
+MIN_SLICE_SIZE = 1024
+
+# number of tasks per worker, smaller slices balance the load better
+SLICES_PER_WORKER = 4
+
+
+class MftRecord(namedtuple('MftRecord', [
+    'index', 'seq_number', 'flags', 'base_record',
+    'parent_ref', 'name', 'size'
+])):
+    """Compact, picklable summary of an MFT entry.
+
+    Attributes:
+        index (int): MFT entry index.
+        seq_number (int): Sequence number.
+        flags (int): Entry flags (0x01 - in use, 0x02 - directory).
+        base_record (int): Base record reference (0 for base records).
+        parent_ref (int): Parent directory entry index from $FILE_NAME \
+        (None if entry has no $FILE_NAME attribute).
+        name (str): File name.
+        size (int): Size of unnamed $DATA attribute in bytes.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_entry(cls, entry):
+        """
+        Args:
+            entry (MftEntry): Initialized :class:`~.mft_entry.MftEntry`.
+
+        Returns:
+            MftRecord: Summary of the entry.
+        """
+        header = entry.header
+        fname_attr = entry.lookup_attribute(MFT_ATTR_FILENAME)
+        data_attr = entry.lookup_attribute(MFT_ATTR_DATA)
+        parent_ref = None
+        size = 0
+
+        if fname_attr is not None:
+            parent_ref = fname_attr.parent_ref & FILE_REFERENCE_MASK
+
+        if data_attr is not None:
+            if data_attr.header.non_resident_flag:
+                size = data_attr.header.real_size
+            else:
+                size = data_attr.header.attr_length
+
+        return cls(
+            entry.index,
+            header.seq_number,
+            header.flags,
+            header.base_file_record,
+            parent_ref,
+            entry.fname_str,
+            size
+        )
+
+    @property
+    def is_in_use(self):
+        return bool(self.flags & MFT_ENTRY_IN_USE)
+
+    @property
+    def is_directory(self):
+        return bool(self.flags & MFT_ENTRY_DIRECTORY)
+
+
+def _scan_slice(params, start, stop, chunk_size):
+    """Worker entry point, parses records [start, stop) with its own \
+    reader."""
+    filename, entry_size, offset, cluster_size, volume_offset, runs = params
+
+    with ImageReader(filename) as reader:
+        table = MftTable(
+            mft_entry_size=entry_size,
+            offset=offset,
+            filename=reader,
+            cluster_size=cluster_size,
+            volume_offset=volume_offset
+        )
+
+        if runs is not None:
+            table._extent_map = ExtentMap(runs, cluster_size, volume_offset)
+
+        return [
+            MftRecord.from_entry(entry)
+            for entry in table.iter_entries(start, stop, chunk_size)
+        ]
+
+
+def _table_params(mft_table):
+    """Returns picklable parameters workers need to open the table."""
+    filename = mft_table.filename
+
+    if isinstance(filename, ImageReader):
+        filename = filename.filename
+
+    extent_map = mft_table.extent_map
+    runs = None if extent_map is None else extent_map.runs
+
+    return (
+        filename,
+        mft_table.entry_size,
+        mft_table.offset,
+        mft_table.cluster_size,
+        mft_table.volume_offset,
+        runs
+    )
+
+
+def scan_records(mft_table, start=0, stop=None, workers=None,
+                 slice_size=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Parses MFT records in a pool of processes.
+
+    Records are yielded in index order and are identical to \
+    :meth:`MftRecord.from_entry` applied to \
+    :meth:`MftTable.iter_entries <.mft.MftTable.iter_entries>` output.
+
+    Args:
+        mft_table (MftTable): Initialized :class:`~.mft.MftTable`.
+        start (int): First entry index.
+        stop (int): Entry index to stop at (default: all entries).
+        workers (int): Number of worker processes (default: number of \
+        CPUs). With 1 worker records are parsed in the calling process.
+        slice_size (int): Number of records per worker task (default: \
+        range is split into 4 slices per worker, at least 1024 records \
+        per slice).
+        chunk_size (int): Maximum number of bytes per read.
+
+    Yields:
+        MftRecord: Summary of every MFT entry in the range.
+    """
+    if stop is None:
+        stop = mft_table.entry_count
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if slice_size is None:
+        slice_size = max(
+            -(-(stop - start) // (workers * SLICES_PER_WORKER)),
+            MIN_SLICE_SIZE)
+
+    bounds = [
+        (first, min(first + slice_size, stop))
+        for first in range(start, stop, slice_size)
+    ]
+
+    if workers <= 1 or len(bounds) <= 1:
+        for entry in mft_table.iter_entries(start, stop, chunk_size):
+            yield MftRecord.from_entry(entry)
+        return
+
+    params = _table_params(mft_table)
+
+    pending = deque()
+    bounds = iter(bounds)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # keep a bounded number of slices in flight, so results of the
+        # whole table are not held in memory at once
+        for first, last in islice(bounds, 2 * workers):
+            pending.append(executor.submit(
+                _scan_slice, params, first, last, chunk_size))
+
+        while pending:
+            records = pending.popleft().result()
+
+            for first, last in islice(bounds, 1):
+                pending.append(executor.submit(
+                    _scan_slice, params, first, last, chunk_size))
+
+            for record in records:
+                yield record
+
+
+def build_index(mft_table, workers=None, **kwargs):
+    """Scans the whole MFT in parallel and merges the results.
+
+    Args:
+        mft_table (MftTable): Initialized :class:`~.mft.MftTable`.
+        workers (int): Number of worker processes (default: number of CPUs).
+        **kwargs: Passed to :func:`scan_records`.
+
+    Returns:
+        dict: :class:`MftRecord` tuples keyed by entry index.
+    """
+    return {
+        record.index: record
+        for record in scan_records(mft_table, workers=workers, **kwargs)
+    }
@@ -1,10 +1,29 @@
 # -*- coding: utf-8 -*-
 
 
+import os
 from rawdisk.util.filesize import size_str
-from .mft import MftTable, ENTRY_VOLUME
-from .mft_attribute import MFT_ATTR_VOLUME_NAME, MFT_ATTR_VOLUME_INFO
+from rawdisk.util.cache import LruCache
+from rawdisk.util.reader import open_image
+from .mft import MftTable, ENTRY_VOLUME, ENTRY_ROOT, ENTRY_BITMAP, \
+    ENTRY_SECURE, ENTRY_UPCASE, ENTRY_EXTEND
+from .mft_attribute import MFT_ATTR_VOLUME_NAME, MFT_ATTR_VOLUME_INFO, \
+    MFT_ATTR_INDEX_ROOT, MFT_ATTR_STANDARD_INFORMATION, \
+    MFT_ATTR_SECURITY_DESCRIPTOR
 from .bootsector import BootSector
+from .bitmap import ClusterBitmap
+from .cluster_map import ClusterMap
+from .mft_columns import read_columns
+from .mft_cache import MftCache, fingerprint
+from .recovery import scan_deleted
+from .path_index import PathIndex, DEFAULT_CACHE_SIZE, PATH_SEPARATOR
+from .timeline import iter_events, DEFAULT_BLOCK_SIZE
+from .streams import iter_streams, entry_streams
+from .secure import SecureStore, iter_permissions
+from .usn_journal import UsnJournal, JOURNAL_NAME
+from .data_stream import open_stream, DEFAULT_READAHEAD
+from .index import DirectoryIndex, INDEX_I30, FILE_NAME_DOS, \
+    DEFAULT_NODE_CACHE_SIZE, load_upcase
 from rawdisk.filesystems.volume import Volume
 
 NTFS_BOOTSECTOR_SIZE = 512
@@ -23,6 +42,12 @@ class NtfsVolume(Volume):
         bootsector (BootSector): initialized \
         :class:`~.bootsector.BootSector` object.
         mft_table (MftTable): initialized :class:`~.mft.MftTable` object
+        index_cache (LruCache): Directory index node cache shared by \
+        :meth:`list_directory` and :meth:`lookup_path`.
+        mft_cache_file (str): SQLite database \
+        (:class:`~.mft_cache.MftCache`) :attr:`mft_columns` are stored \
+        in and reused from (None - decode the MFT every time the volume \
+        is loaded).
 
     See More:
         http://en.wikipedia.org/wiki/NTFS
@@ -35,12 +60,23 @@ class NtfsVolume(Volume):
         self.mft_zone_size = None
         self.major_ver = None
         self.minor_ver = None
+        self.index_cache = LruCache(DEFAULT_NODE_CACHE_SIZE)
+        self._bitmap = None
+        self._cluster_map = None
+        self._fingerprint = None
+        self._image_size = None
+        self._mft_columns = None
+        self._secure = None
+        self._upcase = None
+        self._usn_journal = None
+        self.mft_cache_file = None
 
     def load(self, filename, offset):
         """Loads NTFS volume information
 
         Args:
-            filename (str): Path to file/device to read the volume \
+            filename (str or ImageReader): Path to file/device (or an open \
+            :class:`~rawdisk.util.reader.ImageReader`) to read the volume \
             information from.
             offset (uint): Valid NTFS partition offset from the beginning \
             of the file/device.
@@ -59,13 +95,460 @@ class NtfsVolume(Volume):
         self.mft_table = MftTable(
             mft_entry_size=self.bootsector.mft_record_size,
             filename=self.filename,
-            offset=self.mft_table_offset
+            offset=self.mft_table_offset,
+            cluster_size=self.bootsector.bytes_per_cluster,
+            volume_offset=self.offset
         )
 
         self.mft_table.preload_entries(NUM_SYSTEM_ENTRIES)
 
         self._load_volume_information()
 
+    @property
+    def bitmap(self):
+        """
+        Returns:
+            ClusterBitmap: Cluster allocation bitmap \
+            (:class:`~.bitmap.ClusterBitmap`), loaded on first access.
+        """
+        if self._bitmap is None:
+            with self.open(ENTRY_BITMAP) as stream:
+                self._bitmap = ClusterBitmap.load(
+                    stream, self.bootsector.total_clusters)
+
+        return self._bitmap
+
+    @property
+    def upcase(self):
+        """
+        Returns:
+            numpy.ndarray: $UpCase table of the volume \
+            (:func:`~.index.load_upcase`), loaded on first access (None \
+            if it can not be read).
+        """
+        if self._upcase is None:
+            try:
+                with self.open(ENTRY_UPCASE) as stream:
+                    self._upcase = load_upcase(stream.read())
+            except (IOError, ValueError):
+                # not retried, names are collated with str.upper()
+                self._upcase = False
+
+        return None if self._upcase is False else self._upcase
+
+    @property
+    def fingerprint(self):
+        """
+        Returns:
+            int: Fingerprint of the first MFT records \
+            (:func:`~.mft_cache.fingerprint`), changes when the volume \
+            is modified.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = fingerprint(self.mft_table)
+
+        return self._fingerprint
+
+    @property
+    def image_size(self):
+        """
+        Returns:
+            int: Size of the image file or device the volume is loaded \
+            from in bytes.
+        """
+        if self._image_size is None:
+            with open_image(self.filename) as reader:
+                self._image_size = reader.size
+
+        return self._image_size
+
+    @property
+    def identity(self):
+        """
+        Returns:
+            tuple: (volume serial number, volume size, \
+            :attr:`image_size`, :attr:`fingerprint`), used to check that \
+            cached data belongs to this volume.
+        """
+        return (
+            self.bootsector.extended_bpb.volume_serial,
+            self.size,
+            self.image_size,
+            self.fingerprint
+        )
+
+    @property
+    def mft_columns(self):
+        """
+        Returns:
+            MftColumns: :class:`~.mft_columns.MftColumns` of the whole \
+            MFT, decoded on first access (or loaded from \
+            :attr:`mft_cache_file`).
+        """
+        if self._mft_columns is None:
+            if self.mft_cache_file is None:
+                self._mft_columns = read_columns(self.mft_table)
+            else:
+                self._mft_columns = MftCache(
+                    self.mft_cache_file).load_or_build(
+                        self.identity, self.mft_table)
+
+        return self._mft_columns
+
+    @property
+    def cluster_map(self):
+        """
+        Returns:
+            ClusterMap: Cluster to file reverse map \
+            (:class:`~.cluster_map.ClusterMap`), built on first access.
+        """
+        if self._cluster_map is None:
+            self.load_cluster_map()
+
+        return self._cluster_map
+
+    def load_cluster_map(self, cache_file=None):
+        """Builds cluster to file reverse map in a single MFT pass.
+
+        Args:
+            cache_file (str): Map cache (.npz), map is loaded from it if \
+            it was saved for a volume with the same :attr:`identity`, \
+            otherwise the map is built and saved there.
+
+        Returns:
+            ClusterMap: Initialized :class:`~.cluster_map.ClusterMap`.
+        """
+        identity = self.identity
+        cluster_map = None
+
+        if cache_file is not None and os.path.exists(cache_file):
+            try:
+                cluster_map = ClusterMap.load(cache_file)
+            except (IOError, ValueError, KeyError):
+                cluster_map = None
+
+            if cluster_map is not None and (
+                    cluster_map.identity != identity or
+                    cluster_map.volume_offset != self.offset):
+                cluster_map = None
+
+        if cluster_map is None:
+            cluster_map = ClusterMap.build(
+                self.mft_table,
+                self.bootsector.bytes_per_cluster,
+                self.offset,
+                identity
+            )
+
+            if cache_file is not None:
+                cluster_map.save(cache_file)
+
+        self._cluster_map = cluster_map
+        return cluster_map
+
+    def owner_of(self, offset):
+        """Finds the file that owns a disk offset.
+
+        Args:
+            offset (int): Offset from the beginning of the disk in bytes.
+
+        Returns:
+            ClusterOwner: :class:`~.cluster_map.ClusterOwner` (None if \
+            cluster is unallocated).
+        """
+        return self.cluster_map.owner_of(offset)
+
+    def scan_deleted(self, check_bitmap=True):
+        """Scans the MFT for deleted entries, see \
+        :func:`~.recovery.scan_deleted`.
+
+        Args:
+            check_bitmap (bool): Estimate recoverable content from \
+            :attr:`bitmap`.
+
+        Yields:
+            DeletedEntry: :class:`~.recovery.DeletedEntry` tuples in \
+            index order.
+        """
+        return scan_deleted(
+            self.mft_table, self.bitmap if check_bitmap else None)
+
+    def iter_streams(self):
+        """Scans the whole MFT for alternate data streams, only \
+        attribute headers are decoded.
+
+        Yields:
+            StreamInfo: :class:`~.streams.StreamInfo` tuples (record, \
+            stream name, size, non-resident flag) of every named $DATA \
+            attribute.
+        """
+        return iter_streams(self.mft_table)
+
+    def list_streams(self, path):
+        """Lists alternate data streams of a file.
+
+        Args:
+            path (str or int): Absolute path or MFT record number.
+
+        Returns:
+            list: :class:`~.streams.StreamInfo` tuples.
+
+        Raises:
+            IOError: If path does not exist.
+        """
+        record = path if isinstance(path, int) else self.lookup_path(path)
+
+        if record is None:
+            raise IOError('No such file: {}'.format(path))
+
+        return entry_streams(self.mft_table.get_entry(record))
+
+    @property
+    def secure(self):
+        """
+        Returns:
+            SecureStore: $Secure security descriptors \
+            (:class:`~.secure.SecureStore`), loaded on first access.
+
+        Raises:
+            ValueError: If volume has no $Secure descriptor store \
+            (volumes older than NTFS 3.0).
+        """
+        if self._secure is None:
+            self._secure = SecureStore(
+                self.mft_table.get_entry(ENTRY_SECURE),
+                self.filename,
+                self.bootsector.bytes_per_cluster,
+                self.offset,
+                self.index_cache
+            )
+
+        return self._secure
+
+    def security_descriptor(self, path):
+        """Returns security descriptor of a file, from $Secure or from \
+        the file's own $SECURITY_DESCRIPTOR attribute.
+
+        Args:
+            path (str or int): Absolute path or MFT record number.
+
+        Returns:
+            SecurityDescriptor: \
+            :class:`~.security_descriptor.SecurityDescriptor` (None if \
+            file has no descriptor or it can not be resolved).
+
+        Raises:
+            IOError: If path does not exist.
+        """
+        record = path if isinstance(path, int) else self.lookup_path(path)
+
+        if record is None:
+            raise IOError('No such file: {}'.format(path))
+
+        entry = self.mft_table.get_entry(record)
+        si_attr = entry.lookup_attribute(MFT_ATTR_STANDARD_INFORMATION)
+        sec_id = getattr(si_attr, 'sec_id', 0)
+
+        if sec_id:
+            return self.secure.descriptor(sec_id)
+
+        sd_attr = entry.lookup_attribute(MFT_ATTR_SECURITY_DESCRIPTOR)
+
+        try:
+            return None if sd_attr is None else sd_attr.descriptor
+        except ValueError:
+            return None
+
+    def iter_permissions(self):
+        """Streams security descriptors of all files from \
+        :attr:`mft_columns`, each distinct descriptor is decoded once.
+
+        Yields:
+            FilePermissions: :class:`~.secure.FilePermissions` tuples in \
+            record order, see :func:`~.secure.iter_permissions`.
+        """
+        return iter_permissions(
+            self.mft_columns, self.build_path_index(), self.secure)
+
+    @property
+    def usn_journal(self):
+        """
+        Returns:
+            UsnJournal: $Extend/$UsnJrnl change journal \
+            (:class:`~.usn_journal.UsnJournal`), loaded on first access.
+
+        Raises:
+            ValueError: If change journal is not enabled on the volume.
+        """
+        if self._usn_journal is None:
+            index = self.directory_index(ENTRY_EXTEND)
+            item = None if index is None else index.find(JOURNAL_NAME)
+
+            if item is None:
+                raise ValueError('Volume has no change journal')
+
+            self._usn_journal = UsnJournal(
+                self.mft_table.get_entry(item.record),
+                self.filename,
+                self.bootsector.bytes_per_cluster,
+                self.offset
+            )
+
+        return self._usn_journal
+
+    def iter_usn_records(self, start_usn=None, stop_usn=None, since=None,
+                         until=None, paths=True):
+        """Streams change journal records, see \
+        :meth:`UsnJournal.iter_records \
+        <.usn_journal.UsnJournal.iter_records>`.
+
+        Args:
+            start_usn (int): Skip records with lower USN.
+            stop_usn (int): Stop at records with this or higher USN.
+            since (int): Skip records older than this time (FILETIME).
+            until (int): Skip records newer than this time (FILETIME).
+            paths (bool): Resolve record paths from :attr:`mft_columns`.
+
+        Yields:
+            UsnRecord: :class:`~.usn_journal.UsnRecord` tuples in USN \
+            order.
+        """
+        return self.usn_journal.iter_records(
+            start_usn, stop_usn, since, until,
+            self.build_path_index() if paths else None)
+
+    def build_path_index(self, cache_size=DEFAULT_CACHE_SIZE):
+        """Builds full path index from :attr:`mft_columns`.
+
+        Args:
+            cache_size (int): Maximum number of cached directory paths.
+
+        Returns:
+            PathIndex: Initialized :class:`~.path_index.PathIndex`.
+        """
+        return PathIndex(self.mft_columns, cache_size)
+
+    def iter_timeline(self, block_size=DEFAULT_BLOCK_SIZE):
+        """Streams MACB timeline of all files from :attr:`mft_columns`.
+
+        Args:
+            block_size (int): Number of records converted at a time.
+
+        Yields:
+            TimelineEvent: :class:`~rawdisk.util.timeline.TimelineEvent` \
+            tuples in record order, see :func:`~.timeline.iter_events`.
+        """
+        return iter_events(
+            self.mft_columns, self.build_path_index(), block_size)
+
+    def directory_index(self, record):
+        """Opens $I30 index of a directory.
+
+        Args:
+            record (int): Directory MFT record number.
+
+        Returns:
+            DirectoryIndex: Initialized :class:`~.index.DirectoryIndex` \
+            (None if record is not a directory).
+        """
+        entry = self.mft_table.get_entry(record)
+
+        if entry.lookup_attribute(MFT_ATTR_INDEX_ROOT, INDEX_I30) is None:
+            return None
+
+        return DirectoryIndex(
+            entry,
+            self.filename,
+            self.bootsector.bytes_per_cluster,
+            self.offset,
+            self.index_cache,
+            upcase=self.upcase
+        )
+
+    def lookup_path(self, path):
+        """Finds MFT record of a file walking directory indexes from the \
+        root directory, only index blocks on the path are read.
+
+        Args:
+            path (str): Absolute path ('/' or '\\' separated, case \
+            insensitive).
+
+        Returns:
+            int: MFT record number (None if path does not exist).
+        """
+        record = ENTRY_ROOT
+
+        for name in path.replace('\\', PATH_SEPARATOR).split(
+                PATH_SEPARATOR):
+            if not name:
+                continue
+
+            index = self.directory_index(record)
+            entry = None if index is None else index.find(name)
+
+            if entry is None:
+                return None
+
+            record = entry.record
+
+        return record
+
+    def list_directory(self, path=PATH_SEPARATOR):
+        """Lists directory entries in index order, DOS names of files \
+        that also have a long name are skipped.
+
+        Args:
+            path (str or int): Absolute path or MFT record number of the \
+            directory.
+
+        Returns:
+            list: :class:`~.index.IndexEntry` tuples.
+
+        Raises:
+            ValueError: If path is not an existing directory.
+        """
+        record = path if isinstance(path, int) else self.lookup_path(path)
+        index = None if record is None else self.directory_index(record)
+
+        if index is None:
+            raise ValueError('Not a directory: {}'.format(path))
+
+        index.preload()
+
+        return [
+            entry for entry in index if entry.namespace != FILE_NAME_DOS
+        ]
+
+    def open(self, path, name='', readahead=DEFAULT_READAHEAD):
+        """Opens file content for reading.
+
+        Args:
+            path (str or int): Absolute path or MFT record number.
+            name (str): Alternate data stream name ('' for file content).
+            readahead (int): Stream buffer size in bytes.
+
+        Returns:
+            io.BufferedReader: Seekable, read-only file-like object \
+            (:class:`~.data_stream.DataStream`).
+
+        Raises:
+            IOError: If path does not exist.
+            ValueError: If file has no such stream or it is not supported.
+        """
+        record = path if isinstance(path, int) else self.lookup_path(path)
+
+        if record is None:
+            raise IOError('No such file: {}'.format(path))
+
+        return open_stream(
+            self.mft_table.get_entry(record),
+            self.filename,
+            self.bootsector.bytes_per_cluster,
+            self.offset,
+            name,
+            readahead
+        )
+
     def _load_volume_information(self):
         # Get $Volume file.
         vol_entry = self.mft_table.get_entry(ENTRY_VOLUME)
@@ -112,8 +595,17 @@ class NtfsVolume(Volume):
         print("\tVolume Offset: 0x%x" % self.offset)
         print("\tTotal Sectors: %u" % self.bootsector.bpb.total_sectors)
         print("\tTotal Clusters: %u" % self.bootsector.total_clusters)
-        # print "\tFree Clusters:"
-        # print "\tFree Space:"
+
+        try:
+            free_clusters = self.bitmap.free_clusters
+        except (ValueError, IOError):
+            print("\tFree Clusters: N/A")
+            print("\tFree Space: N/A")
+        else:
+            print("\tFree Clusters: %u" % free_clusters)
+            print("\tFree Space: %s" % size_str(
+                free_clusters * self.bootsector.bytes_per_cluster))
+
         print("\tMFT Offset: 0x%x (from beginning of volume)" %
               self.mft_table_offset)
         print("\tMFT Mirror Offset: 0x%x" %
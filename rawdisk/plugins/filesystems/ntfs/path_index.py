@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+
+"""Full path resolution from $FILE_NAME parent references.
+
+Parents and names of all records are taken from a single columnar pass
+over the MFT (:func:`~.mft_columns.read_columns`), see
+:meth:`~.ntfs_volume.NtfsVolume.build_path_index`. Paths are assembled
+walking up parent references until the root directory or an already
+resolved directory is reached, resolved directory paths are kept in a
+bounded LRU cache, so resolving paths of every file on the volume takes
+roughly linear time.
+
+>>> index = volume.build_path_index()
+>>> index.resolve(42)
+'/Windows/System32/drivers'
+"""
+from rawdisk.util.cache import LruCache
+from .mft import ENTRY_ROOT
+
+PATH_SEPARATOR = '/'
+
+# files whose parent directory can not be found are placed here
+ORPHAN_DIR = '/$OrphanFiles'
+
+# maximum number of cached directory paths
+DEFAULT_CACHE_SIZE = 65536
+
+
+class PathIndex(object):
+    """Maps MFT record numbers to full paths.
+
+    Record's parent is valid if it is an in use directory record with \
+    the sequence number of the parent reference (a directory deleted \
+    and replaced by another record since has another sequence number), \
+    records with invalid parents are orphans and are placed in \
+    :data:`ORPHAN_DIR`. Records that are part of a parent reference loop \
+    are placed in :data:`ORPHAN_DIR` as well.
+
+    Args:
+        columns (MftColumns): :class:`~.mft_columns.MftColumns` of the \
+        whole MFT (position in columns must match the record number).
+        cache_size (int): Maximum number of cached directory paths.
+
+    Attributes:
+        orphans (set): Record numbers found to have invalid parent.
+        loops (set): Record numbers found to be part of a parent loop.
+        cache (LruCache): Cache of resolved directory paths.
+    """
+    def __init__(self, columns, cache_size=DEFAULT_CACHE_SIZE):
+        self.columns = columns
+        self.orphans = set()
+        self.loops = set()
+        self.cache = LruCache(cache_size)
+
+        records = columns.records
+        self._parents = records['parent_ref']
+        self._parent_seqs = records['parent_seq']
+        self._seqs = records['seq_number']
+        self._directories = columns.in_use & columns.is_directory
+
+    def parent(self, record):
+        """
+        Returns:
+            int: Parent record number from $FILE_NAME attribute.
+        """
+        return int(self._parents[record])
+
+    def name(self, record):
+        """
+        Returns:
+            str: Name of the record from $FILE_NAME attribute.
+        """
+        return self.columns.name(record)
+
+    def is_valid_parent(self, record, seq_number):
+        """
+        Args:
+            record (int): Parent record number of a reference.
+            seq_number (int): Parent sequence number of the reference.
+
+        Returns:
+            bool: True if record is an in use directory with the \
+            sequence number.
+        """
+        return 0 <= record < len(self.columns) and \
+            bool(self._directories[record]) and \
+            int(self._seqs[record]) == seq_number
+
+    def resolve(self, record):
+        """Returns full path of the record.
+
+        Args:
+            record (int): MFT record number.
+
+        Returns:
+            str: Full path (eg. '/Windows/notepad.exe').
+        """
+        if record == ENTRY_ROOT:
+            return PATH_SEPARATOR
+
+        path = self.cache.get(record)
+
+        if path is not None:
+            return path
+
+        chain = []
+        visited = set()
+        current = record
+
+        # walk up until root, resolved directory, orphan or loop
+        while True:
+            if current == ENTRY_ROOT:
+                base = ''
+                break
+
+            if current != record:
+                if not self.is_valid_parent(
+                        current, int(self._parent_seqs[chain[-1]])):
+                    self.orphans.add(chain[-1])
+                    base = ORPHAN_DIR
+                    break
+
+                base = self.cache.get(current)
+
+                if base is not None:
+                    break
+
+            if current in visited:
+                self.loops.update(chain[chain.index(current):])
+                base = ORPHAN_DIR
+                break
+
+            visited.add(current)
+            chain.append(current)
+            current = self.parent(current)
+
+        # assemble paths top down, caching directories on the way
+        path = base
+
+        for position in range(len(chain) - 1, -1, -1):
+            node = chain[position]
+            path = path + PATH_SEPARATOR + self.name(node)
+
+            if position > 0 and node not in self.loops:
+                self.cache.put(node, path)
+
+        return path
+
+    def iter_paths(self):
+        """Resolves paths of all valid records.
+
+        Yields:
+            tuple: (record number, full path).
+        """
+        valid = self.columns.records['valid']
+
+        for record in range(len(self.columns)):
+            if valid[record]:
+                yield record, self.resolve(record)
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+
+"""Deleted MFT entry recovery scan.
+
+Deleting a file clears the in use flag of its MFT record and frees its
+clusters in $Bitmap, the record itself keeps its attributes until it is
+reused. :func:`scan_deleted` reads the MFT in large sequential chunks,
+selects records with a valid 'FILE' signature and the in use flag
+cleared from all record headers of a chunk at once, and decodes only
+those records. Data runs of every found record are checked against the
+volume bitmap: clusters that were allocated to another file since the
+deletion can not be recovered.
+
+>>> for entry in volume.scan_deleted():
+>>>     print(entry.index, entry.name, entry.recoverable)
+"""
+from collections import namedtuple
+import numpy
+from .headers import MFT_RECORD_HEADER_SCHEMA, FILE_REFERENCE_MASK, \
+    MFT_ENTRY_IN_USE, MFT_ENTRY_DIRECTORY
+from .mft import DEFAULT_CHUNK_SIZE
+from .mft_attribute import MFT_ATTR_STANDARD_INFORMATION, \
+    MFT_ATTR_FILENAME, MFT_ATTR_DATA
+from .mft_entry import MftEntry, MFT_ENTRY_SIGNATURE
+
+
+class DeletedEntry(namedtuple('DeletedEntry', [
+    'index', 'seq_number', 'flags', 'base_record', 'parent_ref', 'name',
+    'ctime', 'atime', 'mtime', 'rtime', 'size', 'resident_data',
+    'data_runs', 'clusters', 'recoverable_clusters'
+])):
+    """Deleted MFT entry and its recoverable content.
+
+    Attributes:
+        index (int): MFT entry index.
+        seq_number (int): Sequence number (incremented on deletion).
+        flags (int): Entry flags (0x02 - directory).
+        base_record (int): Base record number (0 for base records).
+        parent_ref (int): Parent directory entry index from $FILE_NAME \
+        (None if entry has no $FILE_NAME attribute).
+        name (str): File name from the last $FILE_NAME attribute.
+        ctime (int): Creation time (FILETIME) from \
+        $STANDARD_INFORMATION, or $FILE_NAME if entry has no \
+        $STANDARD_INFORMATION (None if entry has neither).
+        atime (int): Last content modification time (FILETIME), same \
+        source as ctime.
+        mtime (int): Last MFT record change time (FILETIME).
+        rtime (int): Last access time (FILETIME).
+        size (int): Size of unnamed $DATA attribute in bytes.
+        resident_data (bytes): Content of resident unnamed $DATA \
+        attribute (None if content is non-resident or missing).
+        data_runs (list): :class:`~.data_runs.DataRun` tuples of \
+        non-resident unnamed $DATA attribute (empty if runs are \
+        corrupted).
+        clusters (int): Number of allocated (not sparse) clusters in \
+        data runs.
+        recoverable_clusters (int): Number of those clusters still free \
+        in the volume bitmap (None if bitmap was not checked).
+    """
+    __slots__ = ()
+
+    @property
+    def is_directory(self):
+        return bool(self.flags & MFT_ENTRY_DIRECTORY)
+
+    @property
+    def recoverable(self):
+        """
+        Returns:
+            float: Estimated recoverable fraction of the content, 1.0 for \
+            resident content (None if bitmap was not checked).
+        """
+        if not self.clusters:
+            return 1.0
+
+        if self.recoverable_clusters is None:
+            return None
+
+        return self.recoverable_clusters / self.clusters
+
+
+def deleted_entry(entry, bitmap=None):
+    """Extracts recoverable information from a deleted MFT entry.
+
+    Args:
+        entry (MftEntry): :class:`~.mft_entry.MftEntry` with in use flag \
+        cleared.
+        bitmap (ClusterBitmap): Volume :class:`~.bitmap.ClusterBitmap` \
+        data runs are checked against (optional).
+
+    Returns:
+        DeletedEntry: Recoverable information.
+    """
+    header = entry.header
+    fname_attr = entry.lookup_attribute(MFT_ATTR_FILENAME)
+    times_attr = entry.lookup_attribute(MFT_ATTR_STANDARD_INFORMATION)
+    data_attr = entry.lookup_attribute(MFT_ATTR_DATA, '')
+
+    if times_attr is None:
+        times_attr = fname_attr
+
+    times = (None, None, None, None) if times_attr is None else (
+        times_attr.ctime, times_attr.atime, times_attr.mtime,
+        times_attr.rtime)
+
+    size = 0
+    resident_data = None
+    data_runs = []
+
+    if data_attr is not None:
+        if data_attr.header.non_resident_flag:
+            size = data_attr.header.real_size
+
+            try:
+                data_runs = data_attr.data_runs
+            except ValueError:
+                # runs overwritten, content can not be located
+                data_runs = []
+        else:
+            resident_data = bytes(data_attr.value)
+            size = len(resident_data)
+
+    clusters = 0
+    recoverable_clusters = None if bitmap is None else 0
+
+    for run in data_runs:
+        if run.lcn is None:
+            continue
+
+        clusters += run.length
+
+        if bitmap is not None:
+            # clusters outside of the volume are not recoverable
+            in_volume = max(
+                min(run.lcn + run.length, bitmap.total_clusters) - run.lcn,
+                0)
+            recoverable_clusters += in_volume - \
+                bitmap.count_allocated(run.lcn, run.length)
+
+    return DeletedEntry(
+        entry.index,
+        header.seq_number,
+        header.flags,
+        header.base_file_record & FILE_REFERENCE_MASK,
+        None if fname_attr is None
+        else fname_attr.parent_ref & FILE_REFERENCE_MASK,
+        entry.fname_str,
+        times[0], times[1], times[2], times[3],
+        size,
+        resident_data,
+        data_runs,
+        clusters,
+        recoverable_clusters
+    )
+
+
+def deleted_positions(data, entry_size):
+    """Finds deleted records in a buffer of consecutive MFT records.
+
+    Args:
+        data (bytes): Raw MFT records (bytes or memoryview).
+        entry_size (int): MFT record size in bytes.
+
+    Returns:
+        numpy.ndarray: Positions of records with 'FILE' signature and \
+        in use flag cleared.
+    """
+    count = len(data) // entry_size
+    headers = numpy.frombuffer(
+        data, dtype=numpy.uint8, count=count * entry_size).view(
+            MFT_RECORD_HEADER_SCHEMA.numpy_dtype(entry_size))
+
+    return numpy.flatnonzero(
+        (headers['signature'] == MFT_ENTRY_SIGNATURE) &
+        (headers['flags'] & MFT_ENTRY_IN_USE == 0))
+
+
+def scan_deleted(mft_table, bitmap=None, start=0, stop=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE):
+    """Scans the MFT for deleted entries.
+
+    Args:
+        mft_table (MftTable): Initialized :class:`~.mft.MftTable`.
+        bitmap (ClusterBitmap): Volume :class:`~.bitmap.ClusterBitmap` \
+        data runs are checked against (optional).
+        start (int): First entry index.
+        stop (int): Entry index to stop at (default: all entries).
+        chunk_size (int): Maximum number of bytes per read.
+
+    Yields:
+        DeletedEntry: Deleted entries in index order.
+    """
+    entry_size = mft_table.entry_size
+
+    for first, data in mft_table.iter_chunks(start, stop, chunk_size):
+        for position in deleted_positions(data, entry_size).tolist():
+            entry = MftEntry(
+                data=data,
+                offset=position * entry_size,
+                length=entry_size,
+                index=first + position
+            )
+
+            yield deleted_entry(entry, bitmap)
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+
+
+"""$Secure security descriptor store.
+
+Since NTFS 3.0 security descriptors are not stored with the files: every
+distinct descriptor is stored once in the $SDS stream of $Secure (MFT
+entry 9) and files reference it by the security id in
+$STANDARD_INFORMATION. The $SII index maps security ids to $SDS offsets.
+
+:class:`SecureStore` reads the whole $SII index once (it is small, one
+entry per distinct descriptor), descriptors are read from $SDS and
+decoded on first use only and kept in a cache, identical descriptors
+share one object. Millions of files of a volume usually share a few
+hundred descriptors, so a volume-wide permissions report
+(:func:`iter_permissions`) decodes each of them once.
+
+>>> volume.secure.descriptor(0x100).owner
+'S-1-5-32-544'
+>>> for item in volume.iter_permissions():
+>>>     print(item.path, item.descriptor.owner)
+
+See More:
+    http://ftp.kolibrios.org/users/Asper/docs/NTFS/ntfsdoc.html#file_secure
+"""
+import struct
+from collections import namedtuple
+import numpy
+from .data_stream import open_stream
+from .headers import VIEW_INDEX_ENTRY_HEADER_SCHEMA, SDS_ENTRY_HEADER_SCHEMA
+from .index import DirectoryIndex, INDEX_ENTRY_NODE, INDEX_ENTRY_END, \
+    INDEX_ENTRY_HEADER_SIZE
+from .security_descriptor import parse_security_descriptor
+
+# security id index and descriptor stream of $Secure
+INDEX_SII = '$SII'
+STREAM_SDS = '$SDS'
+
+SDS_ENTRY_HEADER_SIZE = 0x14
+SECURITY_ID_SIZE = 4
+
+
+class SecurityIdEntry(namedtuple('SecurityIdEntry', [
+    'flags', 'subnode_vcn', 'sec_id', 'hash', 'offset', 'length'
+])):
+    """$SII index entry, data is a copy of the $SDS entry header.
+
+    Attributes:
+        flags (int): Entry flags (see :class:`~.index.IndexEntry`).
+        subnode_vcn (int): VCN of the child node with smaller keys (None \
+        if entry has no subnode).
+        sec_id (int): Security id (index key).
+        hash (int): Hash of the security descriptor.
+        offset (int): Offset of the $SDS entry in $SDS stream.
+        length (int): Length of the $SDS entry (header and descriptor).
+    """
+    __slots__ = ()
+
+    @property
+    def has_subnode(self):
+        return bool(self.flags & INDEX_ENTRY_NODE)
+
+    @property
+    def is_last(self):
+        return bool(self.flags & INDEX_ENTRY_END)
+
+
+class FilePermissions(namedtuple('FilePermissions', [
+    'record', 'path', 'sec_id', 'descriptor'
+])):
+    """Security descriptor of a file.
+
+    Attributes:
+        record (int): MFT record number of the file.
+        path (str): Full path of the file.
+        sec_id (int): Security id of the file.
+        descriptor (SecurityDescriptor): \
+        :class:`~.security_descriptor.SecurityDescriptor` (None if the \
+        security id can not be resolved).
+    """
+    __slots__ = ()
+
+
+def parse_sii_entries(data, start, end):
+    """Decodes $SII index entries of a node, entry parser of \
+    :class:`~.index.DirectoryIndex`.
+
+    Args:
+        data (bytes): Node data.
+        start (int): Offset of the first entry.
+        end (int): Offset of the end of entries.
+
+    Returns:
+        list: :class:`SecurityIdEntry` tuples, the last one is the end \
+        entry.
+
+    Raises:
+        ValueError: If entries are corrupted.
+    """
+    entries = []
+    offset = start
+
+    while True:
+        if offset + INDEX_ENTRY_HEADER_SIZE > end:
+            raise ValueError(
+                'Index entry at {:#x} crosses node end'.format(offset))
+
+        data_offset, data_length, length, key_length, flags = \
+            VIEW_INDEX_ENTRY_HEADER_SCHEMA.unpack_from(data, offset)
+
+        if length < INDEX_ENTRY_HEADER_SIZE or offset + length > end:
+            raise ValueError(
+                'Corrupted index entry at {:#x}'.format(offset))
+
+        subnode_vcn = None
+
+        if flags & INDEX_ENTRY_NODE:
+            # subnode VCN is in the last 8 bytes of the entry
+            subnode_vcn = struct.unpack_from(
+                '<Q', data, offset + length - 0x08)[0]
+
+        if flags & INDEX_ENTRY_END:
+            entries.append(SecurityIdEntry(flags, subnode_vcn, 0, 0, 0, 0))
+            return entries
+
+        if key_length < SECURITY_ID_SIZE or \
+                data_length < SDS_ENTRY_HEADER_SIZE or \
+                data_offset + data_length > length:
+            raise ValueError(
+                'Corrupted $SII index entry at {:#x}'.format(offset))
+
+        sec_id = struct.unpack_from(
+            '<I', data, offset + INDEX_ENTRY_HEADER_SIZE)[0]
+        hash_value, _, sds_offset, sds_length = \
+            SDS_ENTRY_HEADER_SCHEMA.unpack_from(data, offset + data_offset)
+
+        entries.append(SecurityIdEntry(
+            flags, subnode_vcn, sec_id, hash_value, sds_offset, sds_length))
+
+        offset += length
+
+
+class SecureStore(object):
+    """Security descriptors of $Secure.
+
+    Args:
+        entry (MftEntry): $Secure :class:`~.mft_entry.MftEntry`.
+        source (str or ImageReader): Source to read from.
+        cluster_size (int): Volume cluster size in bytes.
+        volume_offset (int): Volume offset from disk start in bytes.
+        cache (LruCache): Index node cache (see \
+        :class:`~.index.DirectoryIndex`).
+
+    Attributes:
+        entries (dict): :class:`SecurityIdEntry` tuples by security id.
+
+    Raises:
+        ValueError: If entry has no $SII index or $SDS stream (volumes \
+        older than NTFS 3.0) or the index is corrupted.
+    """
+    def __init__(self, entry, source, cluster_size, volume_offset=0,
+                 cache=None):
+        index = DirectoryIndex(
+            entry, source, cluster_size, volume_offset, cache, INDEX_SII,
+            parse_sii_entries)
+        index.preload()
+
+        self.entries = {item.sec_id: item for item in index}
+        self._entry = entry
+        self._source = source
+        self._cluster_size = cluster_size
+        self._volume_offset = volume_offset
+        # security id -> descriptor (None if not resolved)
+        self._descriptors = {}
+        # raw descriptor -> descriptor, shared by identical descriptors
+        self._by_value = {}
+
+        # fail early if there is no $SDS
+        self._open_sds().close()
+
+    def _open_sds(self):
+        return open_stream(self._entry, self._source, self._cluster_size,
+                           self._volume_offset, STREAM_SDS)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, sec_id):
+        return sec_id in self.entries
+
+    def read(self, sec_id):
+        """Reads raw security descriptor from $SDS.
+
+        Args:
+            sec_id (int): Security id.
+
+        Returns:
+            bytes: Self-relative security descriptor (None if security id \
+            is not in the index).
+
+        Raises:
+            ValueError: If $SDS entry does not match the index entry.
+        """
+        item = self.entries.get(sec_id)
+
+        if item is None:
+            return None
+
+        with self._open_sds() as stream:
+            stream.seek(item.offset)
+            data = stream.read(item.length)
+
+        if len(data) < SDS_ENTRY_HEADER_SIZE:
+            raise ValueError(
+                '$SDS entry of security id {:#x} is truncated'.format(
+                    sec_id))
+
+        hash_value, entry_sec_id, offset, length = \
+            SDS_ENTRY_HEADER_SCHEMA.unpack_from(data)
+
+        if (hash_value, entry_sec_id, offset, length) != \
+                (item.hash, sec_id, item.offset, item.length) or \
+                len(data) < length:
+            raise ValueError(
+                '$SDS entry of security id {:#x} is corrupted'.format(sec_id))
+
+        return data[SDS_ENTRY_HEADER_SIZE:length]
+
+    def descriptor(self, sec_id):
+        """Returns decoded security descriptor, each descriptor is read \
+        and decoded once.
+
+        Args:
+            sec_id (int): Security id (eg. \
+            :attr:`MftAttrStandardInformation.sec_id \
+            <.mft_attribute.MftAttrStandardInformation.sec_id>`).
+
+        Returns:
+            SecurityDescriptor: \
+            :class:`~.security_descriptor.SecurityDescriptor` (None if \
+            security id is unknown or its descriptor is corrupted).
+        """
+        try:
+            return self._descriptors[sec_id]
+        except KeyError:
+            pass
+
+        descriptor = None
+
+        try:
+            data = self.read(sec_id)
+
+            if data is not None:
+                descriptor = self._by_value.get(data)
+
+                if descriptor is None:
+                    descriptor = parse_security_descriptor(data)
+                    self._by_value[data] = descriptor
+        except ValueError:
+            descriptor = None
+
+        self._descriptors[sec_id] = descriptor
+        return descriptor
+
+
+def iter_permissions(columns, path_index, store):
+    """Yields security descriptors of all files in use.
+
+    Distinct security ids are resolved once up front, records without \
+    $STANDARD_INFORMATION security id (extension records, volumes older \
+    than NTFS 3.0) are skipped.
+
+    Args:
+        columns (MftColumns): :class:`~.mft_columns.MftColumns` of the \
+        whole MFT.
+        path_index (PathIndex): :class:`~.path_index.PathIndex` built \
+        from the same columns.
+        store (SecureStore): :class:`SecureStore` of the volume.
+
+    Yields:
+        FilePermissions: :class:`FilePermissions` tuples in record order.
+    """
+    records = columns.records
+    selected = numpy.flatnonzero(
+        columns.in_use & (records['base_record'] == 0) &
+        (records['sec_id'] != 0))
+    sec_ids = records['sec_id'][selected]
+    descriptors = {
+        sec_id: store.descriptor(sec_id)
+        for sec_id in numpy.unique(sec_ids).tolist()
+    }
+
+    for number, sec_id in zip(records['record'][selected].tolist(),
+                              sec_ids.tolist()):
+        yield FilePermissions(
+            number, path_index.resolve(number), sec_id, descriptors[sec_id])
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+
+"""Self-relative security descriptor decoding.
+
+Security descriptors hold the owner and group SIDs of a file and its
+access control lists. NTFS stores them in self-relative form: a fixed
+header followed by the SIDs and ACLs, referenced by offsets from the
+start of the descriptor. See :mod:`~.secure` for the volume-wide $Secure
+store, older volumes keep a descriptor per file in
+:class:`~.mft_attribute.MftAttrSecurityDescriptor`.
+
+>>> descriptor = parse_security_descriptor(data)
+>>> descriptor.owner
+'S-1-5-32-544'
+>>> [(ace.ace_type, ace.mask, ace.sid) for ace in descriptor.dacl]
+
+See More:
+    https://docs.microsoft.com/en-us/windows/win32/secauthz/security-descriptors
+"""
+from collections import namedtuple
+from .headers import SECURITY_DESCRIPTOR_SCHEMA, ACL_HEADER_SCHEMA, \
+    ACE_HEADER_SCHEMA
+
+# security descriptor control flags
+SE_DACL_PRESENT = 0x0004
+SE_SACL_PRESENT = 0x0010
+SE_SELF_RELATIVE = 0x8000
+
+# ACE types
+ACCESS_ALLOWED_ACE_TYPE = 0x00
+ACCESS_DENIED_ACE_TYPE = 0x01
+SYSTEM_AUDIT_ACE_TYPE = 0x02
+SYSTEM_ALARM_ACE_TYPE = 0x03
+ACCESS_ALLOWED_OBJECT_ACE_TYPE = 0x05
+ACCESS_DENIED_OBJECT_ACE_TYPE = 0x06
+SYSTEM_AUDIT_OBJECT_ACE_TYPE = 0x07
+SYSTEM_ALARM_OBJECT_ACE_TYPE = 0x08
+
+# ACE types with the SID right after the access mask
+_BASIC_ACE_TYPES = frozenset((
+    ACCESS_ALLOWED_ACE_TYPE, ACCESS_DENIED_ACE_TYPE, SYSTEM_AUDIT_ACE_TYPE,
+    SYSTEM_ALARM_ACE_TYPE
+))
+# ACE types with object flags and GUIDs between the access mask and SID
+_OBJECT_ACE_TYPES = frozenset((
+    ACCESS_ALLOWED_OBJECT_ACE_TYPE, ACCESS_DENIED_OBJECT_ACE_TYPE,
+    SYSTEM_AUDIT_OBJECT_ACE_TYPE, SYSTEM_ALARM_OBJECT_ACE_TYPE
+))
+
+# object ACE flags
+ACE_OBJECT_TYPE_PRESENT = 0x01
+ACE_INHERITED_OBJECT_TYPE_PRESENT = 0x02
+
+SID_HEADER_SIZE = 8
+ACL_HEADER_SIZE = 8
+ACE_HEADER_SIZE = 8
+GUID_SIZE = 16
+
+
+class Ace(namedtuple('Ace', ['ace_type', 'flags', 'mask', 'sid'])):
+    """Access control entry.
+
+    Attributes:
+        ace_type (int): ACE type (eg. 0x00 - access allowed, 0x01 - \
+        access denied).
+        flags (int): Inheritance flags.
+        mask (int): Access mask.
+        sid (str): Trustee SID (None for ACE types without a SID).
+    """
+    __slots__ = ()
+
+
+class SecurityDescriptor(namedtuple('SecurityDescriptor', [
+    'control', 'owner', 'group', 'sacl', 'dacl'
+])):
+    """Decoded security descriptor.
+
+    Attributes:
+        control (int): Control flags.
+        owner (str): Owner SID (None if not set).
+        group (str): Primary group SID (None if not set).
+        sacl (tuple): System ACL :class:`Ace` tuples (None if the \
+        descriptor has no SACL).
+        dacl (tuple): Discretionary ACL :class:`Ace` tuples (None if the \
+        descriptor has no DACL or a NULL DACL, which grants everyone \
+        full access).
+    """
+    __slots__ = ()
+
+
+def parse_sid(data, offset=0):
+    """Decodes binary SID.
+
+    Args:
+        data (bytes): Buffer holding the SID (bytes or memoryview).
+        offset (int): SID offset in data.
+
+    Returns:
+        str: SID string (eg. 'S-1-5-18').
+
+    Raises:
+        ValueError: If SID does not fit into data.
+    """
+    if offset + SID_HEADER_SIZE > len(data):
+        raise ValueError('SID at {:#x} crosses buffer end'.format(offset))
+
+    revision = data[offset]
+    count = data[offset + 1]
+    end = offset + SID_HEADER_SIZE + 4 * count
+
+    if end > len(data):
+        raise ValueError('SID at {:#x} crosses buffer end'.format(offset))
+
+    authority = int.from_bytes(
+        bytes(data[offset + 2:offset + SID_HEADER_SIZE]), 'big')
+    parts = ['S', str(revision),
+             str(authority) if authority < 1 << 32 else hex(authority)]
+
+    for position in range(offset + SID_HEADER_SIZE, end, 4):
+        parts.append(str(int.from_bytes(
+            bytes(data[position:position + 4]), 'little')))
+
+    return '-'.join(parts)
+
+
+def parse_acl(data, offset=0):
+    """Decodes ACL.
+
+    Args:
+        data (bytes): Buffer holding the ACL (bytes or memoryview).
+        offset (int): ACL offset in data.
+
+    Returns:
+        tuple: :class:`Ace` tuples in ACL order.
+
+    Raises:
+        ValueError: If ACL is corrupted.
+    """
+    if offset + ACL_HEADER_SIZE > len(data):
+        raise ValueError('ACL at {:#x} crosses buffer end'.format(offset))
+
+    _, size, ace_count = ACL_HEADER_SCHEMA.unpack_from(data, offset)
+    end = offset + size
+
+    if size < ACL_HEADER_SIZE or end > len(data):
+        raise ValueError('Corrupted ACL at {:#x}'.format(offset))
+
+    aces = []
+    position = offset + ACL_HEADER_SIZE
+
+    for _ in range(ace_count):
+        if position + ACE_HEADER_SIZE > end:
+            raise ValueError(
+                'ACE at {:#x} crosses ACL end'.format(position))
+
+        ace_type, flags, ace_size, mask = \
+            ACE_HEADER_SCHEMA.unpack_from(data, position)
+
+        if ace_size < ACE_HEADER_SIZE or position + ace_size > end:
+            raise ValueError('Corrupted ACE at {:#x}'.format(position))
+
+        sid_offset = None
+
+        if ace_type in _BASIC_ACE_TYPES:
+            sid_offset = position + ACE_HEADER_SIZE
+        elif ace_type in _OBJECT_ACE_TYPES:
+            object_flags = int.from_bytes(bytes(
+                data[position + ACE_HEADER_SIZE:
+                     position + ACE_HEADER_SIZE + 4]), 'little')
+            sid_offset = position + ACE_HEADER_SIZE + 4
+
+            if object_flags & ACE_OBJECT_TYPE_PRESENT:
+                sid_offset += GUID_SIZE
+
+            if object_flags & ACE_INHERITED_OBJECT_TYPE_PRESENT:
+                sid_offset += GUID_SIZE
+
+        sid = None
+
+        if sid_offset is not None:
+            sid = parse_sid(data[:position + ace_size], sid_offset)
+
+        aces.append(Ace(ace_type, flags, mask, sid))
+        position += ace_size
+
+    return tuple(aces)
+
+
+def parse_security_descriptor(data):
+    """Decodes self-relative security descriptor.
+
+    Args:
+        data (bytes): Descriptor (bytes or memoryview).
+
+    Returns:
+        SecurityDescriptor: Decoded :class:`SecurityDescriptor`.
+
+    Raises:
+        ValueError: If descriptor is corrupted.
+    """
+    if len(data) < SECURITY_DESCRIPTOR_SCHEMA.size:
+        raise ValueError('Security descriptor is too short')
+
+    _, control, owner_offset, group_offset, sacl_offset, dacl_offset = \
+        SECURITY_DESCRIPTOR_SCHEMA.unpack_from(data)
+
+    owner = parse_sid(data, owner_offset) if owner_offset else None
+    group = parse_sid(data, group_offset) if group_offset else None
+    sacl = parse_acl(data, sacl_offset) \
+        if control & SE_SACL_PRESENT and sacl_offset else None
+    dacl = parse_acl(data, dacl_offset) \
+        if control & SE_DACL_PRESENT and dacl_offset else None
+
+    return SecurityDescriptor(control, owner, group, sacl, dacl)
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+
+"""Alternate data stream (named $DATA attribute) enumeration.
+
+A volume-wide sweep reads the MFT in large chunks and walks attribute
+headers of all in use records of a chunk in lock step
+(:func:`~.mft_columns.walk_attributes`), so finding named $DATA
+attributes costs about as much as the header pass itself. Only the
+headers of found attributes are decoded, no
+:class:`~.mft_entry.MftEntry` or attribute objects are created.
+
+>>> for stream in volume.iter_streams():
+>>>     print(stream.record, stream.name, stream.size)
+"""
+from collections import namedtuple
+import numpy
+from .fixups import apply_fixups_bulk
+from .headers import MFT_RECORD_HEADER_SCHEMA, FILE_REFERENCE_MASK, \
+    MFT_ENTRY_IN_USE
+from .mft import DEFAULT_CHUNK_SIZE
+from .mft_attr_header import ATTR_HEADER_SCHEMA, NON_RESIDENT_HEADER_SCHEMA
+from .mft_attribute import MFT_ATTR_DATA
+from .mft_columns import walk_attributes
+from .mft_entry import MFT_ENTRY_SIGNATURE
+
+# size of a non-resident attribute header without name
+NON_RESIDENT_HEADER_SIZE = 0x40
+
+
+class StreamInfo(namedtuple('StreamInfo', [
+    'record', 'name', 'size', 'non_resident'
+])):
+    """Named $DATA stream of a file.
+
+    Attributes:
+        record (int): MFT record number of the file (base record number \
+        for streams held by extension records).
+        name (str): Stream name.
+        size (int): Stream size in bytes.
+        non_resident (bool): Stream content is stored in clusters.
+    """
+    __slots__ = ()
+
+
+def _stream_info(record, data, offset, length):
+    """Decodes stream of the attribute header at offset, None for \
+    continuation pieces and corrupted headers."""
+    _, _, non_resident, name_length, name_offset, _, _ = \
+        ATTR_HEADER_SCHEMA.unpack_from(data, offset)
+
+    if name_offset + 2 * name_length > length:
+        return None
+
+    name = str(bytes(data[offset + name_offset:
+                          offset + name_offset + 2 * name_length]),
+               'utf-16-le', 'replace')
+
+    if non_resident:
+        if length < NON_RESIDENT_HEADER_SIZE:
+            return None
+
+        fields = NON_RESIDENT_HEADER_SCHEMA.unpack_from(data, offset)
+        lowest_vcn, size = fields[0], fields[5]
+
+        # size is valid in the first piece only
+        if lowest_vcn:
+            return None
+    else:
+        size = int.from_bytes(
+            bytes(data[offset + 0x10:offset + 0x14]), 'little')
+
+    return StreamInfo(record, name, size, bool(non_resident))
+
+
+def decode_streams(data, first_index=0, entry_size=1024):
+    """Finds named $DATA attributes in a buffer of consecutive MFT \
+    records.
+
+    Args:
+        data (bytes): Raw MFT records (bytes or memoryview).
+        first_index (int): Index of the first record in data.
+        entry_size (int): MFT record size in bytes.
+
+    Returns:
+        list: :class:`StreamInfo` tuples in record and attribute order.
+    """
+    matrix, _ = apply_fixups_bulk(data, entry_size, MFT_ENTRY_SIGNATURE)
+    headers = matrix.reshape(-1).view(
+        MFT_RECORD_HEADER_SCHEMA.numpy_dtype(entry_size))
+    in_use = numpy.flatnonzero(
+        (headers['signature'] == MFT_ENTRY_SIGNATURE) &
+        (headers['flags'] & MFT_ENTRY_IN_USE != 0))
+
+    found_rows = []
+    found_offsets = []
+    found_lengths = []
+
+    for rows, offsets, attr_type, length in walk_attributes(
+            matrix, headers['first_attr_offset'].astype(numpy.int64),
+            in_use):
+        mask = (attr_type == MFT_ATTR_DATA) & (matrix[rows, offsets + 9] > 0)
+        found_rows.append(rows[mask])
+        found_offsets.append(offsets[mask])
+        found_lengths.append(length[mask])
+
+    if not found_rows:
+        return []
+
+    rows = numpy.concatenate(found_rows)
+    offsets = numpy.concatenate(found_offsets)
+    lengths = numpy.concatenate(found_lengths)
+    order = numpy.lexsort((offsets, rows))
+    base_records = headers['base_file_record'] & \
+        numpy.uint64(FILE_REFERENCE_MASK)
+
+    streams = []
+
+    for row, offset, length in zip(rows[order].tolist(),
+                                   offsets[order].tolist(),
+                                   lengths[order].tolist()):
+        record = int(base_records[row]) or first_index + row
+        stream = _stream_info(record, matrix[row], offset, length)
+
+        if stream is not None:
+            streams.append(stream)
+
+    return streams
+
+
+def iter_streams(mft_table, start=0, stop=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE):
+    """Scans the MFT for alternate data streams.
+
+    Args:
+        mft_table (MftTable): Initialized :class:`~.mft.MftTable`.
+        start (int): First entry index.
+        stop (int): Entry index to stop at (default: all entries).
+        chunk_size (int): Maximum number of bytes per read.
+
+    Yields:
+        StreamInfo: :class:`StreamInfo` tuples in order of the records \
+        holding the attributes.
+    """
+    for first, data in mft_table.iter_chunks(start, stop, chunk_size):
+        for stream in decode_streams(data, first, mft_table.entry_size):
+            yield stream
+
+
+def entry_streams(entry):
+    """Lists alternate data streams of a single entry.
+
+    Args:
+        entry (MftEntry): :class:`~.mft_entry.MftEntry` of the file \
+        (with extension records resolved, see \
+        :meth:`MftTable.get_entry <.mft.MftTable.get_entry>`).
+
+    Returns:
+        list: :class:`StreamInfo` tuples in attribute order.
+    """
+    streams = []
+
+    for attr in entry.lookup_attributes(MFT_ATTR_DATA):
+        header = attr.header
+        name = getattr(header, 'attr_name', '')
+
+        if not name:
+            continue
+
+        if header.non_resident_flag:
+            if header.lowest_vcn:
+                continue
+
+            size = header.real_size
+        else:
+            size = header.attr_length
+
+        streams.append(StreamInfo(
+            entry.index, name, size, bool(header.non_resident_flag)))
+
+    return streams
@@ -0,0 +1,496 @@
+# -*- coding: utf-8 -*-
+
+
+"""Builds small synthetic NTFS images out of the sample boot sector and
+MFT records, so tests can cover layouts the sample images do not have.
+
+Sample $MFT $DATA attribute has two data runs: 4 clusters @ LCN 0x255
+(records 0 - 15) and 0x3C clusters @ LCN 0x2D (records 16 - 255), so
+records past 15 are only found at the right place if data runs are
+followed.
+
+New records and index blocks are built with update sequence arrays
+(:func:`protect`), the same way NTFS writes them.
+"""
+import struct
+
+
+SAMPLE_BOOTSECTOR = 'sample_images/ntfs_bootsector.bin'
+SAMPLE_MFT_TABLE = 'sample_images/ntfs_mft_table.bin'
+
+VOLUME_OFFSET = 0x10000
+CLUSTER_SIZE = 4096
+RECORD_SIZE = 1024
+MFT_LCN = 0x255
+# second $MFT extent, starts at record 16
+MFT_EXTENT_LCN = 0x2D
+MFT_EXTENT_FIRST_RECORD = 16
+USN = 0x0003
+ROOT = 5
+
+
+def sample_records():
+    """Returns list of sample MFT records (bytearray)."""
+    with open(SAMPLE_MFT_TABLE, 'rb') as f:
+        data = f.read()
+
+    return [
+        bytearray(data[offset:offset + RECORD_SIZE])
+        for offset in range(0, len(data), RECORD_SIZE)
+    ]
+
+
+def set_record_number(record, number):
+    struct.pack_into('<I', record, 0x2C, number)
+    return record
+
+
+def align8(size):
+    return (size + 7) & ~7
+
+
+def protect(data, usa_offset, usn=USN):
+    """Moves the last two bytes of every 512 byte stride to the update \
+    sequence array and replaces them with the USN (in place)."""
+    count = len(data) // 512 + 1
+    struct.pack_into('<HH', data, 0x04, usa_offset, count)
+    struct.pack_into('<H', data, usa_offset, usn)
+
+    for n in range(1, count):
+        end = n * 512
+        data[usa_offset + 2 * n:usa_offset + 2 * n + 2] = data[end - 2:end]
+        struct.pack_into('<H', data, end - 2, usn)
+
+    return data
+
+
+def encode_data_runs(runs):
+    """Encodes (lcn, length) runs (lcn None for sparse runs)."""
+    data = bytearray()
+    previous = 0
+
+    for lcn, length in runs:
+        length_bytes = (length.bit_length() + 8) // 8
+        encoded = length.to_bytes(length_bytes, 'little')
+
+        if lcn is None:
+            data += bytes([length_bytes]) + encoded
+            continue
+
+        delta = lcn - previous
+        offset_bytes = (delta.bit_length() + 8) // 8
+        data += bytes([length_bytes | offset_bytes << 4]) + encoded + \
+            delta.to_bytes(offset_bytes, 'little', signed=True)
+        previous = lcn
+
+    return bytes(data + b'\x00')
+
+
+def attribute(attr_type, value, name='', identifier=0):
+    """Returns resident attribute (name should have even length, so the \
+    value is 8 byte aligned)."""
+    encoded_name = name.encode('utf-16-le')
+    value_offset = align8(0x18 + len(encoded_name))
+    length = align8(value_offset + len(value))
+    data = bytearray(length)
+    struct.pack_into(
+        '<IIBBHHHIHB', data, 0, attr_type, length, 0, len(name), 0x18, 0,
+        identifier, len(value), value_offset, 0)
+    data[0x18:0x18 + len(encoded_name)] = encoded_name
+    data[value_offset:value_offset + len(value)] = value
+    return bytes(data)
+
+
+def non_resident_attribute(attr_type, runs, real_size, name='',
+                           initialized_size=None, flags=0, comp_unit_size=0,
+                           lowest_vcn=0, identifier=0):
+    """Returns non-resident attribute with (lcn, length) data runs, \
+    lowest_vcn > 0 for further pieces of a split attribute."""
+    encoded_name = name.encode('utf-16-le')
+    runs_offset = align8(0x40 + len(encoded_name))
+    encoded_runs = encode_data_runs(runs)
+    length = align8(runs_offset + len(encoded_runs))
+    clusters = sum(run_length for _, run_length in runs)
+    data = bytearray(length)
+    struct.pack_into(
+        '<IIBBHHHQQHH4xQQQ', data, 0, attr_type, length, 1, len(name), 0x40,
+        flags, identifier, lowest_vcn, lowest_vcn + clusters - 1,
+        runs_offset, comp_unit_size, clusters * CLUSTER_SIZE, real_size,
+        real_size if initialized_size is None else initialized_size)
+    data[0x40:0x40 + len(encoded_name)] = encoded_name
+    data[runs_offset:runs_offset + len(encoded_runs)] = encoded_runs
+    return bytes(data)
+
+
+def attribute_list_entry(attr_type, record, identifier, starting_vcn=0,
+                         name=''):
+    """Returns $ATTRIBUTE_LIST entry."""
+    encoded_name = name.encode('utf-16-le')
+    length = align8(0x1A + len(encoded_name))
+    data = bytearray(length)
+    struct.pack_into(
+        '<IHBBQQH', data, 0, attr_type, length, len(name), 0x1A,
+        starting_vcn, record | 1 << 48, identifier)
+    data[0x1A:0x1A + len(encoded_name)] = encoded_name
+    return bytes(data)
+
+
+def file_name(parent, name, directory=False, size=0, namespace=1):
+    """Returns $FILE_NAME attribute value (also $I30 index key)."""
+    flags = 0x10000000 if directory else 0x20
+    return struct.pack(
+        '<QQQQQQQIIBB', parent | 1 << 48, 1, 2, 3, 4, size, size, flags, 0,
+        len(name), namespace) + name.encode('utf-16-le')
+
+
+def index_entry(record, key=b'', subnode=None):
+    """Returns $I30 index entry, entry without key is the last one."""
+    length = align8(0x10 + len(key)) + (8 if subnode is not None else 0)
+    flags = (0x01 if subnode is not None else 0) | (0 if key else 0x02)
+    data = bytearray(length)
+    struct.pack_into('<QHHI', data, 0, record | 1 << 48 if key else 0,
+                     length, len(key), flags)
+    data[0x10:0x10 + len(key)] = key
+
+    if subnode is not None:
+        struct.pack_into('<Q', data, length - 8, subnode)
+
+    return bytes(data)
+
+
+def index_node(entries, flags=0):
+    """Returns index node header followed by entries."""
+    entries = b''.join(entries)
+    return struct.pack(
+        '<IIIB3x', 0x10, 0x10 + len(entries), 0x10 + len(entries),
+        flags) + entries
+
+
+def index_root(entries, flags=0):
+    """Returns $INDEX_ROOT value of a $I30 index."""
+    return struct.pack('<IIIB3x', 0x30, 1, CLUSTER_SIZE, 1) + \
+        index_node(entries, flags)
+
+
+def index_block(vcn, entries, flags=0):
+    """Returns cluster sized INDX block."""
+    data = bytearray(CLUSTER_SIZE)
+    data[0:4] = b'INDX'
+    struct.pack_into('<Q', data, 0x10, vcn)
+    node = bytearray(index_node(entries, flags))
+    # entries follow header and update sequence array
+    struct.pack_into('<I', node, 0, 0x28)
+    struct.pack_into('<I', node, 4, 0x28 + len(node) - 0x10)
+    struct.pack_into('<I', node, 8, CLUSTER_SIZE - 0x18)
+    data[0x18:0x28] = node[:0x10]
+    data[0x40:0x40 + len(node) - 0x10] = node[0x10:]
+    return protect(data, 0x28)
+
+
+def mft_record(number, attributes, directory=False, base=0):
+    """Returns in use MFT record with the attributes, base is the base \
+    record number of extension records."""
+    data = bytearray(RECORD_SIZE)
+    attributes = b''.join(attributes) + b'\xff\xff\xff\xff\x00\x00\x00\x00'
+    data[0:4] = b'FILE'
+    struct.pack_into(
+        '<HHHHIIQH2xI', data, 0x10, 1, 1, 0x38, 0x03 if directory else 0x01,
+        0x38 + len(attributes), RECORD_SIZE, base, 0, number)
+    data[0x38:0x38 + len(attributes)] = attributes
+    return protect(data, 0x30)
+
+
+class NtfsImage(object):
+    """In-memory disk image with an NTFS volume at :data:`VOLUME_OFFSET`.
+
+    Args:
+        clusters (int): Volume size in clusters.
+    """
+    def __init__(self, clusters=MFT_LCN + 0x10):
+        self.data = bytearray(VOLUME_OFFSET + clusters * CLUSTER_SIZE)
+
+        with open(SAMPLE_BOOTSECTOR, 'rb') as f:
+            self.write(VOLUME_OFFSET, f.read())
+
+    def write(self, offset, data):
+        self.data[offset:offset + len(data)] = data
+
+    def write_cluster(self, lcn, data, offset=0):
+        self.write(VOLUME_OFFSET + lcn * CLUSTER_SIZE + offset, data)
+
+    def write_record(self, number, record):
+        """Writes MFT record to where $MFT data runs place it."""
+        if number < MFT_EXTENT_FIRST_RECORD:
+            lcn, index = MFT_LCN, number
+        else:
+            lcn, index = MFT_EXTENT_LCN, number - MFT_EXTENT_FIRST_RECORD
+
+        self.write_cluster(lcn, record, index * RECORD_SIZE)
+
+    def save(self, filename):
+        with open(filename, 'wb') as f:
+            f.write(self.data)
+
+
+def build_fragmented_image(filename, records=24):
+    """Writes image with sample system records (0 - 7) and copies of them \
+    renumbered as records 8 and above.
+
+    Args:
+        filename (str): Path of the image to write.
+        records (int): Number of records to write.
+    """
+    samples = sample_records()
+    image = NtfsImage()
+
+    for number in range(records):
+        record = samples[number % len(samples)]
+        image.write_record(number, set_record_number(record[:], number))
+
+    image.save(filename)
+    return image
+
+
+# LCN of the root directory $I30 index blocks
+ROOT_INDEX_LCN = 0x100
+
+
+def directory_record(number, parent, name, entries, allocation=None):
+    """Returns directory record with $I30 index.
+
+    Args:
+        entries (list): Root node index entries.
+        allocation (list): (lcn, length) runs of index blocks, root node \
+        entries point to them.
+    """
+    attributes = [
+        attribute(0x30, file_name(parent, name, directory=True)),
+        attribute(0x90, index_root(entries, 0x01 if allocation else 0),
+                  '$I30'),
+    ]
+
+    if allocation:
+        clusters = sum(length for _, length in allocation)
+        attributes.append(non_resident_attribute(
+            0xA0, allocation, clusters * CLUSTER_SIZE, '$I30'))
+        attributes.append(attribute(
+            0xB0, ((1 << clusters) - 1).to_bytes(8, 'little'), '$I30'))
+
+    return mft_record(number, attributes, directory=True)
+
+
+def file_record(number, parent, name, data=()):
+    """Returns file record, data are $DATA attributes."""
+    return mft_record(
+        number, [attribute(0x30, file_name(parent, name))] + list(data))
+
+
+def cluster_pattern(lcn):
+    """Returns content written to data clusters of test files."""
+    return bytes((lcn + n) & 0xFF for n in range(CLUSTER_SIZE))
+
+
+# $DATA runs of /Kernel.txt: fragmented, with a sparse run
+KERNEL_RUNS = [(0x200, 2), (None, 1), (0x180, 1)]
+KERNEL_SIZE = 4 * CLUSTER_SIZE - 100
+KERNEL_INITIALIZED_SIZE = 3 * CLUSTER_SIZE + 500
+BOOT_DATA = b'resident content'
+SYSTEM_LCN = 0x190
+
+
+def build_directory_image(filename):
+    """Writes image with sample system records and a directory tree:
+
+    /Kernel.txt (27, DOS name KERNEL~1.TXT), /Boot (28), /Users/ (29),
+    /Windows/ (24), /Windows/System32/ (25), /Windows/System32/config/
+    (26), /Windows/System32/config/SYSTEM (31)
+
+    Kernel.txt content is non-resident (:data:`KERNEL_RUNS`), Boot
+    content is resident, SYSTEM has one cluster of content and a resident
+    'Zone.Identifier' stream. Data clusters hold :func:`cluster_pattern`.
+
+    Root index has two levels: root node entry Kernel.txt, block 0 with
+    smaller and block 1 with larger names.
+    """
+    def entry(record, parent, name, directory=False, subnode=None,
+              namespace=1):
+        return index_entry(record, file_name(
+            parent, name, directory, namespace=namespace), subnode)
+
+    image = NtfsImage()
+
+    for number, record in enumerate(sample_records()):
+        image.write_record(number, record)
+
+    image.write_record(ROOT, directory_record(ROOT, ROOT, '.', [
+        entry(27, ROOT, 'Kernel.txt', subnode=0),
+        index_entry(0, subnode=1),
+    ], allocation=[(ROOT_INDEX_LCN, 2)]))
+    image.write_cluster(ROOT_INDEX_LCN, index_block(0, [
+        entry(0, ROOT, '$MFT'),
+        entry(3, ROOT, '$Volume'),
+        entry(28, ROOT, 'Boot'),
+        index_entry(0),
+    ]))
+    image.write_cluster(ROOT_INDEX_LCN + 1, index_block(1, [
+        entry(27, ROOT, 'KERNEL~1.TXT', namespace=2),
+        entry(29, ROOT, 'Users', directory=True),
+        entry(24, ROOT, 'Windows', directory=True),
+        index_entry(0),
+    ]))
+
+    image.write_record(24, directory_record(24, ROOT, 'Windows', [
+        entry(25, 24, 'System32', directory=True), index_entry(0)]))
+    image.write_record(25, directory_record(25, 24, 'System32', [
+        entry(26, 25, 'config', directory=True), index_entry(0)]))
+    image.write_record(26, directory_record(26, 25, 'config', [
+        entry(31, 26, 'SYSTEM'), index_entry(0)]))
+    image.write_record(29, directory_record(
+        29, ROOT, 'Users', [index_entry(0)]))
+    image.write_record(27, file_record(27, ROOT, 'Kernel.txt', [
+        non_resident_attribute(
+            0x80, KERNEL_RUNS, KERNEL_SIZE,
+            initialized_size=KERNEL_INITIALIZED_SIZE)]))
+    image.write_record(28, file_record(28, ROOT, 'Boot', [
+        attribute(0x80, BOOT_DATA)]))
+    image.write_record(31, file_record(31, 26, 'SYSTEM', [
+        non_resident_attribute(0x80, [(SYSTEM_LCN, 1)], CLUSTER_SIZE),
+        attribute(0x80, b'[ZoneTransfer]', 'Zone.Identifier')]))
+
+    for lcn in (0x200, 0x201, 0x180, SYSTEM_LCN):
+        image.write_cluster(lcn, cluster_pattern(lcn))
+
+    image.save(filename)
+    return image
+
+
+def lznt1_compress(data):
+    """Greedy LZNT1 compressor, longest match among recent positions \
+    of the same 3 byte prefix."""
+    out = bytearray()
+
+    for chunk_start in range(0, len(data), 4096):
+        chunk = bytes(data[chunk_start:chunk_start + 4096])
+        body = bytearray()
+        positions = {}
+        position = 0
+
+        while position < len(chunk):
+            flags_offset = len(body)
+            body.append(0)
+
+            for bit in range(8):
+                if position >= len(chunk):
+                    break
+
+                shift = 12 - max((position - 1).bit_length() - 4, 0)
+                max_offset = 1 << (16 - shift)
+                max_length = (1 << shift) + 2
+                key = chunk[position:position + 3]
+                best_length, best_offset = 0, 0
+
+                for candidate in reversed(positions.get(key, [])[-16:]):
+                    offset = position - candidate
+
+                    if offset > max_offset:
+                        break
+
+                    length = 0
+                    while length < max_length and \
+                            position + length < len(chunk) and \
+                            chunk[candidate + length] == \
+                            chunk[position + length]:
+                        length += 1
+
+                    if length > best_length:
+                        best_length, best_offset = length, offset
+
+                if best_length >= 3:
+                    body[flags_offset] |= 1 << bit
+                    body += struct.pack(
+                        '<H', (best_offset - 1) << shift | best_length - 3)
+                    step = best_length
+                else:
+                    body.append(chunk[position])
+                    step = 1
+
+                for n in range(position, position + step):
+                    positions.setdefault(chunk[n:n + 3], []).append(n)
+
+                position += step
+
+        if len(body) < len(chunk):
+            out += struct.pack('<H', 0xB000 | len(body) - 1) + body
+        else:
+            out += struct.pack('<H', 0x3000 | len(chunk) - 1) + chunk
+
+    return bytes(out + b'\x00\x00')
+
+
+# record and first data cluster of files written by build_file_image
+FILE_RECORD = 16
+DATA_LCN = 0x300
+COMPRESSION_UNIT = 16 * CLUSTER_SIZE
+
+
+def build_file_image(filename, content, compressed=False):
+    """Writes image with sample system records and a single file (record \
+    :data:`FILE_RECORD`) with the content.
+
+    Compressed content is stored the way NTFS does it: zero units are \
+    sparse, units that do not compress are stored as is, compressed \
+    units are followed by sparse clusters up to the unit size.
+    """
+    runs = []
+    clusters = []
+
+    if compressed:
+        units = range(0, len(content), COMPRESSION_UNIT)
+    else:
+        units = [0]
+
+    for offset in units:
+        if compressed:
+            unit = content[offset:offset + COMPRESSION_UNIT]
+            unit += bytes(COMPRESSION_UNIT - len(unit))
+        else:
+            unit = content
+
+        count = (len(unit) + CLUSTER_SIZE - 1) // CLUSTER_SIZE
+
+        if compressed and not any(unit):
+            runs.append((None, count))
+            continue
+
+        if compressed:
+            packed = lznt1_compress(unit)
+            packed_count = (len(packed) + CLUSTER_SIZE - 1) // CLUSTER_SIZE
+
+            if packed_count < count:
+                runs.append((DATA_LCN + len(clusters), packed_count))
+                runs.append((None, count - packed_count))
+                unit = packed
+                count = packed_count
+            else:
+                runs.append((DATA_LCN + len(clusters), count))
+        else:
+            runs.append((DATA_LCN, count))
+
+        for n in range(count):
+            clusters.append(unit[n * CLUSTER_SIZE:(n + 1) * CLUSTER_SIZE])
+
+    image = NtfsImage(clusters=DATA_LCN + max(len(clusters), 1))
+
+    for number, record in enumerate(sample_records()):
+        image.write_record(number, record)
+
+    image.write_record(FILE_RECORD, file_record(
+        FILE_RECORD, ROOT, 'file.bin', [non_resident_attribute(
+            0x80, runs, len(content), flags=0x0001 if compressed else 0,
+            comp_unit_size=4 if compressed else 0)]))
+
+    for n, cluster in enumerate(clusters):
+        image.write_cluster(DATA_LCN + n, cluster)
+
+    image.save(filename)
+    return image
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+from rawdisk.plugins.filesystems.ntfs.attribute_list import \
+    AttributeListEntry, parse_attribute_list, coalesce_records, \
+    resolve_attribute_list
+from rawdisk.plugins.filesystems.ntfs.data_runs import DataRun
+from rawdisk.plugins.filesystems.ntfs.data_stream import open_stream
+from rawdisk.plugins.filesystems.ntfs.ntfs_volume import NtfsVolume
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+from rawdisk.plugins.filesystems.ntfs.tests.ntfs_image import \
+    attribute, non_resident_attribute, attribute_list_entry, mft_record, \
+    file_name
+
+CLUSTER_SIZE = ntfs_image.CLUSTER_SIZE
+ROOT = ntfs_image.ROOT
+
+# big.bin (40): $DATA split between extension records 44 and 46
+BIG_SIZE = 4 * CLUSTER_SIZE - 10
+BIG_LCNS = [0x1C0, 0x1C1, 0x1D0, 0x1D1]
+ADS_DATA = b'alternate stream'
+BIG_LIST = b''.join([
+    attribute_list_entry(0x30, 40, 1),
+    attribute_list_entry(0x80, 44, 0),
+    attribute_list_entry(0x80, 46, 0, starting_vcn=2),
+    attribute_list_entry(0x80, 44, 1, name='ads'),
+])
+# far.bin (50): non-resident list, extension record 52
+FAR_LIST_LCN = 0x1E0
+
+
+def base_record(number, name, list_attr):
+    return mft_record(number, [
+        attribute(0x30, file_name(ROOT, name), identifier=1),
+        list_attr,
+    ])
+
+
+def build_image(filename):
+    image = ntfs_image.build_directory_image(filename)
+
+    image.write_record(40, base_record(
+        40, 'big.bin', attribute(0x20, BIG_LIST, identifier=2)))
+    image.write_record(44, mft_record(44, [
+        non_resident_attribute(0x80, [(0x1C0, 2)], BIG_SIZE),
+        attribute(0x80, ADS_DATA, 'ads', identifier=1),
+    ], base=40))
+    image.write_record(46, mft_record(46, [
+        non_resident_attribute(0x80, [(0x1D0, 2)], 0, lowest_vcn=2),
+    ], base=40))
+
+    # extension record belongs to another file
+    image.write_record(48, base_record(48, 'orphan.bin', attribute(
+        0x20, attribute_list_entry(0x30, 48, 1) +
+        attribute_list_entry(0x80, 47, 0), identifier=2)))
+    image.write_record(47, mft_record(
+        47, [attribute(0x80, b'not mine')], base=41))
+
+    far_list = attribute_list_entry(0x30, 50, 1) + \
+        attribute_list_entry(0x80, 52, 0)
+    image.write_cluster(FAR_LIST_LCN, far_list)
+    image.write_record(50, base_record(50, 'far.bin', non_resident_attribute(
+        0x20, [(FAR_LIST_LCN, 1)], len(far_list), identifier=2)))
+    image.write_record(52, mft_record(
+        52, [attribute(0x80, b'far')], base=50))
+
+    # list entry length is smaller than the entry header
+    image.write_record(54, base_record(54, 'bad.bin', attribute(
+        0x20, b'\x80\x00\x00\x00\x04\x00' + bytes(0x14), identifier=2)))
+
+    for lcn in BIG_LCNS:
+        image.write_cluster(lcn, ntfs_image.cluster_pattern(lcn))
+
+    image.save(filename)
+    return image
+
+
+class TestAttributeList(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.tmpdir, 'attribute_list.img')
+        build_image(cls.filename)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def setUp(self):
+        self.volume = NtfsVolume()
+        self.volume.load(self.filename, ntfs_image.VOLUME_OFFSET)
+        self.mft_table = self.volume.mft_table
+
+    def test_parse(self):
+        entries = parse_attribute_list(BIG_LIST)
+
+        self.assertEqual(entries[2], AttributeListEntry(
+            0x80, '', 2, 46 | 1 << 48, 0))
+        self.assertEqual(entries[2].record, 46)
+        self.assertEqual(entries[3].name, 'ads')
+        self.assertEqual(len(entries), 4)
+
+        with self.assertRaises(ValueError):
+            parse_attribute_list(BIG_LIST[:-2])
+
+    def test_coalesce(self):
+        self.assertEqual(coalesce_records([46, 44, 44, 100]),
+                         [(44, 47), (100, 101)])
+        self.assertEqual(coalesce_records([46, 44, 100], max_gap=0),
+                         [(44, 45), (46, 47), (100, 101)])
+        self.assertEqual(coalesce_records([]), [])
+
+    def test_resolve(self):
+        entry = self.mft_table.get_entry(40)
+
+        self.assertEqual(
+            [attr_type for attr_type, _, _ in entry.attribute_index],
+            [0x30, 0x80, 0x80, 0x20])
+        # extension attributes have no offset in the base record
+        self.assertIsNone(entry.attribute_index[1][1])
+        self.assertEqual(entry.fname_str, 'big.bin')
+        self.assertEqual(entry.lookup_attribute(0x80, '').data_runs, [
+            DataRun(0, 0x1C0, 2), DataRun(2, 0x1D0, 2)])
+        self.assertEqual(
+            bytes(entry.lookup_attribute(0x80, 'ads').value), ADS_DATA)
+
+        stream = open_stream(entry, self.filename, CLUSTER_SIZE,
+                             ntfs_image.VOLUME_OFFSET)
+        self.assertEqual(stream.read(), b''.join(
+            ntfs_image.cluster_pattern(lcn) for lcn in BIG_LCNS)[:BIG_SIZE])
+
+    def test_coalesced_reads(self):
+        entry = next(self.mft_table.iter_entries(40, 41))
+
+        with mock.patch.object(self.mft_table, 'iter_entries',
+                               wraps=self.mft_table.iter_entries) as reads:
+            self.assertEqual(resolve_attribute_list(entry, self.mft_table), 2)
+
+        # records 44 - 46 are read at once
+        reads.assert_called_once_with(44, 47)
+
+        entry = next(self.mft_table.iter_entries(40, 41))
+
+        with mock.patch.object(self.mft_table, 'iter_entries',
+                               wraps=self.mft_table.iter_entries) as reads:
+            resolve_attribute_list(entry, self.mft_table, max_gap=0)
+
+        self.assertEqual(reads.call_count, 2)
+
+    def test_non_resident_list(self):
+        entry = self.mft_table.get_entry(50)
+
+        self.assertEqual(bytes(entry.lookup_attribute(0x80).value), b'far')
+
+    def test_foreign_extension(self):
+        entry = self.mft_table.get_entry(48)
+
+        self.assertEqual(entry.fname_str, 'orphan.bin')
+        self.assertIsNone(entry.lookup_attribute(0x80))
+
+    def test_corrupted_list(self):
+        entry = self.mft_table.get_entry(54)
+
+        self.assertEqual(
+            [attr_type for attr_type, _, _ in entry.attribute_index],
+            [0x30, 0x20])
+
+    def test_entry_without_list(self):
+        entry = next(self.mft_table.iter_entries(27, 28))
+
+        self.assertEqual(resolve_attribute_list(entry, self.mft_table), 0)
+        self.assertEqual(len(entry.attribute_index), 2)
+
+
+class TestFragmentedMft(unittest.TestCase):
+    """$MFT data runs continue in extension record 15."""
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'fragmented_mft.img')
+        image = ntfs_image.build_directory_image(self.filename)
+        image.write_record(0, mft_record(0, [
+            attribute(0x30, file_name(ROOT, '$MFT'), identifier=1),
+            attribute(0x20, b''.join([
+                attribute_list_entry(0x30, 0, 1),
+                attribute_list_entry(0x80, 0, 2),
+                attribute_list_entry(0x80, 15, 0, starting_vcn=4),
+            ]), identifier=3),
+            non_resident_attribute(
+                0x80, [(ntfs_image.MFT_LCN, 4)], 0x40 * CLUSTER_SIZE,
+                identifier=2),
+        ]))
+        image.write_record(15, mft_record(15, [non_resident_attribute(
+            0x80, [(ntfs_image.MFT_EXTENT_LCN, 0x3C)], 0, lowest_vcn=4)],
+            base=0))
+        image.save(self.filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_records_past_first_extent(self):
+        volume = NtfsVolume()
+        volume.load(self.filename, ntfs_image.VOLUME_OFFSET)
+
+        self.assertEqual(volume.mft_table.entry_count, 0x100)
+        self.assertEqual(volume.mft_table.get_entry(31).fname_str, 'SYSTEM')
+        self.assertEqual(
+            [entry.name for entry in volume.list_directory('/Windows')],
+            ['System32'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import mock
+import numpy
+from rawdisk.plugins.filesystems.ntfs import bitmap as bitmap_module
+from rawdisk.plugins.filesystems.ntfs.bitmap import ClusterBitmap, \
+    popcount, _POPCOUNT
+from rawdisk.plugins.filesystems.ntfs.ntfs_volume import NtfsVolume
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+
+# sample $Bitmap $DATA run
+BITMAP_LCN = 0x252
+
+
+def naive_ranges(data, total_clusters):
+    ranges = []
+
+    for lcn in range(total_clusters):
+        if data[lcn >> 3] >> (lcn & 7) & 1:
+            if ranges and ranges[-1][0] + ranges[-1][1] == lcn:
+                ranges[-1][1] += 1
+            else:
+                ranges.append([lcn, 1])
+
+    return [tuple(r) for r in ranges]
+
+
+class TestClusterBitmap(unittest.TestCase):
+    def test_queries(self):
+        # clusters 0 - 9 and 12 allocated, 2 padding bits set
+        bitmap = ClusterBitmap(b'\xff\x13\xff', 14)
+
+        self.assertEqual(bitmap.allocated_clusters, 11)
+        self.assertEqual(bitmap.free_clusters, 3)
+        self.assertTrue(bitmap.is_allocated(9))
+        self.assertFalse(bitmap.is_allocated(10))
+        self.assertTrue(bitmap.is_allocated(12))
+        self.assertEqual(list(bitmap.allocated_ranges()), [(0, 10), (12, 1)])
+
+        with self.assertRaises(ValueError):
+            bitmap.is_allocated(14)
+
+        with self.assertRaises(ValueError):
+            ClusterBitmap(b'\xff', 14)
+
+    def test_run_to_the_end(self):
+        bitmap = ClusterBitmap(b'\x00\xf0', 16)
+        self.assertEqual(list(bitmap.allocated_ranges()), [(12, 4)])
+
+    def test_blocks(self):
+        rng = random.Random(3)
+        # runs of random length, so runs cross block boundaries
+        data = bytearray()
+
+        while len(data) < 5000:
+            data += bytes([rng.choice([0, 0xff, rng.getrandbits(8)])]) * \
+                rng.randint(1, 300)
+
+        total_clusters = 8 * len(data) - 3
+        expected = naive_ranges(data, total_clusters)
+
+        with mock.patch.object(bitmap_module, 'BLOCK_SIZE', 64), \
+                mock.patch.object(bitmap_module, 'RANGE_BLOCK_SIZE', 100):
+            bitmap = ClusterBitmap(bytes(data), total_clusters)
+
+            self.assertEqual(list(bitmap.allocated_ranges()), expected)
+            self.assertEqual(bitmap.allocated_clusters,
+                             sum(length for _, length in expected))
+
+    def test_count_allocated(self):
+        rng = random.Random(5)
+        data = bytes(rng.getrandbits(8) for _ in range(40))
+        bitmap = ClusterBitmap(data, 317)
+
+        for _ in range(500):
+            lcn = rng.randint(-4, 330)
+            count = rng.randint(0, 40)
+            expected = sum(
+                bitmap.is_allocated(n)
+                for n in range(max(lcn, 0), min(lcn + count, 317)))
+
+            self.assertEqual(bitmap.count_allocated(lcn, count), expected)
+
+    def test_popcount(self):
+        data = numpy.frombuffer(os.urandom(1003), dtype=numpy.uint8)
+        expected = sum(bin(value).count('1') for value in data.tolist())
+
+        self.assertEqual(popcount(data), expected)
+        self.assertEqual(int(_POPCOUNT[data].sum()), expected)
+
+    def test_load(self):
+        bitmap = ClusterBitmap.load(io.BytesIO(b'\x0f\x00\x00'), 20)
+
+        self.assertEqual(bitmap.allocated_clusters, 4)
+        self.assertTrue(bitmap.bits.flags.writeable)
+
+        with self.assertRaises(ValueError):
+            ClusterBitmap.load(io.BytesIO(b'\x0f'), 20)
+
+
+class TestVolumeBitmap(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.tmpdir, 'bitmap.img')
+        image = ntfs_image.build_directory_image(cls.filename)
+        # first 0x300 clusters allocated, then every other cluster
+        image.write_cluster(BITMAP_LCN, b'\xff' * 0x60 + b'\x55' * 0x80)
+        image.save(cls.filename)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def test_bitmap(self):
+        volume = NtfsVolume()
+        volume.load(self.filename, ntfs_image.VOLUME_OFFSET)
+        bitmap = volume.bitmap
+        total = volume.bootsector.total_clusters
+
+        self.assertIs(volume.bitmap, bitmap)
+        self.assertEqual(bitmap.total_clusters, total)
+        self.assertEqual(bitmap.allocated_clusters, 0x300 + 4 * 0x80)
+        self.assertEqual(bitmap.free_clusters, total - 0x300 - 4 * 0x80)
+        self.assertEqual(next(bitmap.allocated_ranges()), (0, 0x301))
+
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            volume.dump_volume()
+
+        self.assertIn('Free Clusters: {}'.format(bitmap.free_clusters),
+                      stdout.getvalue())
+
+    def test_dump_without_bitmap(self):
+        volume = NtfsVolume()
+        volume.load(self.filename, ntfs_image.VOLUME_OFFSET)
+
+        with mock.patch.object(bitmap_module.ClusterBitmap, 'load',
+                               side_effect=ValueError), \
+                mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            volume.dump_volume()
+
+        self.assertIn('Free Clusters: N/A', stdout.getvalue())
+        self.assertIn('Free Space: N/A', stdout.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+import numpy
+from rawdisk.plugins.filesystems.ntfs.cluster_map import ClusterMap, \
+    ClusterOwner, INTERVAL_DTYPE, NO_OWNER
+from rawdisk.plugins.filesystems.ntfs.ntfs_volume import NtfsVolume
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+from rawdisk.plugins.filesystems.ntfs.tests.test_attribute_list import \
+    build_image, BIG_SIZE
+
+CLUSTER_SIZE = ntfs_image.CLUSTER_SIZE
+# Kernel.txt record
+KERNEL_RECORD = 27
+
+
+def disk_offset(lcn, offset=0):
+    return ntfs_image.VOLUME_OFFSET + lcn * CLUSTER_SIZE + offset
+
+
+class TestClusterMap(unittest.TestCase):
+    def setUp(self):
+        intervals = numpy.array([
+            (100, 2, 0, 30, 0x80, 0, 3 * CLUSTER_SIZE),
+            (10, 4, 0, 31, 0x80, 1, 4 * CLUSTER_SIZE),
+            (50, 1, 2, 30, 0x80, 0, 3 * CLUSTER_SIZE),
+        ], dtype=INTERVAL_DTYPE)
+        intervals = intervals[numpy.argsort(intervals['lcn'])]
+        self.cluster_map = ClusterMap(
+            intervals, ['', 'ads'], CLUSTER_SIZE, 0x1000, (1, 2))
+
+    def test_owner_of(self):
+        cluster_map = self.cluster_map
+
+        self.assertEqual(
+            cluster_map.owner_of(0x1000 + 11 * CLUSTER_SIZE + 5),
+            ClusterOwner(31, 0x80, 'ads', CLUSTER_SIZE + 5, False))
+        self.assertEqual(
+            cluster_map.owner_of(0x1000 + 50 * CLUSTER_SIZE),
+            ClusterOwner(30, 0x80, '', 2 * CLUSTER_SIZE, False))
+        self.assertIsNone(cluster_map.owner_of(0x1000 + 14 * CLUSTER_SIZE))
+        self.assertIsNone(cluster_map.owner_of(0x1000 + 9 * CLUSTER_SIZE))
+        self.assertIsNone(cluster_map.owner_of(0x0fff))
+
+    def test_owners_of(self):
+        offsets = 0x1000 + CLUSTER_SIZE * numpy.array([0, 10, 13, 14, 101])
+        positions = self.cluster_map.owners_of(offsets)
+
+        self.assertEqual(positions.tolist(), [NO_OWNER, 0, 0, NO_OWNER, 2])
+
+    def test_save_load(self):
+        tmpdir = tempfile.mkdtemp()
+
+        try:
+            filename = os.path.join(tmpdir, 'map.cache')
+            self.cluster_map.save(filename)
+            loaded = ClusterMap.load(filename)
+        finally:
+            shutil.rmtree(tmpdir)
+
+        self.assertEqual(loaded.identity, (1, 2))
+        self.assertEqual(loaded.names, ['', 'ads'])
+        self.assertEqual(loaded.cluster_size, CLUSTER_SIZE)
+        self.assertEqual(loaded.volume_offset, 0x1000)
+        self.assertEqual(loaded.intervals.tolist(),
+                         self.cluster_map.intervals.tolist())
+
+
+class TestVolumeClusterMap(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.tmpdir, 'cluster_map.img')
+        ntfs_image.build_directory_image(cls.filename)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def setUp(self):
+        self.volume = NtfsVolume()
+        self.volume.load(self.filename, ntfs_image.VOLUME_OFFSET)
+
+    def test_owner_of(self):
+        volume = self.volume
+
+        # Kernel.txt: VCN 0 - 1 at 0x200, VCN 2 sparse, VCN 3 at 0x180
+        self.assertEqual(
+            volume.owner_of(disk_offset(0x201, 10)),
+            ClusterOwner(KERNEL_RECORD, 0x80, '', CLUSTER_SIZE + 10, False))
+        self.assertEqual(
+            volume.owner_of(disk_offset(0x180)),
+            ClusterOwner(KERNEL_RECORD, 0x80, '', 3 * CLUSTER_SIZE, False))
+        # last 100 bytes of the last cluster are slack
+        self.assertTrue(
+            volume.owner_of(disk_offset(0x180, CLUSTER_SIZE - 1)).is_slack)
+        # root directory index blocks
+        owner = volume.owner_of(disk_offset(ntfs_image.ROOT_INDEX_LCN, 1))
+        self.assertEqual((owner.record, owner.attr_type, owner.name),
+                         (ntfs_image.ROOT, 0xA0, '$I30'))
+        self.assertIsNone(volume.owner_of(disk_offset(0x202)))
+        self.assertIsNone(volume.owner_of(0))
+        self.assertIs(volume.cluster_map, volume.cluster_map)
+
+    def test_owners_of(self):
+        lcns = numpy.arange(0x1000) % 0x300
+        positions = self.volume.cluster_map.owners_of(disk_offset(lcns))
+        expected = [
+            NO_OWNER if owner is None else owner.record
+            for owner in (self.volume.owner_of(disk_offset(lcn))
+                          for lcn in lcns.tolist())
+        ]
+        records = numpy.where(
+            positions == NO_OWNER, NO_OWNER,
+            self.volume.cluster_map.intervals['record'][positions].astype(
+                numpy.int64))
+
+        self.assertEqual(records.tolist(), expected)
+
+    def test_cache(self):
+        cache_file = os.path.join(self.tmpdir, 'map.npz')
+        built = self.volume.load_cluster_map(cache_file)
+
+        self.assertTrue(os.path.exists(cache_file))
+        self.assertEqual(built.identity, self.volume.identity)
+
+        volume = NtfsVolume()
+        volume.load(self.filename, ntfs_image.VOLUME_OFFSET)
+
+        with mock.patch.object(ClusterMap, 'build') as build:
+            loaded = volume.load_cluster_map(cache_file)
+
+        build.assert_not_called()
+        self.assertIs(volume.cluster_map, loaded)
+        self.assertEqual(loaded.intervals.tolist(), built.intervals.tolist())
+
+        # map of another volume is rebuilt
+        ClusterMap(built.intervals, built.names, CLUSTER_SIZE,
+                   identity=(1, 2, 3)).save(cache_file)
+        rebuilt = volume.load_cluster_map(cache_file)
+
+        self.assertEqual(rebuilt.identity, volume.identity)
+        self.assertEqual(ClusterMap.load(cache_file).identity,
+                         volume.identity)
+
+
+class TestSplitAttributeClusterMap(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        filename = os.path.join(self.tmpdir, 'attribute_list.img')
+        build_image(filename)
+        self.volume = NtfsVolume()
+        self.volume.load(filename, ntfs_image.VOLUME_OFFSET)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_owner_of(self):
+        # big.bin (40): VCN 0 - 1 in record 44, VCN 2 - 3 in record 46
+        volume = self.volume
+
+        self.assertEqual(
+            volume.owner_of(disk_offset(0x1C1, 5)),
+            ClusterOwner(40, 0x80, '', CLUSTER_SIZE + 5, False))
+        # second piece has real size 0, size of the first piece is used
+        self.assertEqual(
+            volume.owner_of(disk_offset(0x1D0)),
+            ClusterOwner(40, 0x80, '', 2 * CLUSTER_SIZE, False))
+        self.assertFalse(
+            volume.owner_of(disk_offset(0x1D1, CLUSTER_SIZE - 11)).is_slack)
+        self.assertTrue(
+            volume.owner_of(disk_offset(0x1D1, CLUSTER_SIZE - 10)).is_slack)
+        self.assertEqual(
+            set(volume.cluster_map.intervals['size'][
+                volume.cluster_map.intervals['record'] == 40].tolist()),
+            {BIG_SIZE})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+from rawdisk.util.reader import ImageReader
+from rawdisk.plugins.filesystems.ntfs.data_runs import DataRun, \
+    ExtentMap, decode_data_runs
+from rawdisk.plugins.filesystems.ntfs.mft import MftTable
+from rawdisk.plugins.filesystems.ntfs.mft_entry import MftEntry
+from rawdisk.plugins.filesystems.ntfs.mft_attribute import MFT_ATTR_DATA
+from rawdisk.plugins.filesystems.ntfs.ntfs_volume import NtfsVolume
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+
+# $MFT $DATA data runs of the sample MFT
+SAMPLE_MFT_RUNS = [DataRun(0, 0x255, 4), DataRun(4, 0x2D, 0x3C)]
+
+
+class TestDecodeDataRuns(unittest.TestCase):
+    def test_decode(self):
+        data = b'\x21\x04\x55\x02\x21\x3C\xD8\xFD\x00'
+        self.assertEqual(decode_data_runs(data), SAMPLE_MFT_RUNS)
+
+    def test_decode_sparse(self):
+        # 0x10 clusters @ 0x100, 0x20 sparse clusters, 8 clusters @ 0x110
+        data = b'\x21\x10\x00\x01\x01\x20\x11\x08\x10\x00'
+        self.assertEqual(decode_data_runs(data, start_vcn=2), [
+            DataRun(2, 0x100, 0x10),
+            DataRun(0x12, None, 0x20),
+            DataRun(0x32, 0x110, 8),
+        ])
+
+    def test_decode_offset(self):
+        data = b'\xFF\xFF\x11\x02\x05\x00'
+        self.assertEqual(
+            decode_data_runs(memoryview(data), 2), [DataRun(0, 5, 2)])
+
+    def test_decode_truncated(self):
+        self.assertRaises(ValueError, decode_data_runs, b'\x21\x04\x55')
+        self.assertRaises(ValueError, decode_data_runs, b'\x20\x04\x55')
+
+
+class TestExtentMap(unittest.TestCase):
+    def setUp(self):
+        self.map = ExtentMap(
+            SAMPLE_MFT_RUNS + [DataRun(0x40, None, 2), DataRun(0x42, 0x69, 1)],
+            cluster_size=0x1000, volume_offset=0x10000)
+
+    def test_size(self):
+        self.assertEqual(self.map.size, 0x43000)
+        self.assertEqual(ExtentMap([], 0x1000).size, 0)
+
+    def test_lookup(self):
+        self.assertEqual(self.map.lookup(0), SAMPLE_MFT_RUNS[0])
+        self.assertEqual(self.map.lookup(3), SAMPLE_MFT_RUNS[0])
+        self.assertEqual(self.map.lookup(4), SAMPLE_MFT_RUNS[1])
+        self.assertRaises(ValueError, self.map.lookup, 0x43)
+
+    def test_translate(self):
+        self.assertEqual(self.map.translate(0x400), 0x10000 + 0x255400)
+        self.assertEqual(self.map.translate(0x4000), 0x10000 + 0x2D000)
+        self.assertEqual(self.map.translate(0x40000), None)
+
+    def test_iter_segments(self):
+        self.assertEqual(list(self.map.iter_segments(0x3C00, 0x800)), [
+            (0x10000 + 0x258C00, 0x400),
+            (0x10000 + 0x2D000, 0x400),
+        ])
+        # sparse run between two extents
+        self.assertEqual(list(self.map.iter_segments(0x3F000, 0x4000)), [
+            (0x10000 + 0x68000, 0x1000),
+            (None, 0x2000),
+            (0x10000 + 0x69000, 0x1000),
+        ])
+
+    def test_iter_segments_merge(self):
+        extent_map = ExtentMap(
+            [DataRun(0, 8, 2), DataRun(2, 10, 2)], cluster_size=0x200)
+        self.assertEqual(
+            list(extent_map.iter_segments(0, 0x800)), [(0x1000, 0x800)])
+
+    def test_read(self):
+        reader = mock.Mock()
+        reader.read.side_effect = lambda offset, length, cached: \
+            b'\xAA' * length
+
+        data = self.map.read(reader, 0x41800, 0x1000)
+        self.assertEqual(data, b'\x00' * 0x800 + b'\xAA' * 0x800)
+        reader.read.assert_called_once_with(0x79000, 0x800, cached=True)
+
+
+class TestFragmentedMft(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.tmpdir, 'fragmented.img')
+        ntfs_image.build_fragmented_image(cls.filename, records=24)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def create_table(self, filename=None):
+        return MftTable(
+            mft_entry_size=ntfs_image.RECORD_SIZE,
+            offset=ntfs_image.VOLUME_OFFSET +
+            ntfs_image.MFT_LCN * ntfs_image.CLUSTER_SIZE,
+            filename=filename or self.filename,
+            cluster_size=ntfs_image.CLUSTER_SIZE,
+            volume_offset=ntfs_image.VOLUME_OFFSET
+        )
+
+    def test_data_runs(self):
+        mft = self.create_table()
+        data_attr = mft.get_entry(0).lookup_attribute(MFT_ATTR_DATA)
+        self.assertEqual(data_attr.data_runs, SAMPLE_MFT_RUNS)
+        self.assertEqual(mft.extent_map.runs, SAMPLE_MFT_RUNS)
+        self.assertEqual(mft.entry_count, 256)
+
+    def test_resident_data_runs(self):
+        mft = self.create_table()
+        self.assertEqual(mft.get_entry(0).attributes[0].data_runs, None)
+
+    def test_get_entry(self):
+        mft = self.create_table()
+
+        for n in (1, 15, 16, 17, 23):
+            self.assertEqual(mft.get_entry(n).header.mft_record_number, n)
+
+        self.assertEqual(mft.get_entry(19).fname_str, '$Volume')
+
+    def test_get_entry_contiguous(self):
+        # without cluster size table is assumed to be contiguous
+        mft = self.create_table()
+        mft.cluster_size = None
+        self.assertEqual(mft.extent_map, None)
+        self.assertEqual(mft.get_entry(16).header.mft_record_number, 0)
+
+    def test_iter_entries(self):
+        with ImageReader(self.filename) as reader:
+            mft = self.create_table(reader)
+            mft.get_entry(0)
+
+            with mock.patch.object(
+                    reader, 'read', wraps=reader.read) as read:
+                entries = list(mft.iter_entries(8, 24))
+
+        self.assertEqual(
+            [e.header.mft_record_number for e in entries], list(range(8, 24)))
+        # one read per extent
+        self.assertEqual([c[0] for c in read.call_args_list], [
+            (ntfs_image.VOLUME_OFFSET + 0x255000 + 0x2000, 0x2000),
+            (ntfs_image.VOLUME_OFFSET + 0x2D000, 0x2000),
+        ])
+
+    def test_iter_entries_split(self):
+        # 512 byte clusters, second half of record 16 is in another extent
+        records = ntfs_image.sample_records()
+        record = ntfs_image.set_record_number(records[0][:], 16)
+        image = ntfs_image.NtfsImage()
+
+        for number in range(16):
+            image.write_record(number, records[number % len(records)])
+
+        image.write_cluster(0x259, record[:0x200])
+        image.write_cluster(0x20, record[0x200:])
+        filename = os.path.join(self.tmpdir, 'split.img')
+        image.save(filename)
+
+        mft = self.create_table(filename)
+        mft._extent_map = ExtentMap([
+            DataRun(0, 0x12A8, 33),
+            DataRun(33, 0x100, 1),
+        ], 0x200, ntfs_image.VOLUME_OFFSET)
+
+        expected = bytes(MftEntry(data=record, index=16).data)
+        entries = list(mft.iter_entries(0, 17, chunk_size=0x600))
+        self.assertEqual(len(entries), 17)
+        self.assertEqual(entries[16].index, 16)
+        self.assertEqual(bytes(entries[16].data), expected)
+        self.assertEqual(bytes(mft.get_entry(16).data), expected)
+
+    def test_volume(self):
+        volume = NtfsVolume()
+        volume.load(self.filename, ntfs_image.VOLUME_OFFSET)
+        self.assertEqual(volume.mft_table.cluster_size, 0x1000)
+        self.assertEqual(volume.vol_name, 'NTFS Volume')
+        self.assertEqual(
+            volume.mft_table.get_entry(21).header.mft_record_number, 21)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+from rawdisk.util.reader import ImageReader
+from rawdisk.plugins.filesystems.ntfs.data_stream import DataStream
+from rawdisk.plugins.filesystems.ntfs.ntfs_volume import NtfsVolume
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+from rawdisk.plugins.filesystems.ntfs.tests.ntfs_image import \
+    cluster_pattern, CLUSTER_SIZE
+
+
+def kernel_content():
+    data = cluster_pattern(0x200) + cluster_pattern(0x201) + \
+        bytes(CLUSTER_SIZE) + cluster_pattern(0x180)
+    initialized = ntfs_image.KERNEL_INITIALIZED_SIZE
+
+    return data[:initialized] + \
+        bytes(ntfs_image.KERNEL_SIZE - initialized)
+
+
+class TestDataStream(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.tmpdir, 'directories.img')
+        ntfs_image.build_directory_image(cls.filename)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def setUp(self):
+        self.volume = NtfsVolume()
+        self.volume.load(self.filename, ntfs_image.VOLUME_OFFSET)
+
+    def test_read_all(self):
+        with self.volume.open('/Kernel.txt') as f:
+            self.assertEqual(f.read(), kernel_content())
+            self.assertEqual(f.read(), b'')
+
+    def test_seek(self):
+        expected = kernel_content()
+
+        with self.volume.open(27, readahead=512) as f:
+            self.assertTrue(f.seekable())
+            f.seek(CLUSTER_SIZE - 10)
+            self.assertEqual(f.read(20), expected[CLUSTER_SIZE - 10:][:20])
+            f.seek(-50, io.SEEK_END)
+            self.assertEqual(f.read(), expected[-50:])
+            f.seek(10 * CLUSTER_SIZE)
+            self.assertEqual(f.read(10), b'')
+
+            with self.assertRaises(ValueError):
+                f.seek(-1)
+
+    def test_reads_are_coalesced(self):
+        with ImageReader(self.filename) as reader:
+            self.volume.filename = reader
+
+            with mock.patch.object(
+                    reader, 'readinto', wraps=reader.readinto) as read:
+                with self.volume.open('/Kernel.txt') as f:
+                    f.read()
+
+                # two contiguous clusters read at once, sparse run not read
+                self.assertEqual(
+                    [len(c[0][1]) for c in read.call_args_list],
+                    [2 * CLUSTER_SIZE, 500])
+
+            self.assertFalse(reader.closed)
+
+    def test_resident(self):
+        with self.volume.open('/Boot') as f:
+            self.assertEqual(f.read(), ntfs_image.BOOT_DATA)
+            f.seek(9)
+            self.assertEqual(f.read(3), b'con')
+
+    def test_named_stream(self):
+        path = '/Windows/System32/config/SYSTEM'
+
+        with self.volume.open(path) as f:
+            self.assertEqual(
+                f.read(), cluster_pattern(ntfs_image.SYSTEM_LCN))
+
+        with self.volume.open(path, 'Zone.Identifier') as f:
+            self.assertEqual(f.read(), b'[ZoneTransfer]')
+
+        with self.assertRaises(ValueError):
+            self.volume.open(path, 'missing')
+
+    def test_missing_file(self):
+        with self.assertRaises(IOError):
+            self.volume.open('/Windows/notepad.exe')
+
+        with self.assertRaises(ValueError):
+            self.volume.open('/Windows')
+
+    def test_closes_own_reader(self):
+        f = self.volume.open('/Kernel.txt')
+        reader = f.raw._reader
+        f.close()
+
+        self.assertTrue(reader.closed)
+        self.assertTrue(f.raw.closed)
+
+    def test_value(self):
+        stream = DataStream(value=b'abc')
+
+        self.assertEqual(stream.readall(), b'abc')
+        self.assertEqual(stream.size, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import random
+import unittest
+from rawdisk.plugins.filesystems.ntfs.fixups import apply_fixups, \
+    apply_fixups_bulk, fixup_record
+from rawdisk.plugins.filesystems.ntfs.mft import MftTable
+from rawdisk.plugins.filesystems.ntfs.mft_columns import read_columns
+from rawdisk.plugins.filesystems.ntfs.mft_entry import MftEntry
+from rawdisk.plugins.filesystems.ntfs.mft_attribute import \
+    MFT_ATTR_INDEX_ROOT
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+
+
+class TestFixups(unittest.TestCase):
+    def test_apply_fixups(self):
+        original = bytearray(range(256)) * 4
+        original[0:4] = b'FILE'
+        record = ntfs_image.protect(bytearray(original), 0x30)
+
+        self.assertEqual(record[0x1FE:0x200], b'\x03\x00')
+        fixed = apply_fixups(bytes(record), 0x30, 3)
+        self.assertIsInstance(fixed, bytearray)
+        self.assertEqual(fixed[0x1FE:0x200], original[0x1FE:0x200])
+        self.assertEqual(fixed[0x3FE:0x400], original[0x3FE:0x400])
+
+    def test_invalid_usa(self):
+        record = bytes(1024)
+
+        self.assertEqual(apply_fixups(record, 0x30, 0), record)
+        self.assertEqual(apply_fixups(record, 0x3FE, 3), record)
+        # USA covering strides past the end of the record
+        self.assertEqual(apply_fixups(record, 0x30, 4), record)
+
+    def test_torn(self):
+        record = ntfs_image.protect(bytearray(1024), 0x30)
+
+        self.assertFalse(fixup_record(record, 0x30, 3)[1])
+        # second stride was not written
+        record[0x3FE:0x400] = b'\x00\x00'
+        self.assertTrue(fixup_record(record, 0x30, 3)[1])
+        self.assertTrue(fixup_record(record, 0x3FE, 3)[1])
+
+    def test_bulk(self):
+        rng = random.Random(7)
+        size = 1024
+        records = []
+
+        for n in range(200):
+            record = ntfs_image.protect(
+                bytearray(rng.getrandbits(8) for _ in range(size)),
+                rng.choice([0x28, 0x30]), rng.getrandbits(16))
+            record[0:4] = b'FILE' if n % 7 else b'BAAD'
+
+            if n % 5 == 0:
+                # torn stride
+                record[0x3FE] ^= 0xFF
+            if n % 11 == 0:
+                # USA past the end of the record
+                record[4:6] = b'\xff\x03'
+
+            records.append(bytes(record))
+
+        data = b''.join(records) + b'\x00' * 10
+        fixed, torn = apply_fixups_bulk(data, size, b'FILE')
+
+        self.assertEqual(fixed.shape, (200, size))
+
+        for n, record in enumerate(records):
+            if record[0:4] == b'FILE':
+                expected = fixup_record(
+                    record, int.from_bytes(record[4:6], 'little'),
+                    int.from_bytes(record[6:8], 'little'))
+            else:
+                expected = (record, False)
+
+            self.assertEqual(fixed[n].tobytes(), bytes(expected[0]))
+            self.assertEqual(bool(torn[n]), expected[1])
+
+        # without signature all records are fixed
+        self.assertTrue(apply_fixups_bulk(data, size)[1][0])
+
+    def test_bulk_mft_reader(self):
+        mft = MftTable(filename='sample_images/ntfs_mft_table.bin')
+        entries = list(mft.iter_entries())
+        columns = read_columns(mft)
+
+        for entry in entries:
+            single = MftEntry(
+                filename='sample_images/ntfs_mft_table.bin',
+                offset=entry.index * 1024, length=1024, index=entry.index)
+
+            self.assertEqual(bytes(entry.data), bytes(single.data))
+            self.assertEqual(entry.is_torn, single.is_torn)
+            self.assertFalse(entry.is_torn)
+
+        self.assertEqual(columns.name(5), '.')
+        self.assertFalse(columns.records['torn'].any())
+
+    def test_mft_entry(self):
+        mft = MftTable(filename='sample_images/ntfs_mft_table.bin')
+        entry = mft.get_entry(5)
+
+        # $INDEX_ROOT name crosses the first stride end
+        attr = entry.lookup_attribute(MFT_ATTR_INDEX_ROOT)
+        self.assertEqual(attr.header.attr_name, '$I30')
+        self.assertEqual(entry.lookup_attribute(MFT_ATTR_INDEX_ROOT, '$I30'),
+                         attr)
+        self.assertIsNone(
+            entry.lookup_attribute(MFT_ATTR_INDEX_ROOT, '$SII'))
+
+
+if __name__ == "__main__":
+    unittest.main()
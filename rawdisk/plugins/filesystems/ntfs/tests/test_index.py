@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+import numpy
+from rawdisk.plugins.filesystems.ntfs.data_runs import DataRun, ExtentMap
+from rawdisk.plugins.filesystems.ntfs.index import DirectoryIndex, \
+    collation_key, load_upcase, parse_entries, FILE_NAME_DOS, UPCASE_SIZE
+from rawdisk.plugins.filesystems.ntfs.mft import ENTRY_ROOT, ENTRY_UPCASE
+from rawdisk.plugins.filesystems.ntfs.ntfs_volume import NtfsVolume
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+from rawdisk.plugins.filesystems.ntfs.tests.ntfs_image import attribute, \
+    non_resident_attribute, file_name, mft_record, index_entry, \
+    index_block, directory_record
+
+UPCASE_LCN = 0x1C0
+INTL_INDEX_LCN = 0x1E0
+INTL_RECORD = 30
+
+
+def upcase_table():
+    """Returns $UpCase that upper cases ASCII letters only."""
+    table = numpy.arange(UPCASE_SIZE, dtype='<u2')
+    table[ord('a'):ord('z') + 1] -= 0x20
+    return table
+
+
+def build_upcase_image(filename):
+    """Writes directory image with $UpCase and /Intl (30) directory:
+    root node entry 'Ð.txt', block 0 with 'a.txt' and block 1 with
+    'é.txt' ('é' is not upper cased by the table, 'É' < 'Ð' < 'é')."""
+    image = ntfs_image.build_directory_image(filename)
+    table = upcase_table().tobytes()
+
+    image.write_cluster(UPCASE_LCN, table)
+    image.write_record(ENTRY_UPCASE, mft_record(ENTRY_UPCASE, [
+        attribute(0x30, file_name(ntfs_image.ROOT, '$UpCase')),
+        non_resident_attribute(
+            0x80, [(UPCASE_LCN, len(table) // ntfs_image.CLUSTER_SIZE)],
+            len(table)),
+    ]))
+
+    def entry(record, name, subnode=None):
+        return index_entry(record, file_name(INTL_RECORD, name), subnode)
+
+    image.write_record(INTL_RECORD, directory_record(
+        INTL_RECORD, ntfs_image.ROOT, 'Intl', [
+            entry(32, '\u00d0.txt', subnode=0),
+            index_entry(0, subnode=1),
+        ], allocation=[(INTL_INDEX_LCN, 2)]))
+    image.write_cluster(INTL_INDEX_LCN, index_block(0, [
+        entry(33, 'a.txt'), index_entry(0)]))
+    image.write_cluster(INTL_INDEX_LCN + 1, index_block(1, [
+        entry(34, '\u00e9.txt'), index_entry(0)]))
+    image.save(filename)
+
+
+class TestIndexEntries(unittest.TestCase):
+    def test_parse_entries(self):
+        data = b''.join([
+            ntfs_image.index_entry(
+                42, ntfs_image.file_name(5, 'a.txt', size=10), subnode=3),
+            ntfs_image.index_entry(0, subnode=7),
+        ])
+        entries = parse_entries(data, 0, len(data))
+
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0].name, 'a.txt')
+        self.assertEqual(entries[0].record, 42)
+        self.assertEqual(entries[0].seq_number, 1)
+        self.assertEqual(entries[0].parent_ref, 5)
+        self.assertEqual(entries[0].real_size, 10)
+        self.assertEqual(entries[0].subnode_vcn, 3)
+        self.assertFalse(entries[0].is_directory)
+        self.assertTrue(entries[1].is_last)
+        self.assertEqual(entries[1].subnode_vcn, 7)
+
+    def test_corrupted_entries(self):
+        data = ntfs_image.index_entry(0)
+
+        with self.assertRaises(ValueError):
+            parse_entries(data, 0, len(data) - 1)
+
+        with self.assertRaises(ValueError):
+            parse_entries(b'\x00' * 0x10, 0, 0x10)
+
+    def test_collation_key(self):
+        self.assertEqual(collation_key('Windows'), collation_key('WINDOWS'))
+        self.assertLess(collation_key('Kernel.txt'),
+                        collation_key('KERNEL~1.TXT'))
+        self.assertLess(collation_key('a'), collation_key('B'))
+
+    def test_upcase_collation_key(self):
+        table = upcase_table()
+
+        self.assertEqual(collation_key('Windows', table),
+                         collation_key('WINDOWS'))
+        # str.upper() upper cases non-ASCII letters, the table does not
+        self.assertEqual(collation_key('\u00e9'), collation_key('\u00c9'))
+        self.assertGreater(collation_key('\u00e9', table),
+                           collation_key('\u00c9', table))
+        # code units of characters outside the BMP are collated
+        self.assertEqual(collation_key('\U0001f600', table),
+                         '\U0001f600'.encode('utf-16-be'))
+
+        with self.assertRaises(ValueError):
+            load_upcase(table.tobytes()[:-2])
+
+
+class TestDirectoryIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.tmpdir, 'directories.img')
+        ntfs_image.build_directory_image(cls.filename)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def setUp(self):
+        self.volume = NtfsVolume()
+        self.volume.load(self.filename, ntfs_image.VOLUME_OFFSET)
+
+    def open_root(self):
+        return DirectoryIndex(
+            self.volume.mft_table.get_entry(ENTRY_ROOT),
+            self.filename,
+            ntfs_image.CLUSTER_SIZE,
+            ntfs_image.VOLUME_OFFSET
+        )
+
+    def test_root_index(self):
+        index = self.open_root()
+
+        self.assertEqual(index.block_size, ntfs_image.CLUSTER_SIZE)
+        self.assertEqual([e.name for e in index.root.entries],
+                         ['Kernel.txt', ''])
+        self.assertEqual([e.name for e in index], [
+            '$MFT', '$Volume', 'Boot', 'Kernel.txt', 'KERNEL~1.TXT',
+            'Users', 'Windows'])
+        self.assertEqual(index.cache.misses, 2)
+
+    def test_find(self):
+        index = self.open_root()
+
+        self.assertEqual(index.find('boot').record, 28)
+        self.assertEqual(index.cache.misses, 1)
+        self.assertEqual(index.find('Kernel.txt').record, 27)
+        self.assertEqual(index.find('kernel~1.txt').namespace, FILE_NAME_DOS)
+        self.assertEqual(index.find('WINDOWS').record, 24)
+        self.assertIsNone(index.find('Program Files'))
+        self.assertIsNone(index.find('$Bitmap'))
+        self.assertEqual(index.cache.misses, 2)
+
+    def test_unallocated_block(self):
+        index = self.open_root()
+        index._bitmap = b'\x02'
+
+        with self.assertRaises(ValueError):
+            index.node(0)
+
+        self.assertEqual(index.node(1).vcn, 1)
+
+    def test_corrupted_block(self):
+        index = self.open_root()
+        # block 0 is read from the cluster of block 1
+        index._allocation = ExtentMap(
+            [DataRun(0, ntfs_image.ROOT_INDEX_LCN + 1, 1)],
+            ntfs_image.CLUSTER_SIZE, ntfs_image.VOLUME_OFFSET)
+
+        with self.assertRaises(ValueError):
+            index.node(0)
+
+    def test_preload(self):
+        index = self.open_root()
+
+        self.assertEqual(index.preload(), 2)
+        self.assertEqual(
+            [e.name for e in index], [e.name for e in self.open_root()])
+        self.assertEqual(index.cache.misses, 0)
+
+        # only blocks marked in $BITMAP are cached
+        index = self.open_root()
+        index._bitmap = b'\x02'
+        self.assertEqual(index.preload(chunk_size=1), 1)
+
+    def test_torn_block(self):
+        tmpdir = tempfile.mkdtemp()
+
+        try:
+            filename = os.path.join(tmpdir, 'torn.img')
+            image = ntfs_image.build_directory_image(filename)
+            # second stride of block 1 was not written
+            image.write_cluster(
+                ntfs_image.ROOT_INDEX_LCN + 1, b'\x00\x00', 0x3FE)
+            image.save(filename)
+            index = DirectoryIndex(
+                self.volume.mft_table.get_entry(ENTRY_ROOT), filename,
+                ntfs_image.CLUSTER_SIZE, ntfs_image.VOLUME_OFFSET)
+
+            self.assertEqual(index.preload(), 1)
+
+            with self.assertRaisesRegex(ValueError, 'torn'):
+                index.node(1)
+
+            self.assertEqual(index.node(0).vcn, 0)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_list_directory(self):
+        root = self.volume.list_directory()
+
+        self.assertEqual([(e.name, e.record) for e in root], [
+            ('$MFT', 0), ('$Volume', 3), ('Boot', 28), ('Kernel.txt', 27),
+            ('Users', 29), ('Windows', 24)])
+        # all blocks were read in one chunk
+        self.assertEqual(self.volume.index_cache.misses, 0)
+        self.assertTrue(root[-1].is_directory)
+        self.assertEqual(self.volume.list_directory('/Users'), [])
+        self.assertEqual(
+            [e.name for e in self.volume.list_directory(25)], ['config'])
+
+        with self.assertRaises(ValueError):
+            self.volume.list_directory('/Kernel.txt')
+
+        with self.assertRaises(ValueError):
+            self.volume.list_directory('/Program Files')
+
+    def test_lookup_path(self):
+        cache = self.volume.index_cache
+
+        self.assertEqual(
+            self.volume.lookup_path('/Windows/System32/config/SYSTEM'), 31)
+        # one index block per level, other directories are root only
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(
+            self.volume.lookup_path('\\windows\\system32\\CONFIG'), 26)
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(self.volume.lookup_path('/'), ENTRY_ROOT)
+        self.assertIsNone(self.volume.lookup_path('/Windows/notepad.exe'))
+        self.assertIsNone(self.volume.lookup_path('/Kernel.txt/a'))
+
+
+class TestUpcaseIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.tmpdir, 'upcase.img')
+        build_upcase_image(cls.filename)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def setUp(self):
+        self.volume = NtfsVolume()
+        self.volume.load(self.filename, ntfs_image.VOLUME_OFFSET)
+
+    def test_upcase(self):
+        self.assertEqual(self.volume.upcase.tolist(),
+                         upcase_table().tolist())
+
+    def test_find(self):
+        index = self.volume.directory_index(INTL_RECORD)
+
+        self.assertEqual(index.find('\u00e9.TXT').record, 34)
+        self.assertEqual(index.find('A.txt').record, 33)
+        self.assertIsNone(index.find('\u00c9.txt'))
+
+        # str.upper() collation descends to block 0 and misses the name
+        index = DirectoryIndex(
+            self.volume.mft_table.get_entry(INTL_RECORD), self.filename,
+            ntfs_image.CLUSTER_SIZE, ntfs_image.VOLUME_OFFSET)
+
+        self.assertIsNone(index.find('\u00e9.txt'))
+
+    def test_missing_upcase(self):
+        volume = NtfsVolume()
+        volume.load(self.filename, ntfs_image.VOLUME_OFFSET)
+
+        with mock.patch.object(NtfsVolume, 'open', side_effect=IOError):
+            self.assertIsNone(volume.upcase)
+
+        # failure is not retried
+        self.assertIsNone(volume.upcase)
+        self.assertEqual(volume.lookup_path('/Kernel.txt'), 27)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from rawdisk.plugins.filesystems.ntfs.lznt1 import decompress
+from rawdisk.plugins.filesystems.ntfs.ntfs_volume import NtfsVolume
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+from rawdisk.plugins.filesystems.ntfs.tests.ntfs_image import \
+    COMPRESSION_UNIT, lznt1_compress
+
+
+def sample_content():
+    rng = random.Random(5)
+    text = b''.join(
+        rng.choice([b'ntfs ', b'lznt1 ', b'cluster ', b'unit\n'])
+        for _ in range(20000))
+    noise = bytes(rng.getrandbits(8) for _ in range(COMPRESSION_UNIT))
+
+    # compressed unit, sparse unit, uncompressed unit, compressed tail
+    return text[:COMPRESSION_UNIT] + bytes(COMPRESSION_UNIT) + noise + \
+        text[:COMPRESSION_UNIT // 3]
+
+
+class TestDecompress(unittest.TestCase):
+    def test_back_reference(self):
+        # literal 'a', then 9 bytes copied from offset 1
+        self.assertEqual(
+            decompress(b'\x03\xb0\x02a\x06\x00'), bytearray(b'a' * 10))
+
+    def test_uncompressed_chunk(self):
+        self.assertEqual(decompress(b'\x02\x30abc\x00\x00'), b'abc')
+
+    def test_round_trip(self):
+        data = sample_content()
+        self.assertEqual(bytes(decompress(lznt1_compress(data))), data)
+
+    def test_short_chunk_padding(self):
+        chunks = lznt1_compress(b'x' * 100)[:-2] + lznt1_compress(b'y')
+        self.assertEqual(
+            decompress(chunks), b'x' * 100 + bytes(3996) + b'y')
+
+    def test_size_limit(self):
+        data = lznt1_compress(bytes(10000))
+        self.assertEqual(len(decompress(data, 5000)), 5000)
+
+    def test_corrupted(self):
+        with self.assertRaises(ValueError):
+            # back reference before the start of the chunk
+            decompress(b'\x01\xb0\x01\x06')
+
+        with self.assertRaises(ValueError):
+            decompress(b'\xff\xbf\x00')
+
+
+class TestCompressedStream(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.tmpdir, 'compressed.img')
+        cls.content = sample_content()
+        ntfs_image.build_file_image(cls.filename, cls.content, True)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def setUp(self):
+        self.volume = NtfsVolume()
+        self.volume.load(self.filename, ntfs_image.VOLUME_OFFSET)
+
+    def test_read_all(self):
+        with self.volume.open(ntfs_image.FILE_RECORD) as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_random_reads(self):
+        with self.volume.open(ntfs_image.FILE_RECORD, readahead=1) as f:
+            cache = f.raw.unit_cache
+            offset = 3 * COMPRESSION_UNIT + 100
+            f.seek(offset)
+            self.assertEqual(f.read(50), self.content[offset:offset + 50])
+            self.assertEqual(list(cache._items), [3])
+
+            # read across the sparse and uncompressed units
+            offset = 2 * COMPRESSION_UNIT - 10
+            f.seek(offset)
+            self.assertEqual(f.read(COMPRESSION_UNIT),
+                             self.content[offset:offset + COMPRESSION_UNIT])
+            self.assertEqual(sorted(cache._items), [1, 2, 3])
+
+            f.seek(offset)
+            f.read(20)
+            self.assertEqual(cache.misses, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+from rawdisk.plugins.filesystems.ntfs import mft_cache
+from rawdisk.plugins.filesystems.ntfs.mft_cache import MftCache, \
+    fingerprint
+from rawdisk.plugins.filesystems.ntfs.ntfs_volume import NtfsVolume
+from rawdisk.plugins.filesystems.ntfs.path_index import PathIndex
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+from rawdisk.plugins.filesystems.ntfs.tests.test_path_index import \
+    make_columns, DIRECTORY, FILE
+
+SERIAL = 0xF00DCAFE12345678
+IDENTITY = (SERIAL, 0x100000, 0x200000, 0xABCD)
+
+
+class TestMftCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache = MftCache(os.path.join(self.tmpdir, 'mft.db'))
+        self.columns = make_columns({
+            5: (5, '.', DIRECTORY),
+            16: (5, 'Windows', DIRECTORY),
+            17: (16, 'notepad.exe', FILE),
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_round_trip(self):
+        self.assertIsNone(self.cache.load(IDENTITY))
+
+        self.cache.save(IDENTITY, self.columns)
+        # new instance on an existing database
+        loaded = MftCache(self.cache.filename).load(IDENTITY)
+
+        self.assertEqual(loaded.records.tolist(),
+                         self.columns.records.tolist())
+        self.assertEqual(loaded.names, self.columns.names)
+        self.assertEqual(
+            PathIndex(loaded).resolve(17), '/Windows/notepad.exe')
+
+    def test_invalidation(self):
+        self.cache.save(IDENTITY, self.columns)
+
+        # another volume, another image, changed fingerprint, changed
+        # record layout
+        self.assertIsNone(self.cache.load((SERIAL + 1,) + IDENTITY[1:]))
+        self.assertIsNone(self.cache.load(
+            IDENTITY[:2] + (0x300000,) + IDENTITY[3:]))
+        self.assertIsNone(self.cache.load(IDENTITY[:3] + (0xABCE,)))
+
+        with mock.patch.object(mft_cache, 'RECORD_LAYOUT', '[]'):
+            self.assertIsNone(self.cache.load(IDENTITY))
+
+        # stale index is replaced
+        self.cache.save(IDENTITY[:3] + (0xABCE,), make_columns({}))
+        self.assertIsNone(self.cache.load(IDENTITY))
+        self.assertEqual(
+            len(self.cache.load(IDENTITY[:3] + (0xABCE,))), 32)
+
+
+class TestVolumeMftCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'volume.img')
+        self.image = ntfs_image.build_directory_image(self.filename)
+        self.cache_file = os.path.join(self.tmpdir, 'mft.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def load_volume(self):
+        volume = NtfsVolume()
+        volume.load(self.filename, ntfs_image.VOLUME_OFFSET)
+        volume.mft_cache_file = self.cache_file
+        return volume
+
+    def test_fingerprint(self):
+        volume = self.load_volume()
+
+        self.assertEqual(volume.fingerprint, fingerprint(volume.mft_table))
+        self.assertEqual(volume.identity[2],
+                         os.path.getsize(self.filename))
+        self.assertEqual(volume.identity[3], volume.fingerprint)
+        self.assertNotEqual(
+            fingerprint(volume.mft_table, 1), volume.fingerprint)
+
+    def test_reopen(self):
+        built = self.load_volume().mft_columns
+        volume = self.load_volume()
+
+        with mock.patch.object(mft_cache, 'read_columns') as read_columns:
+            columns = volume.mft_columns
+            path_index = volume.build_path_index()
+
+        read_columns.assert_not_called()
+        self.assertIs(volume.mft_columns, columns)
+        self.assertEqual(columns.records.tolist(), built.records.tolist())
+        self.assertEqual(path_index.resolve(26), '/Windows/System32/config')
+
+    def test_modified_volume(self):
+        self.load_volume().mft_columns
+
+        # record 3 ($Volume) is rewritten
+        self.image.write_record(3, ntfs_image.mft_record(
+            3, [ntfs_image.attribute(0x60, 'NEW'.encode('utf-16-le'))]))
+        self.image.save(self.filename)
+        volume = self.load_volume()
+
+        with mock.patch.object(mft_cache, 'read_columns',
+                               wraps=mft_cache.read_columns) as read_columns:
+            volume.mft_columns
+
+        read_columns.assert_called_once_with(volume.mft_table)
+        self.assertEqual(MftCache(self.cache_file).load(volume.identity)
+                         .records.tolist(),
+                         volume.mft_columns.records.tolist())
+
+    def test_modified_file_not_detected(self):
+        original = self.load_volume()
+        cached = original.mft_columns
+
+        # records past the fingerprinted system records are not covered,
+        # Kernel.txt is renamed in place
+        self.image.write_record(27, ntfs_image.mft_record(27, [
+            ntfs_image.attribute(0x30, ntfs_image.file_name(
+                ntfs_image.ROOT, 'Renamed.txt'))]))
+        self.image.save(self.filename)
+        volume = self.load_volume()
+
+        with mock.patch.object(mft_cache, 'read_columns') as read_columns:
+            columns = volume.mft_columns
+
+        read_columns.assert_not_called()
+        self.assertEqual(volume.fingerprint, original.fingerprint)
+        self.assertEqual(columns.name(27), cached.name(27))
+        self.assertEqual(
+            mft_cache.read_columns(volume.mft_table).name(27), 'Renamed.txt')
+
+    def test_resized_image(self):
+        self.load_volume().mft_columns
+
+        # same volume in a larger image
+        with open(self.filename, 'ab') as f:
+            f.write(bytes(0x1000))
+
+        volume = self.load_volume()
+
+        with mock.patch.object(mft_cache, 'read_columns',
+                               wraps=mft_cache.read_columns) as read_columns:
+            volume.mft_columns
+
+        read_columns.assert_called_once_with(volume.mft_table)
+
+
+if __name__ == "__main__":
+    unittest.main()
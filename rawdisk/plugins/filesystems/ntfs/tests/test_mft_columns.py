@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy
+from rawdisk.util.filetimes import filetime_to_dt
+from rawdisk.plugins.filesystems.ntfs.mft import MftTable
+from rawdisk.plugins.filesystems.ntfs.mft_attribute import \
+    MFT_ATTR_STANDARD_INFORMATION
+from rawdisk.plugins.filesystems.ntfs.mft_columns import read_columns, \
+    decode_columns
+from rawdisk.plugins.filesystems.ntfs.mft_scan import MftRecord
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+
+
+class TestMftColumns(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.tmpdir, 'fragmented.img')
+        ntfs_image.build_fragmented_image(cls.filename, records=40)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def setUp(self):
+        self.mft = MftTable(
+            mft_entry_size=ntfs_image.RECORD_SIZE,
+            offset=ntfs_image.VOLUME_OFFSET +
+            ntfs_image.MFT_LCN * ntfs_image.CLUSTER_SIZE,
+            filename=self.filename,
+            cluster_size=ntfs_image.CLUSTER_SIZE,
+            volume_offset=ntfs_image.VOLUME_OFFSET
+        )
+
+    def test_matches_entries(self):
+        columns = read_columns(self.mft, chunk_size=0x2000)
+        self.assertEqual(len(columns), 256)
+
+        for n, entry in enumerate(self.mft.iter_entries()):
+            record = MftRecord.from_entry(entry)
+            row = columns.records[n]
+
+            self.assertEqual(row['record'], n)
+            self.assertEqual(bool(row['valid']), n < 40)
+            self.assertEqual(row['flags'], record.flags)
+            self.assertEqual(row['seq_number'], record.seq_number)
+            self.assertEqual(row['base_record'], record.base_record)
+            self.assertEqual(row['size'], record.size)
+            self.assertEqual(columns.name(n), record.name)
+            self.assertEqual(row['parent_ref'], record.parent_ref or 0)
+
+            fn = [attr for attr in entry.attributes
+                  if attr.type_str == '$FILE_NAME']
+
+            if fn:
+                self.assertEqual(row['parent_seq'], fn[-1].parent_ref >> 48)
+                self.assertEqual(
+                    [row['fn_ctime'], row['fn_atime'], row['fn_mtime'],
+                     row['fn_rtime']],
+                    [fn[-1].ctime, fn[-1].atime, fn[-1].mtime, fn[-1].rtime])
+
+            si = entry.lookup_attribute(MFT_ATTR_STANDARD_INFORMATION)
+
+            if si is None:
+                self.assertEqual(row['ctime'], 0)
+            else:
+                self.assertEqual(
+                    [row['ctime'], row['atime'], row['mtime'], row['rtime']],
+                    [si.ctime, si.atime, si.mtime, si.rtime])
+                self.assertEqual(row['sec_id'], getattr(si, 'sec_id', 0))
+
+    def test_masks(self):
+        columns = read_columns(self.mft, 0, 16)
+        self.assertEqual(columns.in_use.sum(), 16)
+        self.assertEqual(list(columns.is_directory.nonzero()[0]), [5, 13])
+
+    def test_datetimes(self):
+        columns = read_columns(self.mft)
+        ctimes = columns.datetimes('ctime', 'us')
+        valid = columns.records['ctime'] != 0
+
+        self.assertTrue(valid.any())
+        self.assertTrue(numpy.isnat(ctimes[~valid]).all())
+        self.assertEqual(
+            ctimes[valid].tolist(),
+            [filetime_to_dt(int(ft))
+             for ft in columns.records['ctime'][valid]])
+
+    def test_decode_columns(self):
+        with open('sample_images/ntfs_mft_table.bin', 'rb') as f:
+            data = f.read()
+
+        columns = decode_columns(memoryview(data), first_index=8)
+        self.assertEqual(list(columns.records['record']), list(range(8, 16)))
+        self.assertEqual(columns.name(3), '$Volume')
+        self.assertEqual(columns.records['size'][0], 0x40000)
+
+        self.assertEqual(len(decode_columns(b'')), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
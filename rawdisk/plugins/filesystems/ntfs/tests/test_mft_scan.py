@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from rawdisk.util.reader import ImageReader
+from rawdisk.plugins.filesystems.ntfs.mft import MftTable
+from rawdisk.plugins.filesystems.ntfs.mft_scan import MftRecord, \
+    scan_records, build_index
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+
+
+class TestMftRecord(unittest.TestCase):
+    def test_from_entry(self):
+        mft = MftTable(filename='sample_images/ntfs_mft_table.bin')
+        record = MftRecord.from_entry(mft.get_entry(0))
+
+        self.assertEqual(record.index, 0)
+        self.assertEqual(record.seq_number, 1)
+        self.assertEqual(record.name, '$MFT')
+        self.assertEqual(record.parent_ref, 5)
+        self.assertEqual(record.size, 0x40000)
+        self.assertTrue(record.is_in_use)
+        self.assertFalse(record.is_directory)
+        self.assertEqual(pickle.loads(pickle.dumps(record)), record)
+
+
+class TestScanRecords(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.tmpdir, 'fragmented.img')
+        ntfs_image.build_fragmented_image(cls.filename, records=40)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def create_table(self, filename=None):
+        return MftTable(
+            mft_entry_size=ntfs_image.RECORD_SIZE,
+            offset=ntfs_image.VOLUME_OFFSET +
+            ntfs_image.MFT_LCN * ntfs_image.CLUSTER_SIZE,
+            filename=filename or self.filename,
+            cluster_size=ntfs_image.CLUSTER_SIZE,
+            volume_offset=ntfs_image.VOLUME_OFFSET
+        )
+
+    def test_single_process(self):
+        mft = self.create_table()
+        expected = [MftRecord.from_entry(e) for e in mft.iter_entries()]
+        records = list(scan_records(mft, workers=1))
+
+        self.assertEqual(len(records), 256)
+        self.assertEqual(records, expected)
+
+    def test_parallel(self):
+        mft = self.create_table()
+        expected = list(scan_records(mft, workers=1))
+        records = list(scan_records(mft, workers=2, slice_size=24))
+
+        self.assertEqual(records, expected)
+        self.assertEqual(records[35].name, '$Volume')
+        self.assertEqual(records[35].index, 35)
+
+    def test_parallel_range(self):
+        with ImageReader(self.filename) as reader:
+            mft = self.create_table(reader)
+            records = list(scan_records(mft, 10, 30, workers=3, slice_size=4))
+
+        self.assertEqual([r.index for r in records], list(range(10, 30)))
+
+    def test_build_index(self):
+        mft = self.create_table()
+        index = build_index(mft, workers=2, stop=40, slice_size=8)
+
+        self.assertEqual(sorted(index), list(range(40)))
+        self.assertEqual(index[0].name, '$MFT')
+        self.assertEqual(index[21].name, '.')
+
+
+if __name__ == "__main__":
+    unittest.main()
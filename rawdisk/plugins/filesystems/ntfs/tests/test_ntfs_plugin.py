@@ -1,10 +1,17 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import gc
 import unittest
+import tracemalloc
+import mock
+from rawdisk.util.reader import ImageReader
 from rawdisk.plugins.filesystems.ntfs.ntfs import Ntfs
 from rawdisk.plugins.filesystems.ntfs.bootsector import BootSector
 from rawdisk.plugins.filesystems.ntfs.mft import MftTable
+from rawdisk.plugins.filesystems.ntfs.mft_attribute import MftAttr
+from rawdisk.plugins.filesystems.ntfs.mft_entry import ENTRY_OVERHEAD, \
+    DECODED_ENTRY_OVERHEAD
 from rawdisk.plugins.filesystems.ntfs.ntfs_volume import NtfsVolume, \
     NUM_SYSTEM_ENTRIES
 
@@ -126,6 +133,58 @@ class TestMftTable(unittest.TestCase):
         self.assertTrue(mft.get_entry(2) is not None)
         self.assertEqual(len(mft._entries), 3)
 
+    def test_entry_count(self):
+        mft = MftTable(
+            filename='sample_images/ntfs_mft_table.bin',
+        )
+
+        # $MFT is 256 records long, but only 8 records are in the sample
+        self.assertEqual(mft.entry_count, 8)
+
+    def test_iter_entries(self):
+        mft = MftTable(
+            filename='sample_images/ntfs_mft_table.bin',
+        )
+
+        entries = list(mft.iter_entries())
+        self.assertEqual([e.index for e in entries], list(range(8)))
+        self.assertEqual(entries[0].fname_str, '$MFT')
+        self.assertEqual(entries[3].fname_str, '$Volume')
+        # scanned entries are not cached
+        self.assertEqual(len(mft._entries), 1)
+
+        for entry in entries:
+            expected = mft.get_entry(entry.index)
+            self.assertEqual(bytes(entry.data), bytes(expected.data))
+            self.assertEqual(entry.fname_str, expected.fname_str)
+
+    def test_iter_entries_chunked(self):
+        mft = MftTable(
+            filename='sample_images/ntfs_mft_table.bin',
+        )
+
+        with ImageReader(mft.filename) as reader:
+            mft.filename = reader
+
+            with mock.patch.object(
+                    reader, 'read', wraps=reader.read) as read:
+                entries = list(mft.iter_entries(1, 7, chunk_size=2048))
+
+        self.assertEqual([e.index for e in entries], list(range(1, 7)))
+        self.assertEqual(
+            [c[0] for c in read.call_args_list],
+            [(1024, 2048), (3072, 2048), (5120, 2048)])
+
+    def test_preload_entries(self):
+        mft = MftTable(
+            filename='sample_images/ntfs_mft_table.bin',
+        )
+        entry = mft.get_entry(0)
+
+        mft.preload_entries(4)
+        self.assertEqual(sorted(mft._entries), [0, 1, 2, 3])
+        self.assertTrue(mft.get_entry(0) is entry)
+
 
 class TestMftEntry(unittest.TestCase):
     def test_init(self):
@@ -146,7 +205,7 @@ class TestMftEntry(unittest.TestCase):
         self.assertEqual(header.used_size, 0x1A0)
         self.assertEqual(header.allocated_size, 0x400)
         self.assertEqual(header.base_file_record, 0x0)
-        self.assertEqual(header.next_attr_id, 0x0)
+        self.assertEqual(header.next_attr_id, 0x7)
         self.assertEqual(header.mft_record_number, 0x0)
 
         self.assertEqual(len(entry.attributes), 4)
@@ -156,3 +215,99 @@ class TestMftEntry(unittest.TestCase):
         self.assertTrue(entry.is_file)
         self.assertTrue(entry.is_in_use)
         self.assertTrue(entry.lookup_attribute(0x10) is not None)
+
+    def test_header_record_number(self):
+        mft = MftTable(
+            filename='sample_images/ntfs_mft_table.bin',
+        )
+
+        for n in range(4):
+            self.assertEqual(mft.get_entry(n).header.mft_record_number, n)
+
+    def test_lazy_attributes(self):
+        mft = MftTable(
+            filename='sample_images/ntfs_mft_table.bin',
+        )
+
+        with mock.patch.object(
+                MftAttr, 'factory', wraps=MftAttr.factory) as factory:
+            entry = mft.get_entry(5)
+            self.assertTrue(entry.is_directory)
+            self.assertTrue(entry.is_in_use)
+            self.assertEqual(factory.call_count, 0)
+
+            self.assertEqual(
+                [attr_type for attr_type, _, _ in entry.attribute_index],
+                [0x10, 0x30, 0x50, 0x90, 0xA0, 0xB0, 0x100])
+            self.assertEqual(factory.call_count, 0)
+
+            attr = entry.lookup_attribute(0x30)
+            self.assertEqual(attr.fname, '.')
+            self.assertEqual(factory.call_count, 1)
+
+            self.assertEqual(entry.fname_str, '.')
+            self.assertTrue(entry.attributes[1] is attr)
+            self.assertEqual(factory.call_count, 7)
+
+    def entry_footprint(self, keep, count=1000):
+        mft = MftTable(
+            filename='sample_images/ntfs_mft_table.bin',
+        )
+        entries = []
+        gc.collect()
+        tracemalloc.start()
+
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+
+            while len(entries) < count:
+                for entry in mft.iter_entries():
+                    entries.append(keep(entry))
+
+            return (tracemalloc.get_traced_memory()[0] - before) / count
+        finally:
+            tracemalloc.stop()
+
+    def test_footprint(self):
+        def decode(entry):
+            for attr in entry.attributes:
+                if attr is not None and attr.header.non_resident_flag:
+                    attr.data_runs
+
+            return entry
+
+        # a bare copy of the record buffer is the baseline
+        record = self.entry_footprint(lambda entry: bytes(entry.data))
+
+        self.assertLess(self.entry_footprint(lambda entry: entry) - record,
+                        ENTRY_OVERHEAD)
+        self.assertLess(self.entry_footprint(decode) - record,
+                        DECODED_ENTRY_OVERHEAD)
+
+    def test_slots(self):
+        mft = MftTable(
+            filename='sample_images/ntfs_mft_table.bin',
+        )
+        entry = mft.get_entry(0)
+
+        self.assertFalse(hasattr(entry, '__dict__'))
+
+        for attr in entry.attributes:
+            self.assertFalse(hasattr(attr, '__dict__'))
+            self.assertFalse(hasattr(attr.header, '__dict__'))
+            self.assertEqual(attr.header.data, None)
+
+        self.assertEqual(entry.attributes[0].header.size, 0x18)
+        self.assertEqual(entry.name_str, 'Master File Table')
+
+        # $STANDARD_INFORMATION and $FILE_NAME are fully decoded
+        for attr in entry.attributes[:2]:
+            self.assertIsNone(attr.data)
+            self.assertIsNone(attr.value)
+            self.assertEqual(attr.size, attr.header.length)
+
+        # $DATA runs are decoded lazily
+        data_attr = entry.lookup_attribute(0x80)
+        self.assertIsNotNone(data_attr.data)
+        self.assertTrue(data_attr.data_runs)
+        self.assertIsNone(data_attr.data)
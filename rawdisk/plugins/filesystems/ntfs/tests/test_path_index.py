@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy
+from rawdisk.plugins.filesystems.ntfs.mft_columns import MftColumns, \
+    RECORD_DTYPE
+from rawdisk.plugins.filesystems.ntfs.ntfs_volume import NtfsVolume
+from rawdisk.plugins.filesystems.ntfs.path_index import PathIndex, \
+    ORPHAN_DIR
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+
+FILE = 0x01
+DIRECTORY = 0x03
+
+
+def make_columns(entries, count=32):
+    """entries: {record: (parent, name, flags[, parent sequence number])},
+    sequence numbers of records are 0."""
+    records = numpy.zeros(count, dtype=RECORD_DTYPE)
+    names = b''
+
+    for record, item in sorted(entries.items()):
+        parent, name, flags = item[:3]
+        encoded = name.encode('utf-16-le')
+        records[record]['record'] = record
+        records[record]['valid'] = True
+        records[record]['flags'] = flags
+        records[record]['parent_ref'] = parent
+        records[record]['parent_seq'] = item[3] if len(item) > 3 else 0
+        records[record]['name_offset'] = len(names)
+        records[record]['name_length'] = len(name)
+        names += encoded
+
+    return MftColumns(records, names)
+
+
+class TestPathIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = PathIndex(make_columns({
+            5: (5, '.', DIRECTORY),
+            16: (5, 'Windows', DIRECTORY),
+            17: (16, 'System32', DIRECTORY),
+            18: (17, 'notepad.exe', FILE),
+            19: (16, 'win.ini', FILE),
+            # parent record is a file
+            20: (19, 'orphan.txt', FILE),
+            # parent record is not in use
+            21: (30, 'lost.txt', FILE),
+            # 22 <-> 23 loop
+            22: (23, 'a', DIRECTORY),
+            23: (22, 'b', DIRECTORY),
+            24: (22, 'c.txt', FILE),
+            # parent directory was deleted, record 16 was reused since
+            25: (16, 'stale.txt', FILE, 1),
+        }))
+
+    def test_resolve(self):
+        self.assertEqual(self.index.resolve(5), '/')
+        self.assertEqual(self.index.resolve(16), '/Windows')
+        self.assertEqual(
+            self.index.resolve(18), '/Windows/System32/notepad.exe')
+        self.assertEqual(self.index.resolve(17), '/Windows/System32')
+
+    def test_cache(self):
+        self.index.resolve(18)
+        # directories on the way are cached, files are not
+        self.assertTrue(16 in self.index.cache)
+        self.assertTrue(17 in self.index.cache)
+        self.assertFalse(18 in self.index.cache)
+
+        hits = self.index.cache.hits
+        self.assertEqual(self.index.resolve(19), '/Windows/win.ini')
+        self.assertEqual(self.index.cache.hits, hits + 1)
+
+    def test_bounded_cache(self):
+        index = PathIndex(self.index.columns, cache_size=1)
+        self.assertEqual(index.resolve(18), '/Windows/System32/notepad.exe')
+        self.assertEqual(len(index.cache), 1)
+        self.assertEqual(index.resolve(19), '/Windows/win.ini')
+
+    def test_orphans(self):
+        self.assertEqual(
+            self.index.resolve(20), ORPHAN_DIR + '/orphan.txt')
+        self.assertEqual(self.index.resolve(21), ORPHAN_DIR + '/lost.txt')
+        # resolved after the parent is cached
+        self.index.resolve(17)
+        self.assertEqual(self.index.resolve(25), ORPHAN_DIR + '/stale.txt')
+        self.assertEqual(self.index.orphans, {20, 21, 25})
+        self.assertFalse(self.index.is_valid_parent(16, 1))
+        self.assertTrue(self.index.is_valid_parent(16, 0))
+
+    def test_loops(self):
+        path = self.index.resolve(24)
+        self.assertTrue(path.startswith(ORPHAN_DIR + '/'))
+        self.assertTrue(path.endswith('/a/c.txt'))
+        self.assertEqual(self.index.loops, {22, 23})
+        self.assertFalse(22 in self.index.cache)
+        self.assertTrue(self.index.resolve(22).startswith(ORPHAN_DIR))
+
+    def test_iter_paths(self):
+        paths = dict(self.index.iter_paths())
+        self.assertEqual(len(paths), 11)
+        self.assertEqual(paths[19], '/Windows/win.ini')
+
+
+class TestVolumePathIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.tmpdir, 'fragmented.img')
+        ntfs_image.build_fragmented_image(cls.filename, records=24)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def test_build_path_index(self):
+        volume = NtfsVolume()
+        volume.load(self.filename, ntfs_image.VOLUME_OFFSET)
+        index = volume.build_path_index()
+
+        self.assertEqual(index.resolve(0), '/$MFT')
+        self.assertEqual(index.resolve(19), '/$Volume')
+        self.assertEqual(len(dict(index.iter_paths())), 24)
+
+
+if __name__ == "__main__":
+    unittest.main()
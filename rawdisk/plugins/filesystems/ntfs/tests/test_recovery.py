@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+from rawdisk.plugins.filesystems.ntfs.data_runs import DataRun
+from rawdisk.plugins.filesystems.ntfs.mft_entry import MftEntry
+from rawdisk.plugins.filesystems.ntfs.ntfs_volume import NtfsVolume
+from rawdisk.plugins.filesystems.ntfs.recovery import scan_deleted, \
+    deleted_entry, deleted_positions
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+from rawdisk.plugins.filesystems.ntfs.tests.test_bitmap import BITMAP_LCN
+
+CLUSTER_SIZE = ntfs_image.CLUSTER_SIZE
+RECORD_SIZE = ntfs_image.RECORD_SIZE
+
+# runs of the deleted file, first 2 clusters were reused since deletion
+GONE_RUNS = [(0x2F0, 4), (None, 2), (0x2F8, 2)]
+GONE_SIZE = 8 * CLUSTER_SIZE - 10
+SECRET_DATA = b'deleted resident content'
+
+
+def deleted(record):
+    """Clears in use flag of a record built by ntfs_image."""
+    record = bytearray(record)
+    record[0x16] &= ~0x01
+    return bytes(record)
+
+
+class TestRecovery(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.tmpdir, 'recovery.img')
+        image = ntfs_image.build_directory_image(cls.filename)
+        image.write_record(40, deleted(ntfs_image.file_record(
+            40, 24, 'gone.txt', [ntfs_image.non_resident_attribute(
+                0x80, GONE_RUNS, GONE_SIZE)])))
+        image.write_record(41, deleted(ntfs_image.file_record(
+            41, ntfs_image.ROOT, 'secret.txt',
+            [ntfs_image.attribute(0x80, SECRET_DATA)])))
+        # deleted directory without attributes
+        image.write_record(42, deleted(ntfs_image.mft_record(
+            42, [], directory=True)))
+        # not a record (signature overwritten)
+        image.write_record(43, b'BAAD' + deleted(ntfs_image.file_record(
+            43, ntfs_image.ROOT, 'x'))[4:])
+        # clusters 0 - 0x2F1 allocated
+        image.write_cluster(BITMAP_LCN, b'\xff' * 0x5E + b'\x03')
+        image.save(cls.filename)
+
+        cls.volume = NtfsVolume()
+        cls.volume.load(cls.filename, ntfs_image.VOLUME_OFFSET)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def test_scan(self):
+        entries = list(self.volume.scan_deleted())
+
+        self.assertEqual([entry.index for entry in entries], [40, 41, 42])
+
+        gone, secret, directory = entries
+        self.assertEqual(gone.name, 'gone.txt')
+        self.assertEqual(gone.parent_ref, 24)
+        self.assertEqual(gone.size, GONE_SIZE)
+        self.assertIsNone(gone.resident_data)
+        self.assertEqual(gone.data_runs, [
+            DataRun(0, 0x2F0, 4), DataRun(4, None, 2), DataRun(6, 0x2F8, 2)])
+        self.assertEqual(gone.clusters, 6)
+        self.assertEqual(gone.recoverable_clusters, 4)
+        self.assertAlmostEqual(gone.recoverable, 4 / 6)
+        # $FILE_NAME times are used without $STANDARD_INFORMATION
+        self.assertEqual((gone.ctime, gone.atime, gone.mtime, gone.rtime),
+                         (1, 2, 3, 4))
+
+        self.assertEqual(secret.resident_data, SECRET_DATA)
+        self.assertEqual(secret.size, len(SECRET_DATA))
+        self.assertEqual(secret.recoverable, 1.0)
+
+        self.assertTrue(directory.is_directory)
+        self.assertEqual(directory.name, '')
+        self.assertIsNone(directory.parent_ref)
+        self.assertIsNone(directory.ctime)
+
+    def test_without_bitmap(self):
+        entries = list(self.volume.scan_deleted(check_bitmap=False))
+
+        self.assertIsNone(entries[0].recoverable_clusters)
+        self.assertIsNone(entries[0].recoverable)
+        self.assertEqual(entries[1].recoverable, 1.0)
+
+    def test_chunks(self):
+        table = self.volume.mft_table
+        expected = list(scan_deleted(table))
+
+        # chunks of 3 records
+        self.assertEqual(
+            list(scan_deleted(table, chunk_size=3 * RECORD_SIZE)), expected)
+        self.assertEqual(
+            [entry.index for entry in scan_deleted(table, start=41, stop=43)],
+            [41, 42])
+
+    def test_positions_match_entries(self):
+        table = self.volume.mft_table
+
+        for first, data in table.iter_chunks():
+            expected = [
+                n for n in range(len(data) // RECORD_SIZE)
+                if bytes(data[n * RECORD_SIZE:n * RECORD_SIZE + 4]) ==
+                b'FILE' and not MftEntry(
+                    data=data, offset=n * RECORD_SIZE,
+                    length=RECORD_SIZE).is_in_use
+            ]
+            self.assertEqual(
+                deleted_positions(data, RECORD_SIZE).tolist(), expected)
+
+    def test_corrupted_runs(self):
+        record = bytearray(ntfs_image.file_record(
+            44, ntfs_image.ROOT, 'bad', [ntfs_image.non_resident_attribute(
+                0x80, [(0x2F0, 4)], CLUSTER_SIZE)]))
+        entry = MftEntry(data=deleted(record), index=44)
+        attr = entry.lookup_attribute(0x80)
+        # run header claims more bytes than the attribute holds
+        runs_offset = entry.attribute_index[1][1] + \
+            attr.header.data_run_offset
+        record[runs_offset] = 0x88
+        entry = MftEntry(data=deleted(record), index=44)
+
+        result = deleted_entry(entry, self.volume.bitmap)
+
+        self.assertEqual(result.data_runs, [])
+        self.assertEqual(result.recoverable_clusters, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import mock
+from rawdisk.plugins.filesystems.ntfs import secure
+from rawdisk.plugins.filesystems.ntfs.mft import ENTRY_SECURE
+from rawdisk.plugins.filesystems.ntfs.ntfs_volume import NtfsVolume
+from rawdisk.plugins.filesystems.ntfs.security_descriptor import Ace, \
+    parse_security_descriptor, parse_sid, SE_DACL_PRESENT, \
+    SE_SELF_RELATIVE, ACCESS_ALLOWED_ACE_TYPE, ACCESS_DENIED_ACE_TYPE, \
+    ACCESS_ALLOWED_OBJECT_ACE_TYPE
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+from rawdisk.plugins.filesystems.ntfs.tests.ntfs_image import attribute, \
+    non_resident_attribute, file_name, mft_record, index_entry, \
+    index_node, index_block, align8
+
+CLUSTER_SIZE = ntfs_image.CLUSTER_SIZE
+ROOT = ntfs_image.ROOT
+SII_LCN = 0x1C0
+SDS_LCN = 0x1D0
+
+ADMINISTRATORS = 'S-1-5-32-544'
+SYSTEM = 'S-1-5-18'
+USERS = 'S-1-5-32-545'
+FULL_CONTROL = 0x1F01FF
+READ_EXECUTE = 0x1200A9
+
+
+def sid(text):
+    parts = [int(part) for part in text.split('-')[1:]]
+    return struct.pack('<BB', parts[0], len(parts) - 2) + \
+        parts[1].to_bytes(6, 'big') + \
+        b''.join(struct.pack('<I', part) for part in parts[2:])
+
+
+def ace(ace_type, mask, trustee, flags=0):
+    body = struct.pack('<I', mask) + sid(trustee)
+    return struct.pack('<BBH', ace_type, flags, 4 + len(body)) + body
+
+
+def acl(aces):
+    data = b''.join(aces)
+    return struct.pack('<BBHHH', 2, 0, 8 + len(data), len(aces), 0) + data
+
+
+def descriptor(owner, group, dacl_aces=None):
+    """Returns self-relative descriptor, no DACL if dacl_aces is None."""
+    owner, group = sid(owner), sid(group)
+    dacl = b'' if dacl_aces is None else acl(dacl_aces)
+    control = SE_SELF_RELATIVE | (SE_DACL_PRESENT if dacl else 0)
+    owner_offset = 0x14
+    group_offset = owner_offset + len(owner)
+    dacl_offset = group_offset + len(group) if dacl else 0
+    return struct.pack('<BBHIIII', 1, 0, control, owner_offset,
+                       group_offset, 0, dacl_offset) + owner + group + dacl
+
+
+def standard_information(sec_id):
+    return attribute(0x10, struct.pack(
+        '<QQQQIIIIIIQQ', 1, 2, 3, 4, 0x20, 0, 0, 0, 0, sec_id, 0, 0))
+
+
+def sii_entry(sec_id, hash_value, offset, length, subnode=None):
+    entry_length = 0x28 + (8 if subnode is not None else 0)
+    data = bytearray(entry_length)
+    struct.pack_into('<HHIHHI', data, 0, 0x14, 0x14, 0, entry_length, 4,
+                     0x01 if subnode is not None else 0)
+    struct.pack_into('<IIIQI', data, 0x10, sec_id, hash_value, sec_id,
+                     offset, length)
+
+    if subnode is not None:
+        struct.pack_into('<Q', data, entry_length - 8, subnode)
+
+    return bytes(data)
+
+
+def sds_entries(descriptors):
+    """Returns $SDS data and (sec_id, hash, offset, length) of entries."""
+    data = b''
+    entries = []
+
+    for sec_id, value in descriptors:
+        header = struct.pack('<IIQI', sec_id * 7, sec_id, len(data),
+                             0x14 + len(value))
+        entries.append((sec_id, sec_id * 7, len(data), 0x14 + len(value)))
+        data += (header + value).ljust((0x14 + len(value) + 15) & ~15,
+                                       b'\x00')
+
+    return data, entries
+
+
+ADMIN_DESCRIPTOR = descriptor(ADMINISTRATORS, SYSTEM, [
+    ace(ACCESS_ALLOWED_ACE_TYPE, FULL_CONTROL, SYSTEM),
+    ace(ACCESS_DENIED_ACE_TYPE, 0x10000, USERS, flags=0x03),
+    ace(ACCESS_ALLOWED_ACE_TYPE, READ_EXECUTE, USERS),
+])
+NULL_DACL_DESCRIPTOR = descriptor(SYSTEM, SYSTEM)
+# 0x102 has the same descriptor as 0x100, 0x103 $SDS entry is corrupted
+SDS_DATA, SDS_ENTRIES = sds_entries([
+    (0x100, ADMIN_DESCRIPTOR),
+    (0x101, NULL_DACL_DESCRIPTOR),
+    (0x102, ADMIN_DESCRIPTOR),
+    (0x103, ADMIN_DESCRIPTOR),
+])
+
+
+def build_image(filename):
+    image = ntfs_image.build_directory_image(filename)
+    sii = [sii_entry(*entry) for entry in SDS_ENTRIES]
+
+    # two level $SII: root node entry 0x101, block 0 with smaller and
+    # block 1 with larger security ids
+    root = struct.pack('<IIIB3x', 0, 0x10, CLUSTER_SIZE, 1) + index_node(
+        [sii_entry(*SDS_ENTRIES[1], subnode=0), index_entry(0, subnode=1)],
+        0x01)
+    image.write_cluster(SII_LCN, index_block(0, [sii[0], index_entry(0)]))
+    image.write_cluster(SII_LCN + 1, index_block(
+        1, [sii[2], sii[3], index_entry(0)]))
+
+    sds = bytearray(SDS_DATA)
+    struct.pack_into('<I', sds, SDS_ENTRIES[3][2] + 4, 0x999)
+    image.write_cluster(SDS_LCN, bytes(sds))
+
+    image.write_record(ENTRY_SECURE, mft_record(ENTRY_SECURE, [
+        attribute(0x30, file_name(ROOT, '$Secure')),
+        non_resident_attribute(0x80, [(SDS_LCN, 1)], len(sds), '$SDS'),
+        attribute(0x90, root, '$SII'),
+        non_resident_attribute(0xA0, [(SII_LCN, 2)], 2 * CLUSTER_SIZE,
+                               '$SII'),
+        attribute(0xB0, b'\x03' + bytes(7), '$SII'),
+    ]))
+
+    files = [('admin.txt', 0x100), ('system.txt', 0x101),
+             ('same.txt', 0x102), ('corrupted.txt', 0x103),
+             ('unknown.txt', 0x104)]
+
+    for number, (name, sec_id) in enumerate(files, 40):
+        image.write_record(number, mft_record(number, [
+            standard_information(sec_id),
+            attribute(0x30, file_name(ROOT, name)),
+        ]))
+
+    # NTFS 1.x file with its own descriptor
+    image.write_record(48, mft_record(48, [
+        attribute(0x30, file_name(ROOT, 'old.txt')),
+        attribute(0x50, ADMIN_DESCRIPTOR.ljust(align8(
+            len(ADMIN_DESCRIPTOR)), b'\x00')),
+    ]))
+
+    image.save(filename)
+
+
+class TestSecurityDescriptor(unittest.TestCase):
+    def test_parse_sid(self):
+        self.assertEqual(parse_sid(sid(ADMINISTRATORS)), ADMINISTRATORS)
+        self.assertEqual(parse_sid(b'\x00' + sid(SYSTEM), 1), SYSTEM)
+
+        with self.assertRaises(ValueError):
+            parse_sid(sid(ADMINISTRATORS)[:-1])
+
+    def test_parse(self):
+        parsed = parse_security_descriptor(ADMIN_DESCRIPTOR)
+
+        self.assertEqual(parsed.owner, ADMINISTRATORS)
+        self.assertEqual(parsed.group, SYSTEM)
+        self.assertIsNone(parsed.sacl)
+        self.assertEqual(parsed.dacl, (
+            Ace(ACCESS_ALLOWED_ACE_TYPE, 0, FULL_CONTROL, SYSTEM),
+            Ace(ACCESS_DENIED_ACE_TYPE, 0x03, 0x10000, USERS),
+            Ace(ACCESS_ALLOWED_ACE_TYPE, 0, READ_EXECUTE, USERS),
+        ))
+        self.assertIsNone(parse_security_descriptor(
+            NULL_DACL_DESCRIPTOR).dacl)
+
+    def test_object_ace(self):
+        body = struct.pack('<II', 0x100, 0x01) + bytes(16) + sid(USERS)
+        value = descriptor(SYSTEM, SYSTEM, [struct.pack(
+            '<BBH', ACCESS_ALLOWED_OBJECT_ACE_TYPE, 0, 4 + len(body)) + body])
+
+        self.assertEqual(parse_security_descriptor(value).dacl, (
+            Ace(ACCESS_ALLOWED_OBJECT_ACE_TYPE, 0, 0x100, USERS),))
+
+    def test_corrupted(self):
+        with self.assertRaises(ValueError):
+            parse_security_descriptor(ADMIN_DESCRIPTOR[:0x10])
+
+        # DACL crosses descriptor end
+        with self.assertRaises(ValueError):
+            parse_security_descriptor(ADMIN_DESCRIPTOR[:-4])
+
+
+class TestSecureStore(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.tmpdir, 'secure.img')
+        build_image(cls.filename)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def setUp(self):
+        self.volume = NtfsVolume()
+        self.volume.load(self.filename, ntfs_image.VOLUME_OFFSET)
+
+    def test_index(self):
+        store = self.volume.secure
+
+        self.assertEqual(sorted(store.entries), [0x100, 0x101, 0x102, 0x103])
+        self.assertEqual(store.entries[0x102].offset, SDS_ENTRIES[2][2])
+        self.assertNotIn(0x104, store)
+
+    def test_descriptor(self):
+        store = self.volume.secure
+
+        self.assertEqual(store.descriptor(0x100).owner, ADMINISTRATORS)
+        self.assertIsNone(store.descriptor(0x101).dacl)
+        # shared with 0x100
+        self.assertIs(store.descriptor(0x102), store.descriptor(0x100))
+        self.assertIsNone(store.descriptor(0x103))
+        self.assertIsNone(store.descriptor(0x104))
+
+        with self.assertRaises(ValueError):
+            store.read(0x103)
+
+    def test_parsed_once(self):
+        store = self.volume.secure
+
+        with mock.patch.object(
+                secure, 'parse_security_descriptor',
+                wraps=secure.parse_security_descriptor) as parse:
+            for _ in range(3):
+                for sec_id in (0x100, 0x101, 0x102):
+                    store.descriptor(sec_id)
+
+        self.assertEqual(parse.call_count, 2)
+
+    def test_file_descriptor(self):
+        self.assertEqual(
+            self.volume.security_descriptor(40).owner, ADMINISTRATORS)
+        self.assertEqual(self.volume.security_descriptor(41).owner, SYSTEM)
+        self.assertIsNone(self.volume.security_descriptor(44))
+        # $SECURITY_DESCRIPTOR attribute
+        self.assertEqual(
+            self.volume.security_descriptor(48).dacl[0].sid, SYSTEM)
+
+        with self.assertRaises(IOError):
+            self.volume.security_descriptor('/missing.txt')
+
+    def test_permissions(self):
+        with mock.patch.object(
+                secure, 'parse_security_descriptor',
+                wraps=secure.parse_security_descriptor) as parse:
+            report = [item for item in self.volume.iter_permissions()
+                      if item.record >= 40]
+
+        self.assertEqual(
+            [(item.record, item.path, item.sec_id) for item in report], [
+                (40, '/admin.txt', 0x100),
+                (41, '/system.txt', 0x101),
+                (42, '/same.txt', 0x102),
+                (43, '/corrupted.txt', 0x103),
+                (44, '/unknown.txt', 0x104),
+            ])
+        self.assertEqual([item.descriptor is not None for item in report],
+                         [True, True, True, False, False])
+        self.assertEqual(parse.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+from rawdisk.plugins.filesystems.ntfs.ntfs_volume import NtfsVolume
+from rawdisk.plugins.filesystems.ntfs.streams import StreamInfo, \
+    iter_streams, entry_streams
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+from rawdisk.plugins.filesystems.ntfs.tests.ntfs_image import attribute, \
+    non_resident_attribute, attribute_list_entry, mft_record, file_name
+
+CLUSTER_SIZE = ntfs_image.CLUSTER_SIZE
+RECORD_SIZE = ntfs_image.RECORD_SIZE
+BIG_SIZE = 2 * CLUSTER_SIZE - 7
+
+STREAMS = [
+    StreamInfo(31, 'Zone.Identifier', 14, False),
+    StreamInfo(40, 'big', BIG_SIZE, True),
+    StreamInfo(40, 'tag', 3, False),
+    # held by extension record 44
+    StreamInfo(40, 'ext', 5, False),
+]
+
+
+def build_image(filename):
+    image = ntfs_image.build_directory_image(filename)
+    # /multi.txt: streams in the base record and in extension records
+    image.write_record(40, mft_record(40, [
+        attribute(0x30, file_name(ntfs_image.ROOT, 'multi.txt'),
+                  identifier=1),
+        attribute(0x80, b'content', identifier=2),
+        non_resident_attribute(0x80, [(0x1C0, 1)], BIG_SIZE, 'big',
+                               identifier=3),
+        attribute(0x80, b'tag', 'tag', identifier=4),
+        attribute(0x20, b''.join([
+            attribute_list_entry(0x30, 40, 1),
+            attribute_list_entry(0x80, 40, 2),
+            attribute_list_entry(0x80, 40, 3, name='big'),
+            attribute_list_entry(0x80, 45, 0, starting_vcn=1, name='big'),
+            attribute_list_entry(0x80, 44, 0, name='ext'),
+            attribute_list_entry(0x80, 40, 4, name='tag'),
+        ]), identifier=5),
+    ]))
+    image.write_record(44, mft_record(
+        44, [attribute(0x80, b'extra', 'ext')], base=40))
+    # second piece of 'big' is not a stream of its own
+    image.write_record(45, mft_record(45, [non_resident_attribute(
+        0x80, [(0x1D0, 1)], 0, 'big', lowest_vcn=1)], base=40))
+
+    # streams of deleted records are not listed
+    record = bytearray(ntfs_image.file_record(41, ntfs_image.ROOT, 'gone', [
+        attribute(0x80, b'gone', 'ads')]))
+    record[0x16] &= ~0x01
+    image.write_record(41, record)
+
+    image.save(filename)
+
+
+class TestStreams(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.tmpdir, 'streams.img')
+        build_image(cls.filename)
+
+        cls.volume = NtfsVolume()
+        cls.volume.load(cls.filename, ntfs_image.VOLUME_OFFSET)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def test_sweep(self):
+        self.assertEqual(list(self.volume.iter_streams()), STREAMS)
+
+    def test_chunks(self):
+        self.assertEqual(
+            list(iter_streams(self.volume.mft_table,
+                              chunk_size=3 * RECORD_SIZE)), STREAMS)
+        self.assertEqual(
+            list(iter_streams(self.volume.mft_table, 32, 44)), STREAMS[1:3])
+
+    def test_list_streams(self):
+        self.assertEqual(self.volume.list_streams(40), [
+            STREAMS[1], STREAMS[3], STREAMS[2]])
+        self.assertEqual(
+            self.volume.list_streams('/Windows/System32/config/SYSTEM'),
+            STREAMS[:1])
+        self.assertEqual(self.volume.list_streams('/Kernel.txt'), [])
+
+        with self.assertRaises(IOError):
+            self.volume.list_streams('/missing')
+
+    def test_sweep_matches_entries(self):
+        table = self.volume.mft_table
+        expected = [
+            stream for entry in table.iter_entries() if entry.is_in_use
+            for stream in entry_streams(entry)
+        ]
+
+        # same streams without resolving extension records
+        self.assertEqual(
+            list(iter_streams(table)),
+            [stream._replace(record=40) if stream.record == 44 else stream
+             for stream in expected])
+
+
+if __name__ == "__main__":
+    unittest.main()
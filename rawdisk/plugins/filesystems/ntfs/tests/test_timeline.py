@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+from rawdisk.plugins.filesystems.ntfs.ntfs_volume import NtfsVolume
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+from rawdisk.plugins.filesystems.ntfs.tests.ntfs_image import attribute, \
+    file_name, mft_record
+
+# 2009-07-25 23:00:00 + n seconds
+BASE_TIME = 128930364000000000
+SECOND = 10000000
+REPORT_DATA = b'quarterly numbers'
+
+
+def standard_information(ctime, atime, mtime, rtime):
+    return attribute(0x10, struct.pack(
+        '<QQQQIIII', ctime, atime, mtime, rtime, 0x20, 0, 0, 0))
+
+
+class TestTimeline(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.tmpdir, 'timeline.img')
+        image = ntfs_image.build_directory_image(cls.filename)
+        # /Windows/report.doc, access time (rtime) not set
+        image.write_record(40, mft_record(40, [
+            standard_information(
+                BASE_TIME, BASE_TIME + 2 * SECOND, BASE_TIME + 3 * SECOND, 0),
+            attribute(0x30, file_name(24, 'report.doc')),
+            attribute(0x80, REPORT_DATA),
+        ]))
+        # extension record of report.doc has no events of its own
+        image.write_record(41, mft_record(41, [
+            standard_information(BASE_TIME, 0, 0, 0)], base=40))
+        image.save(cls.filename)
+
+        cls.volume = NtfsVolume()
+        cls.volume.load(cls.filename, ntfs_image.VOLUME_OFFSET)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def test_events(self):
+        events = [event for event in self.volume.iter_timeline()
+                  if event.record in (40, 41)]
+
+        self.assertEqual(
+            [(event.event, event.source, event.time) for event in events], [
+                ('M', '$SI', '2009-07-25T23:00:02.000000Z'),
+                ('C', '$SI', '2009-07-25T23:00:03.000000Z'),
+                ('B', '$SI', '2009-07-25T23:00:00.000000Z'),
+                # ntfs_image $FILE_NAME times are 1 - 4
+                ('M', '$FN', '1601-01-01T00:00:00.000000Z'),
+                ('A', '$FN', '1601-01-01T00:00:00.000000Z'),
+                ('C', '$FN', '1601-01-01T00:00:00.000000Z'),
+                ('B', '$FN', '1601-01-01T00:00:00.000000Z'),
+            ])
+        self.assertEqual(
+            set((event.path, event.record, event.size) for event in events),
+            {('/Windows/report.doc', 40, len(REPORT_DATA))})
+
+    def test_record_order(self):
+        events = list(self.volume.iter_timeline())
+        records = [event.record for event in events]
+
+        self.assertEqual(records, sorted(records))
+        self.assertIn(
+            '/Windows/System32/config/SYSTEM',
+            set(event.path for event in events))
+
+    def test_blocks(self):
+        self.assertEqual(list(self.volume.iter_timeline(block_size=7)),
+                         list(self.volume.iter_timeline()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import mock
+from rawdisk.plugins.filesystems.ntfs import usn_journal
+from rawdisk.plugins.filesystems.ntfs.mft import ENTRY_EXTEND
+from rawdisk.plugins.filesystems.ntfs.ntfs_volume import NtfsVolume
+from rawdisk.plugins.filesystems.ntfs.path_index import ORPHAN_DIR
+from rawdisk.plugins.filesystems.ntfs.usn_journal import UsnJournal, \
+    parse_records, join_path, USN_PAGE_SIZE
+from rawdisk.plugins.filesystems.ntfs.tests import ntfs_image
+from rawdisk.plugins.filesystems.ntfs.tests.ntfs_image import attribute, \
+    non_resident_attribute, file_name, mft_record, index_entry, \
+    directory_record, align8
+
+CLUSTER_SIZE = ntfs_image.CLUSTER_SIZE
+ROOT = ntfs_image.ROOT
+JOURNAL_RECORD = 40
+JOURNAL_LCN = 0x1C0
+SPARSE_CLUSTERS = 4
+PAGES = 8
+RECORDS_PER_PAGE = 3
+START = SPARSE_CLUSTERS * CLUSTER_SIZE
+
+# 2009-07-25 23:00:00 + n seconds
+BASE_TIME = 128930364000000000
+SECOND = 10000000
+
+FILE_CREATE = 0x100
+CLOSE = 0x80000000
+
+
+def usn_record(usn, timestamp, record, parent, name, reason=FILE_CREATE,
+               version=2):
+    encoded_name = name.encode('utf-16-le')
+
+    if version == 2:
+        header = struct.pack(
+            '<IHHQQQQIIIIHH', 0, 2, 0, record | 1 << 48, parent | 1 << 48,
+            usn, timestamp, reason, 0, 0x100, 0x20, len(encoded_name), 0x3C)
+    else:
+        header = struct.pack(
+            '<IHHQ8xQ8xQQIIIIHH', 0, 3, 0, record | 1 << 48,
+            parent | 1 << 48, usn, timestamp, reason, 0, 0x100, 0x20,
+            len(encoded_name), 0x4C)
+
+    data = bytearray(align8(len(header) + len(encoded_name)))
+    data[:len(header)] = header
+    data[len(header):len(header) + len(encoded_name)] = encoded_name
+    struct.pack_into('<I', data, 0, len(data))
+    return bytes(data)
+
+
+def journal_pages():
+    """Returns $J data past the sparse region and (usn, time) of records.
+
+    Page n holds records 3n - 3n+2 of /fileN.txt, the last page holds a
+    single V3 record of /Windows/last.txt followed by a corrupted record.
+    """
+    data = bytearray()
+    records = []
+
+    for page in range(PAGES):
+        usn = START + page * USN_PAGE_SIZE
+        content = b''
+        count = 1 if page == PAGES - 1 else RECORDS_PER_PAGE
+
+        for position in range(count):
+            number = page * RECORDS_PER_PAGE + position
+            timestamp = BASE_TIME + number * SECOND
+
+            if page == PAGES - 1:
+                record = usn_record(usn, timestamp, 60, 24, 'last.txt',
+                                    FILE_CREATE | CLOSE, version=3)
+            else:
+                record = usn_record(usn, timestamp, 100 + number, ROOT,
+                                    'file{}.txt'.format(number))
+
+            records.append((usn, timestamp))
+            content += record
+            usn += len(record)
+
+        if page == PAGES - 1:
+            size = START + page * USN_PAGE_SIZE + len(content)
+            content += b'\x05\x00\x00\x00\x02\x00\x00\x00'
+
+        data += content.ljust(USN_PAGE_SIZE, b'\x00')
+
+    return bytes(data), records, size
+
+
+JOURNAL_DATA, RECORDS, JOURNAL_SIZE = journal_pages()
+
+
+def build_image(filename, journal=True):
+    image = ntfs_image.build_directory_image(filename)
+    entries = [index_entry(0)]
+
+    if journal:
+        entries.insert(0, index_entry(JOURNAL_RECORD, file_name(
+            ENTRY_EXTEND, '$UsnJrnl')))
+
+    image.write_record(ENTRY_EXTEND, directory_record(
+        ENTRY_EXTEND, ROOT, '$Extend', entries))
+
+    image.write_record(JOURNAL_RECORD, mft_record(JOURNAL_RECORD, [
+        attribute(0x30, file_name(ENTRY_EXTEND, '$UsnJrnl')),
+        attribute(0x80, bytes(0x20), '$Max'),
+        non_resident_attribute(
+            0x80, [(None, SPARSE_CLUSTERS), (JOURNAL_LCN, PAGES)],
+            JOURNAL_SIZE, '$J'),
+    ]))
+    image.write_cluster(JOURNAL_LCN, JOURNAL_DATA)
+    image.save(filename)
+
+
+class TestParseRecords(unittest.TestCase):
+    def test_parse(self):
+        records = parse_records(JOURNAL_DATA[:USN_PAGE_SIZE])
+
+        self.assertEqual([record.usn for record in records],
+                         [usn for usn, _ in RECORDS[:RECORDS_PER_PAGE]])
+        self.assertEqual(records[1].name, 'file1.txt')
+        self.assertEqual(records[1].record, 101)
+        self.assertEqual(records[1].parent_record, ROOT)
+        self.assertEqual(records[1].reasons, ['FILE_CREATE'])
+        self.assertIsNone(records[1].path)
+
+    def test_v3_and_corrupted(self):
+        records = parse_records(JOURNAL_DATA[-USN_PAGE_SIZE:])
+
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0].version, 3)
+        self.assertEqual(records[0].record, 60)
+        self.assertEqual(records[0].reasons, ['FILE_CREATE', 'CLOSE'])
+
+    def test_zero_fill(self):
+        self.assertEqual(parse_records(bytes(2 * USN_PAGE_SIZE)), [])
+
+
+class TestUsnJournal(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.tmpdir, 'usn_journal.img')
+        build_image(cls.filename)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def setUp(self):
+        self.volume = NtfsVolume()
+        self.volume.load(self.filename, ntfs_image.VOLUME_OFFSET)
+        self.journal = self.volume.usn_journal
+
+    def test_sparse_region(self):
+        self.assertEqual(self.journal.start, START)
+        self.assertEqual(self.journal.size, JOURNAL_SIZE)
+
+    def test_all_records(self):
+        records = list(self.volume.iter_usn_records())
+
+        self.assertEqual([(record.usn, record.timestamp)
+                          for record in records], RECORDS)
+        self.assertEqual(records[0].path, '/file0.txt')
+        self.assertEqual(records[-1].path, '/Windows/last.txt')
+
+    def test_since(self):
+        since = RECORDS[10][1]
+
+        # binary search over 8 pages reads at most 4 of them
+        with mock.patch.object(UsnJournal, '_page_time',
+                               wraps=self.journal._page_time) as lookups:
+            self.assertEqual(self.journal.find_time(since),
+                             START + 3 * USN_PAGE_SIZE)
+
+        self.assertLessEqual(lookups.call_count, 4)
+        self.assertEqual(
+            [record.usn for record in self.journal.iter_records(
+                since=since, until=RECORDS[15][1])],
+            [usn for usn, _ in RECORDS[10:16]])
+        self.assertEqual(
+            list(self.journal.iter_records(since=RECORDS[-1][1] + 1)), [])
+
+    def test_until(self):
+        until = RECORDS[4][1]
+
+        # record 5 is the first newer one, its page and one more are read
+        with mock.patch.object(usn_journal, 'parse_records',
+                               wraps=usn_journal.parse_records) as parse:
+            records = list(self.journal.iter_records(
+                until=until, chunk_size=USN_PAGE_SIZE))
+
+        self.assertEqual([record.usn for record in records],
+                         [usn for usn, _ in RECORDS[:5]])
+        self.assertEqual(parse.call_count, 3)
+
+    def test_usn_range(self):
+        start_usn, stop_usn = RECORDS[4][0], RECORDS[9][0]
+
+        self.assertEqual(
+            [record.usn for record in self.journal.iter_records(
+                start_usn, stop_usn, chunk_size=USN_PAGE_SIZE)],
+            [usn for usn, _ in RECORDS[4:9]])
+
+    def test_orphan_parent(self):
+        path_index = self.volume.build_path_index()
+        record = parse_records(usn_record(
+            START, BASE_TIME, 70, 0x10000, 'gone.txt'))[0]
+
+        self.assertEqual(join_path(path_index, record),
+                         ORPHAN_DIR + '/gone.txt')
+
+        # parent record was reused since the change
+        record = parse_records(usn_record(
+            START, BASE_TIME, 70, 24, 'reused.txt'))[0]
+        record = record._replace(parent_ref=24 | 2 << 48)
+
+        self.assertEqual(join_path(path_index, record),
+                         ORPHAN_DIR + '/reused.txt')
+        self.assertEqual(
+            join_path(path_index, record._replace(parent_ref=24 | 1 << 48)),
+            '/Windows/reused.txt')
+
+    def test_no_journal(self):
+        filename = os.path.join(self.tmpdir, 'no_journal.img')
+        build_image(filename, journal=False)
+        volume = NtfsVolume()
+        volume.load(filename, ntfs_image.VOLUME_OFFSET)
+
+        with self.assertRaises(ValueError):
+            volume.iter_usn_records()
+
+
+if __name__ == "__main__":
+    unittest.main()
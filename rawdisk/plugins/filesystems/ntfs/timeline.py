@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+
+"""MACB timeline of all MFT entries.
+
+Times of $STANDARD_INFORMATION and of the $FILE_NAME attribute the file
+name comes from are taken from a single columnar pass over the MFT
+(:class:`~.mft_columns.MftColumns`), paths from the parent reference
+path index (:class:`~.path_index.PathIndex`). Events are selected,
+ordered and converted to ISO 8601 strings for a block of records at a
+time with vectorized operations, only the rows themselves are built one
+by one, so the timeline of a volume streams in bounded memory.
+
+>>> from rawdisk.util.timeline import write_csv
+>>> with open('timeline.csv', 'w', newline='') as f:
+>>>     write_csv(volume.iter_timeline(), f)
+"""
+import numpy
+from rawdisk.util.filetimes import filetimes_to_datetime64
+from rawdisk.util.timeline import TimelineEvent
+
+# number of records converted at a time
+DEFAULT_BLOCK_SIZE = 65536
+
+SOURCE_SI = '$SI'
+SOURCE_FN = '$FN'
+
+# (source, MACB event, column) in output order, atime is the content
+# modification time and rtime the access time (see
+# :class:`~.mft_attribute.MftAttrStandardInformation`)
+EVENT_COLUMNS = tuple(
+    (source, event, prefix + column)
+    for source, prefix in ((SOURCE_SI, ''), (SOURCE_FN, 'fn_'))
+    for event, column in (
+        ('M', 'atime'), ('A', 'rtime'), ('C', 'mtime'), ('B', 'ctime'))
+)
+
+
+def iter_events(columns, path_index, block_size=DEFAULT_BLOCK_SIZE):
+    """Yields timeline events of all base records in record order.
+
+    Records without a 'FILE' signature and extension records are \
+    skipped, zero (not set) and out of range times are left out.
+
+    Args:
+        columns (MftColumns): :class:`~.mft_columns.MftColumns` of the \
+        whole MFT.
+        path_index (PathIndex): :class:`~.path_index.PathIndex` built \
+        from the same columns.
+        block_size (int): Number of records converted at a time.
+
+    Yields:
+        TimelineEvent: :class:`~rawdisk.util.timeline.TimelineEvent` \
+        tuples, events of a record in :data:`EVENT_COLUMNS` order.
+    """
+    records = columns.records
+
+    for start in range(0, len(records), block_size):
+        block = records[start:start + block_size]
+        valid = block['valid'] & (block['base_record'] == 0)
+        rows = []
+        kinds = []
+        times = []
+
+        for kind, (_, _, column) in enumerate(EVENT_COLUMNS):
+            values = block[column]
+            selected = numpy.flatnonzero(valid & (values != 0))
+            rows.append(selected)
+            kinds.append(numpy.full(len(selected), kind, dtype=numpy.int8))
+            times.append(values[selected])
+
+        rows = numpy.concatenate(rows)
+        kinds = numpy.concatenate(kinds)
+        # microseconds cover every FILETIME value
+        times = filetimes_to_datetime64(numpy.concatenate(times), 'us')
+
+        order = numpy.lexsort((kinds, rows))
+        order = order[~numpy.isnat(times[order])]
+        rows, kinds = rows[order], kinds[order]
+        stamps = numpy.datetime_as_string(times[order], timezone='UTC')
+        numbers = block['record'][rows].tolist()
+        sizes = block['size'][rows].tolist()
+
+        last = None
+        path = None
+
+        for number, kind, stamp, size in zip(
+                numbers, kinds.tolist(), stamps.tolist(), sizes):
+            if number != last:
+                path = path_index.resolve(number)
+                last = number
+
+            source, event, _ = EVENT_COLUMNS[kind]
+            yield TimelineEvent(stamp, path, number, event, source, size)
@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+
+
+"""$UsnJrnl:$J change journal reader.
+
+The change journal ($Extend/$UsnJrnl, $J stream) is an append-only log
+of file changes. The USN (update sequence number) of a record is its
+offset in $J, so records are ordered by USN and, as they are appended,
+by time. When the journal grows past its maximum size the oldest
+clusters are deallocated: $J starts with a sparse region that reads as
+zeros and can be many gigabytes large. Records never cross a page
+boundary, the rest of a page that can not hold the next record is zero
+filled.
+
+:class:`UsnJournal` starts reading at the first allocated cluster, found
+from the data runs without any I/O. A time range query first looks up
+the page to start at with a binary search over the first record of each
+page (:meth:`UsnJournal.find_time`), so a 'last 24 hours' query reads a
+few pages plus the tail of the journal. Pages are decoded in large
+sequential chunks.
+
+>>> since = dt_to_filetime(datetime.now(utc) - timedelta(hours=24))
+>>> for record in volume.iter_usn_records(since=since):
+>>>     print(record.timestamp_dt, record.reasons, record.path)
+
+See More:
+    https://docs.microsoft.com/en-us/windows/win32/api/winioctl/ns-winioctl-usn_record_v2
+"""
+import struct
+from collections import namedtuple
+from rawdisk.util.filetimes import filetime_to_dt
+from .data_stream import open_stream
+from .headers import USN_RECORD_V2_SCHEMA, USN_RECORD_V3_SCHEMA, \
+    FILE_REFERENCE_MASK
+from .mft import DEFAULT_CHUNK_SIZE
+from .mft_attribute import MFT_ATTR_DATA
+from .path_index import PATH_SEPARATOR, ORPHAN_DIR
+
+# journal file in $Extend and its record stream
+JOURNAL_NAME = '$UsnJrnl'
+STREAM_J = '$J'
+
+# records do not cross page boundaries
+USN_PAGE_SIZE = 0x1000
+
+# record length and major version
+_RECORD_PREFIX = struct.Struct('<IH')
+
+# major version -> (record schema, file name offset)
+USN_RECORD_SCHEMAS = {
+    2: (USN_RECORD_V2_SCHEMA, 0x3C),
+    3: (USN_RECORD_V3_SCHEMA, 0x4C),
+}
+
+# reason flags in output order
+USN_REASONS = (
+    (0x00000001, 'DATA_OVERWRITE'),
+    (0x00000002, 'DATA_EXTEND'),
+    (0x00000004, 'DATA_TRUNCATION'),
+    (0x00000010, 'NAMED_DATA_OVERWRITE'),
+    (0x00000020, 'NAMED_DATA_EXTEND'),
+    (0x00000040, 'NAMED_DATA_TRUNCATION'),
+    (0x00000100, 'FILE_CREATE'),
+    (0x00000200, 'FILE_DELETE'),
+    (0x00000400, 'EA_CHANGE'),
+    (0x00000800, 'SECURITY_CHANGE'),
+    (0x00001000, 'RENAME_OLD_NAME'),
+    (0x00002000, 'RENAME_NEW_NAME'),
+    (0x00004000, 'INDEXABLE_CHANGE'),
+    (0x00008000, 'BASIC_INFO_CHANGE'),
+    (0x00010000, 'HARD_LINK_CHANGE'),
+    (0x00020000, 'COMPRESSION_CHANGE'),
+    (0x00040000, 'ENCRYPTION_CHANGE'),
+    (0x00080000, 'OBJECT_ID_CHANGE'),
+    (0x00100000, 'REPARSE_POINT_CHANGE'),
+    (0x00200000, 'STREAM_CHANGE'),
+    (0x00400000, 'TRANSACTED_CHANGE'),
+    (0x00800000, 'INTEGRITY_CHANGE'),
+    (0x80000000, 'CLOSE'),
+)
+
+
+class UsnRecord(namedtuple('UsnRecord', [
+    'usn', 'timestamp', 'file_ref', 'parent_ref', 'reason', 'source_info',
+    'sec_id', 'file_attributes', 'name', 'version', 'path'
+])):
+    """Change journal record (USN_RECORD_V2 or USN_RECORD_V3).
+
+    Attributes:
+        usn (int): Update sequence number (offset of the record in $J).
+        timestamp (int): Time of the change in Microsoft FILETIME format.
+        file_ref (int): File reference of the changed file.
+        parent_ref (int): File reference of its parent directory.
+        reason (int): Reason flags (see :data:`USN_REASONS`).
+        source_info (int): Source flags.
+        sec_id (int): Security id of the file.
+        file_attributes (int): File attributes.
+        name (str): File name.
+        version (int): Record major version (2 or 3).
+        path (str): Full path of the file, parent path is taken from \
+        the current MFT (None if paths were not resolved).
+    """
+    __slots__ = ()
+
+    @property
+    def record(self):
+        return self.file_ref & FILE_REFERENCE_MASK
+
+    @property
+    def parent_record(self):
+        return self.parent_ref & FILE_REFERENCE_MASK
+
+    @property
+    def timestamp_dt(self):
+        """
+        Returns:
+            datetime: Time of the change in Python's datetime format.
+        """
+        return filetime_to_dt(self.timestamp)
+
+    @property
+    def reasons(self):
+        """
+        Returns:
+            list: Names of the reason flags (eg. ['FILE_CREATE', 'CLOSE']).
+        """
+        return [name for flag, name in USN_REASONS if self.reason & flag]
+
+
+def parse_records(data):
+    """Decodes journal records of whole pages. Empty (zero filled) rests \
+    of pages are skipped, so are rests of pages with a corrupted or \
+    unknown record.
+
+    Args:
+        data (bytes): Journal pages (bytes or memoryview), starting at a \
+        page boundary.
+
+    Returns:
+        list: :class:`UsnRecord` tuples (with path None) in journal order.
+    """
+    records = []
+    end = len(data)
+    position = 0
+
+    while position + _RECORD_PREFIX.size <= end:
+        page_end = min(
+            (position // USN_PAGE_SIZE + 1) * USN_PAGE_SIZE, end)
+        length, major_version = _RECORD_PREFIX.unpack_from(data, position)
+        schema, name_start = USN_RECORD_SCHEMAS.get(
+            major_version, (None, 0)) if length else (None, 0)
+
+        if schema is None or length < name_start or length % 8 or \
+                position + length > page_end:
+            # zero fill or corrupted record, continue with the next page
+            position = page_end
+            continue
+
+        _, version, _, file_ref, parent_ref, usn, timestamp, reason, \
+            source_info, sec_id, file_attributes, name_length, \
+            name_offset = schema.unpack_from(data, position)
+
+        if name_offset + name_length > length:
+            position = page_end
+            continue
+
+        name_offset += position
+        name = str(data[name_offset:name_offset + name_length],
+                   'utf-16-le', 'replace')
+        records.append(UsnRecord(
+            usn, timestamp, file_ref, parent_ref, reason, source_info,
+            sec_id, file_attributes, name, version, None))
+        position += length
+
+    return records
+
+
+def join_path(path_index, record):
+    """Returns full path of a journal record's file.
+
+    Args:
+        path_index (PathIndex): :class:`~.path_index.PathIndex` of the \
+        volume.
+        record (UsnRecord): Journal record.
+
+    Returns:
+        str: Parent directory path joined with the file name, files \
+        whose parent is not in the MFT anymore (the parent record is \
+        not an in use directory or was reused since) are placed in \
+        :data:`~.path_index.ORPHAN_DIR`.
+    """
+    parent = record.parent_record
+
+    if path_index.is_valid_parent(parent, record.parent_ref >> 48):
+        directory = path_index.resolve(parent)
+    else:
+        directory = ORPHAN_DIR
+
+    return directory.rstrip(PATH_SEPARATOR) + PATH_SEPARATOR + record.name
+
+
+class UsnJournal(object):
+    """$J stream of the change journal.
+
+    Args:
+        entry (MftEntry): $UsnJrnl :class:`~.mft_entry.MftEntry`.
+        source (str or ImageReader): Source to read from.
+        cluster_size (int): Volume cluster size in bytes.
+        volume_offset (int): Volume offset from disk start in bytes.
+
+    Attributes:
+        size (int): $J size in bytes (USN of the next record).
+        start (int): Offset of the first page that is not sparse (USN \
+        the oldest kept records start at).
+
+    Raises:
+        ValueError: If entry has no $J stream.
+    """
+    def __init__(self, entry, source, cluster_size, volume_offset=0):
+        attr = entry.lookup_attribute(MFT_ATTR_DATA, STREAM_J)
+
+        if attr is None:
+            raise ValueError('MFT entry {} has no {} stream'.format(
+                entry.index, STREAM_J))
+
+        self._entry = entry
+        self._source = source
+        self._cluster_size = cluster_size
+        self._volume_offset = volume_offset
+
+        if attr.header.non_resident_flag:
+            self.size = attr.header.real_size
+            allocated = [run.vcn for run in attr.data_runs
+                         if run.lcn is not None]
+            start = min(allocated) * cluster_size if allocated \
+                else self.size
+        else:
+            self.size = attr.header.attr_length
+            start = 0
+
+        self.start = min(start, self.size) // USN_PAGE_SIZE * USN_PAGE_SIZE
+
+    def open(self):
+        """Opens $J, stream buffer holds a single page, so page lookups \
+        do not read ahead.
+
+        Returns:
+            io.BufferedReader: Buffered :class:`~.data_stream.DataStream`.
+        """
+        return open_stream(self._entry, self._source, self._cluster_size,
+                           self._volume_offset, STREAM_J, USN_PAGE_SIZE)
+
+    def _page_time(self, stream, page):
+        """Returns time of the first record of a page (None if page \
+        holds no records)."""
+        stream.seek(page * USN_PAGE_SIZE)
+        records = parse_records(stream.read(USN_PAGE_SIZE))
+
+        return records[0].timestamp if records else None
+
+    def _find_time(self, stream, filetime):
+        low = self.start // USN_PAGE_SIZE
+        high = -(-self.size // USN_PAGE_SIZE)
+        first = low
+
+        # first page starting at or after filetime, empty pages are past
+        # the journal end
+        while low < high:
+            middle = (low + high) // 2
+            timestamp = self._page_time(stream, middle)
+
+            if timestamp is None or timestamp >= filetime:
+                high = middle
+            else:
+                low = middle + 1
+
+        # records of the previous page may be newer as well
+        return max(low - 1, first) * USN_PAGE_SIZE
+
+    def find_time(self, filetime):
+        """Finds where records of a time range start, reads one page per \
+        step of a binary search.
+
+        Args:
+            filetime (int): Time in Microsoft FILETIME format.
+
+        Returns:
+            int: Offset (USN) of the page to start reading at, records \
+            before it are older (assuming times increase with USN).
+        """
+        with self.open() as stream:
+            return self._find_time(stream, filetime)
+
+    def iter_records(self, start_usn=None, stop_usn=None, since=None,
+                     until=None, path_index=None,
+                     chunk_size=DEFAULT_CHUNK_SIZE):
+        """Streams journal records, the sparse region and records before \
+        start_usn and since are not read. Reading stops one page past the \
+        first record newer than until (assuming times increase with USN).
+
+        Args:
+            start_usn (int): Skip records with lower USN.
+            stop_usn (int): Stop at records with this or higher USN.
+            since (int): Skip records older than this time (FILETIME).
+            until (int): Skip records newer than this time (FILETIME).
+            path_index (PathIndex): Resolve record paths with this \
+            :class:`~.path_index.PathIndex` (see :func:`join_path`).
+            chunk_size (int): Maximum number of bytes per read.
+
+        Yields:
+            UsnRecord: :class:`UsnRecord` tuples in USN order.
+        """
+        chunk_size = max(chunk_size // USN_PAGE_SIZE, 1) * USN_PAGE_SIZE
+        begin = self.start
+        stop = self.size if stop_usn is None else min(stop_usn, self.size)
+
+        if start_usn is not None:
+            begin = max(begin, start_usn // USN_PAGE_SIZE * USN_PAGE_SIZE)
+
+        with self.open() as stream:
+            if since is not None:
+                begin = max(begin, self._find_time(stream, since))
+
+            # last page to read, records of the page following the first
+            # newer record may be older as well
+            last_page = None
+
+            for offset in range(begin, stop, chunk_size):
+                if last_page is not None and \
+                        offset // USN_PAGE_SIZE > last_page:
+                    return
+
+                stream.seek(offset)
+                data = stream.read(min(chunk_size, self.size - offset))
+
+                for record in parse_records(data):
+                    page = record.usn // USN_PAGE_SIZE
+
+                    if record.usn >= stop or \
+                            last_page is not None and page > last_page:
+                        return
+
+                    if until is not None and record.timestamp > until:
+                        if last_page is None:
+                            last_page = page + 1
+
+                        continue
+
+                    if start_usn is not None and record.usn < start_usn or \
+                            since is not None and record.timestamp < since:
+                        continue
+
+                    if path_index is not None:
+                        record = record._replace(
+                            path=join_path(path_index, record))
+
+                    yield record
@@ -13,6 +13,7 @@ import logging
 from enum import Enum
 from rawdisk.scheme import mbr
 from rawdisk.scheme import gpt
+from rawdisk.util.reader import open_image
 
 
 class PartitionScheme(Enum):
@@ -25,7 +26,8 @@ def detect_scheme(filename):
     """Detects partitioning scheme of the source
 
     Args:
-        filename (str): path to file or device for detection of \
+        filename (str or ImageReader): path to file or device (or an open \
+        :class:`~rawdisk.util.reader.ImageReader`) for detection of \
         partitioning scheme.
 
     Returns:
@@ -43,10 +45,9 @@ def detect_scheme(filename):
     logger = logging.getLogger(__name__)
     logger.info('Detecting partitioning scheme')
 
-    with open(filename, 'rb') as f:
+    with open_image(filename) as reader:
         # Look for MBR signature first
-        f.seek(mbr.MBR_SIG_OFFSET)
-        data = f.read(mbr.MBR_SIG_SIZE)
+        data = reader.read(mbr.MBR_SIG_OFFSET, mbr.MBR_SIG_SIZE)
         signature = struct.unpack("<H", data)[0]
 
         if signature != mbr.MBR_SIGNATURE:
@@ -55,8 +56,7 @@ def detect_scheme(filename):
             return PartitionScheme.SCHEME_UNKNOWN
         else:
             # Could be MBR or GPT, look for GPT header
-            f.seek(gpt.GPT_HEADER_OFFSET)
-            data = f.read(gpt.GPT_SIG_SIZE)
+            data = reader.read(gpt.GPT_HEADER_OFFSET, gpt.GPT_SIG_SIZE)
             signature = struct.unpack("<8s", data)[0]
 
             if signature != gpt.GPT_SIGNATURE:
@@ -5,6 +5,7 @@ import uuid
 import struct
 import logging
 from rawdisk.util.rawstruct import RawStruct
+from rawdisk.util.reader import open_image
 from .headers import GPT_HEADER, GPT_PARTITION_ENTRY
 from ctypes import c_ubyte
 
@@ -28,7 +29,7 @@ class GptPartitionEntry(RawStruct):
             self.get_ulonglong_le(0x20),                # first_lba
             self.get_ulonglong_le(0x28),                # last_lba
             self.get_ulonglong_le(0x30),                # attr_flags
-            self.get_chunk(0x38, 72).decode('utf-16'),  # name
+            self.get_unicode(0x38, 72),                 # name
         )
 
     @property
@@ -67,35 +68,37 @@ class Gpt(object):
         """Loads GPT partition table.
 
         Args:
-            filename (str): path to file or device to open for reading
+            filename (str or ImageReader): path to file or device to open \
+            for reading, or an open :class:`~rawdisk.util.reader.ImageReader`
             bs (uint): Block size of the volume, default: 512
 
         Raises:
             IOError: If file does not exist or not readable
         """
-        with open(filename, 'rb') as f:
-            f.seek(GPT_HEADER_OFFSET + 0x0C)
-            header_size = struct.unpack("<I", f.read(4))[0]
-            f.seek(GPT_HEADER_OFFSET)
+        with open_image(filename) as reader:
+            header_size = struct.unpack(
+                "<I", reader.read(GPT_HEADER_OFFSET + 0x0C, 4))[0]
 
-            header_data = f.read(header_size)
+            header_data = bytes(reader.read(GPT_HEADER_OFFSET, header_size))
             self.header = GPT_HEADER(header_data)
 
             if (self.header.signature != GPT_SIGNATURE):
                 raise Exception("Invalid GPT signature")
 
-            self.__load_partition_entries(f, bs)
+            self.__load_partition_entries(reader, bs)
 
-    def __load_partition_entries(self, fd, bs):
+    def __load_partition_entries(self, reader, bs):
         """Loads the list of :class:`GptPartition` partition entries
 
         Args:
+            reader (ImageReader): Reader to load partition entries from
             bs (uint): Block size of the volume
         """
 
-        fd.seek(self.header.part_lba * bs)
+        offset = self.header.part_lba * bs
         for p in range(0, self.header.num_partitions):
-            data = fd.read(self.header.part_size)
+            data = reader.read(offset, self.header.part_size)
+            offset += self.header.part_size
             entry = GptPartitionEntry(data)
             if entry.type_guid != uuid.UUID(
                 '{00000000-0000-0000-0000-000000000000}'
@@ -2,6 +2,7 @@
 from rawdisk.util.rawstruct import RawStruct
 from .headers import MBR_PARTITION_ENTRY
 from rawdisk.util.addressing import chs2lba
+from rawdisk.util.schema import StructSchema
 import logging
 
 
@@ -15,6 +16,20 @@ PARTITION_TABLE_OFFSET = 0x1BE
 PARTITION_TABLE_SIZE = PARTITION_ENTRY_SIZE * MBR_NUM_PARTS
 SECTOR_SIZE = 512
 
+# On-disk partition entry layout, CHS fields are split after decoding
+MBR_PARTITION_ENTRY_SCHEMA = StructSchema([
+    ('boot_indicator',      0, 'B'),
+    ('starting_head',       1, 'B'),
+    ('starting_sector',     2, 'B'),
+    ('starting_cylinder',   3, 'B'),
+    ('part_type',           4, 'B'),
+    ('ending_head',         5, 'B'),
+    ('ending_sector',       6, 'B'),
+    ('ending_cylinder',     7, 'B'),
+    ('relative_sector',     8, 'I'),
+    ('total_sectors',       12, 'I'),
+])
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,22 +37,21 @@ class MbrPartitionEntry(RawStruct):
     def __init__(self, data):
         RawStruct.__init__(self, data)
 
-        tmp = self.get_ubyte(2)
-        tmp2 = self.get_ubyte(6)
+        (boot_indicator, starting_head, tmp, starting_cylinder, part_type,
+         ending_head, tmp2, ending_cylinder, relative_sector,
+         total_sectors) = MBR_PARTITION_ENTRY_SCHEMA.unpack_from(self.data)
 
         self.fields = MBR_PARTITION_ENTRY(
-            self.get_ubyte(0),          # boot indicator
-            self.get_ubyte(1),          # starting_head
-            tmp & 0x3F,                 # starting_sector
-            ((tmp & 0xC0) << 2) +
-            self.get_ubyte(3),          # starting cylinder
-            self.get_ubyte(4),          # part_type
-            self.get_ubyte(5),          # ending_head
-            tmp2 & 0x3F,                # ending_sector
-            ((tmp2 & 0xC0) << 2) +
-            self.get_ubyte(7),      # ending cylinder
-            self.get_uint_le(8),        # relative sector
-            self.get_uint_le(12),       # total sectors
+            boot_indicator,
+            starting_head,
+            tmp & 0x3F,                             # starting_sector
+            ((tmp & 0xC0) << 2) + starting_cylinder,
+            part_type,
+            ending_head,
+            tmp2 & 0x3F,                            # ending_sector
+            ((tmp2 & 0xC0) << 2) + ending_cylinder,
+            relative_sector,
+            total_sectors,
         )
 
     @property
@@ -95,7 +109,8 @@ class Mbr(RawStruct):
     """Represents the Master Boot Record of the filesystem.
 
     Args:
-        filename (str): path to file or device to open for reading
+        filename (str or ImageReader): path to file or device to open for \
+        reading, or an open :class:`~rawdisk.util.reader.ImageReader`
 
     Attributes:
         partition_table (PartitionTable): Initialized \
@@ -7,6 +7,11 @@ from rawdisk.filesystems.unknown_volume import UnknownVolume
 from rawdisk.plugins.plugin_manager import PluginManager
 from rawdisk.scheme.mbr import SECTOR_SIZE
 from rawdisk.scheme.common import PartitionScheme
+from rawdisk.util.reader import ImageReader, MmapImageReader
+from rawdisk.util.cache import BlockCache
+
+# default block cache budget in bytes
+DEFAULT_CACHE_SIZE = 16 * 1024 * 1024
 
 
 class Session(object):
@@ -19,12 +24,30 @@ class Session(object):
         scheme (enum): One of \
         :attr:`SCHEME_MBR <rawdisk.scheme.common.SCHEME_MBR>` \
         or :attr:`SCHEME_GPT <rawdisk.scheme.common.SCHEME_GPT>`.
+        reader (ImageReader): :class:`~rawdisk.util.reader.ImageReader` \
+        shared by all structures and volumes loaded by this session.
+
+    Args:
+        load_plugins (bool): Load filesystem plugins on initialization.
+        use_mmap (bool): Map loaded image into memory \
+        (:class:`~rawdisk.util.reader.MmapImageReader`), structures are \
+        then windows over the mapping instead of copies.
+        cache_size (int): Byte budget of the block cache shared by all \
+        readers of this session, 0 disables caching. Not used with mmap.
+        mft_cache (str): SQLite database parsed MFT metadata of loaded \
+        NTFS volumes is stored in, volumes loaded again reuse it \
+        (:class:`~rawdisk.plugins.filesystems.ntfs.mft_cache.MftCache`).
     """
-    def __init__(self, load_plugins=True):
+    def __init__(self, load_plugins=True, use_mmap=False,
+                 cache_size=DEFAULT_CACHE_SIZE, mft_cache=None):
         self.logger = logging.getLogger(__name__)
         self.__volumes = []
         self.__partition_scheme = None
         self.__filename = None
+        self.__reader = None
+        self.__use_mmap = use_mmap
+        self.__cache = BlockCache(cache_size) if cache_size > 0 else None
+        self.__mft_cache = mft_cache
         self.__fs_plugins = []
 
         if load_plugins:
@@ -52,6 +75,28 @@ class Session(object):
     def filename(self):
         return self.__filename
 
+    @property
+    def reader(self):
+        return self.__reader
+
+    @property
+    def cache(self):
+        """Return :class:`~rawdisk.util.cache.BlockCache` shared by session \
+        readers (hits and misses counters show how much I/O was saved)"""
+        return self.__cache
+
+    @property
+    def mft_cache(self):
+        """Return path of the MFT index database (None if not used)"""
+        return self.__mft_cache
+
+    def close(self):
+        """Closes the reader opened by :meth:`load`. Loaded volumes can not
+        read any more data after this."""
+        if self.__reader is not None:
+            self.__reader.close()
+            self.__reader = None
+
     def __analyze_disk_image(self, filename, bs=512):
         pass
 
@@ -68,30 +113,42 @@ class Session(object):
         Raises:
             IOError - File/device does not exist or is not readable.
         """
+        self.close()
         self.__filename = filename
         self.__volumes = []
+        if self.__use_mmap:
+            self.__reader = MmapImageReader(filename)
+        else:
+            self.__reader = ImageReader(filename, cache=self.__cache)
+
+        reader = self.__reader
 
         # Detect partitioning scheme
-        self.__partition_scheme = rawdisk.scheme.common.detect_scheme(filename)
+        self.__partition_scheme = rawdisk.scheme.common.detect_scheme(reader)
 
         plugin_objects = [plugin.plugin_object for plugin in self.__fs_plugins]
         fs_detector = FilesystemDetector(fs_plugins=plugin_objects)
 
         if self.__partition_scheme == PartitionScheme.SCHEME_MBR:
-            self.__load_mbr_volumes(filename, fs_detector, bs)
+            self.__load_mbr_volumes(reader, fs_detector, bs)
         elif self.__partition_scheme == PartitionScheme.SCHEME_GPT:
-            self.__load_gpt_volumes(filename, fs_detector, bs)
+            self.__load_gpt_volumes(reader, fs_detector, bs)
         else:
             self.logger.warning('Partitioning scheme could not be determined.')
             # try detecting standalone volume
-            volume = fs_detector.detect_standalone(filename, offset=0)
+            volume = fs_detector.detect_standalone(reader, offset=0)
             if volume is not None:
-                volume.load(filename, offset=0)
+                volume.load(reader, offset=0)
                 self.__volumes.append(volume)
             else:
                 self.logger.warning(
                     'Were not able to detect standalone volume type')
 
+        # volumes that keep an MFT index (NTFS) share the session database
+        for volume in self.__volumes:
+            if hasattr(volume, 'mft_cache_file'):
+                volume.mft_cache_file = self.__mft_cache
+
     def __load_gpt_volumes(self, filename, fs_detector, bs=512):
         gpt = rawdisk.scheme.gpt.Gpt()
         gpt.load(filename)
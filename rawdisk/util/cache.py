@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+
+"""Bounded caches used to avoid repeated disk reads and decoding."""
+from collections import OrderedDict
+
+
+DEFAULT_BLOCK_SIZE = 4096
+
+
+class LruCache(object):
+    """Mapping with a bounded total weight, least recently used items are
+    evicted first.
+
+    Args:
+        capacity (int): Maximum total weight of cached values.
+        weigh (callable): Returns weight of a value, every value weighs 1 \
+        if not specified (capacity is then a maximum number of items).
+
+    Attributes:
+        hits (int): Number of lookups that found the key.
+        misses (int): Number of lookups that did not find the key.
+    """
+    def __init__(self, capacity, weigh=None):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._weigh = weigh
+        self._weight = 0
+        self._items = OrderedDict()
+
+    @property
+    def weight(self):
+        """
+        Returns:
+            int: Total weight of currently cached values.
+        """
+        return self._weight
+
+    def get(self, key, default=None):
+        """Returns cached value and marks it as most recently used.
+
+        Args:
+            key: Cache key.
+            default: Value to return if key is not cached.
+        """
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Caches the value, evicting least recently used values if \
+        capacity is exceeded. Values heavier than capacity are not cached.
+        """
+        weight = self.__weigh(value)
+
+        if key in self._items:
+            self._weight -= self.__weigh(self._items.pop(key))
+
+        if weight > self.capacity:
+            return
+
+        self._items[key] = value
+        self._weight += weight
+
+        while self._weight > self.capacity:
+            _, evicted = self._items.popitem(last=False)
+            self._weight -= self.__weigh(evicted)
+
+    def clear(self):
+        self._items.clear()
+        self._weight = 0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def __weigh(self, value):
+        return 1 if self._weigh is None else self._weigh(value)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+
+class BlockCache(LruCache):
+    """Block aligned read cache with a byte budget.
+
+    One instance is usually shared by all readers of a \
+    :class:`Session <rawdisk.session.Session>`, blocks are keyed by the \
+    source identity, so readers of the same image share cached blocks. \
+    Hit and miss counters are per block.
+
+    Args:
+        capacity (int): Maximum number of bytes to keep cached.
+        block_size (int): Cache block size in bytes (default: 4096).
+        max_read (int): Reads larger than this bypass the cache, so bulk \
+        scans do not evict metadata (default: 1/4 of capacity).
+    """
+    def __init__(self, capacity, block_size=DEFAULT_BLOCK_SIZE,
+                 max_read=None):
+        LruCache.__init__(self, capacity, weigh=len)
+        self.block_size = block_size
+
+        if max_read is None:
+            max_read = capacity // 4
+
+        self.max_read = max_read
+
+    def read(self, source_key, offset, length, source_size, fetch):
+        """Returns requested range, reading only blocks that are not cached.
+
+        Args:
+            source_key: Identity of the source (eg. device and inode).
+            offset (int): Offset from the beginning of the source in bytes.
+            length (int): Number of bytes to return.
+            source_size (int): Size of the source in bytes.
+            fetch (callable): fetch(offset, length) reads uncached data \
+            from the source, consecutive missing blocks are fetched \
+            with a single call.
+
+        Returns:
+            bytes: Requested data.
+        """
+        if length == 0:
+            return b''
+
+        if length > self.max_read:
+            return fetch(offset, length)
+
+        bs = self.block_size
+        first = offset // bs
+        last = (offset + length - 1) // bs
+        blocks = []
+        missing = []
+
+        for n in range(first, last + 1):
+            block = self.get((source_key, n))
+            blocks.append(block)
+
+            if block is None:
+                missing.append(n)
+
+        # fetch runs of consecutive missing blocks with a single read
+        start = 0
+        while start < len(missing):
+            end = start
+            while end + 1 < len(missing) and \
+                    missing[end + 1] == missing[end] + 1:
+                end += 1
+
+            run_offset = missing[start] * bs
+            run_length = min(
+                (missing[end] + 1) * bs, source_size) - run_offset
+            data = fetch(run_offset, run_length)
+
+            for i, n in enumerate(range(missing[start], missing[end] + 1)):
+                block = data[i * bs:(i + 1) * bs]
+                blocks[n - first] = block
+                self.put((source_key, n), block)
+
+            start = end + 1
+
+        data = b''.join(blocks) if len(blocks) > 1 else blocks[0]
+        start = offset - first * bs
+
+        return data[start:start + length]
@@ -29,6 +29,9 @@
 
 Source: http://reliablybroken.com\
 /b/2011/09/free-software-ftw-updated-filetimes-py/
+
+:func:`filetimes_to_datetime64` and :func:`filetimes_to_epoch` convert
+whole arrays of FILETIME numbers (eg. MFT columns) in one vectorized step.
 """
 from datetime import datetime, timedelta, tzinfo
 from calendar import timegm
@@ -40,6 +43,14 @@ EPOCH_AS_FILETIME = 116444736000000000  # January 1, 1970 as MS file time
 HUNDREDS_OF_NANOSECONDS = 10000000
 
 
+# (multiplier, divisor) from FILETIME ticks to datetime64 units
+DATETIME64_UNITS = {
+    'ns': (100, 1),
+    'us': (1, 10),
+    'ms': (1, 10000),
+    's': (1, HUNDREDS_OF_NANOSECONDS),
+}
+
 ZERO = timedelta(0)
 HOUR = timedelta(hours=1)
 
@@ -101,3 +112,81 @@ def filetime_to_dt(ft):
     # Add remainder in as microseconds. Python 3.2 requires an integer
     dt = dt.replace(microsecond=(ns100 // 10))
     return dt
+
+
+def _filetime_ticks(filetimes):
+    """Returns signed ticks since Unix epoch and mask of valid values \
+    (not zero, not past the signed 64 bit range)."""
+    import numpy
+
+    filetimes = numpy.asarray(filetimes, dtype=numpy.uint64)
+    valid = (filetimes != 0) & \
+        (filetimes <= numpy.uint64(numpy.iinfo(numpy.int64).max))
+    ticks = numpy.where(valid, filetimes, EPOCH_AS_FILETIME).view(
+        numpy.int64) - EPOCH_AS_FILETIME
+
+    return ticks, valid
+
+
+def filetimes_to_datetime64(filetimes, unit='ns'):
+    """Converts FILETIME numbers to NumPy datetime64 values at once.
+
+    Zero (time not set) and values that do not fit into the datetime64 \
+    unit are NaT, nothing is raised.
+
+    >>> filetimes_to_datetime64([116444736000000000, 0], 's')
+    array(['1970-01-01T00:00:00', 'NaT'], dtype='datetime64[s]')
+
+    Args:
+        filetimes (numpy.ndarray): FILETIME numbers (array or sequence \
+        of unsigned 64 bit integers).
+        unit (str): datetime64 unit, one of :data:`DATETIME64_UNITS` \
+        (datetime64[ns] covers years 1678 - 2261, 'us' all FILETIME \
+        values).
+
+    Returns:
+        numpy.ndarray: datetime64[unit] array of the same shape.
+
+    Raises:
+        ValueError: If unit is not supported.
+    """
+    import numpy
+
+    if unit not in DATETIME64_UNITS:
+        raise ValueError('Unsupported datetime64 unit {!r}'.format(unit))
+
+    multiplier, divisor = DATETIME64_UNITS[unit]
+    ticks, valid = _filetime_ticks(filetimes)
+
+    if multiplier > 1:
+        limit = numpy.iinfo(numpy.int64).max // multiplier
+        valid &= numpy.abs(ticks) <= limit
+        ticks = numpy.where(valid, ticks, 0) * multiplier
+    else:
+        ticks = ticks // divisor
+
+    # minimum int64 value is NaT
+    ticks = numpy.where(valid, ticks, numpy.iinfo(numpy.int64).min)
+
+    return ticks.astype('datetime64[{}]'.format(unit))
+
+
+def filetimes_to_epoch(filetimes):
+    """Converts FILETIME numbers to Unix timestamps at once.
+
+    >>> filetimes_to_epoch([128930364000000000, 0])
+    array([1.2485628e+09,           nan])
+
+    Args:
+        filetimes (numpy.ndarray): FILETIME numbers.
+
+    Returns:
+        numpy.ndarray: float64 seconds since 1970-01-01 UTC, NaN for zero \
+        and out of range values.
+    """
+    import numpy
+
+    ticks, valid = _filetime_ticks(filetimes)
+
+    return numpy.where(
+        valid, ticks / float(HUNDREDS_OF_NANOSECONDS), numpy.nan)
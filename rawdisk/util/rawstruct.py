@@ -4,17 +4,26 @@ import struct
 import hexdump
 import uuid
 import os
+from rawdisk.util.reader import ImageReader
 
 
 class RawStruct(object):
     """Helper class used as a parent class for most filesystem structures.
 
+    When initialized with a :class:`memoryview` (eg. from \
+    :class:`~rawdisk.util.reader.MmapImageReader`), structure is a window \
+    over the parent buffer: getters unpack values in place and \
+    :meth:`get_chunk` returns views instead of copies, so nested structures \
+    share the same memory.
+
     Args:
-        data (bytes): Byte array to initialize structure with.
-        filename (str): A file to read the data from.
+        data (bytes or memoryview): Byte array to initialize structure with.
+        filename (str or ImageReader): A file to read the data from, or \
+        an open :class:`~rawdisk.util.reader.ImageReader`.
         offset (int): Offset into data or file (if specified).
         length (int): Number of bytes to read.
     """
+    __slots__ = ('_data',)
 
     def __init__(self, data=None, offset=None, length=None, filename=None):
         if offset is None:
@@ -25,6 +34,8 @@ class RawStruct(object):
                 self._data = data[offset:]
             else:
                 self._data = data[offset:offset + length]
+        elif isinstance(filename, ImageReader):
+            self._data = filename.read(offset, length)
         elif filename is not None:
             self.__validate_offset(filename=filename, offset=offset,
                                    length=length)
@@ -51,7 +62,8 @@ class RawStruct(object):
     def data(self):
         """
         Returns:
-            bytes: Byte array of the structure.
+            bytes: Byte array of the structure (memoryview if structure \
+            was initialized with one).
         """
         return self._data
 
@@ -69,7 +81,8 @@ class RawStruct(object):
             offset (int): byte array start [x:]
             length (int): number of bytes to return [:x]
         Returns:
-            bytes: Custom length byte array of the structure.
+            bytes: Custom length byte array of the structure \
+            (memoryview if structure was initialized with one).
         """
         return self.data[offset:offset + length]
 
@@ -100,7 +113,7 @@ class RawStruct(object):
         See Also:
             https://docs.python.org/2/library/struct.html#format-characters
         """
-        return struct.unpack(format, self.data[offset:offset + length])[0]
+        return struct.unpack_from(format, self._data, offset)[0]
 
     def get_ubyte(self, offset):
         """Returns unsigned char (1 byte)
@@ -108,7 +121,7 @@ class RawStruct(object):
         Args:
             offset (uchar): unsigned char offset in byte array
         """
-        return struct.unpack("B", self.data[offset:offset + 1])[0]
+        return struct.unpack_from("B", self._data, offset)[0]
 
     def get_byte(self, offset):
         """Returns char (1 byte)
@@ -116,7 +129,7 @@ class RawStruct(object):
         Args:
             offset (char): signed char offset in byte array
         """
-        return struct.unpack("b", self.data[offset:offset + 1])[0]
+        return struct.unpack_from("b", self._data, offset)[0]
 
     def get_ushort_le(self, offset):
         """Returns unsigned short (2 bytes),
@@ -125,7 +138,7 @@ class RawStruct(object):
         Args:
             offset (int): unsigned short offset in byte array.
         """
-        return struct.unpack("<H", self.data[offset:offset + 2])[0]
+        return struct.unpack_from("<H", self._data, offset)[0]
 
     def get_ushort_be(self, offset):
         """Returns unsigned short (2 bytes),
@@ -134,7 +147,7 @@ class RawStruct(object):
         Args:
             offset (int): unsigned short offset in byte array.
         """
-        return struct.unpack(">H", self.data[offset:offset + 2])[0]
+        return struct.unpack_from(">H", self._data, offset)[0]
 
     def get_uint_le(self, offset):
         """Returns unsigned int (4 bytes)
@@ -142,7 +155,7 @@ class RawStruct(object):
         Args:
             offset (int): unsigned int offset in little-endian byte array
         """
-        return struct.unpack("<I", self.data[offset:offset + 4])[0]
+        return struct.unpack_from("<I", self._data, offset)[0]
 
     def get_uint_be(self, offset):
         """Returns unsigned int (4 bytes)
@@ -150,7 +163,7 @@ class RawStruct(object):
         Args:
             offset (int): unsigned int offset in big-endian byte array
         """
-        return struct.unpack(">I", self.data[offset:offset + 4])[0]
+        return struct.unpack_from(">I", self._data, offset)[0]
 
     def get_int_le(self, offset):
         """Returns int (4 bytes)
@@ -158,7 +171,7 @@ class RawStruct(object):
         Args:
             offset (int): int offset in little-endian byte array
         """
-        return struct.unpack("<I", self.data[offset:offset + 4])[0]
+        return struct.unpack_from("<I", self._data, offset)[0]
 
     def get_ulong_le(self, offset):
         """Returns unsigned long (4 bytes)
@@ -166,7 +179,7 @@ class RawStruct(object):
         Args:
             offset (int): unsigned long offset in little-endian byte array
         """
-        return struct.unpack("<L", self.data[offset:offset + 4])[0]
+        return struct.unpack_from("<L", self._data, offset)[0]
 
     def get_ulong_be(self, offset):
         """Returns unsigned long (4 bytes)
@@ -174,7 +187,7 @@ class RawStruct(object):
         Args:
             offset (int): unsigned long offset in big-endian byte array
         """
-        return struct.unpack(">L", self.data[offset:offset + 4])[0]
+        return struct.unpack_from(">L", self._data, offset)[0]
 
     def get_ulonglong_le(self, offset):
         """Returns unsigned long long (8 bytes)
@@ -182,7 +195,7 @@ class RawStruct(object):
         Args:
             offset (int): unsigned long long offset in little-endian byte array
         """
-        return struct.unpack("<Q", self.data[offset:offset + 8])[0]
+        return struct.unpack_from("<Q", self._data, offset)[0]
 
     def get_ulonglong_be(self, offset):
         """Returns unsigned long long (8 bytes)
@@ -190,7 +203,7 @@ class RawStruct(object):
         Args:
             offset (int): unsigned long long offset in big-endian byte array
         """
-        return struct.unpack(">Q", self.data[offset:offset + 8])[0]
+        return struct.unpack_from(">Q", self._data, offset)[0]
 
     def get_string(self, offset, length):
         """Returns string (length bytes)
@@ -199,9 +212,18 @@ class RawStruct(object):
             offset (int): sring offset in byte array
             length (int): string length
         """
-        return struct.unpack(str(length) + "s", self.data[
-                                                offset:offset + length
-                                                ])[0]
+        return struct.unpack_from(
+            str(length) + "s", self._data, offset)[0]
+
+    def get_unicode(self, offset, length, encoding='utf-16'):
+        """Returns decoded string (length bytes)
+
+        Args:
+            offset (int): string offset in byte array
+            length (int): string length in bytes
+            encoding (str): string encoding (default: utf-16)
+        """
+        return str(self._data[offset:offset + length], encoding)
 
     def export(self, filename, offset=0, length=None):
         """Exports byte array to specified destination
@@ -236,4 +258,4 @@ class RawStruct(object):
         See More:
             https://bitbucket.org/techtonik/hexdump/
         """
-        hexdump.hexdump(self._data)
+        hexdump.hexdump(bytes(self._data))
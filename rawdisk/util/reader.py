@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+
+
+"""Shared read access to disk images and block devices.
+
+:class:`ImageReader` keeps a single descriptor open and serves positional
+reads, so structures that are loaded one after another (MBR, GPT, boot
+sectors, MFT entries, plugin probes) do not have to open and stat the
+source over and over again.
+"""
+import os
+import mmap
+from contextlib import contextmanager
+
+
+if hasattr(os, 'pread'):
+    def _pread(fd, length, offset):
+        return os.pread(fd, length, offset)
+else:
+    def _pread(fd, length, offset):
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.read(fd, length)
+
+if hasattr(os, 'preadv'):
+    def _preadinto(fd, view, offset):
+        return os.preadv(fd, [view], offset)
+else:
+    def _preadinto(fd, view, offset):
+        data = _pread(fd, len(view), offset)
+        view[:len(data)] = data
+        return len(data)
+
+
+class ImageReader(object):
+    """Read-only access to a file or device through one open descriptor.
+
+    Instances can be passed anywhere a filename is accepted
+    (eg. :class:`RawStruct <rawdisk.util.rawstruct.RawStruct>`,
+    :class:`Mbr <rawdisk.scheme.mbr.Mbr>`, filesystem plugins).
+
+    Args:
+        filename (str): Path to file or device to open for reading.
+        cache (BlockCache): Optional :class:`~rawdisk.util.cache.BlockCache` \
+        to serve repeated reads from, can be shared between readers.
+
+    Raises:
+        IOError: If file/device does not exist or is not readable.
+
+    >>> with ImageReader('sample_images/ntfs_mbr.vhd') as reader:
+    >>>     mbr = Mbr(filename=reader)
+    """
+    def __init__(self, filename, cache=None):
+        self._filename = filename
+        self._cache = cache
+        self._fd = os.open(filename, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+
+        try:
+            # st_size is 0 for block devices, seeking to the end works for
+            # both regular files and devices
+            self._size = os.lseek(self._fd, 0, os.SEEK_END)
+            stat = os.fstat(self._fd)
+            self._cache_key = (stat.st_dev, stat.st_ino, self._size)
+        except OSError:
+            os.close(self._fd)
+            raise
+
+    @property
+    def filename(self):
+        """
+        Returns:
+            str: Path to file or device this reader was opened with.
+        """
+        return self._filename
+
+    @property
+    def size(self):
+        """
+        Returns:
+            int: Size of the file or device in bytes.
+        """
+        return self._size
+
+    @property
+    def closed(self):
+        return self._fd is None
+
+    @property
+    def cache(self):
+        """
+        Returns:
+            BlockCache: Cache used by this reader or None.
+        """
+        return self._cache
+
+    def read(self, offset, length=None, cached=True):
+        """Reads bytes at the specified position, file position is not used.
+
+        Args:
+            offset (int): Offset from the beginning of the source in bytes.
+            length (int): Number of bytes to read (default: until the end).
+            cached (bool): Serve the read through the block cache \
+            (if reader has one). Bulk sequential reads should pass False.
+
+        Returns:
+            bytes: Data read from the source.
+
+        Raises:
+            IOError: If requested range is beyond the end of the source.
+        """
+        if length is None:
+            length = max(self._size - offset, 0)
+
+        self._validate_range(offset, length)
+
+        if cached and self._cache is not None:
+            return self._cache.read(
+                self._cache_key, offset, length, self._size, self._read)
+
+        return self._read(offset, length)
+
+    def readinto(self, offset, buffer):
+        """Reads len(buffer) bytes at the specified position directly into \
+        buffer, block cache is not used.
+
+        Args:
+            offset (int): Offset from the beginning of the source in bytes.
+            buffer (bytearray): Writable buffer (or memoryview) to fill.
+
+        Returns:
+            int: Number of bytes read.
+
+        Raises:
+            IOError: If requested range is beyond the end of the source.
+        """
+        view = memoryview(buffer).cast('B')
+        length = len(view)
+        self._validate_range(offset, length)
+        received = 0
+
+        while received < length:
+            count = _preadinto(self._fd, view[received:], offset + received)
+
+            if not count:
+                raise IOError('Unexpected end of file at offset {}'.format(
+                    offset + received))
+
+            received += count
+
+        return length
+
+    def _validate_range(self, offset, length):
+        if self._fd is None:
+            raise ValueError('I/O operation on closed reader.')
+
+        expected = offset + length
+
+        if offset < 0 or expected > self._size:
+            raise IOError(
+                '{} offset is beyond current file size: {}'.format(
+                    expected, self._size))
+
+    def _read(self, offset, length):
+        data = _pread(self._fd, length, offset)
+
+        # pread may return less than requested, keep reading until done
+        if len(data) < length:
+            chunks = [data]
+            received = len(data)
+
+            while received < length:
+                chunk = _pread(self._fd, length - received, offset + received)
+
+                if not chunk:
+                    raise IOError(
+                        'Unexpected end of file at offset {}'.format(
+                            offset + received))
+
+                chunks.append(chunk)
+                received += len(chunk)
+
+            data = b''.join(chunks)
+
+        return data
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self._filename)
+
+
+class MmapImageReader(ImageReader):
+    """:class:`ImageReader` that maps the whole source into memory.
+
+    :meth:`read` returns :class:`memoryview` windows over the mapping \
+    instead of copies, structures initialized with them unpack fields in \
+    place and share the mapped buffer with their sub-structures.
+
+    Note:
+        Mapping a multi-terabyte device requires 64-bit Python. If views \
+        returned by :meth:`read` are still referenced when the reader is \
+        closed, the mapping is released once the last view goes away.
+
+    Args:
+        filename (str): Path to file or device to open for reading.
+
+    Raises:
+        IOError: If file/device does not exist or is not readable.
+    """
+    def __init__(self, filename):
+        ImageReader.__init__(self, filename)
+
+        if self._size > 0:
+            self._map = mmap.mmap(
+                self._fd, self._size, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._map)
+        else:
+            # empty files can not be mapped
+            self._map = None
+            self._view = memoryview(b'')
+
+    def read(self, offset, length=None, cached=True):
+        """Returns a window over the mapped source, no data is copied.
+
+        Args:
+            offset (int): Offset from the beginning of the source in bytes.
+            length (int): Number of bytes (default: until the end).
+            cached (bool): Ignored, mapped reads do not use block cache.
+
+        Returns:
+            memoryview: Read-only view of the requested range.
+
+        Raises:
+            IOError: If requested range is beyond the end of the source.
+        """
+        if length is None:
+            length = max(self._size - offset, 0)
+
+        self._validate_range(offset, length)
+
+        return self._view[offset:offset + length]
+
+    def close(self):
+        if self._map is not None:
+            self._view.release()
+
+            try:
+                self._map.close()
+            except BufferError:
+                # views handed out by read() are still alive, mapping is
+                # unmapped when the last one is garbage collected
+                pass
+
+            self._map = None
+
+        ImageReader.close(self)
+
+
+@contextmanager
+def open_image(source):
+    """Context manager that yields an :class:`ImageReader` for the source.
+
+    If source is already an :class:`ImageReader` it is yielded as is and
+    left open, otherwise a new reader is opened and closed on exit.
+
+    Args:
+        source (str or ImageReader): Path to file/device or open reader.
+    """
+    if isinstance(source, ImageReader):
+        yield source
+    else:
+        with ImageReader(source) as reader:
+            yield reader
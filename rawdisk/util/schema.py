@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+
+"""Declarative binary structure layouts.
+
+Structure layout is declared once as a list of (name, offset, type) fields
+and compiled into a single :class:`struct.Struct`, so the whole structure
+is decoded with one ``unpack_from`` call instead of a slice, format parse
+and tuple allocation per field. The same declaration provides ``_fields_``
+for ctypes structures in ``headers.py`` modules.
+
+>>> BPB_SCHEMA = StructSchema([
+>>>     ('bytes_per_sector',    0x0B, c_ushort),
+>>>     ('sectors_per_cluster', 0x0D, c_ubyte),
+>>> ])
+>>> class BPB(Structure):
+>>>     _fields_ = BPB_SCHEMA.ctypes_fields
+>>> bpb = BPB(*BPB_SCHEMA.unpack_from(data))
+"""
+import struct
+from functools import lru_cache
+from ctypes import Array, c_byte, c_ubyte, c_short, c_ushort, c_int, \
+    c_uint, c_long, c_ulong, c_longlong, c_ulonglong, c_char
+
+
+CTYPES_FORMATS = {
+    c_byte: 'b',
+    c_ubyte: 'B',
+    c_char: 'c',
+    c_short: 'h',
+    c_ushort: 'H',
+    c_int: 'i',
+    c_uint: 'I',
+    c_long: 'l' if struct.calcsize('l') == 4 else 'q',
+    c_ulong: 'L' if struct.calcsize('L') == 4 else 'Q',
+    c_longlong: 'q',
+    c_ulonglong: 'Q',
+}
+
+
+@lru_cache(maxsize=None)
+def compile_format(format):
+    """Returns cached :class:`struct.Struct` for the format string."""
+    return struct.Struct(format)
+
+
+def ctype_format(ctype):
+    """Returns struct format of a ctypes type (eg. 'H' for c_ushort, \
+    '4s' for c_char * 4).
+
+    Raises:
+        TypeError: If ctypes type has no struct equivalent.
+    """
+    if isinstance(ctype, str):
+        return ctype
+
+    if issubclass(ctype, Array) and ctype._type_ is c_char:
+        return '{}s'.format(ctype._length_)
+
+    try:
+        return CTYPES_FORMATS[ctype]
+    except KeyError:
+        raise TypeError(
+            'Unsupported field type: {}'.format(ctype.__name__))
+
+
+class StructSchema(object):
+    """Binary layout compiled into a single precompiled \
+    :class:`struct.Struct`.
+
+    Args:
+        fields (list): (name, offset, type) tuples in ascending offset \
+        order, type is a ctypes type (eg. c_ushort, c_char * 4) or \
+        struct format string (eg. 'H', '8s'). Gaps between fields are \
+        skipped.
+        byte_order (str): struct byte order character (default: '<').
+
+    Attributes:
+        names (tuple): Field names in declaration order.
+        struct (struct.Struct): Compiled structure.
+
+    Raises:
+        ValueError: If fields overlap or are not sorted by offset.
+    """
+    def __init__(self, fields, byte_order='<'):
+        self.fields = list(fields)
+        self.names = tuple(name for name, _, _ in self.fields)
+        self.byte_order = byte_order
+
+        format = byte_order
+        position = 0
+
+        for name, offset, ctype in self.fields:
+            if offset < position:
+                raise ValueError(
+                    'Field {} at offset {:#x} overlaps previous field'.format(
+                        name, offset))
+
+            if offset > position:
+                format += '{}x'.format(offset - position)
+
+            field_format = ctype_format(ctype)
+            format += field_format
+            position = offset + struct.calcsize(byte_order + field_format)
+
+        self.struct = compile_format(format)
+
+    @property
+    def size(self):
+        """
+        Returns:
+            int: Number of bytes covered by the layout.
+        """
+        return self.struct.size
+
+    @property
+    def ctypes_fields(self):
+        """
+        Returns:
+            list: (name, ctype) pairs usable as ctypes ``_fields_``.
+        """
+        return [(name, ctype) for name, _, ctype in self.fields]
+
+    def unpack_from(self, buffer, offset=0):
+        """Decodes all fields with a single ``unpack_from`` call.
+
+        Args:
+            buffer (bytes): bytes, bytearray or memoryview to decode.
+            offset (int): Structure offset in buffer.
+
+        Returns:
+            tuple: Field values in declaration order.
+        """
+        return self.struct.unpack_from(buffer, offset)
+
+    def unpack_into(self, target, buffer, offset=0):
+        """Decodes all fields and sets them as attributes of target."""
+        for name, value in zip(self.names, self.struct.unpack_from(
+                buffer, offset)):
+            setattr(target, name, value)
+
+    def numpy_dtype(self, itemsize=None):
+        """Returns NumPy structured dtype with the same layout, so arrays \
+        of structures can be decoded with a single ``numpy.frombuffer``.
+
+        Args:
+            itemsize (int): Size of one item in bytes, eg. record size \
+            for structures at the start of fixed size records \
+            (default: :attr:`size`).
+
+        Returns:
+            numpy.dtype: Structured dtype.
+        """
+        import numpy
+
+        formats = []
+
+        for _, _, ctype in self.fields:
+            field_format = ctype_format(ctype)
+            size = struct.calcsize(self.byte_order + field_format)
+
+            if field_format[-1] in 'sc':
+                formats.append('S{}'.format(size))
+            elif field_format in 'fd':
+                formats.append('{}f{}'.format(self.byte_order, size))
+            else:
+                # integers: lowercase struct formats are signed
+                formats.append('{}{}{}'.format(
+                    self.byte_order,
+                    'i' if field_format.islower() else 'u',
+                    size))
+
+        return numpy.dtype({
+            'names': list(self.names),
+            'formats': formats,
+            'offsets': [offset for _, offset, _ in self.fields],
+            'itemsize': itemsize or self.size,
+        })
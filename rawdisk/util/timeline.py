@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+
+"""MACB timeline rows and their CSV / JSON lines writers.
+
+Filesystem volumes that support timelines provide an ``iter_timeline()``
+generator of :class:`TimelineEvent` tuples, one per timestamp. Writers
+consume the generator row by row, so memory use does not grow with the
+number of events.
+
+>>> write_csv(volume.iter_timeline(), sys.stdout)
+"""
+import csv
+import json
+from collections import namedtuple
+
+# M - content modified, A - accessed, C - metadata changed, B - born
+MACB_EVENTS = ('M', 'A', 'C', 'B')
+
+
+class TimelineEvent(namedtuple('TimelineEvent', [
+    'time', 'path', 'record', 'event', 'source', 'size'
+])):
+    """Single timestamp of a file.
+
+    Attributes:
+        time (str): ISO 8601 UTC time (eg. '2009-07-25T23:00:00.000100Z').
+        path (str): Full path of the file.
+        record (int): Record number of the file (eg. MFT entry index).
+        event (str): One of :data:`MACB_EVENTS`.
+        source (str): Metadata the time comes from (eg. '$SI').
+        size (int): File size in bytes.
+    """
+    __slots__ = ()
+
+
+def write_csv(events, stream):
+    """Writes events as CSV with a header row.
+
+    Args:
+        events (iterable): :class:`TimelineEvent` tuples.
+        stream (io.TextIOBase): Text stream (open files with newline='').
+
+    Returns:
+        int: Number of events written.
+    """
+    writer = csv.writer(stream)
+    writer.writerow(TimelineEvent._fields)
+    count = 0
+
+    for event in events:
+        writer.writerow(event)
+        count += 1
+
+    return count
+
+
+def write_jsonl(events, stream):
+    """Writes events as JSON lines, one object per event.
+
+    Args:
+        events (iterable): :class:`TimelineEvent` tuples.
+        stream (io.TextIOBase): Text stream.
+
+    Returns:
+        int: Number of events written.
+    """
+    fields = TimelineEvent._fields
+    count = 0
+
+    for event in events:
+        stream.write(json.dumps(dict(zip(fields, event))))
+        stream.write('\n')
+        count += 1
+
+    return count
+
+
+# output format name -> writer
+TIMELINE_WRITERS = {
+    'csv': write_csv,
+    'jsonl': write_jsonl,
+}
@@ -1,5 +1,6 @@
 import unittest
 from rawdisk.scheme.common import detect_scheme, PartitionScheme
+from rawdisk.util.reader import ImageReader
 
 
 class TestCommon(unittest.TestCase):
@@ -14,3 +15,9 @@ class TestCommon(unittest.TestCase):
     def test_detect_unknown_scheme(self):
         scheme = detect_scheme('sample_images/ntfs_mft_table.bin')
         self.assertEqual(PartitionScheme.SCHEME_UNKNOWN, scheme)
+
+    def test_detect_scheme_with_reader(self):
+        with ImageReader('sample_images/ntfs_primary_gpt.bin') as reader:
+            scheme = detect_scheme(reader)
+
+        self.assertEqual(PartitionScheme.SCHEME_GPT, scheme)
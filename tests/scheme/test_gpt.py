@@ -3,6 +3,7 @@
 import unittest
 from rawdisk.scheme.gpt import Gpt, GptPartitionEntry
 from uuid import UUID
+from rawdisk.util.reader import ImageReader
 
 
 class TestGptModule(unittest.TestCase):
@@ -34,6 +35,13 @@ class TestGptModule(unittest.TestCase):
         self.assertEqual(header.part_array_crc32, 0xf0f45a62)
         self.assertEqual(len(self.gpt.partition_entries), 2)
 
+    def test_load_with_reader(self):
+        with ImageReader('sample_images/ntfs_primary_gpt.bin') as reader:
+            self.gpt.load(filename=reader, bs=512)
+
+        self.assertEqual(self.gpt.header.signature, b'EFI PART')
+        self.assertEqual(len(self.gpt.partition_entries), 2)
+
 
 class TestGptPartitionEntry(unittest.TestCase):
     def setUp(self):
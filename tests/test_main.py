@@ -1,5 +1,10 @@
+import os
+import shutil
+import tempfile
 import unittest
-from rawdisk.main import parse_args
+import mock
+from rawdisk.main import parse_args, write_timeline
+from rawdisk.util.timeline import TimelineEvent
 
 
 class TestMain(unittest.TestCase):
@@ -18,3 +23,35 @@ class TestMain(unittest.TestCase):
         self.assertEqual('test.img', arguments.filename)
         self.assertEqual('ERROR', arguments.log_level)
         self.assertEqual('log.yaml', arguments.log_config)
+        self.assertIsNone(arguments.timeline)
+
+    def test_parseargs_timeline(self):
+        arguments = parse_args(
+            ['-f', 'test.img', '--timeline', 'jsonl', '-o', 'out.jsonl'])
+
+        self.assertEqual('jsonl', arguments.timeline)
+        self.assertEqual('out.jsonl', arguments.output)
+
+        with self.assertRaises(SystemExit):
+            parse_args(['-f', 'test.img', '--timeline', 'xml'])
+
+    def test_write_timeline(self):
+        volume = mock.Mock()
+        volume.iter_timeline.return_value = iter([
+            TimelineEvent('2009-07-25T23:00:00.000000Z', '/a.txt', 40, 'M',
+                          '$SI', 12)])
+        # volumes without timeline support are skipped
+        other = mock.Mock(spec=[])
+        tmpdir = tempfile.mkdtemp()
+        output = os.path.join(tmpdir, 'timeline.csv')
+
+        try:
+            self.assertEqual(
+                write_timeline([other, volume], 'csv', output), 1)
+
+            with open(output) as f:
+                self.assertEqual(f.read().splitlines(), [
+                    'time,path,record,event,source,size',
+                    '2009-07-25T23:00:00.000000Z,/a.txt,40,M,$SI,12'])
+        finally:
+            shutil.rmtree(tmpdir)
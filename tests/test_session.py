@@ -1,3 +1,6 @@
+import os
+import shutil
+import tempfile
 import unittest
 from rawdisk.session import Session
 from rawdisk.filesystems.unknown_volume import UnknownVolume
@@ -31,3 +34,48 @@ class TestSession(unittest.TestCase):
         self.assertEqual(self.session.partition_scheme,
                          PartitionScheme.SCHEME_GPT)
         self.assertEqual(len(self.session.volumes), 2)
+
+    def test_load_keeps_reader_open_until_close(self):
+        self.session.load(filename='sample_images/ntfs_primary_gpt.bin')
+        reader = self.session.reader
+        self.assertFalse(reader.closed)
+        self.session.close()
+        self.assertTrue(reader.closed)
+        self.assertIsNone(self.session.reader)
+
+    def test_load_gpt_with_mmap(self):
+        session = Session(load_plugins=False, use_mmap=True)
+        session.load(filename='sample_images/ntfs_primary_gpt.bin')
+        self.assertEqual(session.partition_scheme,
+                         PartitionScheme.SCHEME_GPT)
+        self.assertEqual(len(session.volumes), 2)
+        session.close()
+
+    def test_repeated_metadata_reads_hit_cache(self):
+        self.session.load(filename='sample_images/ntfs_primary_gpt.bin')
+        self.assertGreater(self.session.cache.hits, 0)
+
+    def test_cache_can_be_disabled(self):
+        session = Session(load_plugins=False, cache_size=0)
+        session.load(filename='sample_images/ntfs_primary_gpt.bin')
+        self.assertIsNone(session.cache)
+        self.assertIsNone(session.reader.cache)
+        session.close()
+
+    def test_mft_cache_assigned_to_ntfs_volumes(self):
+        tmpdir = tempfile.mkdtemp()
+
+        try:
+            cache_file = os.path.join(tmpdir, 'mft.db')
+            session = Session(mft_cache=cache_file)
+            session.load(filename='sample_images/ntfs_mbr.vhd')
+            volume = session.volumes[0]
+
+            self.assertEqual(session.mft_cache, cache_file)
+            self.assertEqual(volume.mft_cache_file, cache_file)
+            self.assertEqual(len(volume.mft_columns),
+                             volume.mft_table.entry_count)
+            self.assertTrue(os.path.exists(cache_file))
+            session.close()
+        finally:
+            shutil.rmtree(tmpdir)
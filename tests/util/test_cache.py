@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+from rawdisk.util.cache import LruCache, BlockCache
+from rawdisk.util.reader import ImageReader
+
+SAMPLE_FILENAME = 'sample_images/ntfs_mft_table.bin'
+
+
+class TestLruCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LruCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+
+    def test_weighted_capacity(self):
+        cache = LruCache(10, weigh=len)
+        cache.put('a', b'x' * 6)
+        cache.put('b', b'x' * 6)
+
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.weight, 6)
+
+        cache.put('c', b'x' * 11)
+        self.assertNotIn('c', cache)
+
+    def test_hits_and_misses(self):
+        cache = LruCache(2)
+        cache.put('a', 1)
+        cache.get('a')
+        cache.get('b')
+
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+
+class TestBlockCache(unittest.TestCase):
+    def setUp(self):
+        with open(SAMPLE_FILENAME, 'rb') as f:
+            self.sample_data = f.read()
+
+        self.fetches = []
+
+    def fetch(self, offset, length):
+        self.fetches.append((offset, length))
+        return self.sample_data[offset:offset + length]
+
+    def read(self, cache, offset, length):
+        return cache.read(
+            'sample', offset, length, len(self.sample_data), self.fetch)
+
+    def test_read_returns_requested_range(self):
+        cache = BlockCache(4096, block_size=512)
+
+        for offset, length in [(0, 10), (500, 30), (1020, 600), (8000, 192)]:
+            self.assertEqual(
+                self.read(cache, offset, length),
+                self.sample_data[offset:offset + length])
+
+    def test_repeated_read_is_served_from_cache(self):
+        cache = BlockCache(4096, block_size=512)
+        self.read(cache, 0x1FE, 2)
+        self.read(cache, 0x0, 0x200)
+
+        self.assertEqual(self.fetches, [(0, 512)])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_consecutive_missing_blocks_fetched_at_once(self):
+        cache = BlockCache(8192, block_size=512)
+        self.read(cache, 512, 10)
+        self.read(cache, 0, 2048)
+
+        self.assertEqual(self.fetches, [(512, 512), (0, 512), (1024, 1024)])
+
+    def test_large_reads_bypass_cache(self):
+        cache = BlockCache(2048, block_size=512)
+        self.read(cache, 0, 4096)
+
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(self.fetches, [(0, 4096)])
+
+    def test_eviction_respects_byte_budget(self):
+        cache = BlockCache(1024, block_size=512, max_read=1024)
+
+        for n in range(8):
+            self.read(cache, n * 512, 512)
+
+        self.assertLessEqual(cache.weight, 1024)
+        self.assertEqual(len(cache), 2)
+
+
+class TestCachedImageReader(unittest.TestCase):
+    def test_readers_share_cache(self):
+        cache = BlockCache(64 * 1024)
+
+        with ImageReader(SAMPLE_FILENAME, cache=cache) as reader:
+            first = reader.read(0x400, 0x10)
+
+        with ImageReader(SAMPLE_FILENAME, cache=cache) as reader:
+            second = reader.read(0x410, 0x10)
+            uncached = reader.read(0x400, 0x20, cached=False)
+
+        self.assertEqual(first + second, uncached)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
@@ -2,9 +2,19 @@
 # -*- coding: utf-8 -*-
 
 import unittest
-from rawdisk.util.filetimes import dt_to_filetime, filetime_to_dt, UTC, ZERO
+import numpy
+from rawdisk.util.filetimes import dt_to_filetime, filetime_to_dt, UTC, \
+    ZERO, filetimes_to_datetime64, filetimes_to_epoch
 from datetime import datetime
 
+SAMPLES = [
+    116444736000000000,     # 1970-01-01
+    128930364000001000,     # 2009-07-25 23:00:00.0001
+    1,                      # 1601-01-01, before datetime64[ns] range
+    0,                      # not set
+    2 ** 63,                # out of range
+]
+
 
 class TestFiletimesModule(unittest.TestCase):
     def test_dt_to_filetime(self):
@@ -15,6 +25,34 @@ class TestFiletimesModule(unittest.TestCase):
         value = 116444736000000000
         self.assertEqual(datetime(1970, 1, 1, 0, 0), filetime_to_dt(value))
 
+    def test_filetimes_to_datetime64(self):
+        converted = filetimes_to_datetime64(numpy.array(SAMPLES, '<u8'))
+
+        self.assertEqual(converted.dtype, numpy.dtype('datetime64[ns]'))
+        self.assertEqual(
+            converted[:2].astype('datetime64[us]').tolist(),
+            [filetime_to_dt(ft) for ft in SAMPLES[:2]])
+        self.assertEqual(numpy.isnat(converted).tolist(),
+                         [False, False, True, True, True])
+
+        # microseconds cover the whole FILETIME range
+        converted = filetimes_to_datetime64(SAMPLES, 'us')
+        self.assertEqual(
+            converted[:3].tolist(), [filetime_to_dt(ft) for ft in SAMPLES[:3]])
+        self.assertEqual(numpy.isnat(converted).tolist(),
+                         [False, False, False, True, True])
+
+        with self.assertRaises(ValueError):
+            filetimes_to_datetime64(SAMPLES, 'D')
+
+    def test_filetimes_to_epoch(self):
+        seconds = filetimes_to_epoch(SAMPLES)
+
+        self.assertEqual(seconds[0], 0.0)
+        self.assertAlmostEqual(seconds[1], 1248562800.0001, places=4)
+        self.assertEqual(numpy.isnan(seconds).tolist(),
+                         [False, False, False, True, True])
+
     def test_utc(self):
         utc = UTC()
 
@@ -6,6 +6,7 @@ import mock
 import struct
 import uuid
 from rawdisk.util.rawstruct import RawStruct
+from rawdisk.util.reader import ImageReader
 
 
 class TestRawStruct(unittest.TestCase):
@@ -51,6 +52,16 @@ class TestRawStruct(unittest.TestCase):
                     (length, self.sample_data[offset:offset + length])
                 )
 
+    def test_init_with_reader(self):
+        filename = 'sample_images/ntfs_bootsector.bin'
+        with open(filename, 'rb') as f:
+            expected = f.read()[3:11]
+
+        with ImageReader(filename) as reader:
+            r = RawStruct(filename=reader, offset=3, length=8)
+
+        self.assertEqual(r.data, expected)
+
     def test_init_without_filename_or_data(self):
         with self.assertRaises(ValueError):
             RawStruct()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+from rawdisk.util.reader import ImageReader, MmapImageReader, open_image
+from rawdisk.plugins.filesystems.ntfs.mft_entry import MftEntry
+from rawdisk.plugins.filesystems.ntfs.mft_attribute import MFT_ATTR_FILENAME, \
+    MFT_ATTR_DATA
+
+SAMPLE_FILENAME = 'sample_images/ntfs_mft_table.bin'
+
+
+class TestImageReader(unittest.TestCase):
+    def setUp(self):
+        self.reader = ImageReader(SAMPLE_FILENAME)
+
+        with open(SAMPLE_FILENAME, 'rb') as f:
+            self.sample_data = f.read()
+
+    def tearDown(self):
+        self.reader.close()
+
+    def test_size(self):
+        self.assertEqual(self.reader.size, len(self.sample_data))
+
+    def test_read(self):
+        self.assertEqual(
+            self.reader.read(0x400, 0x10), self.sample_data[0x400:0x410])
+
+    def test_read_until_end(self):
+        self.assertEqual(
+            self.reader.read(0x1C00), self.sample_data[0x1C00:])
+
+    def test_readinto(self):
+        buffer = bytearray(0x20)
+        self.assertEqual(self.reader.readinto(0x400, buffer), 0x20)
+        self.assertEqual(buffer, self.sample_data[0x400:0x420])
+
+        with self.assertRaises(IOError):
+            self.reader.readinto(len(self.sample_data) - 1, buffer)
+
+    def test_read_beyond_end_raises(self):
+        with self.assertRaises(IOError):
+            self.reader.read(len(self.sample_data) - 1, 2)
+
+    def test_read_after_close_raises(self):
+        self.reader.close()
+        self.assertTrue(self.reader.closed)
+
+        with self.assertRaises(ValueError):
+            self.reader.read(0, 1)
+
+    def test_missing_file_raises(self):
+        with self.assertRaises(IOError):
+            ImageReader('sample_images/does_not_exist.bin')
+
+
+class TestOpenImage(unittest.TestCase):
+    def test_open_image_with_filename(self):
+        with open_image(SAMPLE_FILENAME) as reader:
+            self.assertEqual(reader.filename, SAMPLE_FILENAME)
+
+        self.assertTrue(reader.closed)
+
+    def test_open_image_with_reader_leaves_it_open(self):
+        reader = ImageReader(SAMPLE_FILENAME)
+
+        with open_image(reader) as r:
+            self.assertIs(r, reader)
+
+        self.assertFalse(reader.closed)
+        reader.close()
+
+
+class TestMmapImageReader(unittest.TestCase):
+    def setUp(self):
+        self.reader = MmapImageReader(SAMPLE_FILENAME)
+
+        with open(SAMPLE_FILENAME, 'rb') as f:
+            self.sample_data = f.read()
+
+    def tearDown(self):
+        self.reader.close()
+
+    def test_read_returns_view(self):
+        data = self.reader.read(0x400, 0x10)
+        self.assertIsInstance(data, memoryview)
+        self.assertEqual(data, self.sample_data[0x400:0x410])
+
+    def test_read_beyond_end_raises(self):
+        with self.assertRaises(IOError):
+            self.reader.read(len(self.sample_data), 1)
+
+    def test_structures_share_mapped_buffer(self):
+        entry = MftEntry(
+            filename=self.reader, offset=0, length=1024, index=0)
+        attr = entry.lookup_attribute(MFT_ATTR_DATA)
+
+        self.assertIs(attr.data.obj, entry.data.obj)
+        # attribute headers keep no raw bytes once decoded
+        self.assertIsNone(attr.header.data)
+
+        # nor do attributes once their content is decoded
+        self.assertTrue(attr.data_runs)
+        self.assertIsNone(attr.data)
+        self.assertEqual(
+            entry.lookup_attribute(MFT_ATTR_FILENAME).fname, '$MFT')
+        self.assertIsNone(entry.lookup_attribute(MFT_ATTR_FILENAME).data)
+
+    def test_close_with_live_views(self):
+        data = self.reader.read(0, 4)
+        self.reader.close()
+        self.assertTrue(self.reader.closed)
+        self.assertEqual(data, self.sample_data[:4])
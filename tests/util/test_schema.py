@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import struct
+import unittest
+from ctypes import Structure, c_ushort, c_ubyte, c_char, c_wchar
+from rawdisk.util.schema import StructSchema, ctype_format
+
+
+class TestStructSchema(unittest.TestCase):
+    def setUp(self):
+        self.data = bytes(range(32))
+
+    def test_gaps_are_skipped(self):
+        schema = StructSchema([
+            ('a', 0x02, 'H'),
+            ('b', 0x08, 'B'),
+            ('c', 0x10, '4s'),
+        ])
+
+        self.assertEqual(schema.size, 0x14)
+        self.assertEqual(
+            schema.unpack_from(self.data),
+            (struct.unpack_from('<H', self.data, 2)[0], 8,
+             bytes(range(16, 20)))
+        )
+
+    def test_unpack_from_offset(self):
+        schema = StructSchema([('a', 0, 'B'), ('b', 1, 'B')])
+        self.assertEqual(schema.unpack_from(memoryview(self.data), 4), (4, 5))
+
+    def test_overlapping_fields_raise(self):
+        with self.assertRaises(ValueError):
+            StructSchema([('a', 0, 'I'), ('b', 2, 'H')])
+
+    def test_ctypes_fields(self):
+        schema = StructSchema([
+            ('sig', 0x00, c_char * 4),
+            ('value', 0x04, c_ushort),
+            ('flag', 0x07, c_ubyte),
+        ])
+
+        class Header(Structure):
+            _fields_ = schema.ctypes_fields
+
+        header = Header(*schema.unpack_from(b'FILE\x34\x12\x00\x01'))
+        self.assertEqual(header.sig, b'FILE')
+        self.assertEqual(header.value, 0x1234)
+        self.assertEqual(header.flag, 1)
+
+    def test_unpack_into(self):
+        class Target(object):
+            pass
+
+        target = Target()
+        StructSchema([('a', 0, 'B'), ('b', 2, 'B')]).unpack_into(
+            target, self.data)
+
+        self.assertEqual((target.a, target.b), (0, 2))
+
+    def test_numpy_dtype(self):
+        import numpy
+
+        schema = StructSchema([
+            ('a', 0x02, 'H'),
+            ('b', 0x04, 'b'),
+            ('c', 0x08, c_char * 4),
+            ('d', 0x0C, 'Q'),
+        ])
+        dtype = schema.numpy_dtype(itemsize=24)
+        self.assertEqual(dtype.itemsize, 24)
+        self.assertEqual(schema.numpy_dtype().itemsize, schema.size)
+
+        data = bytes(range(48))
+        items = numpy.frombuffer(data, dtype=dtype)
+        self.assertEqual(len(items), 2)
+
+        for n, item in enumerate(items):
+            self.assertEqual(
+                tuple(item.tolist()), schema.unpack_from(data, n * 24))
+
+    def test_unsupported_ctype_raises(self):
+        with self.assertRaises(TypeError):
+            ctype_format(c_wchar * 4)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import json
+import unittest
+from rawdisk.util.timeline import TimelineEvent, write_csv, write_jsonl
+
+EVENTS = [
+    TimelineEvent('2009-07-25T23:00:00.000100Z', '/a, b.txt', 40, 'M',
+                  '$SI', 12),
+    TimelineEvent('2009-07-25T23:00:01.000000Z', '/a, b.txt', 40, 'B',
+                  '$FN', 12),
+]
+
+
+class TestTimeline(unittest.TestCase):
+    def test_write_csv(self):
+        stream = io.StringIO(newline='')
+
+        self.assertEqual(write_csv(iter(EVENTS), stream), 2)
+        self.assertEqual(stream.getvalue().splitlines(), [
+            'time,path,record,event,source,size',
+            '2009-07-25T23:00:00.000100Z,"/a, b.txt",40,M,$SI,12',
+            '2009-07-25T23:00:01.000000Z,"/a, b.txt",40,B,$FN,12',
+        ])
+
+    def test_write_jsonl(self):
+        stream = io.StringIO()
+
+        self.assertEqual(write_jsonl(iter(EVENTS), stream), 2)
+
+        rows = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(rows[1], {
+            'time': '2009-07-25T23:00:01.000000Z', 'path': '/a, b.txt',
+            'record': 40, 'event': 'B', 'source': '$FN', 'size': 12})
+
+    def test_empty(self):
+        stream = io.StringIO()
+
+        self.assertEqual(write_jsonl(iter([]), stream), 0)
+        self.assertEqual(stream.getvalue(), '')
+
+
+if __name__ == "__main__":
+    unittest.main()